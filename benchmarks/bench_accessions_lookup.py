@@ -0,0 +1,171 @@
+"""
+Accessions DB の一括 lookup (``get_accession_info_bulk`` など) の速度を測る。
+
+比較する経路:
+    - in_list: ``WHERE Accession IN (?, ?, ...)`` に QUERY_BATCH_SIZE (旧 10,000) 件ずつ bind (従来の経路)
+    - unnest_list: キーを list のまま渡して ``UNNEST(?)`` と JOIN
+    - split_join: キーを改行区切りの 1 文字列で渡して ``string_split`` と JOIN (現在の経路)
+
+入力はデフォルトで合成 DB ({work_dir}/sra/sra_accessions.duckdb、--rows 行、20 run / submission)。
+本番の DB も ``--const-dir`` で渡せる (その場合は DB から accession を抜き出してキーにする)。
+
+使い方:
+    python benchmarks/bench_accessions_lookup.py
+    python benchmarks/bench_accessions_lookup.py --sizes 1000 10000 100000 --rows 5000000
+    python benchmarks/bench_accessions_lookup.py --const-dir /path/to/const
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+import duckdb
+
+from ddbj_search_converter.config import SRA_DB_FILE_NAME, Config
+from ddbj_search_converter.sra_accessions_tab import (
+    finalize_db,
+    get_accession_info_bulk,
+    get_submission_accessions,
+    init_accession_db,
+    lookup_submissions_for_accessions,
+)
+
+OLD_QUERY_BATCH_SIZE = 10000
+
+
+def build_synthetic_db(const_dir: Path, n_rows: int) -> None:
+    tmp_db_path = const_dir.joinpath("sra", "bench_tmp.duckdb")
+    init_accession_db(tmp_db_path)
+    with duckdb.connect(tmp_db_path) as conn:
+        conn.execute(
+            """
+            INSERT INTO accessions (Accession, Submission, Type, Status, Visibility, Updated, Published, Received)
+            SELECT
+                'SRR' || lpad(i::VARCHAR, 9, '0'),
+                'SRA' || lpad((i // 20)::VARCHAR, 7, '0'),
+                'RUN',
+                'live',
+                'public',
+                TIMESTAMPTZ '2024-01-01 00:00:00+00',
+                TIMESTAMPTZ '2024-01-01 00:00:00+00',
+                TIMESTAMPTZ '2024-01-01 00:00:00+00'
+            FROM range(?) AS t(i)
+            """,
+            (n_rows,),
+        )
+    finalize_db(tmp_db_path, const_dir.joinpath("sra", SRA_DB_FILE_NAME))
+
+
+def sample_keys(db_path: Path, column: str, n: int) -> list[str]:
+    with duckdb.connect(db_path, read_only=True) as conn:
+        rows = conn.execute(
+            f"SELECT DISTINCT {column} FROM accessions WHERE {column} IS NOT NULL USING SAMPLE {n} ROWS"
+        ).fetchall()
+    keys = [row[0] for row in rows]
+    random.shuffle(keys)
+    return keys
+
+
+def lookup_in_list(db_path: Path, keys: list[str]) -> int:
+    found = 0
+    with duckdb.connect(db_path, read_only=True) as conn:
+        for i in range(0, len(keys), OLD_QUERY_BATCH_SIZE):
+            batch = keys[i : i + OLD_QUERY_BATCH_SIZE]
+            placeholders = ", ".join(["?"] * len(batch))
+            found += len(
+                conn.execute(
+                    f"SELECT Accession, Status FROM accessions WHERE Accession IN ({placeholders})", batch
+                ).fetchall()
+            )
+    return found
+
+
+def lookup_unnest_list(db_path: Path, keys: list[str]) -> int:
+    with duckdb.connect(db_path, read_only=True) as conn:
+        rows = conn.execute(
+            """
+            SELECT Accession, Status
+            FROM accessions
+            JOIN (SELECT DISTINCT UNNEST(?) AS key) AS keys ON Accession = keys.key
+            """,
+            (keys,),
+        ).fetchall()
+    return len(rows)
+
+
+K = TypeVar("K")
+
+
+def measure(label: str, keys: K, func: Callable[[K], int]) -> float:
+    start = time.perf_counter()
+    found = func(keys)
+    elapsed = time.perf_counter() - start
+    print(f"    {label:<40} {elapsed:>8.3f} s ({found} rows)")
+    return elapsed
+
+
+def bench(config: Config, sizes: list[int], skip_slow_above: int) -> None:
+    db_path = config.const_dir.joinpath("sra", SRA_DB_FILE_NAME)
+    for n in sizes:
+        accessions = sample_keys(db_path, "Accession", n)
+        submissions = set(sample_keys(db_path, "Submission", max(1, n // 20)))
+        print(f"  {len(accessions)} accessions / {len(submissions)} submissions")
+        if n <= skip_slow_above:
+            baseline = measure(
+                "in_list (get_accession_info_bulk)", accessions, lambda keys: lookup_in_list(db_path, keys)
+            )
+            measure("unnest_list", accessions, lambda keys: lookup_unnest_list(db_path, keys))
+        else:
+            baseline = 0.0
+            print(f"    (in_list / unnest_list skipped above {skip_slow_above} keys)")
+        current = measure(
+            "split_join (get_accession_info_bulk)",
+            accessions,
+            lambda keys: len(get_accession_info_bulk(config, "sra", keys)),
+        )
+        measure(
+            "split_join (lookup_submissions)",
+            accessions,
+            lambda keys: len(lookup_submissions_for_accessions(config, "sra", keys)),
+        )
+        measure(
+            "split_join (get_submission_accessions)",
+            submissions,
+            lambda keys: sum(len(v) for v in get_submission_accessions(config, "sra", keys).values()),
+        )
+        if baseline > 0:
+            print(f"    speedup (in_list -> split_join): {baseline / current:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Accessions DB bulk lookups.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Rows of the synthetic DB. Default: 2000000")
+    parser.add_argument("--const-dir", type=Path, default=None, help="Use {const_dir}/sra/sra_accessions.duckdb.")
+    parser.add_argument(
+        "--skip-slow-above",
+        type=int,
+        default=100_000,
+        help="Skip the in_list / unnest_list paths above this many keys. Default: 100000",
+    )
+    args = parser.parse_args()
+
+    if args.const_dir is not None:
+        config = Config(const_dir=args.const_dir)
+        print(f"Accessions DB: {args.const_dir}")
+        bench(config, args.sizes, args.skip_slow_above)
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        config = Config(const_dir=Path(work_dir))
+        print(f"Accessions DB: synthetic ({args.rows} rows)")
+        build_synthetic_db(config.const_dir, args.rows)
+        bench(config, args.sizes, args.skip_slow_above)
+
+
+if __name__ == "__main__":
+    main()
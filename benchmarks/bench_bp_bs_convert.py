@@ -0,0 +1,93 @@
+"""
+BioProject / BioSample の XML 要素 → Pydantic model 変換の throughput を測る。
+
+比較する経路:
+    - generic: 名前空間対応の ``_element_to_dict`` で dict 化して変換 (従来の経路)
+    - plain: ``parse_xml`` (名前空間宣言がなければ ``_plain_element_to_dict``) で dict 化して変換
+
+入力はデフォルトで tests/fixtures の XML。件数が少ないので ``--repeat`` 回繰り返す。
+本番の分割ファイル ({result_dir}/{bioproject,biosample}/tmp_xml/{date}/*.xml) も渡せる。
+
+使い方:
+    python benchmarks/bench_bp_bs_convert.py
+    python benchmarks/bench_bp_bs_convert.py --bs-xml /path/to/ncbi_1.xml --repeat 1
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from lxml import etree
+
+from ddbj_search_converter.jsonl.bp import xml_entry_to_bp_instance
+from ddbj_search_converter.jsonl.bs import xml_entry_to_bs_instance
+from ddbj_search_converter.xml_utils import _SAFE_PARSER, _element_to_dict, iterate_xml_element, parse_xml
+
+FIXTURES_DIR = Path(__file__).resolve().parents[1] / "tests/fixtures/usr/local/resources"
+DEFAULT_BP_XML = FIXTURES_DIR / "bioproject/bioproject.xml"
+DEFAULT_BS_XML = FIXTURES_DIR / "biosample/biosample_set.xml.gz"
+
+
+def parse_generic(xml_bytes: bytes) -> dict[str, Any]:
+    root = etree.fromstring(xml_bytes, parser=_SAFE_PARSER)
+    return {str(root.tag): _element_to_dict(root)}
+
+
+def measure(label: str, elements: list[bytes], func: Callable[[bytes], object]) -> float:
+    start = time.perf_counter()
+    for element in elements:
+        func(element)
+    elapsed = time.perf_counter() - start
+    docs_per_sec = len(elements) / elapsed if elapsed > 0 else float("inf")
+    print(f"  {label:<28} {docs_per_sec:>12,.0f} docs/sec ({elapsed:.3f} s)")
+    return docs_per_sec
+
+
+def bench_bp(xml_path: Path, repeat: int, is_ddbj: bool) -> None:
+    elements = list(iterate_xml_element(xml_path, "Package")) * repeat
+    print(f"BioProject: {xml_path} ({len(elements)} elements)")
+    generic = measure(
+        "generic dict + convert",
+        elements,
+        lambda e: xml_entry_to_bp_instance(parse_generic(e)["Package"], is_ddbj),
+    )
+    plain = measure(
+        "plain dict + convert",
+        elements,
+        lambda e: xml_entry_to_bp_instance(parse_xml(e)["Package"], is_ddbj),
+    )
+    print(f"  speedup: {plain / generic:.2f}x")
+
+
+def bench_bs(xml_path: Path, repeat: int, is_ddbj: bool) -> None:
+    elements = list(iterate_xml_element(xml_path, "BioSample")) * repeat
+    print(f"BioSample: {xml_path} ({len(elements)} elements)")
+    generic = measure(
+        "generic dict + convert",
+        elements,
+        lambda e: xml_entry_to_bs_instance(parse_generic(e), is_ddbj),
+    )
+    plain = measure(
+        "plain dict + convert",
+        elements,
+        lambda e: xml_entry_to_bs_instance(parse_xml(e), is_ddbj),
+    )
+    print(f"  speedup: {plain / generic:.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark BioProject/BioSample XML conversion.")
+    parser.add_argument("--bp-xml", type=Path, default=DEFAULT_BP_XML)
+    parser.add_argument("--bs-xml", type=Path, default=DEFAULT_BS_XML)
+    parser.add_argument("--ddbj", action="store_true", help="Treat the inputs as DDBJ XML.")
+    parser.add_argument("--repeat", type=int, default=500, help="Repeat the elements N times. Default: 500")
+    args = parser.parse_args()
+
+    bench_bp(args.bp_xml, args.repeat, args.ddbj)
+    bench_bs(args.bs_xml, args.repeat, args.ddbj)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+from ddbj_search_converter.config import get_config
+from ddbj_search_converter.dblink.lookup_index import build_lookup_index
+from ddbj_search_converter.logging.logger import log_info, run_logger
+
+
+def main() -> None:
+    config = get_config()
+    with run_logger(config=config):
+        log_info("building dbxref lookup index")
+        build_lookup_index(config)
+
+
+if __name__ == "__main__":
+    main()
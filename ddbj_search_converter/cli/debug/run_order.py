@@ -24,6 +24,7 @@ PIPELINE_ORDER: list[str] = [
     # Phase 1: DBLink Construction — finalize
     "finalize_dblink_db",
     "dump_dblink_files",
+    "build_dblink_lookup_index",
     "show_dblink_counts",
     # Phase 2: JSONL Generation — sync
     "sync_ncbi_tar",
@@ -1,13 +1,31 @@
-from ddbj_search_converter.config import get_config
+import argparse
+import sys
+
+from ddbj_search_converter.config import Config, get_config
 from ddbj_search_converter.dblink.db import finalize_dblink_db, finalize_umbrella_db
 from ddbj_search_converter.logging.logger import log_info, run_logger
 
 
+def parse_args(args: list[str]) -> tuple[Config, bool]:
+    """コマンドライン引数をパースする。"""
+    parser = argparse.ArgumentParser(description="Finalize the DBLink database.")
+    parser.add_argument(
+        "--full",
+        help="Rebuild dbxref from raw_edges instead of patching the previous DBLink database.",
+        action="store_true",
+    )
+
+    parsed = parser.parse_args(args)
+
+    return get_config(), parsed.full
+
+
 def main() -> None:
-    config = get_config()
+    config, full = parse_args(sys.argv[1:])
+
     with run_logger(config=config):
-        log_info("finalizing dblink database")
-        finalize_dblink_db(config)
+        log_info(f"finalizing dblink database ({'full' if full else 'incremental'} mode)")
+        finalize_dblink_db(config, full=full)
         finalize_umbrella_db(config)
 
 
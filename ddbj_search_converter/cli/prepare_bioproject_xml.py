@@ -2,6 +2,7 @@
 BioProject XML の前処理 CLI。
 
 BioProject XML を <Package> 単位で batch 分割する。
+分割自体もバイト範囲ごとに並列で行う (``split_xml`` の ``parallel_num``)。
 分割されたファイルは並列処理に使用される。
 
 入力:
@@ -11,8 +12,13 @@ BioProject XML を <Package> 単位で batch 分割する。
 出力:
 - {result_dir}/bioproject/tmp_xml/{YYYYMMDD}/ncbi_{n}.xml
 - {result_dir}/bioproject/tmp_xml/{YYYYMMDD}/ddbj_{n}.xml
+- {result_dir}/bioproject/tmp_xml/{YYYYMMDD}/{ncbi,ddbj}_manifest.parquet
+  (accession → 分割ファイル内の位置。regenerate_jsonl が参照する)
+- --compression 指定時は分割ファイルが {prefix}_{n}.xml.gz / {prefix}_{n}.xml.zst になる
 """
 
+import argparse
+import sys
 from pathlib import Path
 
 from ddbj_search_converter.config import (
@@ -23,9 +29,11 @@ from ddbj_search_converter.config import (
     get_config,
 )
 from ddbj_search_converter.logging.logger import log_info, run_logger
-from ddbj_search_converter.xml_utils import get_tmp_xml_dir, split_xml
+from ddbj_search_converter.xml_manifest import sniff_bp_accession
+from ddbj_search_converter.xml_utils import SplitCompression, get_tmp_xml_dir, split_size_summary, split_xml
 
 DEFAULT_BATCH_SIZE = 2000
+DEFAULT_PARALLEL_NUM = 8
 
 
 def process_bioproject_xml(
@@ -33,6 +41,9 @@ def process_bioproject_xml(
     output_dir: Path,
     prefix: str,
     batch_size: int,
+    parallel_num: int = DEFAULT_PARALLEL_NUM,
+    compression: SplitCompression | None = None,
+    max_bytes: int | None = None,
 ) -> list[Path]:
     """Process BioProject XML file.
 
@@ -42,7 +53,10 @@ def process_bioproject_xml(
     if not xml_path.exists():
         raise FileNotFoundError(f"file not found: {xml_path}")
 
-    log_info(f"splitting {xml_path} with batch_size={batch_size}", file=str(xml_path))
+    log_info(
+        f"splitting {xml_path} with batch_size={batch_size}, max_bytes={max_bytes}, parallel_num={parallel_num}",
+        file=str(xml_path),
+    )
     output_files = split_xml(
         xml_path,
         output_dir,
@@ -51,12 +65,43 @@ def process_bioproject_xml(
         prefix=prefix,
         wrapper_start=BIOPROJECT_WRAPPER_START,
         wrapper_end=BIOPROJECT_WRAPPER_END,
+        parallel_num=parallel_num,
+        sniffer=sniff_bp_accession,
+        compression=compression,
+        max_bytes=max_bytes,
     )
+    log_info(f"split {prefix}: {split_size_summary(output_files)}", file=str(xml_path))
 
     return output_files
 
 
+def parse_args(args: list[str]) -> tuple[SplitCompression | None, int | None]:
+    """コマンドライン引数をパースする。"""
+    parser = argparse.ArgumentParser(description="Split BioProject XML into batches.")
+    parser.add_argument(
+        "--compression",
+        help="Compress the split XML files. Default: uncompressed",
+        choices=["gzip", "zstd"],
+        default=None,
+    )
+    parser.add_argument(
+        "--max-chunk-mb",
+        help="Also close a split file once its elements reach this many MiB. Default: count only",
+        type=int,
+        default=None,
+    )
+
+    parsed = parser.parse_args(args)
+    if parsed.max_chunk_mb is not None and parsed.max_chunk_mb < 1:
+        parser.error("--max-chunk-mb must be at least 1")
+
+    compression: SplitCompression | None = parsed.compression
+    max_bytes = parsed.max_chunk_mb * 1024 * 1024 if parsed.max_chunk_mb is not None else None
+    return compression, max_bytes
+
+
 def main() -> None:
+    compression, max_bytes = parse_args(sys.argv[1:])
     config = get_config()
 
     with run_logger(config=config):
@@ -68,6 +113,8 @@ def main() -> None:
             output_dir,
             "ncbi",
             DEFAULT_BATCH_SIZE,
+            compression=compression,
+            max_bytes=max_bytes,
         )
         log_info(f"created {len(ncbi_files)} NCBI BioProject XML files")
 
@@ -77,6 +124,8 @@ def main() -> None:
             output_dir,
             "ddbj",
             DEFAULT_BATCH_SIZE,
+            compression=compression,
+            max_bytes=max_bytes,
         )
         log_info(f"created {len(ddbj_files)} DDBJ BioProject XML files")
 
@@ -1,7 +1,8 @@
 """
 BioSample XML の前処理 CLI。
 
-gzip 圧縮された BioSample XML を展開し、batch 単位で分割する。
+gzip 圧縮された BioSample XML を展開しながら batch 単位で分割する。
+展開済みの XML 全体 (NCBI 分で約 100 GB) はディスクに書き出さない。
 分割されたファイルは並列処理に使用される。
 
 入力:
@@ -11,13 +12,20 @@ gzip 圧縮された BioSample XML を展開し、batch 単位で分割する。
 出力:
 - {result_dir}/biosample/tmp_xml/{YYYYMMDD}/ncbi_{n}.xml
 - {result_dir}/biosample/tmp_xml/{YYYYMMDD}/ddbj_{n}.xml
+- {result_dir}/biosample/tmp_xml/{YYYYMMDD}/{ncbi,ddbj}_manifest.parquet
+  (accession → 分割ファイル内の位置。regenerate_jsonl が参照する)
+- --compression 指定時は分割ファイルが {prefix}_{n}.xml.gz / {prefix}_{n}.xml.zst になる
 """
 
+import argparse
+import sys
+from functools import partial
 from pathlib import Path
 
 from ddbj_search_converter.config import DDBJ_BIOSAMPLE_XML, NCBI_BIOSAMPLE_XML, Config, get_config
 from ddbj_search_converter.logging.logger import log_info, run_logger
-from ddbj_search_converter.xml_utils import extract_gzip, get_tmp_xml_dir, split_xml
+from ddbj_search_converter.xml_manifest import sniff_bs_accession
+from ddbj_search_converter.xml_utils import SplitCompression, get_tmp_xml_dir, split_size_summary, split_xml
 
 DEFAULT_BATCH_SIZE = 10000
 
@@ -31,6 +39,8 @@ def process_biosample_xml(
     gz_path: Path,
     prefix: str,
     batch_size: int,
+    compression: SplitCompression | None = None,
+    max_bytes: int | None = None,
 ) -> list[Path]:
     """Process BioSample XML gzip file.
 
@@ -42,30 +52,52 @@ def process_biosample_xml(
 
     tmp_dir = get_tmp_xml_dir(config, "biosample")
 
-    # Extract gzip
-    log_info(f"extracting {gz_path}", file=str(gz_path))
-    xml_path = extract_gzip(gz_path, tmp_dir)
-
-    # Split XML
-    log_info(f"splitting {xml_path} with batch_size={batch_size}", file=str(xml_path))
+    # Split XML (streaming from gzip)
+    log_info(f"splitting {gz_path} with batch_size={batch_size}, max_bytes={max_bytes}", file=str(gz_path))
     output_files = split_xml(
-        xml_path,
+        gz_path,
         tmp_dir,
         batch_size,
         tag="BioSample",
         prefix=prefix,
         wrapper_start=BIOSAMPLE_XML_HEADER,
         wrapper_end=BIOSAMPLE_XML_FOOTER,
+        sniffer=partial(sniff_bs_accession, is_ddbj=prefix == "ddbj"),
+        compression=compression,
+        max_bytes=max_bytes,
     )
-
-    # Remove extracted XML (keep only split files)
-    xml_path.unlink()
-    log_info(f"removed temporary file: {xml_path}", file=str(xml_path))
+    log_info(f"split {prefix}: {split_size_summary(output_files)}", file=str(gz_path))
 
     return output_files
 
 
+def parse_args(args: list[str]) -> tuple[SplitCompression | None, int | None]:
+    """コマンドライン引数をパースする。"""
+    parser = argparse.ArgumentParser(description="Split BioSample XML into batches.")
+    parser.add_argument(
+        "--compression",
+        help="Compress the split XML files. Default: uncompressed",
+        choices=["gzip", "zstd"],
+        default=None,
+    )
+    parser.add_argument(
+        "--max-chunk-mb",
+        help="Also close a split file once its elements reach this many MiB. Default: count only",
+        type=int,
+        default=None,
+    )
+
+    parsed = parser.parse_args(args)
+    if parsed.max_chunk_mb is not None and parsed.max_chunk_mb < 1:
+        parser.error("--max-chunk-mb must be at least 1")
+
+    compression: SplitCompression | None = parsed.compression
+    max_bytes = parsed.max_chunk_mb * 1024 * 1024 if parsed.max_chunk_mb is not None else None
+    return compression, max_bytes
+
+
 def main() -> None:
+    compression, max_bytes = parse_args(sys.argv[1:])
     config = get_config()
 
     with run_logger(config=config):
@@ -75,6 +107,8 @@ def main() -> None:
             NCBI_BIOSAMPLE_XML,
             "ncbi",
             DEFAULT_BATCH_SIZE,
+            compression,
+            max_bytes,
         )
         log_info(f"created {len(ncbi_files)} NCBI BioSample XML files")
 
@@ -84,6 +118,8 @@ def main() -> None:
             DDBJ_BIOSAMPLE_XML,
             "ddbj",
             DEFAULT_BATCH_SIZE,
+            compression,
+            max_bytes,
         )
         log_info(f"created {len(ddbj_files)} DDBJ BioSample XML files")
 
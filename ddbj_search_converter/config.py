@@ -51,6 +51,7 @@ DRA_DB_FILE_NAME = "dra_accessions.duckdb"
 TMP_DRA_DB_FILE_NAME = "dra_accessions.tmp.duckdb"
 DBLINK_DB_FILE_NAME = "dblink.duckdb"
 TMP_DBLINK_DB_FILE_NAME = "dblink.tmp.duckdb"
+PATCH_DBLINK_DB_FILE_NAME = "dblink.patch.duckdb"
 UMBRELLA_DB_FILE_NAME = "umbrella.duckdb"
 TMP_UMBRELLA_DB_FILE_NAME = "umbrella.tmp.duckdb"
 DATE_CACHE_DB_FILE_NAME = "bp_bs_date.duckdb"
@@ -146,6 +147,8 @@ class Config(BaseModel):
     xsm_postgres_url: str = ""
     trad_postgres_url: str = ""
     es_url: str = "http://ddbj-search-elasticsearch:9200"
+    # JSONL の dbXrefs に載せる関連エントリの type ごとの上限 (0 で無制限)
+    dbxref_max_per_type: int = 100_000
 
 
 default_config = Config()
@@ -159,6 +162,9 @@ def get_config() -> Config:
         xsm_postgres_url=os.environ.get(f"{ENV_PREFIX}_XSM_POSTGRES_URL", default_config.xsm_postgres_url),
         trad_postgres_url=os.environ.get(f"{ENV_PREFIX}_TRAD_POSTGRES_URL", default_config.trad_postgres_url),
         es_url=os.environ.get(f"{ENV_PREFIX}_ES_URL", default_config.es_url),
+        dbxref_max_per_type=int(
+            os.environ.get(f"{ENV_PREFIX}_DBXREF_MAX_PER_TYPE") or default_config.dbxref_max_per_type
+        ),
     )
 
 
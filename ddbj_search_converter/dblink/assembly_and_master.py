@@ -39,7 +39,7 @@ import httpx
 
 from ddbj_search_converter.config import ASSEMBLY_SUMMARY_URL, BP_ID_TO_ACCESSION_FILE_NAME, TRAD_BASE_PATH, get_config
 from ddbj_search_converter.dblink.bp_bs import IdMapping, load_id_mapping_tsv
-from ddbj_search_converter.dblink.db import AccessionType, IdPairs, load_to_db
+from ddbj_search_converter.dblink.db import AccessionType, EdgeSink, IdPairs, load_to_db
 from ddbj_search_converter.dblink.utils import filter_by_blacklist, filter_pairs_by_blacklist, load_blacklist
 from ddbj_search_converter.id_patterns import is_valid_accession
 from ddbj_search_converter.logging.logger import log_debug, log_info, log_warn, run_logger
@@ -288,12 +288,13 @@ def main() -> None:
 
         log_info("loading relations into dblink database")
 
-        load_to_db(config, assembly_to_bp, "insdc-assembly", "bioproject")
-        load_to_db(config, assembly_to_bs, "insdc-assembly", "biosample")
-        load_to_db(config, assembly_to_insdc, "insdc-assembly", "insdc-master")
-        load_to_db(config, master_to_bp, "insdc-master", "bioproject")
-        load_to_db(config, master_to_bs, "insdc-master", "biosample")
-        load_to_db(config, bs_to_bp, "biosample", "bioproject")
+        with EdgeSink(config) as sink:
+            load_to_db(config, assembly_to_bp, "insdc-assembly", "bioproject", sink=sink)
+            load_to_db(config, assembly_to_bs, "insdc-assembly", "biosample", sink=sink)
+            load_to_db(config, assembly_to_insdc, "insdc-assembly", "insdc-master", sink=sink)
+            load_to_db(config, master_to_bp, "insdc-master", "bioproject", sink=sink)
+            load_to_db(config, master_to_bs, "insdc-master", "biosample", sink=sink)
+            load_to_db(config, bs_to_bp, "biosample", "bioproject", sink=sink)
 
 
 if __name__ == "__main__":
@@ -35,12 +35,12 @@ from dataclasses import dataclass, field
 from pathlib import Path
 
 from ddbj_search_converter.config import BP_BLACKLIST_REL_PATH, Config, get_config
-from ddbj_search_converter.dblink.db import IdPairs, load_to_db, save_umbrella_relations
+from ddbj_search_converter.dblink.db import EdgeSink, IdPairs, load_to_db, save_umbrella_relations
 from ddbj_search_converter.dblink.utils import filter_pairs_by_blacklist
 from ddbj_search_converter.id_patterns import is_valid_accession
 from ddbj_search_converter.logging.logger import log_debug, log_error, log_info, log_warn, run_logger
 from ddbj_search_converter.logging.schema import DebugCategory
-from ddbj_search_converter.xml_utils import get_tmp_xml_dir
+from ddbj_search_converter.xml_utils import get_tmp_xml_dir, list_split_files, open_xml_stream, sort_largest_first
 
 DEFAULT_PARALLEL_NUM = 32
 
@@ -103,7 +103,7 @@ def process_bioproject_xml_file(xml_path: Path) -> BioProjectRelations:
     inside_link = False
     current_link: dict[str, str] = {}
 
-    with xml_path.open("r", encoding="utf-8") as f:
+    with open_xml_stream(xml_path) as f:
         for event, elem in ET.iterparse(f, events=("start", "end")):
             tag = elem.tag.split("}")[-1]
 
@@ -214,7 +214,8 @@ def process_xml_files_parallel(
 
     with ProcessPoolExecutor(max_workers=parallel_num) as executor:
         futures: dict[Future[BioProjectRelations], Path] = {
-            executor.submit(process_bioproject_xml_file, xml_path): xml_path for xml_path in xml_files
+            executor.submit(process_bioproject_xml_file, xml_path): xml_path
+            for xml_path in sort_largest_first(xml_files)
         }
 
         for future in as_completed(futures):
@@ -281,7 +282,7 @@ def process_bioproject_xml(
     geo_all: IdPairs = set()
 
     # NCBI files
-    ncbi_files = sorted(tmp_xml_dir.glob("ncbi_*.xml"))
+    ncbi_files = list_split_files(tmp_xml_dir, "ncbi")
     if not ncbi_files:
         raise FileNotFoundError(f"no NCBI XML files found in {tmp_xml_dir}")
     log_info(f"found {len(ncbi_files)} NCBI XML files")
@@ -292,7 +293,7 @@ def process_bioproject_xml(
     log_info(f"ncbi: {len(umbrella)} umbrella, {len(humandbs)} humandbs, {len(geo)} geo relations")
 
     # DDBJ files
-    ddbj_files = sorted(tmp_xml_dir.glob("ddbj_*.xml"))
+    ddbj_files = list_split_files(tmp_xml_dir, "ddbj")
     if not ddbj_files:
         raise FileNotFoundError(f"no DDBJ XML files found in {tmp_xml_dir}")
     log_info(f"found {len(ddbj_files)} DDBJ XML files")
@@ -330,11 +331,12 @@ def main() -> None:
         if umbrella_relations:
             save_umbrella_relations(config, umbrella_relations)
 
-        if humandbs_relations:
-            load_to_db(config, humandbs_relations, "bioproject", "humandbs")
+        with EdgeSink(config) as sink:
+            if humandbs_relations:
+                load_to_db(config, humandbs_relations, "bioproject", "humandbs", sink=sink)
 
-        if geo_relations:
-            load_to_db(config, geo_relations, "bioproject", "geo")
+            if geo_relations:
+                load_to_db(config, geo_relations, "bioproject", "geo", sink=sink)
 
 
 if __name__ == "__main__":
@@ -28,6 +28,8 @@ dump_dblink_files CLI コマンドで出力する。
 出力:
 - dblink.tmp.duckdb (raw_edges テーブル) に挿入
 - bp_id_to_accession.tsv, bs_id_to_accession.tsv (数字ID -> accession マッピング)
+- --write-entry-cache 指定時: 分割 BioSample XML ごとの entry cache
+  ({prefix}_{n}.entries.jsonl、generate_bs_jsonl が XML の代わりに読む)
 
 処理フロー:
 1. blacklist ファイルを読み込み
@@ -41,10 +43,14 @@ dump_dblink_files CLI コマンドで出力する。
 9. 全ての関連を DuckDB にロード
 """
 
+import argparse
+import sys
 import xml.etree.ElementTree as ET
 from collections.abc import Callable
 from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
+from typing import Any
 
 from ddbj_search_converter.config import (
     BP_BS_PRESERVED_REL_PATH,
@@ -58,10 +64,19 @@ from ddbj_search_converter.config import (
 from ddbj_search_converter.dblink.db import IdPairs, load_to_db
 from ddbj_search_converter.dblink.utils import convert_id_if_needed, filter_by_blacklist, load_blacklist
 from ddbj_search_converter.id_patterns import is_valid_accession
-from ddbj_search_converter.logging.logger import log_debug, log_error, log_info, run_logger
+from ddbj_search_converter.jsonl.bs import parse_accession, write_entry_cache, xml_entry_to_bs_instance
+from ddbj_search_converter.logging.logger import log_debug, log_error, log_info, log_warn, run_logger
 from ddbj_search_converter.logging.schema import DebugCategory
+from ddbj_search_converter.schema import BioSample
 from ddbj_search_converter.sra_accessions_tab import iter_bp_bs_relations
-from ddbj_search_converter.xml_utils import get_tmp_xml_dir
+from ddbj_search_converter.xml_utils import (
+    get_tmp_xml_dir,
+    iterate_xml_element,
+    list_split_files,
+    open_xml_stream,
+    parse_xml,
+    sort_largest_first,
+)
 
 DEFAULT_PARALLEL_NUM = 32
 
@@ -89,7 +104,7 @@ def process_ncbi_xml_file(xml_path: Path) -> XmlProcessResult:
     current_bs: str | None = None
     current_bs_is_valid = False
 
-    with xml_path.open("r", encoding="utf-8") as f:
+    with open_xml_stream(xml_path) as f:
         for event, elem in ET.iterparse(f, events=("start", "end")):
             tag = elem.tag.split("}")[-1]
 
@@ -143,7 +158,7 @@ def process_ddbj_xml_file(xml_path: Path) -> XmlProcessResult:
     current_bs_is_valid = False
     in_ids = False
 
-    with xml_path.open("r", encoding="utf-8") as f:
+    with open_xml_stream(xml_path) as f:
         for event, elem in ET.iterparse(f, events=("start", "end")):
             tag = elem.tag.split("}")[-1]
 
@@ -184,6 +199,87 @@ def process_ddbj_xml_file(xml_path: Path) -> XmlProcessResult:
     return results, skipped, {}
 
 
+def _as_list(value: Any) -> list[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _extract_bps_from_sample(sample: dict[str, Any], is_ddbj: bool) -> list[str]:
+    """parse 済みの BioSample dict から関連する BioProject accession を取り出す。
+
+    process_ncbi_xml_file / process_ddbj_xml_file と同じ規則で、iterparse の代わりに
+    parse_xml の結果を見る。
+    """
+    bps: list[str] = []
+    if not is_ddbj:
+        links = sample.get("Links")
+        for link in _as_list(links.get("Link") if isinstance(links, dict) else None):
+            if not isinstance(link, dict) or link.get("target") != "bioproject":
+                continue
+            bp = link.get("label") or (link.get("content") or "").strip()
+            if bp and not bp.startswith("PRJ"):
+                bp = f"PRJNA{bp}"
+            if bp and is_valid_accession(bp, "bioproject"):
+                bps.append(bp)
+
+    # DDBJ uses "bioproject_id", NCBI uses "bioproject_accession"
+    attr_names = ("bioproject_id", "bioproject_accession") if is_ddbj else ("bioproject_accession",)
+    attributes = sample.get("Attributes")
+    for attr in _as_list(attributes.get("Attribute") if isinstance(attributes, dict) else None):
+        if not isinstance(attr, dict) or attr.get("attribute_name") not in attr_names:
+            continue
+        bp = (attr.get("content") or "").strip()
+        if bp and is_valid_accession(bp, "bioproject"):
+            bps.append(bp)
+
+    return bps
+
+
+def scan_biosample_xml_file(xml_path: Path, is_ddbj: bool) -> XmlProcessResult:
+    """
+    分割 BioSample XML を 1 回だけ parse し、関連と id -> accession マッピングを
+    集めると同時に entry cache を書き出す。
+
+    返り値は process_ncbi_xml_file / process_ddbj_xml_file と同じ。
+    entry cache には BioSample への変換に成功したエントリだけが入る
+    (変換に失敗しても、関連は dict から取れる限り集める)。
+
+    Returns:
+        (relations, skipped_accessions, id_to_accession_mapping)
+    """
+    results: list[tuple[str, str]] = []
+    skipped: list[str] = []
+    id_to_accession: dict[str, str] = {}
+    docs: list[BioSample] = []
+
+    for xml_element in iterate_xml_element(xml_path, "BioSample"):
+        try:
+            metadata = parse_xml(xml_element)
+            sample = metadata["BioSample"]
+            try:
+                bs = parse_accession(sample, is_ddbj)
+            except ValueError:
+                bs = None
+
+            if bs is not None:
+                if not is_valid_accession(bs, "biosample"):
+                    skipped.append(bs)
+                else:
+                    results.extend((bs, bp) for bp in _extract_bps_from_sample(sample, is_ddbj))
+                    bs_id = sample.get("id")
+                    if not is_ddbj and isinstance(bs_id, str) and bs_id:
+                        id_to_accession[bs_id] = bs
+
+            docs.append(xml_entry_to_bs_instance(metadata, is_ddbj))
+        except Exception as e:
+            log_warn(f"failed to parse xml element: {e}", file=str(xml_path))
+
+    write_entry_cache(xml_path, docs)
+
+    return results, skipped, id_to_accession
+
+
 def process_xml_files_parallel(
     xml_files: list[Path],
     worker_func: Callable[[Path], XmlProcessResult],
@@ -205,7 +301,7 @@ def process_xml_files_parallel(
 
     with ProcessPoolExecutor(max_workers=parallel_num) as executor:
         futures: dict[Future[XmlProcessResult], Path] = {
-            executor.submit(worker_func, xml_path): xml_path for xml_path in xml_files
+            executor.submit(worker_func, xml_path): xml_path for xml_path in sort_largest_first(xml_files)
         }
 
         for future in as_completed(futures):
@@ -236,20 +332,24 @@ def process_ncbi_biosample_xml(
     config: Config,
     bs_to_bp: IdPairs,
     parallel_num: int = DEFAULT_PARALLEL_NUM,
+    entry_cache: bool = False,
 ) -> IdMapping:
     """Process NCBI BioSample XML files and return id -> accession mapping.
 
+    entry_cache=True の場合は scan_biosample_xml_file で entry cache も書く。
+
     Returns:
         id_to_accession mapping for BioSample
     """
     tmp_xml_dir = get_tmp_xml_dir(config, "biosample")
-    ncbi_files = sorted(tmp_xml_dir.glob("ncbi_*.xml"))
+    ncbi_files = list_split_files(tmp_xml_dir, "ncbi")
 
     if not ncbi_files:
         raise FileNotFoundError(f"no NCBI XML files found in {tmp_xml_dir}")
 
     log_info(f"found {len(ncbi_files)} NCBI XML files in {tmp_xml_dir}")
-    results, id_mappings = process_xml_files_parallel(ncbi_files, process_ncbi_xml_file, parallel_num, source="ncbi")
+    worker_func = partial(scan_biosample_xml_file, is_ddbj=False) if entry_cache else process_ncbi_xml_file
+    results, id_mappings = process_xml_files_parallel(ncbi_files, worker_func, parallel_num, source="ncbi")
     bs_to_bp.update(results)
     log_info(f"extracted {len(results)} NCBI BioSample -> BioProject relations")
     log_info(f"collected {len(id_mappings)} BioSample id -> accession mappings")
@@ -260,19 +360,22 @@ def process_ddbj_biosample_xml(
     config: Config,
     bs_to_bp: IdPairs,
     parallel_num: int = DEFAULT_PARALLEL_NUM,
+    entry_cache: bool = False,
 ) -> None:
     """Process DDBJ BioSample XML files.
 
     Note: DDBJ XML does not have id attribute, so no id mapping is returned.
+    entry_cache=True の場合は scan_biosample_xml_file で entry cache も書く。
     """
     tmp_xml_dir = get_tmp_xml_dir(config, "biosample")
-    ddbj_files = sorted(tmp_xml_dir.glob("ddbj_*.xml"))
+    ddbj_files = list_split_files(tmp_xml_dir, "ddbj")
 
     if not ddbj_files:
         raise FileNotFoundError(f"no DDBJ XML files found in {tmp_xml_dir}")
 
     log_info(f"found {len(ddbj_files)} DDBJ XML files in {tmp_xml_dir}")
-    results, _ = process_xml_files_parallel(ddbj_files, process_ddbj_xml_file, parallel_num, source="ddbj")
+    worker_func = partial(scan_biosample_xml_file, is_ddbj=True) if entry_cache else process_ddbj_xml_file
+    results, _ = process_xml_files_parallel(ddbj_files, worker_func, parallel_num, source="ddbj")
     bs_to_bp.update(results)
     log_info(f"extracted {len(results)} DDBJ BioSample -> BioProject relations")
 
@@ -292,7 +395,7 @@ def process_ncbi_bioproject_xml_file(xml_path: Path) -> XmlProcessResult:
     """
     id_to_accession: dict[str, str] = {}
 
-    with xml_path.open("r", encoding="utf-8") as f:
+    with open_xml_stream(xml_path) as f:
         for _, elem in ET.iterparse(f, events=("end",)):
             tag = elem.tag.split("}")[-1]
 
@@ -315,7 +418,7 @@ def process_ncbi_bioproject_xml_for_id_mapping(
 ) -> IdMapping:
     """Process NCBI BioProject XML files and return id -> accession mapping."""
     tmp_xml_dir = get_tmp_xml_dir(config, "bioproject")
-    ncbi_files = sorted(tmp_xml_dir.glob("ncbi_*.xml"))
+    ncbi_files = list_split_files(tmp_xml_dir, "ncbi")
 
     if not ncbi_files:
         raise FileNotFoundError(f"no NCBI BioProject XML files found in {tmp_xml_dir}")
@@ -451,15 +554,30 @@ def process_preserved_file(config: Config, bs_to_bp: IdPairs) -> None:
             bs_to_bp.add((bs, bp))
 
 
+def parse_args(args: list[str]) -> tuple[Config, bool]:
+    """コマンドライン引数をパースする。"""
+    parser = argparse.ArgumentParser(description="Create BioSample <-> BioProject relations in the DBLink database.")
+    parser.add_argument(
+        "--write-entry-cache",
+        help="Also write converted BioSample entries next to the split XML files, "
+        "so that generate_bs_jsonl does not parse the XML again.",
+        action="store_true",
+    )
+
+    parsed = parser.parse_args(args)
+
+    return get_config(), parsed.write_entry_cache
+
+
 def main() -> None:
-    config = get_config()
+    config, entry_cache = parse_args(sys.argv[1:])
     with run_logger(config=config):
         bp_blacklist, bs_blacklist = load_blacklist(config)
 
         bs_to_bp: IdPairs = set()
 
         # 1. Process NCBI BioSample XML and collect id -> accession mapping
-        bs_id_to_accession = process_ncbi_biosample_xml(config, bs_to_bp)
+        bs_id_to_accession = process_ncbi_biosample_xml(config, bs_to_bp, entry_cache=entry_cache)
 
         # 2. Process NCBI BioProject XML for id -> accession mapping
         bp_id_to_accession = process_ncbi_bioproject_xml_for_id_mapping(config)
@@ -471,7 +589,7 @@ def main() -> None:
         write_id_mapping_tsv(bp_id_to_accession, bp_mapping_path)
 
         # 4. Process DDBJ BioSample XML (no id mapping needed)
-        process_ddbj_biosample_xml(config, bs_to_bp)
+        process_ddbj_biosample_xml(config, bs_to_bp, entry_cache=entry_cache)
 
         # 5. Process SRA/DRA accessions with id conversion
         process_sra_dra_accessions(config, bs_to_bp, bs_id_to_accession, bp_id_to_accession)
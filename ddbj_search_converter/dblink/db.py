@@ -5,8 +5,9 @@ DBLink は各種 accession 間の関連を無向グラフとして管理する
 
 スキーマは 2 段階:
     - 中間 ``raw_edges`` テーブル (src_type, src_accession, dst_type, dst_accession):
-      各 parser が canonical 形 (``normalize_edge`` で ``(src_type, src_accession)
-      <= (dst_type, dst_accession)`` を保証) で append する。
+      各 parser が canonical 形 (``(src_type, src_accession) <= (dst_type,
+      dst_accession)``) で append する。通常は ``EdgeSink`` が SQL 側で正規化し、
+      TSV 経由の経路では ``normalize_edge`` で正規化する。
     - 最終 ``dbxref`` テーブル (accession_type, accession, linked_type,
       linked_accession): ``build_dbxref_table`` で ``raw_edges`` を UNION ALL で
       両方向に mirror (半辺化) して構築する。1 つの無向 edge ``{A, B}`` が 2 行
@@ -14,27 +15,36 @@ DBLink は各種 accession 間の関連を無向グラフとして管理する
       lookup で両端点の隣接を取得でき、DuckDB の zone map が両方向で効く。
 
 ``finalize_dblink_db`` で ``raw_edges`` は DROP され、最終 DB には ``dbxref``
-のみ残る。
+のみ残る。前回の最終 DB があれば、既定では ``patch_dbxref_table`` で前回の
+``dbxref`` に relation ごとの差分 (追加 / 削除 edge) だけを当てる。
 
 ファイルパス:
     - 一時 DB: {const_dir}/dblink/dblink.tmp.duckdb
+    - 差分適用用 DB: {const_dir}/dblink/dblink.patch.duckdb
     - 最終 DB: {const_dir}/dblink/dblink.duckdb
 """
 
-from collections.abc import Iterable, Iterator
+import itertools
+import shutil
+import threading
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from operator import itemgetter
 from pathlib import Path
-from typing import Literal
+from typing import Literal, cast
 
 import duckdb
 
 from ddbj_search_converter.config import (
     DBLINK_DB_FILE_NAME,
+    PATCH_DBLINK_DB_FILE_NAME,
     TMP_DBLINK_DB_FILE_NAME,
     TMP_UMBRELLA_DB_FILE_NAME,
     TODAY_STR,
     UMBRELLA_DB_FILE_NAME,
     Config,
 )
+from ddbj_search_converter.dblink.lookup_index import open_lookup_index
 from ddbj_search_converter.logging.logger import log_info
 
 AccessionType = Literal[
@@ -62,6 +72,8 @@ AccessionType = Literal[
 ]
 
 Edge = tuple[AccessionType, str, AccessionType, str]
+# (type ごとに上限件で切った隣接, 切る前の type ごとの件数)
+CappedLinks = tuple[list[tuple[AccessionType, str]], dict[AccessionType, int]]
 IdPairs = set[tuple[str, str]]
 
 
@@ -73,6 +85,10 @@ def _final_db_path(config: Config) -> Path:
     return config.const_dir.joinpath("dblink", DBLINK_DB_FILE_NAME)
 
 
+def _patch_db_path(config: Config) -> Path:
+    return config.const_dir.joinpath("dblink", PATCH_DBLINK_DB_FILE_NAME)
+
+
 def normalize_edge(
     a_type: AccessionType,
     a_id: str,
@@ -108,14 +124,27 @@ def init_dblink_db(config: Config) -> None:
         """)
 
 
-def finalize_dblink_db(config: Config) -> None:
-    """``raw_edges`` から ``dbxref`` を構築し、index を張り、tmp → final に replace。
+def finalize_dblink_db(config: Config, *, full: bool = False) -> None:
+    """``raw_edges`` から ``dbxref`` を作り、最終 DB を置き換える。
 
-    各段階 (build_dbxref_table / create_dbxref_indexes / atomic replace) で
-    失敗した場合は ``RuntimeError`` でラップし、段階ラベル + 関連 path を
+    ``full`` が偽で前回の最終 DB があれば ``patch_dbxref_table`` で差分だけを
+    当てる。前回 DB が無い、差分が大きすぎる、または ``full`` が真の場合は
+    ``build_dbxref_table`` で全件を作り直し、index を張り、tmp → final に
+    replace する。
+
+    各段階で失敗した場合は ``RuntimeError`` でラップし、段階ラベル + 関連 path を
     メッセージに含める (元 traceback は ``__cause__`` 経由で保持)。replace は
     atomic だが、その前段の build / create_indexes で失敗すると tmp DB が残る
     ため、メッセージから debug の起点が辿れる。"""
+    if not full and _final_db_path(config).exists():
+        try:
+            patched = patch_dbxref_table(config)
+        except Exception as e:
+            raise RuntimeError("finalize_dblink_db: failed at patch_dbxref_table") from e
+        if patched:
+            return
+        log_info("falling back to full rebuild")
+
     try:
         build_dbxref_table(config)
     except Exception as e:
@@ -187,33 +216,151 @@ def load_edges_from_tsv(config: Config, tsv_path: Path) -> None:
         )
 
 
+EDGE_BATCH_SIZE = 1_000_000
+
+# 2 本の ID 列 (改行区切り文字列) を行に展開し、(type, accession) の struct を
+# LEAST / GREATEST で比較して canonical 形 (``normalize_edge`` と同じ向き) に
+# 揃えてから ``raw_edges`` に append する。
+_INSERT_EDGES_SQL = """
+    INSERT INTO raw_edges
+    SELECT lo.t, lo.a, hi.t, hi.a
+    FROM (
+        SELECT
+            least({'t': $src_type, 'a': src}, {'t': $dst_type, 'a': dst}) AS lo,
+            greatest({'t': $src_type, 'a': src}, {'t': $dst_type, 'a': dst}) AS hi
+        FROM (
+            SELECT
+                UNNEST(string_split($src_ids, chr(10))) AS src,
+                UNNEST(string_split($dst_ids, chr(10))) AS dst
+        )
+    )
+"""
+
+
+def _join_ids(ids: Sequence[str]) -> str:
+    text = "\n".join(ids)
+    if text.count("\n") != len(ids) - 1:
+        raise ValueError("accession must not contain a newline")
+    return text
+
+
+class EdgeSink:
+    """``raw_edges`` への append 口。
+
+    1 本の接続を開いたまま、edge を列 (src の ID 列 / dst の ID 列) の batch で
+    受け取る。canonical 形への正規化は DuckDB 側で vector 化して行うため、
+    Python での行ごとの整形と TSV の往復が発生しない。DuckDB は writer が 1 つ
+    なので、同じ tmp DB に書く sink は同時に 1 つだけ開くこと。
+    """
+
+    def __init__(self, config: Config) -> None:
+        self._conn = duckdb.connect(str(_tmp_db_path(config)))
+
+    def __enter__(self) -> "EdgeSink":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def add_columns(
+        self,
+        type_src: AccessionType,
+        src_ids: Sequence[str],
+        type_dst: AccessionType,
+        dst_ids: Sequence[str],
+    ) -> None:
+        """同じ長さの ID 列 2 本を 1 batch として append する。"""
+        if len(src_ids) != len(dst_ids):
+            raise ValueError(f"column length mismatch: {len(src_ids)} != {len(dst_ids)}")
+        if not src_ids:
+            return
+        self._conn.execute(
+            _INSERT_EDGES_SQL,
+            {
+                "src_type": type_src,
+                "dst_type": type_dst,
+                "src_ids": _join_ids(src_ids),
+                "dst_ids": _join_ids(dst_ids),
+            },
+        )
+
+    def add_pairs(
+        self,
+        pairs: Iterable[tuple[str, str]],
+        type_src: AccessionType,
+        type_dst: AccessionType,
+        *,
+        batch_size: int = EDGE_BATCH_SIZE,
+    ) -> int:
+        """(src_id, dst_id) の iterable を ``batch_size`` ごとに列へ詰めて append する。
+
+        Returns:
+            append した edge 数。
+        """
+        total = 0
+        it = iter(pairs)
+        while chunk := list(itertools.islice(it, batch_size)):
+            self.add_columns(type_src, list(map(itemgetter(0), chunk)), type_dst, list(map(itemgetter(1), chunk)))
+            total += len(chunk)
+        return total
+
+
 def load_to_db(
     config: Config,
     lines: IdPairs,
     type_src: AccessionType,
     type_dst: AccessionType,
+    *,
+    sink: EdgeSink | None = None,
 ) -> None:
-    def line_generator() -> Iterable[Edge]:
-        for src_id, dst_id in lines:
-            yield (type_src, src_id, type_dst, dst_id)
-
-    tsv_name = f"{type_src}_to_{type_dst}.tsv"
-    tmp_dir = get_tmp_dir(config)
-    tsv_path = tmp_dir.joinpath(tsv_name)
-
-    log_info(f"writing {len(lines)} edges to {tsv_path}", file=str(tsv_path))
-    write_edges_to_tsv(tsv_path, line_generator(), append=True)
+    """``type_src`` -> ``type_dst`` の ID pair を ``raw_edges`` に append する。
 
-    log_info(f"loading edges from {tsv_path}", file=str(tsv_path))
-    load_edges_from_tsv(config, tsv_path)
+    ``sink`` を渡すとその接続を使い回す。省略時はこの呼び出しの間だけ sink を開く。
+    """
+    log_info(f"loading {len(lines)} {type_src} -> {type_dst} edges into raw_edges")
+    if sink is not None:
+        sink.add_pairs(lines, type_src, type_dst)
+        return
+    with EdgeSink(config) as own_sink:
+        own_sink.add_pairs(lines, type_src, type_dst)
+
+
+# 1 partition に入れる半辺数の目安。これを超える accession_type は、sample から
+# 求めた accession の境界で範囲に分ける。
+DBXREF_PARTITION_ROWS = 50_000_000
+_PARTITION_SAMPLE_ROWS = 100_000
+
+# ``accession_type = $accession_type`` の半辺 (raw_edges の両向き) を取り出す。
+_HALF_EDGES_SQL = """
+    SELECT
+        src_type AS accession_type,
+        src_accession AS accession,
+        dst_type AS linked_type,
+        dst_accession AS linked_accession
+    FROM raw_edges
+    WHERE src_type = $accession_type
+    UNION ALL
+    SELECT dst_type, dst_accession, src_type, src_accession
+    FROM raw_edges
+    WHERE dst_type = $accession_type
+"""
 
 
 def build_dbxref_table(config: Config) -> None:
     """``raw_edges`` を両方向に mirror して半辺化 ``dbxref`` を構築する。
 
     canonical 形 (A -> B, A <= B) の edge を 2 つの半辺 (A -> B と B -> A) に
-    展開し、DISTINCT + ORDER BY で sort 済みの最終テーブルを作る。完了後、
-    ``raw_edges`` は DROP する。
+    展開し、DISTINCT + ORDER BY で sort 済みの最終テーブルを作る。sort key の
+    先頭は ``accession_type`` なので、``accession_type`` ごと (大きい type は
+    さらに accession の範囲ごと) に DISTINCT + sort した partition を順に
+    INSERT すれば、連結しただけで全体が sort 済みになる。1 回の sort が扱う
+    行数が partition 分に収まるため、メモリと spill が partition 単位で
+    抑えられる。partition ごとの所要時間と spill のピークを log に残す。完了後、
+    ``raw_edges`` は DROP する。``dbxref_meta`` は全件ビルド直後の状態 (patch 0 回) に
+    初期化する。
 
     共有計算機で他プロセスのメモリを巻き込まないよう ``memory_limit`` を明示し、
     超過分の disk spill 先を ``result_dir`` 配下 (容量に余裕のある data volume)
@@ -226,27 +373,287 @@ def build_dbxref_table(config: Config) -> None:
     with duckdb.connect(str(db_path)) as conn:
         _apply_duckdb_limits(conn, spill_dir)
         conn.execute("""
-            CREATE TABLE dbxref AS
-            SELECT DISTINCT
-                accession_type, accession, linked_type, linked_accession
+            CREATE TABLE dbxref (
+                accession_type TEXT,
+                accession TEXT,
+                linked_type TEXT,
+                linked_accession TEXT
+            )
+        """)
+        type_counts = conn.execute("""
+            SELECT accession_type, COUNT(*)
             FROM (
-                SELECT
-                    src_type AS accession_type,
-                    src_accession AS accession,
-                    dst_type AS linked_type,
-                    dst_accession AS linked_accession
-                FROM raw_edges
+                SELECT src_type AS accession_type FROM raw_edges
                 UNION ALL
-                SELECT
-                    dst_type AS accession_type,
-                    dst_accession AS accession,
-                    src_type AS linked_type,
-                    src_accession AS linked_accession
-                FROM raw_edges
+                SELECT dst_type FROM raw_edges
             )
-            ORDER BY accession_type, accession, linked_type, linked_accession
-        """)
+            GROUP BY accession_type
+            ORDER BY accession_type
+        """).fetchall()
+
+        for accession_type, half_edges in type_counts:
+            for lower, upper in _accession_ranges(conn, accession_type, half_edges):
+                _insert_dbxref_partition(conn, spill_dir, accession_type, lower, upper)
         conn.execute("DROP TABLE raw_edges")
+        conn.execute("CREATE TABLE dbxref_meta (patch_count INTEGER NOT NULL, patched_edges BIGINT NOT NULL)")
+        conn.execute("INSERT INTO dbxref_meta VALUES (0, 0)")
+
+
+def _accession_ranges(
+    conn: duckdb.DuckDBPyConnection,
+    accession_type: str,
+    half_edges: int,
+) -> list[tuple[str | None, str | None]]:
+    """``accession_type`` の半辺を ``DBXREF_PARTITION_ROWS`` 程度ずつに分ける accession の範囲。
+
+    ``(lower, upper)`` は ``lower <= accession < upper`` (``None`` は端を開放) を表す。
+    """
+    if half_edges <= DBXREF_PARTITION_ROWS:
+        return [(None, None)]
+
+    n_parts = -(-half_edges // DBXREF_PARTITION_ROWS)
+    sample = sorted(
+        row[0]
+        for row in conn.execute(
+            f"SELECT accession FROM ({_HALF_EDGES_SQL}) USING SAMPLE {_PARTITION_SAMPLE_ROWS} ROWS",
+            {"accession_type": accession_type},
+        ).fetchall()
+    )
+    bounds = sorted({sample[len(sample) * i // n_parts] for i in range(1, n_parts)})
+    return list(zip([None, *bounds], [*bounds, None], strict=True))
+
+
+def _insert_dbxref_partition(
+    conn: duckdb.DuckDBPyConnection,
+    spill_dir: Path,
+    accession_type: str,
+    lower: str | None,
+    upper: str | None,
+) -> None:
+    conditions = ["TRUE"]
+    params: dict[str, str] = {"accession_type": accession_type}
+    if lower is not None:
+        conditions.append("accession >= $lower")
+        params["lower"] = lower
+    if upper is not None:
+        conditions.append("accession < $upper")
+        params["upper"] = upper
+
+    label = accession_type if lower is None and upper is None else f"{accession_type} [{lower or ''}, {upper or ''})"
+    start = time.monotonic()
+    with _SpillMonitor(spill_dir) as spill:
+        row = conn.execute(
+            f"""
+            INSERT INTO dbxref
+            SELECT DISTINCT accession_type, accession, linked_type, linked_accession
+            FROM ({_HALF_EDGES_SQL})
+            WHERE {" AND ".join(conditions)}
+            ORDER BY accession, linked_type, linked_accession
+            """,
+            params,
+        ).fetchone()
+    rows = row[0] if row is not None else 0
+    log_info(
+        f"built dbxref partition {label}: {rows} rows in {time.monotonic() - start:.1f}s, "
+        f"peak spill {spill.peak_bytes / 1024**2:.1f} MiB",
+    )
+
+
+class _SpillMonitor:
+    """``temp_directory`` 配下の合計サイズを別 thread で poll し、ピークを記録する。"""
+
+    def __init__(self, spill_dir: Path, interval: float = 1.0) -> None:
+        self.spill_dir = spill_dir
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+
+    def __enter__(self) -> "_SpillMonitor":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _poll(self) -> None:
+        while True:
+            self.peak_bytes = max(self.peak_bytes, self._spill_bytes())
+            if self._stop.wait(self.interval):
+                return
+
+    def _spill_bytes(self) -> int:
+        total = 0
+        for path in self.spill_dir.rglob("*"):
+            try:
+                if path.is_file():
+                    total += path.stat().st_size
+            except FileNotFoundError:
+                # DuckDB が spill file を消した直後
+                continue
+        return total
+
+
+# 差分 (追加 + 削除 edge 数) が前回の edge 数に対してこの割合を超えたら、
+# patch より全件 rebuild の方が速いので諦める。
+INCREMENTAL_MAX_CHANGE_RATIO = 0.05
+
+# patch は削除で tombstone を残し、追加行を sort されない末尾に積む。前回の全件ビルドからの
+# patch 回数か、累積の差分 edge 数 (前回の edge 数比) がこれを超えたら全件 rebuild で戻す。
+PATCH_MAX_COUNT = 30
+PATCH_MAX_DRIFT_RATIO = 0.2
+
+# 前回 ``dbxref`` の canonical 側の半辺 (= 前回の ``raw_edges`` 相当) を 1 relation 分取り出す。
+_PREV_EDGES_SQL = """
+    SELECT accession_type, accession, linked_type, linked_accession
+    FROM dbxref
+    WHERE accession_type = $src_type AND linked_type = $dst_type
+      AND (accession_type, accession) <= (linked_type, linked_accession)
+"""
+
+_NEW_EDGES_SQL = """
+    SELECT src_type, src_accession, dst_type, dst_accession
+    FROM raw.raw_edges
+    WHERE src_type = $src_type AND dst_type = $dst_type
+"""
+
+
+def patch_dbxref_table(config: Config) -> bool:
+    """前回の最終 DB の ``dbxref`` に ``raw_edges`` との差分を当てる。
+
+    前回の最終 DB を複製し (index ごと引き継ぐ)、relation
+    (``(src_type, dst_type)`` の組) ごとに、今回の ``raw_edges`` と前回
+    ``dbxref`` の canonical 側の半辺との ``EXCEPT`` で追加 / 削除 edge を求める。
+    削除 edge の半辺 2 行を DELETE し、追加 edge の半辺 2 行を末尾に INSERT
+    してから final に replace する。追加分は末尾に積まれるため物理 sort は
+    崩れる (zone map が効きにくくなる) ので、``dbxref_meta`` に前回の全件ビルドから
+    の patch 回数と累積の差分 edge 数を記録し、``PATCH_MAX_COUNT`` /
+    ``PATCH_MAX_DRIFT_RATIO`` を超えたら全件 rebuild に回す。
+
+    Returns:
+        patch を適用したら ``True``。差分が ``INCREMENTAL_MAX_CHANGE_RATIO`` を
+        超えた、累積の patch が上限を超える、または ``dbxref_meta`` が無い場合は
+        何も変えずに ``False`` を返す (呼び出し側で全件 rebuild)。
+    """
+    tmp_path = _tmp_db_path(config)
+    final_path = _final_db_path(config)
+    patch_path = _patch_db_path(config)
+
+    meta = _read_dbxref_meta(final_path)
+    if meta is None:
+        log_info("dbxref_meta not found in the previous dblink db")
+        return False
+    patch_count, patched_edges = meta
+    if patch_count >= PATCH_MAX_COUNT:
+        log_info(f"{patch_count} patches since the last full rebuild reach {PATCH_MAX_COUNT}")
+        return False
+
+    spill_dir = config.result_dir.joinpath("dblink", "duckdb_tmp", TODAY_STR)
+    spill_dir.mkdir(parents=True, exist_ok=True)
+
+    patch_path.unlink(missing_ok=True)
+    shutil.copy2(final_path, patch_path)
+
+    with duckdb.connect(str(patch_path)) as conn:
+        _apply_duckdb_limits(conn, spill_dir)
+        # ATTACH は parameter binding を受け付けないので quote を escape して埋め込む
+        escaped_tmp_path = str(tmp_path).replace("'", "''")
+        conn.execute(f"ATTACH '{escaped_tmp_path}' AS raw (READ_ONLY)")
+        conn.execute("CREATE TEMP TABLE edge_added AS SELECT * FROM raw.raw_edges LIMIT 0")
+        conn.execute("CREATE TEMP TABLE edge_removed AS SELECT * FROM raw.raw_edges LIMIT 0")
+
+        relations = conn.execute("""
+            SELECT DISTINCT src_type, dst_type FROM raw.raw_edges
+            UNION
+            SELECT DISTINCT accession_type, linked_type FROM dbxref
+            WHERE accession_type <= linked_type
+            ORDER BY 1, 2
+        """).fetchall()
+
+        total_changes = 0
+        for src_type, dst_type in relations:
+            params = {"src_type": src_type, "dst_type": dst_type}
+            added = _count_inserted(conn, f"INSERT INTO edge_added {_NEW_EDGES_SQL} EXCEPT {_PREV_EDGES_SQL}", params)
+            removed = _count_inserted(
+                conn, f"INSERT INTO edge_removed {_PREV_EDGES_SQL} EXCEPT {_NEW_EDGES_SQL}", params
+            )
+            log_info(f"{src_type} <-> {dst_type}: +{added} -{removed} edges")
+            total_changes += added + removed
+
+        row = conn.execute("SELECT COUNT(*) FROM dbxref").fetchone()
+        prev_edges = (row[0] if row is not None else 0) // 2
+        too_large = total_changes > prev_edges * INCREMENTAL_MAX_CHANGE_RATIO
+        drifted = patched_edges + total_changes > prev_edges * PATCH_MAX_DRIFT_RATIO
+        if not too_large and not drifted:
+            _apply_edge_delta(conn)
+            conn.execute(
+                "UPDATE dbxref_meta SET patch_count = patch_count + 1, patched_edges = patched_edges + ?",
+                [total_changes],
+            )
+        conn.execute("DETACH raw")
+
+    if too_large or drifted:
+        if too_large:
+            log_info(f"{total_changes} changed edges exceed {INCREMENTAL_MAX_CHANGE_RATIO:.0%} of {prev_edges}")
+        else:
+            log_info(
+                f"{patched_edges + total_changes} edges patched since the last full rebuild "
+                f"exceed {PATCH_MAX_DRIFT_RATIO:.0%} of {prev_edges}"
+            )
+        patch_path.unlink()
+        return False
+
+    try:
+        patch_path.replace(final_path)
+    except Exception as e:
+        raise RuntimeError(
+            f"patch_dbxref_table: failed at atomic replace {patch_path} -> {final_path}",
+        ) from e
+    tmp_path.unlink()
+    log_info(f"patched dbxref with {total_changes} changed edges")
+
+    return True
+
+
+def _read_dbxref_meta(db_path: Path) -> tuple[int, int] | None:
+    """``dbxref_meta`` の (patch 回数, 累積の差分 edge 数) を読む。テーブルが無ければ None。"""
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        tables = {row[0] for row in conn.execute("SHOW TABLES").fetchall()}
+        if "dbxref_meta" not in tables:
+            return None
+        row = conn.execute("SELECT patch_count, patched_edges FROM dbxref_meta").fetchone()
+
+    return None if row is None else (row[0], row[1])
+
+
+def _apply_edge_delta(conn: duckdb.DuckDBPyConnection) -> None:
+    """``edge_removed`` / ``edge_added`` の半辺を ``dbxref`` から消し / 足す。"""
+    conn.execute("""
+        DELETE FROM dbxref
+        USING (
+            SELECT src_type AS t1, src_accession AS a1, dst_type AS t2, dst_accession AS a2
+            FROM edge_removed
+            UNION ALL
+            SELECT dst_type, dst_accession, src_type, src_accession FROM edge_removed
+        ) AS r
+        WHERE dbxref.accession_type = r.t1 AND dbxref.accession = r.a1
+          AND dbxref.linked_type = r.t2 AND dbxref.linked_accession = r.a2
+    """)
+    conn.execute("""
+        INSERT INTO dbxref
+        SELECT DISTINCT * FROM (
+            SELECT src_type, src_accession, dst_type, dst_accession FROM edge_added
+            UNION ALL
+            SELECT dst_type, dst_accession, src_type, src_accession FROM edge_added
+        )
+        ORDER BY 1, 2, 3, 4
+    """)
+
+
+def _count_inserted(conn: duckdb.DuckDBPyConnection, sql: str, params: dict[str, str]) -> int:
+    row = conn.execute(sql, params).fetchone()
+    return row[0] if row is not None else 0
 
 
 def _apply_duckdb_limits(conn: duckdb.DuckDBPyConnection, spill_dir: Path) -> None:
@@ -309,9 +716,18 @@ def get_linked_entities_bulk(
     entity_type: AccessionType,
     accessions: list[str],
 ) -> dict[str, list[tuple[AccessionType, str]]]:
+    """``accession`` ごとの隣接を返す。
+
+    ``build_lookup_index`` で書き出した最新の index があればそれを mmap して引き、
+    無ければ ``dblink.duckdb`` を引く。
+    """
     if not accessions:
         return {}
 
+    index = open_lookup_index(config, entity_type)
+    if index is not None:
+        return cast("dict[str, list[tuple[AccessionType, str]]]", index.get_bulk(accessions))
+
     db_path = _final_db_path(config)
 
     with duckdb.connect(str(db_path), read_only=True) as conn:
@@ -342,6 +758,86 @@ def get_linked_entities_bulk(
     return result
 
 
+_CAPPED_INPUT_SQL = """
+    WITH input(accession) AS (
+        SELECT DISTINCT UNNEST($accessions)
+    )
+"""
+
+
+def get_linked_entities_capped(
+    config: Config,
+    *,
+    entity_type: AccessionType,
+    accessions: list[str],
+    max_per_type: int,
+) -> dict[str, CappedLinks]:
+    """``accession`` ごとに、type ごとに linked_accession 順で先頭 ``max_per_type`` 件
+    (0 以下なら全件) の隣接と、上限で切る前の type ごとの件数を返す。
+
+    数百万件の隣接を持つ hub エントリでも、上限を超える分は tuple にしない。
+    index があれば type の範囲だけを切り出し、無ければ DuckDB 側で
+    ``row_number()`` により切り、件数は別の ``COUNT(*)`` で取る。
+    """
+    if not accessions:
+        return {}
+
+    index = open_lookup_index(config, entity_type)
+    if index is not None:
+        return cast("dict[str, CappedLinks]", index.get_bulk_capped(accessions, max_per_type))
+
+    db_path = _final_db_path(config)
+    params: dict[str, object] = {"accessions": accessions, "entity_type": entity_type}
+    qualify = ""
+    if max_per_type > 0:
+        qualify = """
+            QUALIFY row_number() OVER (
+                PARTITION BY d.accession, d.linked_type ORDER BY d.linked_accession
+            ) <= $max_per_type
+        """
+
+    result: dict[str, CappedLinks] = {}
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        rows = conn.execute(
+            f"""
+            {_CAPPED_INPUT_SQL}
+            SELECT d.accession, d.linked_type, d.linked_accession
+            FROM dbxref d
+            JOIN input i
+              ON d.accession_type = $entity_type
+             AND d.accession = i.accession
+            {qualify}
+            ORDER BY 1, 2, 3
+            """,
+            {**params, "max_per_type": max_per_type} if qualify else params,
+        ).fetchall()
+        for acc, r_type, r_acc in rows:
+            result.setdefault(acc, ([], {}))[0].append((r_type, r_acc))
+
+        if max_per_type > 0:
+            count_rows = conn.execute(
+                f"""
+                {_CAPPED_INPUT_SQL}
+                SELECT d.accession, d.linked_type, COUNT(*)
+                FROM dbxref d
+                JOIN input i
+                  ON d.accession_type = $entity_type
+                 AND d.accession = i.accession
+                GROUP BY d.accession, d.linked_type
+                ORDER BY 1, 2
+                """,
+                params,
+            ).fetchall()
+            for acc, r_type, count in count_rows:
+                result[acc][1][r_type] = count
+        else:
+            for linked, counts in result.values():
+                for r_type, _ in linked:
+                    counts[r_type] = counts.get(r_type, 0) + 1
+
+    return result
+
+
 def export_edges(
     config: Config,
     output_path: Path,
@@ -21,7 +21,7 @@ from collections.abc import Iterator
 from pathlib import Path
 
 from ddbj_search_converter.config import GEA_BASE_PATH, get_config
-from ddbj_search_converter.dblink.db import IdPairs, load_to_db
+from ddbj_search_converter.dblink.db import EdgeSink, IdPairs, load_to_db
 from ddbj_search_converter.dblink.idf_sdrf import _classify_related_study, process_idf_sdrf_dir
 from ddbj_search_converter.dblink.utils import filter_pairs_by_blacklist, load_blacklist
 from ddbj_search_converter.id_patterns import is_valid_accession
@@ -146,18 +146,19 @@ def main() -> None:
         gea_to_bp = filter_pairs_by_blacklist(gea_to_bp, bp_blacklist, "right")
         gea_to_bs = filter_pairs_by_blacklist(gea_to_bs, bs_blacklist, "right")
 
-        if gea_to_bp:
-            load_to_db(config, gea_to_bp, "gea", "bioproject")
-        if gea_to_bs:
-            load_to_db(config, gea_to_bs, "gea", "biosample")
-        if gea_to_sra_run:
-            load_to_db(config, gea_to_sra_run, "gea", "sra-run")
-        if gea_to_sra_experiment:
-            load_to_db(config, gea_to_sra_experiment, "gea", "sra-experiment")
-        if gea_to_jga_study:
-            load_to_db(config, gea_to_jga_study, "gea", "jga-study")
-        if gea_to_humandbs:
-            load_to_db(config, gea_to_humandbs, "gea", "humandbs")
+        with EdgeSink(config) as sink:
+            if gea_to_bp:
+                load_to_db(config, gea_to_bp, "gea", "bioproject", sink=sink)
+            if gea_to_bs:
+                load_to_db(config, gea_to_bs, "gea", "biosample", sink=sink)
+            if gea_to_sra_run:
+                load_to_db(config, gea_to_sra_run, "gea", "sra-run", sink=sink)
+            if gea_to_sra_experiment:
+                load_to_db(config, gea_to_sra_experiment, "gea", "sra-experiment", sink=sink)
+            if gea_to_jga_study:
+                load_to_db(config, gea_to_jga_study, "gea", "jga-study", sink=sink)
+            if gea_to_humandbs:
+                load_to_db(config, gea_to_humandbs, "gea", "humandbs", sink=sink)
 
 
 if __name__ == "__main__":
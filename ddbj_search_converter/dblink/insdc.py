@@ -34,6 +34,7 @@ from ddbj_search_converter.config import (
 )
 from ddbj_search_converter.dblink.db import (
     AccessionType,
+    EdgeSink,
     IdPairs,
     get_tmp_dir,
     load_edges_from_tsv,
@@ -245,10 +246,11 @@ def main() -> None:
         insdc_to_bs = filter_pairs_by_blacklist(insdc_to_bs, bs_blacklist, "right")
 
         # 3. DB にロード
-        if insdc_to_bp:
-            load_to_db(config, insdc_to_bp, "insdc", "bioproject")
-        if insdc_to_bs:
-            load_to_db(config, insdc_to_bs, "insdc", "biosample")
+        with EdgeSink(config) as sink:
+            if insdc_to_bp:
+                load_to_db(config, insdc_to_bp, "insdc", "bioproject", sink=sink)
+            if insdc_to_bs:
+                load_to_db(config, insdc_to_bs, "insdc", "biosample", sink=sink)
 
         # 4. TRAD PostgreSQL から関連を抽出 (URL が設定されている場合のみ)
         if not config.trad_postgres_url:
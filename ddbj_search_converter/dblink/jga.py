@@ -42,7 +42,7 @@ from ddbj_search_converter.config import (
     Config,
     get_config,
 )
-from ddbj_search_converter.dblink.db import AccessionType, IdPairs, load_to_db
+from ddbj_search_converter.dblink.db import AccessionType, EdgeSink, IdPairs, load_to_db
 from ddbj_search_converter.dblink.utils import filter_sra_pairs_by_blacklist, load_jga_blacklist
 from ddbj_search_converter.id_patterns import is_valid_accession
 from ddbj_search_converter.logging.logger import log_debug, log_info, run_logger
@@ -358,36 +358,37 @@ def main() -> None:
         for name in internal_relations:
             internal_relations[name] = filter_sra_pairs_by_blacklist(internal_relations[name], jga_blacklist)
 
-        # Load to DB: humandbs (from TSV)
-        if study_to_humandbs:
-            load_to_db(config, study_to_humandbs, "jga-study", "humandbs")
-        if dataset_to_humandbs:
-            load_to_db(config, dataset_to_humandbs, "jga-dataset", "humandbs")
+        with EdgeSink(config) as sink:
+            # Load to DB: humandbs (from TSV)
+            if study_to_humandbs:
+                load_to_db(config, study_to_humandbs, "jga-study", "humandbs", sink=sink)
+            if dataset_to_humandbs:
+                load_to_db(config, dataset_to_humandbs, "jga-dataset", "humandbs", sink=sink)
 
-        # Load to DB: pubmed (from XML)
-        if study_to_pubmed:
-            load_to_db(config, study_to_pubmed, "jga-study", "pubmed")
+            # Load to DB: pubmed (from XML)
+            if study_to_pubmed:
+                load_to_db(config, study_to_pubmed, "jga-study", "pubmed", sink=sink)
 
-        # Load to DB: CSV-based internal relations
-        if internal_relations["dataset_policy"]:
-            load_to_db(config, internal_relations["dataset_policy"], "jga-dataset", "jga-policy")
+            # Load to DB: CSV-based internal relations
+            if internal_relations["dataset_policy"]:
+                load_to_db(config, internal_relations["dataset_policy"], "jga-dataset", "jga-policy", sink=sink)
 
-        if internal_relations["policy_dac"]:
-            load_to_db(config, internal_relations["policy_dac"], "jga-policy", "jga-dac")
+            if internal_relations["policy_dac"]:
+                load_to_db(config, internal_relations["policy_dac"], "jga-policy", "jga-dac", sink=sink)
 
-        if internal_relations["dataset_study"]:
-            # Reverse to get study -> dataset
-            study_to_dataset = reverse_relation(internal_relations["dataset_study"])
-            load_to_db(config, study_to_dataset, "jga-study", "jga-dataset")
+            if internal_relations["dataset_study"]:
+                # Reverse to get study -> dataset
+                study_to_dataset = reverse_relation(internal_relations["dataset_study"])
+                load_to_db(config, study_to_dataset, "jga-study", "jga-dataset", sink=sink)
 
-        if internal_relations["dataset_dac"]:
-            load_to_db(config, internal_relations["dataset_dac"], "jga-dataset", "jga-dac")
+            if internal_relations["dataset_dac"]:
+                load_to_db(config, internal_relations["dataset_dac"], "jga-dataset", "jga-dac", sink=sink)
 
-        if internal_relations["study_dac"]:
-            load_to_db(config, internal_relations["study_dac"], "jga-study", "jga-dac")
+            if internal_relations["study_dac"]:
+                load_to_db(config, internal_relations["study_dac"], "jga-study", "jga-dac", sink=sink)
 
-        if internal_relations["study_policy"]:
-            load_to_db(config, internal_relations["study_policy"], "jga-study", "jga-policy")
+            if internal_relations["study_policy"]:
+                load_to_db(config, internal_relations["study_policy"], "jga-study", "jga-policy", sink=sink)
 
 
 if __name__ == "__main__":
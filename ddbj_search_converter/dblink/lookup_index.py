@@ -0,0 +1,346 @@
+"""
+``dbxref`` の読み取り専用 lookup index。
+
+JSONL 生成の worker は chunk ごとに ``get_linked_entities_bulk`` で ``dblink.duckdb``
+を引くため、chunk ごとに接続を張り、SQL を plan し、結果を tuple に materialize
+する。``build_lookup_index`` で ``dbxref`` を accession_type ごとの binary file に
+書き出しておくと、worker はそれを mmap して接続も SQL も無しに隣接を引ける。
+file は読み取り専用なので、全 worker が page cache 経由で同じ page を共有する。
+
+file layout ({const_dir}/dblink/dbxref_index/{accession_type}.idx、整数は native
+byte order の uint64):
+    - header (48 bytes): magic ``b"DBXIDX01"``, key 数 n, 以下 4 section の開始 offset
+    - key_offsets (n + 1 個): keys section 内の各 key の開始 byte (末尾は終端)
+    - link_offsets (n + 1 個): links section 内の各 key の隣接の開始 byte (末尾は終端)
+    - keys: accession を UTF-8 で sort 順 (byte 順 = DuckDB の VARCHAR 順) に連結
+    - links: key ごとに ``{linked_type}\\t{linked_accession}\\n`` を連結
+
+``manifest.json`` に書き出し元 ``dblink.duckdb`` の size と mtime を残す。
+``dblink.duckdb`` が置き換わった後の古い index は使わず、呼び出し側は DuckDB に
+fallback する。
+"""
+
+import json
+import mmap
+import shutil
+import struct
+from array import array
+from collections.abc import Iterable
+from pathlib import Path
+from typing import BinaryIO
+
+import duckdb
+
+from ddbj_search_converter.config import DBLINK_DB_FILE_NAME, TODAY_STR, Config
+from ddbj_search_converter.logging.logger import log_info
+
+INDEX_DIR_NAME = "dbxref_index"
+MANIFEST_FILE_NAME = "manifest.json"
+
+_MAGIC = b"DBXIDX01"
+_HEADER = struct.Struct("=8sQQQQQ")
+_FETCH_SIZE = 100_000
+_OFFSET_FLUSH_SIZE = 1 << 20
+
+# (type ごとに上限件で切った隣接, 切る前の type ごとの件数)
+CappedLinks = tuple[list[tuple[str, str]], dict[str, int]]
+
+
+def _index_dir(config: Config) -> Path:
+    return config.const_dir.joinpath("dblink", INDEX_DIR_NAME)
+
+
+def _source_db_path(config: Config) -> Path:
+    return config.const_dir.joinpath("dblink", DBLINK_DB_FILE_NAME)
+
+
+# === Build ===
+
+
+def build_lookup_index(config: Config) -> None:
+    """最終 ``dblink.duckdb`` の ``dbxref`` から lookup index を作り直す。
+
+    一時ディレクトリに全 accession_type 分を書き切ってから差し替える。差し替えの
+    間 index が無い瞬間があるが、その間の lookup は DuckDB に fallback する。
+    accession ごとの ``string_agg`` は大きい type で spill するので、
+    ``create_dbxref_indexes`` と同じ memory_limit / spill 先を使う。
+    """
+    # db は open_lookup_index のために本 module を import するので、循環を避けて遅延 import
+    from ddbj_search_converter.dblink.db import _apply_duckdb_limits
+
+    source = _source_db_path(config)
+    index_dir = _index_dir(config)
+    tmp_dir = index_dir.with_name(f"{INDEX_DIR_NAME}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    spill_dir = config.result_dir.joinpath("dblink", "duckdb_tmp", TODAY_STR)
+    spill_dir.mkdir(parents=True, exist_ok=True)
+
+    source_stat = source.stat()
+    with duckdb.connect(str(source), read_only=True) as conn:
+        _apply_duckdb_limits(conn, spill_dir)
+        accession_types = [
+            row[0] for row in conn.execute("SELECT DISTINCT accession_type FROM dbxref ORDER BY 1").fetchall()
+        ]
+        for accession_type in accession_types:
+            keys = _write_type_index(conn, accession_type, tmp_dir)
+            log_info(f"wrote lookup index for {accession_type}: {keys} accessions")
+
+    manifest = {
+        "source_size": source_stat.st_size,
+        "source_mtime_ns": source_stat.st_mtime_ns,
+        "accession_types": accession_types,
+    }
+    tmp_dir.joinpath(MANIFEST_FILE_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+
+    shutil.rmtree(index_dir, ignore_errors=True)
+    tmp_dir.replace(index_dir)
+
+
+def _write_type_index(conn: duckdb.DuckDBPyConnection, accession_type: str, out_dir: Path) -> int:
+    """1 accession_type 分の index file を書き、key 数を返す。
+
+    section ごとに一時 file へ流し込み、最後に header を付けて連結する。隣接の
+    整形 (``type\\tacc\\n`` の連結) は DuckDB 側の ``string_agg`` に任せる。
+    """
+    parts = {name: out_dir.joinpath(f"{accession_type}.{name}.part") for name in ("ko", "lo", "keys", "links")}
+    cur = conn.execute(
+        """
+        SELECT
+            accession,
+            string_agg(
+                linked_type || chr(9) || linked_accession || chr(10), ''
+                ORDER BY linked_type, linked_accession
+            )
+        FROM dbxref
+        WHERE accession_type = ?
+        GROUP BY accession
+        ORDER BY accession
+        """,
+        (accession_type,),
+    )
+
+    n_keys = 0
+    key_pos = 0
+    link_pos = 0
+    key_offsets = array("Q", [0])
+    link_offsets = array("Q", [0])
+    with (
+        parts["ko"].open("wb") as ko_f,
+        parts["lo"].open("wb") as lo_f,
+        parts["keys"].open("wb") as keys_f,
+        parts["links"].open("wb") as links_f,
+    ):
+        while rows := cur.fetchmany(_FETCH_SIZE):
+            for accession, links in rows:
+                key = accession.encode("utf-8")
+                packed = links.encode("utf-8")
+                keys_f.write(key)
+                links_f.write(packed)
+                key_pos += len(key)
+                link_pos += len(packed)
+                key_offsets.append(key_pos)
+                link_offsets.append(link_pos)
+            n_keys += len(rows)
+            if len(key_offsets) >= _OFFSET_FLUSH_SIZE:
+                key_offsets.tofile(ko_f)
+                link_offsets.tofile(lo_f)
+                key_offsets = array("Q")
+                link_offsets = array("Q")
+        key_offsets.tofile(ko_f)
+        link_offsets.tofile(lo_f)
+
+    offsets_size = (n_keys + 1) * key_offsets.itemsize
+    key_offsets_start = _HEADER.size
+    link_offsets_start = key_offsets_start + offsets_size
+    keys_start = link_offsets_start + offsets_size
+    links_start = keys_start + key_pos
+    with out_dir.joinpath(f"{accession_type}.idx").open("wb") as f:
+        f.write(_HEADER.pack(_MAGIC, n_keys, key_offsets_start, link_offsets_start, keys_start, links_start))
+        for name in ("ko", "lo", "keys", "links"):
+            _append_part(f, parts[name])
+
+    return n_keys
+
+
+def _append_part(f: BinaryIO, part: Path) -> None:
+    with part.open("rb") as src:
+        shutil.copyfileobj(src, f)
+    part.unlink()
+
+
+# === Lookup ===
+
+
+class LookupIndex:
+    """1 accession_type 分の index file を mmap して隣接を引く。
+
+    ``close()`` (または ``with`` を抜けたとき) に mmap を解放する。
+    """
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n_keys, key_offsets_start, link_offsets_start, keys_start, links_start = _HEADER.unpack_from(self._mm)
+        if magic != _MAGIC:
+            raise ValueError(f"not a dbxref lookup index: {path}")
+        self._view = memoryview(self._mm)
+        offsets_size = (n_keys + 1) * 8
+        self._n_keys = n_keys
+        self._key_offsets = self._view[key_offsets_start : key_offsets_start + offsets_size].cast("Q")
+        self._link_offsets = self._view[link_offsets_start : link_offsets_start + offsets_size].cast("Q")
+        self._keys_start = keys_start
+        self._links_start = links_start
+
+    def __enter__(self) -> "LookupIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """mmap を解放する。mmap への view が残っていると閉じられないので先に release する。"""
+        if self._mm.closed:
+            return
+        self._key_offsets.release()
+        self._link_offsets.release()
+        self._view.release()
+        self._mm.close()
+
+    def _key_at(self, i: int) -> bytes:
+        return self._mm[self._keys_start + self._key_offsets[i] : self._keys_start + self._key_offsets[i + 1]]
+
+    def _find(self, key: bytes) -> int:
+        lo, hi = 0, self._n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_keys and self._key_at(lo) == key:
+            return lo
+        return -1
+
+    def _packed(self, i: int) -> bytes:
+        return self._mm[self._links_start + self._link_offsets[i] : self._links_start + self._link_offsets[i + 1]]
+
+    def get(self, accession: str) -> list[tuple[str, str]]:
+        """``accession`` の隣接 ``(linked_type, linked_accession)`` を返す。無ければ空 list。"""
+        i = self._find(accession.encode("utf-8"))
+        if i < 0:
+            return []
+        packed = self._packed(i)
+        result: list[tuple[str, str]] = []
+        for line in packed.decode("utf-8").splitlines():
+            linked_type, linked_accession = line.split("\t", 1)
+            result.append((linked_type, linked_accession))
+        return result
+
+    def get_bulk(self, accessions: Iterable[str]) -> dict[str, list[tuple[str, str]]]:
+        """隣接を持つ accession だけを key にした dict を返す (``get_linked_entities_bulk`` と同じ形)。"""
+        result: dict[str, list[tuple[str, str]]] = {}
+        for accession in accessions:
+            if accession in result:
+                continue
+            linked = self.get(accession)
+            if linked:
+                result[accession] = linked
+        return result
+
+    def get_capped(self, accession: str, max_per_type: int) -> CappedLinks | None:
+        """type ごとに linked_accession 順で先頭 ``max_per_type`` 件 (0 以下なら全件) の隣接と、
+        上限で切る前の type ごとの件数を返す。隣接が無ければ None。
+
+        隣接は ``(linked_type, linked_accession)`` 順に並んでいるので、type の境界は
+        bytes のまま探し、件数は改行を数える。decode するのは残す行だけ。
+        """
+        i = self._find(accession.encode("utf-8"))
+        if i < 0:
+            return None
+        packed = self._packed(i)
+        linked: list[tuple[str, str]] = []
+        counts: dict[str, int] = {}
+        pos, end = 0, len(packed)
+        while pos < end:
+            tab = packed.index(b"\t", pos)
+            type_bytes = packed[pos:tab]
+            # 同じ type の行は連続しているので、その最後の行を後ろから探す
+            last = packed.rfind(b"\n" + type_bytes + b"\t", pos, end)
+            type_end = packed.index(b"\n", tab if last < 0 else last + 1) + 1
+            n = packed.count(b"\n", pos, type_end)
+            linked_type = type_bytes.decode("utf-8")
+            counts[linked_type] = n
+
+            cut = type_end
+            if 0 < max_per_type < n:
+                cut = pos
+                for _ in range(max_per_type):
+                    cut = packed.index(b"\n", cut) + 1
+            prefix = len(type_bytes) + 1
+            linked.extend((linked_type, line[prefix:].decode("utf-8")) for line in packed[pos:cut].splitlines())
+            pos = type_end
+
+        return linked, counts
+
+    def get_bulk_capped(self, accessions: Iterable[str], max_per_type: int) -> dict[str, CappedLinks]:
+        """``get_capped`` を accession ごとに引き、隣接を持つ accession だけを key にした dict を返す。"""
+        result: dict[str, CappedLinks] = {}
+        for accession in accessions:
+            if accession in result:
+                continue
+            capped = self.get_capped(accession, max_per_type)
+            if capped is not None:
+                result[accession] = capped
+        return result
+
+
+# process 内で開いた index。書き出し元 DB ごとに、開いたときの (size, mtime) と
+# accession_type ごとの index を持つ。DB が置き換わったら古い index はまとめて閉じる。
+_OPENED: dict[Path, tuple[tuple[int, int], dict[str, LookupIndex]]] = {}
+
+
+def close_lookup_indexes() -> None:
+    """process 内で開いた index をすべて閉じる。"""
+    for _, indexes in _OPENED.values():
+        for index in indexes.values():
+            index.close()
+    _OPENED.clear()
+
+
+def open_lookup_index(config: Config, accession_type: str) -> LookupIndex | None:
+    """現在の ``dblink.duckdb`` から作られた index があれば開いて返す。
+
+    index が無い、書き出し元と ``dblink.duckdb`` が食い違う、またはその
+    accession_type の file が無い場合は ``None`` (呼び出し側で DuckDB を引く)。
+    """
+    source = _source_db_path(config)
+    try:
+        source_stat = source.stat()
+    except FileNotFoundError:
+        return None
+    source_key = (source_stat.st_size, source_stat.st_mtime_ns)
+    opened_key, indexes = _OPENED.get(source, (None, {}))
+    if opened_key != source_key:
+        # DB が置き換わった (または初回)。前の DB 向けに開いた index は閉じる
+        for stale in indexes.values():
+            stale.close()
+        indexes = {}
+        _OPENED[source] = (source_key, indexes)
+    if accession_type in indexes:
+        return indexes[accession_type]
+
+    path = _index_dir(config).joinpath(f"{accession_type}.idx")
+    try:
+        manifest = json.loads(_index_dir(config).joinpath(MANIFEST_FILE_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    if (manifest.get("source_size"), manifest.get("source_mtime_ns")) != source_key:
+        return None
+    if not path.exists():
+        return None
+
+    index = LookupIndex(path)
+    indexes[accession_type] = index
+    return index
@@ -24,7 +24,7 @@ from ddbj_search_converter.config import (
     Config,
     get_config,
 )
-from ddbj_search_converter.dblink.db import IdPairs, load_to_db
+from ddbj_search_converter.dblink.db import EdgeSink, IdPairs, load_to_db
 from ddbj_search_converter.dblink.idf_sdrf import process_idf_sdrf_dir
 from ddbj_search_converter.dblink.utils import filter_pairs_by_blacklist, load_blacklist
 from ddbj_search_converter.id_patterns import is_valid_accession
@@ -155,11 +155,12 @@ def main() -> None:
         mtb_to_bp = filter_pairs_by_blacklist(mtb_to_bp, bp_blacklist, "right")
         mtb_to_bs = filter_pairs_by_blacklist(mtb_to_bs, bs_blacklist, "right")
 
-        if mtb_to_bp:
-            load_to_db(config, mtb_to_bp, "metabobank", "bioproject")
+        with EdgeSink(config) as sink:
+            if mtb_to_bp:
+                load_to_db(config, mtb_to_bp, "metabobank", "bioproject", sink=sink)
 
-        if mtb_to_bs:
-            load_to_db(config, mtb_to_bs, "metabobank", "biosample")
+            if mtb_to_bs:
+                load_to_db(config, mtb_to_bs, "metabobank", "biosample", sink=sink)
 
 
 if __name__ == "__main__":
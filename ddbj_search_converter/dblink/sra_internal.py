@@ -37,44 +37,120 @@ BioSample <-> SRA:
 
 出力:
 - dblink.tmp.duckdb (raw_edges テーブル) に挿入
+
+抽出は DuckDB の中で完結させる。dblink.tmp.duckdb に accessions DB を ATTACH し、
+accessions を 1 回だけ scan して全関連を (a_type, a, b_type, b) の行に展開する。
+ID の検証 (``ID_PATTERN_MAP`` と同じ正規表現を ``regexp_full_match`` で)、数値 ID の
+accession への変換、blacklist の除外、edge の canonical 化も SQL で行い、結果を
+``raw_edges`` に直接 INSERT する。Python 側に行を持ってこないので、TSV の書き出しと
+読み直しも無い。
 """
 
-from ddbj_search_converter.config import BP_ID_TO_ACCESSION_FILE_NAME, BS_ID_TO_ACCESSION_FILE_NAME, Config, get_config
-from ddbj_search_converter.dblink.bp_bs import IdMapping, load_id_mapping_tsv
-from ddbj_search_converter.dblink.db import IdPairs, load_to_db
-from ddbj_search_converter.dblink.utils import (
-    convert_id_if_needed,
-    filter_pairs_by_blacklist,
-    filter_sra_pairs_by_blacklist,
-    load_blacklist,
-    load_sra_blacklist,
+import duckdb
+
+from ddbj_search_converter.config import (
+    BP_ID_TO_ACCESSION_FILE_NAME,
+    BS_ID_TO_ACCESSION_FILE_NAME,
+    TODAY_STR,
+    Config,
+    get_config,
 )
-from ddbj_search_converter.id_patterns import is_valid_accession
+from ddbj_search_converter.dblink.bp_bs import IdMapping, load_id_mapping_tsv
+from ddbj_search_converter.dblink.db import AccessionType, _apply_duckdb_limits, _tmp_db_path, get_tmp_dir
+from ddbj_search_converter.dblink.utils import load_blacklist, load_sra_blacklist
+from ddbj_search_converter.duckdb_bulk import load_tsv_into_table, write_rows_to_tsv
+from ddbj_search_converter.id_patterns import ID_PATTERN_MAP
 from ddbj_search_converter.logging.logger import log_debug, log_info, run_logger
 from ddbj_search_converter.logging.schema import DebugCategory
-from ddbj_search_converter.sra_accessions_tab import (
-    SourceKind,
-    iter_bp_analysis_relations,
-    iter_bp_experiment_relations,
-    iter_bp_run_relations,
-    iter_bp_study_relations,
-    iter_bs_analysis_relations,
-    iter_bs_experiment_relations,
-    iter_bs_run_relations,
-    iter_bs_sample_relations,
-    iter_experiment_run_relations,
-    iter_experiment_sample_relations,
-    iter_run_sample_relations,
-    iter_study_analysis_relations,
-    iter_study_experiment_relations,
-    iter_study_run_relations,
-    iter_study_sample_relations,
-    iter_submission_analysis_relations,
-    iter_submission_experiment_relations,
-    iter_submission_run_relations,
-    iter_submission_sample_relations,
-    iter_submission_study_relations,
-)
+from ddbj_search_converter.sra_accessions_tab import SourceKind, _final_dra_db_path, _final_sra_db_path
+
+# (a_type, b_type, a 側の列, b 側の列, accessions.Type)
+# a_type が bioproject / biosample の関連は、a 側に数値 ID が入っていることがあるので変換を試みる。
+SRA_RELATION_SPECS: list[tuple[AccessionType, AccessionType, str, str, str]] = [
+    # SRA 内部関連
+    ("sra-submission", "sra-study", "Submission", "Accession", "STUDY"),
+    ("sra-study", "sra-experiment", "Study", "Accession", "EXPERIMENT"),
+    ("sra-study", "sra-analysis", "Study", "Accession", "ANALYSIS"),
+    # Study が空の analysis 用
+    ("sra-submission", "sra-analysis", "Submission", "Accession", "ANALYSIS"),
+    ("sra-experiment", "sra-run", "Experiment", "Accession", "RUN"),
+    ("sra-experiment", "sra-sample", "Accession", "Sample", "EXPERIMENT"),
+    ("sra-run", "sra-sample", "Accession", "Sample", "RUN"),
+    # SRA 階層横断関連
+    ("sra-submission", "sra-experiment", "Submission", "Accession", "EXPERIMENT"),
+    ("sra-submission", "sra-run", "Submission", "Accession", "RUN"),
+    ("sra-submission", "sra-sample", "Submission", "Accession", "SAMPLE"),
+    ("sra-study", "sra-run", "Study", "Accession", "RUN"),
+    ("sra-study", "sra-sample", "Study", "Sample", "EXPERIMENT"),
+    # BioProject <-> SRA
+    ("bioproject", "sra-study", "BioProject", "Accession", "STUDY"),
+    ("bioproject", "sra-experiment", "BioProject", "Accession", "EXPERIMENT"),
+    ("bioproject", "sra-run", "BioProject", "Accession", "RUN"),
+    ("bioproject", "sra-analysis", "BioProject", "Accession", "ANALYSIS"),
+    # BioSample <-> SRA
+    ("biosample", "sra-sample", "BioSample", "Accession", "SAMPLE"),
+    ("biosample", "sra-experiment", "BioSample", "Accession", "EXPERIMENT"),
+    ("biosample", "sra-run", "BioSample", "Accession", "RUN"),
+    ("biosample", "sra-analysis", "BioSample", "Accession", "ANALYSIS"),
+]
+
+
+def _pairs_sql() -> str:
+    """accessions を 1 回 scan して、全関連の (a_type, a, b_type, b) を返す SQL。
+
+    1 行から、その行の Type に該当する関連の struct を list にして UNNEST する。
+    列名と Type はすべて ``SRA_RELATION_SPECS`` の定数なので f-string で埋め込む。
+    重複は ID 変換後にまとめて落とすので、ここでは DISTINCT しない。
+    """
+    structs = ",\n".join(
+        f"CASE WHEN Type = '{type_filter}' THEN "
+        f"{{'a_type': '{a_type}', 'a': {col_a}, 'b_type': '{b_type}', 'b': {col_b}}} END"
+        for a_type, b_type, col_a, col_b, type_filter in SRA_RELATION_SPECS
+    )
+    types = ", ".join(f"'{t}'" for t in sorted({spec[4] for spec in SRA_RELATION_SPECS}))
+
+    return f"""
+        SELECT pair.a_type AS a_type, pair.a AS a, pair.b_type AS b_type, pair.b AS b
+        FROM (
+            SELECT UNNEST([{structs}]) AS pair
+            FROM src.accessions
+            WHERE Type IN ({types})
+        )
+        WHERE pair.a IS NOT NULL AND pair.a <> '' AND pair.b IS NOT NULL AND pair.b <> ''
+    """
+
+
+# ``ID_PATTERN_MAP`` の ``^...\Z`` を外したもの。``regexp_full_match`` に渡すと is_valid_accession と同じ判定になる。
+_SQL_ID_PATTERNS: dict[str, str] = {
+    t: ID_PATTERN_MAP[t].pattern.removeprefix("^").removesuffix(r"\Z")
+    for t in sorted({t for spec in SRA_RELATION_SPECS for t in spec[:2]})
+}
+
+
+def _valid_sql(id_col: str, type_col: str) -> str:
+    """``is_valid_accession(id_col, type_col)`` と同じ判定をする SQL 式。"""
+    whens = " ".join(
+        f"WHEN '{t}' THEN regexp_full_match({id_col}, '{pattern}')" for t, pattern in _SQL_ID_PATTERNS.items()
+    )
+    return f"CASE {type_col} {whens} ELSE false END"
+
+
+def _load_temp_table(
+    conn: duckdb.DuckDBPyConnection,
+    config: Config,
+    source: SourceKind,
+    table_name: str,
+    *,
+    columns: list[str],
+    rows: list[tuple[str, ...]],
+) -> None:
+    """blacklist / ID マッピングを TSV 経由で TEMP テーブルに入れる。"""
+    column_defs = ", ".join(f"{column} TEXT" for column in columns)
+    conn.execute(f"CREATE TEMP TABLE {table_name} ({column_defs})")
+    tsv_path = get_tmp_dir(config).joinpath(f"{source}_internal_{table_name}.tsv")
+    written = write_rows_to_tsv(tsv_path, rows)
+    load_tsv_into_table(conn, table_name, columns, tsv_path, written)
+    tsv_path.unlink()
 
 
 def process_sra_internal_relations(
@@ -100,522 +176,107 @@ def process_sra_internal_relations(
         bs_id_to_accession: BioSample 数値 ID -> accession マッピング
     """
     source_label = source.upper()
-
-    # === SRA 内部関連 ===
-
-    # Submission <-> Study
-    submission_study: IdPairs = set()
-    for submission, study in iter_submission_study_relations(config, source=source):
-        if not submission or not study:
-            continue
-        if not is_valid_accession(submission, "sra-submission"):
-            log_debug(
-                f"skipping invalid sra-submission: {submission}",
-                accession=submission,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(study, "sra-study"):
-            log_debug(
-                f"skipping invalid sra-study: {study}",
-                accession=study,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        submission_study.add((submission, study))
-    log_info(f"extracted {len(submission_study)} {source_label} Submission <-> Study relations")
-    submission_study = filter_sra_pairs_by_blacklist(submission_study, sra_blacklist)
-    if submission_study:
-        load_to_db(config, submission_study, "sra-submission", "sra-study")
-
-    # Study <-> Experiment
-    study_experiment: IdPairs = set()
-    for study, experiment in iter_study_experiment_relations(config, source=source):
-        if not study or not experiment:
-            continue
-        if not is_valid_accession(study, "sra-study"):
-            log_debug(
-                f"skipping invalid sra-study: {study}",
-                accession=study,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(experiment, "sra-experiment"):
-            log_debug(
-                f"skipping invalid sra-experiment: {experiment}",
-                accession=experiment,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        study_experiment.add((study, experiment))
-    log_info(f"extracted {len(study_experiment)} {source_label} Study <-> Experiment relations")
-    study_experiment = filter_sra_pairs_by_blacklist(study_experiment, sra_blacklist)
-    if study_experiment:
-        load_to_db(config, study_experiment, "sra-study", "sra-experiment")
-
-    # Study <-> Analysis
-    study_analysis: IdPairs = set()
-    for study, analysis in iter_study_analysis_relations(config, source=source):
-        if not study or not analysis:
-            continue
-        if not is_valid_accession(study, "sra-study"):
-            log_debug(
-                f"skipping invalid sra-study: {study}",
-                accession=study,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(analysis, "sra-analysis"):
-            log_debug(
-                f"skipping invalid sra-analysis: {analysis}",
-                accession=analysis,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        study_analysis.add((study, analysis))
-    log_info(f"extracted {len(study_analysis)} {source_label} Study <-> Analysis relations")
-    study_analysis = filter_sra_pairs_by_blacklist(study_analysis, sra_blacklist)
-    if study_analysis:
-        load_to_db(config, study_analysis, "sra-study", "sra-analysis")
-
-    # Submission <-> Analysis (Study が空の analysis 用)
-    submission_analysis: IdPairs = set()
-    for submission, analysis in iter_submission_analysis_relations(config, source=source):
-        if not submission or not analysis:
-            continue
-        if not is_valid_accession(submission, "sra-submission"):
-            log_debug(
-                f"skipping invalid sra-submission: {submission}",
-                accession=submission,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(analysis, "sra-analysis"):
-            log_debug(
-                f"skipping invalid sra-analysis: {analysis}",
-                accession=analysis,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        submission_analysis.add((submission, analysis))
-    log_info(f"extracted {len(submission_analysis)} {source_label} Submission <-> Analysis relations")
-    submission_analysis = filter_sra_pairs_by_blacklist(submission_analysis, sra_blacklist)
-    if submission_analysis:
-        load_to_db(config, submission_analysis, "sra-submission", "sra-analysis")
-
-    # Experiment <-> Run
-    experiment_run: IdPairs = set()
-    for experiment, run in iter_experiment_run_relations(config, source=source):
-        if not experiment or not run:
-            continue
-        if not is_valid_accession(experiment, "sra-experiment"):
-            log_debug(
-                f"skipping invalid sra-experiment: {experiment}",
-                accession=experiment,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(run, "sra-run"):
-            log_debug(
-                f"skipping invalid sra-run: {run}",
-                accession=run,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        experiment_run.add((experiment, run))
-    log_info(f"extracted {len(experiment_run)} {source_label} Experiment <-> Run relations")
-    experiment_run = filter_sra_pairs_by_blacklist(experiment_run, sra_blacklist)
-    if experiment_run:
-        load_to_db(config, experiment_run, "sra-experiment", "sra-run")
-
-    # Experiment <-> Sample
-    experiment_sample: IdPairs = set()
-    for experiment, sample in iter_experiment_sample_relations(config, source=source):
-        if not experiment or not sample:
-            continue
-        if not is_valid_accession(experiment, "sra-experiment"):
-            log_debug(
-                f"skipping invalid sra-experiment: {experiment}",
-                accession=experiment,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(sample, "sra-sample"):
-            log_debug(
-                f"skipping invalid sra-sample: {sample}",
-                accession=sample,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        experiment_sample.add((experiment, sample))
-    log_info(f"extracted {len(experiment_sample)} {source_label} Experiment <-> Sample relations")
-    experiment_sample = filter_sra_pairs_by_blacklist(experiment_sample, sra_blacklist)
-    if experiment_sample:
-        load_to_db(config, experiment_sample, "sra-experiment", "sra-sample")
-
-    # Run <-> Sample
-    run_sample: IdPairs = set()
-    for run, sample in iter_run_sample_relations(config, source=source):
-        if not run or not sample:
-            continue
-        if not is_valid_accession(run, "sra-run"):
-            log_debug(
-                f"skipping invalid sra-run: {run}",
-                accession=run,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(sample, "sra-sample"):
-            log_debug(
-                f"skipping invalid sra-sample: {sample}",
-                accession=sample,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        run_sample.add((run, sample))
-    log_info(f"extracted {len(run_sample)} {source_label} Run <-> Sample relations")
-    run_sample = filter_sra_pairs_by_blacklist(run_sample, sra_blacklist)
-    if run_sample:
-        load_to_db(config, run_sample, "sra-run", "sra-sample")
-
-    # === SRA 階層横断関連 ===
-
-    # Submission <-> Experiment
-    submission_experiment: IdPairs = set()
-    for submission, experiment in iter_submission_experiment_relations(config, source=source):
-        if not submission or not experiment:
-            continue
-        if not is_valid_accession(submission, "sra-submission"):
-            log_debug(
-                f"skipping invalid sra-submission: {submission}",
-                accession=submission,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(experiment, "sra-experiment"):
-            log_debug(
-                f"skipping invalid sra-experiment: {experiment}",
-                accession=experiment,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        submission_experiment.add((submission, experiment))
-    log_info(f"extracted {len(submission_experiment)} {source_label} Submission <-> Experiment relations")
-    submission_experiment = filter_sra_pairs_by_blacklist(submission_experiment, sra_blacklist)
-    if submission_experiment:
-        load_to_db(config, submission_experiment, "sra-submission", "sra-experiment")
-
-    # Submission <-> Run
-    submission_run: IdPairs = set()
-    for submission, run in iter_submission_run_relations(config, source=source):
-        if not submission or not run:
-            continue
-        if not is_valid_accession(submission, "sra-submission"):
-            log_debug(
-                f"skipping invalid sra-submission: {submission}",
-                accession=submission,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(run, "sra-run"):
-            log_debug(
-                f"skipping invalid sra-run: {run}",
-                accession=run,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        submission_run.add((submission, run))
-    log_info(f"extracted {len(submission_run)} {source_label} Submission <-> Run relations")
-    submission_run = filter_sra_pairs_by_blacklist(submission_run, sra_blacklist)
-    if submission_run:
-        load_to_db(config, submission_run, "sra-submission", "sra-run")
-
-    # Submission <-> Sample
-    submission_sample: IdPairs = set()
-    for submission, sample in iter_submission_sample_relations(config, source=source):
-        if not submission or not sample:
-            continue
-        if not is_valid_accession(submission, "sra-submission"):
-            log_debug(
-                f"skipping invalid sra-submission: {submission}",
-                accession=submission,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(sample, "sra-sample"):
-            log_debug(
-                f"skipping invalid sra-sample: {sample}",
-                accession=sample,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        submission_sample.add((submission, sample))
-    log_info(f"extracted {len(submission_sample)} {source_label} Submission <-> Sample relations")
-    submission_sample = filter_sra_pairs_by_blacklist(submission_sample, sra_blacklist)
-    if submission_sample:
-        load_to_db(config, submission_sample, "sra-submission", "sra-sample")
-
-    # Study <-> Run
-    study_run: IdPairs = set()
-    for study, run in iter_study_run_relations(config, source=source):
-        if not study or not run:
-            continue
-        if not is_valid_accession(study, "sra-study"):
-            log_debug(
-                f"skipping invalid sra-study: {study}",
-                accession=study,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(run, "sra-run"):
-            log_debug(
-                f"skipping invalid sra-run: {run}",
-                accession=run,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        study_run.add((study, run))
-    log_info(f"extracted {len(study_run)} {source_label} Study <-> Run relations")
-    study_run = filter_sra_pairs_by_blacklist(study_run, sra_blacklist)
-    if study_run:
-        load_to_db(config, study_run, "sra-study", "sra-run")
-
-    # Study <-> Sample
-    study_sample: IdPairs = set()
-    for study, sample in iter_study_sample_relations(config, source=source):
-        if not study or not sample:
-            continue
-        if not is_valid_accession(study, "sra-study"):
-            log_debug(
-                f"skipping invalid sra-study: {study}",
-                accession=study,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        if not is_valid_accession(sample, "sra-sample"):
-            log_debug(
-                f"skipping invalid sra-sample: {sample}",
-                accession=sample,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        study_sample.add((study, sample))
-    log_info(f"extracted {len(study_sample)} {source_label} Study <-> Sample relations")
-    study_sample = filter_sra_pairs_by_blacklist(study_sample, sra_blacklist)
-    if study_sample:
-        load_to_db(config, study_sample, "sra-study", "sra-sample")
-
-    # === BioProject <-> SRA ===
-
-    # BioProject <-> Study
-    bp_study: IdPairs = set()
-    for raw_bp, study in iter_bp_study_relations(config, source=source):
-        if not raw_bp or not study:
-            continue
-        converted_bp = convert_id_if_needed(raw_bp, "bioproject", bp_id_to_accession, "accessions_db", source)
-        if not converted_bp:
-            continue
-        if not is_valid_accession(study, "sra-study"):
-            log_debug(
-                f"skipping invalid sra-study: {study}",
-                accession=study,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        bp_study.add((converted_bp, study))
-    log_info(f"extracted {len(bp_study)} {source_label} BioProject <-> Study relations")
-    bp_study = filter_sra_pairs_by_blacklist(bp_study, sra_blacklist)
-    bp_study = filter_pairs_by_blacklist(bp_study, bp_blacklist, "left")
-    if bp_study:
-        load_to_db(config, bp_study, "bioproject", "sra-study")
-
-    # BioProject <-> Experiment
-    bp_experiment: IdPairs = set()
-    for raw_bp, experiment in iter_bp_experiment_relations(config, source=source):
-        if not raw_bp or not experiment:
-            continue
-        converted_bp = convert_id_if_needed(raw_bp, "bioproject", bp_id_to_accession, "accessions_db", source)
-        if not converted_bp:
-            continue
-        if not is_valid_accession(experiment, "sra-experiment"):
-            log_debug(
-                f"skipping invalid sra-experiment: {experiment}",
-                accession=experiment,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        bp_experiment.add((converted_bp, experiment))
-    log_info(f"extracted {len(bp_experiment)} {source_label} BioProject <-> Experiment relations")
-    bp_experiment = filter_sra_pairs_by_blacklist(bp_experiment, sra_blacklist)
-    bp_experiment = filter_pairs_by_blacklist(bp_experiment, bp_blacklist, "left")
-    if bp_experiment:
-        load_to_db(config, bp_experiment, "bioproject", "sra-experiment")
-
-    # BioProject <-> Run
-    bp_run: IdPairs = set()
-    for raw_bp, run in iter_bp_run_relations(config, source=source):
-        if not raw_bp or not run:
-            continue
-        converted_bp = convert_id_if_needed(raw_bp, "bioproject", bp_id_to_accession, "accessions_db", source)
-        if not converted_bp:
-            continue
-        if not is_valid_accession(run, "sra-run"):
-            log_debug(
-                f"skipping invalid sra-run: {run}",
-                accession=run,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        bp_run.add((converted_bp, run))
-    log_info(f"extracted {len(bp_run)} {source_label} BioProject <-> Run relations")
-    bp_run = filter_sra_pairs_by_blacklist(bp_run, sra_blacklist)
-    bp_run = filter_pairs_by_blacklist(bp_run, bp_blacklist, "left")
-    if bp_run:
-        load_to_db(config, bp_run, "bioproject", "sra-run")
-
-    # BioProject <-> Analysis
-    bp_analysis: IdPairs = set()
-    for raw_bp, analysis in iter_bp_analysis_relations(config, source=source):
-        if not raw_bp or not analysis:
-            continue
-        converted_bp = convert_id_if_needed(raw_bp, "bioproject", bp_id_to_accession, "accessions_db", source)
-        if not converted_bp:
-            continue
-        if not is_valid_accession(analysis, "sra-analysis"):
-            log_debug(
-                f"skipping invalid sra-analysis: {analysis}",
-                accession=analysis,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        bp_analysis.add((converted_bp, analysis))
-    log_info(f"extracted {len(bp_analysis)} {source_label} BioProject <-> Analysis relations")
-    bp_analysis = filter_sra_pairs_by_blacklist(bp_analysis, sra_blacklist)
-    bp_analysis = filter_pairs_by_blacklist(bp_analysis, bp_blacklist, "left")
-    if bp_analysis:
-        load_to_db(config, bp_analysis, "bioproject", "sra-analysis")
-
-    # === BioSample <-> SRA ===
-
-    # BioSample <-> Sample
-    bs_sample: IdPairs = set()
-    for raw_bs, sample in iter_bs_sample_relations(config, source=source):
-        if not raw_bs or not sample:
-            continue
-        converted_bs = convert_id_if_needed(raw_bs, "biosample", bs_id_to_accession, "accessions_db", source)
-        if not converted_bs:
-            continue
-        if not is_valid_accession(sample, "sra-sample"):
-            log_debug(
-                f"skipping invalid sra-sample: {sample}",
-                accession=sample,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        bs_sample.add((converted_bs, sample))
-    log_info(f"extracted {len(bs_sample)} {source_label} BioSample <-> Sample relations")
-    bs_sample = filter_sra_pairs_by_blacklist(bs_sample, sra_blacklist)
-    bs_sample = filter_pairs_by_blacklist(bs_sample, bs_blacklist, "left")
-    if bs_sample:
-        load_to_db(config, bs_sample, "biosample", "sra-sample")
-
-    # BioSample <-> Experiment
-    bs_experiment: IdPairs = set()
-    for raw_bs, experiment in iter_bs_experiment_relations(config, source=source):
-        if not raw_bs or not experiment:
-            continue
-        converted_bs = convert_id_if_needed(raw_bs, "biosample", bs_id_to_accession, "accessions_db", source)
-        if not converted_bs:
-            continue
-        if not is_valid_accession(experiment, "sra-experiment"):
-            log_debug(
-                f"skipping invalid sra-experiment: {experiment}",
-                accession=experiment,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        bs_experiment.add((converted_bs, experiment))
-    log_info(f"extracted {len(bs_experiment)} {source_label} BioSample <-> Experiment relations")
-    bs_experiment = filter_sra_pairs_by_blacklist(bs_experiment, sra_blacklist)
-    bs_experiment = filter_pairs_by_blacklist(bs_experiment, bs_blacklist, "left")
-    if bs_experiment:
-        load_to_db(config, bs_experiment, "biosample", "sra-experiment")
-
-    # BioSample <-> Run
-    bs_run: IdPairs = set()
-    for raw_bs, run in iter_bs_run_relations(config, source=source):
-        if not raw_bs or not run:
-            continue
-        converted_bs = convert_id_if_needed(raw_bs, "biosample", bs_id_to_accession, "accessions_db", source)
-        if not converted_bs:
-            continue
-        if not is_valid_accession(run, "sra-run"):
-            log_debug(
-                f"skipping invalid sra-run: {run}",
-                accession=run,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        bs_run.add((converted_bs, run))
-    log_info(f"extracted {len(bs_run)} {source_label} BioSample <-> Run relations")
-    bs_run = filter_sra_pairs_by_blacklist(bs_run, sra_blacklist)
-    bs_run = filter_pairs_by_blacklist(bs_run, bs_blacklist, "left")
-    if bs_run:
-        load_to_db(config, bs_run, "biosample", "sra-run")
-
-    # BioSample <-> Analysis
-    bs_analysis: IdPairs = set()
-    for raw_bs, analysis in iter_bs_analysis_relations(config, source=source):
-        if not raw_bs or not analysis:
-            continue
-        converted_bs = convert_id_if_needed(raw_bs, "biosample", bs_id_to_accession, "accessions_db", source)
-        if not converted_bs:
-            continue
-        if not is_valid_accession(analysis, "sra-analysis"):
-            log_debug(
-                f"skipping invalid sra-analysis: {analysis}",
-                accession=analysis,
-                debug_category=DebugCategory.INVALID_ACCESSION_ID,
-                source=source,
-            )
-            continue
-        bs_analysis.add((converted_bs, analysis))
-    log_info(f"extracted {len(bs_analysis)} {source_label} BioSample <-> Analysis relations")
-    bs_analysis = filter_sra_pairs_by_blacklist(bs_analysis, sra_blacklist)
-    bs_analysis = filter_pairs_by_blacklist(bs_analysis, bs_blacklist, "left")
-    if bs_analysis:
-        load_to_db(config, bs_analysis, "biosample", "sra-analysis")
+    accessions_db = _final_sra_db_path(config) if source == "sra" else _final_dra_db_path(config)
+    spill_dir = config.result_dir.joinpath("dblink", "duckdb_tmp", TODAY_STR)
+    spill_dir.mkdir(parents=True, exist_ok=True)
+
+    with duckdb.connect(str(_tmp_db_path(config))) as conn:
+        _apply_duckdb_limits(conn, spill_dir)
+        # ATTACH は parameter binding を受け付けないので quote を escape して埋め込む
+        escaped_accessions_db = str(accessions_db).replace("'", "''")
+        conn.execute(f"ATTACH '{escaped_accessions_db}' AS src (READ_ONLY)")
+
+        for table_name, blacklist in (
+            ("sra_blacklist", sra_blacklist),
+            ("bp_blacklist", bp_blacklist),
+            ("bs_blacklist", bs_blacklist),
+        ):
+            _load_temp_table(conn, config, source, table_name, columns=["accession"], rows=[(a,) for a in blacklist])
+        for table_name, mapping in (("bp_id_map", bp_id_to_accession), ("bs_id_map", bs_id_to_accession)):
+            _load_temp_table(conn, config, source, table_name, columns=["id", "accession"], rows=list(mapping.items()))
+
+        log_info(f"scanning {source_label} accessions for internal relations", file=str(accessions_db))
+        conn.execute(f"CREATE TEMP TABLE sra_pairs AS {_pairs_sql()}")
+        conn.execute("DETACH src")
+
+        # a 側が不正な ID なら bioproject / biosample は数値 ID として変換を試み、変換できなければ NULL
+        conn.execute(
+            f"""
+            CREATE TEMP TABLE sra_edges AS
+            SELECT DISTINCT
+                p.a_type,
+                CASE
+                    WHEN {_valid_sql("p.a", "p.a_type")} THEN p.a
+                    WHEN p.a_type = 'bioproject' THEN bp.accession
+                    WHEN p.a_type = 'biosample' THEN bs.accession
+                END AS a,
+                p.b_type,
+                p.b
+            FROM sra_pairs AS p
+            LEFT JOIN bp_id_map AS bp ON p.a_type = 'bioproject' AND bp.id = p.a
+            LEFT JOIN bs_id_map AS bs ON p.a_type = 'biosample' AND bs.id = p.a
+            WHERE {_valid_sql("p.b", "p.b_type")}
+            """
+        )
+
+        invalid_rows = conn.execute(
+            f"""
+            SELECT DISTINCT a_type, a FROM sra_pairs WHERE NOT {_valid_sql("a", "a_type")}
+            UNION
+            SELECT DISTINCT b_type, b FROM sra_pairs WHERE NOT {_valid_sql("b", "b_type")}
+            ORDER BY ALL
+            """
+        ).fetchall()
+        for id_type, raw_id in invalid_rows:
+            if id_type == "bioproject" and raw_id in bp_id_to_accession:
+                continue
+            if id_type == "biosample" and raw_id in bs_id_to_accession:
+                continue
+            extra = {"file": "accessions_db"} if id_type in ("bioproject", "biosample") else {}
+            log_debug(
+                f"skipping invalid {id_type}: {raw_id}",
+                accession=raw_id,
+                debug_category=DebugCategory.INVALID_ACCESSION_ID,
+                source=source,
+                **extra,
+            )
+
+        conn.execute("DELETE FROM sra_edges WHERE a IS NULL")
+        counts = dict(
+            conn.execute("SELECT a_type || ' <-> ' || b_type, count(*) FROM sra_edges GROUP BY ALL").fetchall()
+        )
+        for a_type, b_type, *_ in SRA_RELATION_SPECS:
+            label = f"{a_type} <-> {b_type}"
+            log_info(f"extracted {counts.get(label, 0)} {source_label} {label} relations")
+
+        removed = conn.execute(
+            """
+            DELETE FROM sra_edges
+            WHERE a IN (SELECT accession FROM sra_blacklist)
+                OR b IN (SELECT accession FROM sra_blacklist)
+                OR (a_type = 'bioproject' AND a IN (SELECT accession FROM bp_blacklist))
+                OR (a_type = 'biosample' AND a IN (SELECT accession FROM bs_blacklist))
+            """
+        ).fetchall()[0][0]
+        if removed > 0:
+            log_info(f"removed {removed} {source_label} internal relations by blacklist")
+
+        # normalize_edge と同じく (src_type, src_accession) <= (dst_type, dst_accession) の向きに揃える
+        inserted = conn.execute(
+            """
+            INSERT INTO raw_edges
+            SELECT
+                CASE WHEN forward THEN a_type ELSE b_type END,
+                CASE WHEN forward THEN a ELSE b END,
+                CASE WHEN forward THEN b_type ELSE a_type END,
+                CASE WHEN forward THEN b ELSE a END
+            FROM (
+                SELECT *, (a_type < b_type OR (a_type = b_type AND a <= b)) AS forward
+                FROM sra_edges
+            )
+            """
+        ).fetchall()[0][0]
+        log_info(f"inserted {inserted} {source_label} internal relations into raw_edges")
 
 
 def main() -> None:
@@ -49,6 +49,8 @@ def get_common_mapping() -> dict[str, Any]:
         "title": {"type": "text"},
         "description": {"type": "text"},
         "dbXrefs": {"type": "object", "enabled": False},
+        "dbXrefsCount": {"type": "object", "enabled": False},
+        "dbXrefsLimit": {"type": "integer"},
         "sameAs": {
             "type": "nested",
             "properties": {
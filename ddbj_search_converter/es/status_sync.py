@@ -22,7 +22,6 @@ from ddbj_search_converter.es._error_utils import sanitize_error_info
 from ddbj_search_converter.es.client import get_es_client
 from ddbj_search_converter.es.index import make_physical_index_name
 from ddbj_search_converter.logging.logger import log_info
-from ddbj_search_converter.sra_accessions_tab import normalize_status, status_strength
 from elasticsearch import helpers
 
 # 同期対象は DDBJ 由来のみ。NCBI 側は Accessions.tab の Updated が status 変更でも動くので
@@ -97,8 +96,8 @@ def resolve_physical_index(index: str, target_suffix: str | None) -> str:
 def load_ssot_statuses(config: Config, index: str) -> tuple[dict[str, str], set[str]]:
     """SSOT の status を読む。
 
-    BP/BS は Status Cache の値をそのまま、SRA は Accessions.tab の値を
-    ``normalize_status`` に通す (JSONL 生成と同じ経路)。
+    BP/BS は Status Cache の値をそのまま、SRA は Accessions DB の ``accession_resolved``
+    にある ``normalize_status`` 済みの値を使う (JSONL 生成と同じ経路)。
 
     Returns:
         (non-public な accession -> status, SSOT に存在する全 accession)。
@@ -122,25 +121,16 @@ def load_ssot_statuses(config: Config, index: str) -> tuple[dict[str, str], set[
     if not db_path.exists():
         raise FileNotFoundError(f"DRA accessions db not found: {db_path}")
 
+    # 同一 accession の複数 status は DB 構築時に JSONL 生成と同じ priority で 1 つに決めてある
     with duckdb.connect(str(db_path), read_only=True) as conn:
         rows = conn.execute(
-            "SELECT Accession, Status FROM accessions WHERE Type = ? AND Accession IS NOT NULL",
+            "SELECT Accession, NormalizedStatus FROM accession_resolved WHERE Type = ?",
             [sra_type],
         ).fetchall()
 
-    # 同一 accession が複数 status で現れることがある。JSONL 生成と同じ priority で 1 つに決める。
-    strongest: dict[str, str | None] = {}
-    for accession, status in rows:
-        if accession not in strongest or status_strength(status) < status_strength(strongest[accession]):
-            strongest[accession] = status
+    non_public = {accession: status for accession, status in rows if status != "public"}
 
-    non_public = {
-        accession: normalized
-        for accession, status in strongest.items()
-        if (normalized := normalize_status(status)) != "public"
-    }
-
-    return non_public, set(strongest)
+    return non_public, {accession for accession, _ in rows}
 
 
 def fetch_es_non_public(config: Config, index: str, target_suffix: str | None = None) -> dict[str, str]:
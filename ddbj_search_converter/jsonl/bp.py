@@ -21,12 +21,13 @@ from ddbj_search_converter.config import (
 from ddbj_search_converter.dblink.utils import load_blacklist
 from ddbj_search_converter.jsonl.distribution import make_bp_distribution
 from ddbj_search_converter.jsonl.utils import (
+    EntryFilter,
     _build_url,
+    attach_dbxrefs,
     build_doi_url,
     build_pubmed_url,
     build_search_entry_self_url,
     deduplicate_organizations,
-    get_dbxref_map,
     is_valid_external_url,
     normalize_publication_dbtype,
     write_jsonl,
@@ -47,7 +48,14 @@ from ddbj_search_converter.schema import (
     Status,
     Xref,
 )
-from ddbj_search_converter.xml_utils import iterate_xml_element, parse_xml
+from ddbj_search_converter.xml_manifest import (
+    build_unchanged_index,
+    commit_content_hashes,
+    content_hash_store_path,
+    load_unchanged_accessions,
+    sniff_bp_accession,
+)
+from ddbj_search_converter.xml_utils import iterate_xml_element, list_split_files, parse_xml, split_file_stem
 
 DEFAULT_BATCH_SIZE = 2000
 DEFAULT_PARALLEL_NUM = 64
@@ -617,6 +625,10 @@ def xml_entry_to_bp_instance(entry: dict[str, Any], is_ddbj: bool) -> BioProject
     project = entry["Project"]
     accession = project["Project"]["ProjectID"]["ArchiveID"]["accession"]
 
+    # NCBI の日付は XML にあるので、この parse 結果からそのまま取る
+    # (DDBJ は後で date cache から更新する)
+    date_created, date_modified, date_published = (None, None, None) if is_ddbj else parse_date_from_xml(project)
+
     # properties 内の値を正規化
     normalize_properties(project)
 
@@ -645,9 +657,9 @@ def xml_entry_to_bp_instance(entry: dict[str, Any], is_ddbj: bool) -> BioProject
         sameAs=parse_same_as(project, accession),
         status=parse_status(project, is_ddbj),
         accessibility=parse_accessibility(project, is_ddbj),
-        dateCreated=None,  # 後で更新
-        dateModified=None,  # 後で更新
-        datePublished=None,  # 後で更新
+        dateCreated=date_created,
+        dateModified=date_modified,
+        datePublished=date_published,
     )
 
 
@@ -685,24 +697,6 @@ def _fetch_dates_ddbj(config: Config, docs: dict[str, BioProject]) -> None:
             docs[acc].datePublished = dp
 
 
-def _fetch_dates_ncbi(xml_path: Path, docs: dict[str, BioProject]) -> None:
-    """NCBI BioProject の日付を XML から取得して設定する。"""
-    for xml_element in iterate_xml_element(xml_path, "Package"):
-        try:
-            metadata = parse_xml(xml_element)
-            project = metadata["Package"]["Project"]
-            accession = project["Project"]["ProjectID"]["ArchiveID"]["accession"]
-            if accession in docs:
-                date_created, date_modified, date_published = parse_date_from_xml(project)
-                docs[accession].dateCreated = date_created
-                docs[accession].dateModified = date_modified
-                docs[accession].datePublished = date_published
-        except Exception as e:
-            log_debug(
-                f"failed to fetch ncbi dates from xml element: {e}", debug_category=DebugCategory.FETCH_DATES_FAILED
-            )
-
-
 def _process_xml_file_worker(
     config: Config,
     xml_path: Path,
@@ -712,6 +706,7 @@ def _process_xml_file_worker(
     target_accessions: set[str] | None = None,
     since: str | None = None,
     include_dbxrefs: bool = False,
+    unchanged_index: Path | None = None,
 ) -> int:
     """
     XML ファイルを処理して JSONL を出力するワーカー関数。
@@ -725,54 +720,49 @@ def _process_xml_file_worker(
         target_accessions: 処理対象の accession の集合 (DDBJ 差分更新用)。None の場合は全件処理。
         since: 差分更新の基準日時 (NCBI 用)。None の場合は全件処理。
         include_dbxrefs: True の場合は dbXrefs を含める
+        unchanged_index: 前回の JSONL 生成から内容が変わっていない accession の一覧
+            (NCBI 差分更新用、``build_unchanged_index``)。該当する要素は parse しない。
     """
     log_info(f"processing {xml_path.name} -> {output_path.name}")
 
     docs: dict[str, BioProject] = {}
-    skipped_count = 0
-    filtered_count = 0
 
+    # blacklist / DDBJ 差分更新の対象外 / 内容が変わっていないものは parse 前に落とす
+    entry_filter = EntryFilter(
+        blacklist=bp_blacklist,
+        target_accessions=target_accessions if is_ddbj else None,
+        unchanged=load_unchanged_accessions(unchanged_index, xml_path.name) if unchanged_index is not None else set(),
+    )
     for xml_element in iterate_xml_element(xml_path, "Package"):
+        accession = sniff_bp_accession(xml_element)
+        if accession is not None and not entry_filter(accession):
+            continue
         try:
             metadata = parse_xml(xml_element)
             bp_instance = xml_entry_to_bp_instance(metadata["Package"], is_ddbj)
 
-            # blacklist チェック
-            if bp_instance.identifier in bp_blacklist:
-                skipped_count += 1
-                continue
-
-            # DDBJ 差分更新: target_accessions に含まれないものはスキップ
-            if is_ddbj and target_accessions is not None and bp_instance.identifier not in target_accessions:
-                filtered_count += 1
+            # accession を sniff できなかった要素は、ここで判定する
+            if accession is None and not entry_filter(bp_instance.identifier):
                 continue
 
             docs[bp_instance.identifier] = bp_instance
         except Exception as e:
             log_warn(f"failed to parse xml element: {e}", file=str(xml_path))
 
-    if skipped_count > 0:
-        log_info(f"skipped {skipped_count} blacklisted entries")
-    if filtered_count > 0:
-        log_info(f"filtered {filtered_count} entries (not in target_accessions)")
+    entry_filter.log_counts()
 
     # dbXrefs を一括取得
     if include_dbxrefs:
-        dbxref_map = get_dbxref_map(config, "bioproject", list(docs.keys()))
-        for accession, xrefs in dbxref_map.items():
-            if accession in docs:
-                docs[accession].dbXrefs = xrefs
+        attach_dbxrefs(config, "bioproject", docs)
 
     # parent/child BioProject 関連を取得
     from ddbj_search_converter.jsonl.utils import enrich_umbrella_relations
 
     enrich_umbrella_relations(config, docs)
 
-    # 日付を取得
+    # 日付を取得 (NCBI は xml_entry_to_bp_instance で設定済み)
     if is_ddbj:
         _fetch_dates_ddbj(config, docs)
-    else:
-        _fetch_dates_ncbi(xml_path, docs)
 
     # ステータスをキャッシュから取得して上書き
     _fetch_statuses(config, docs)
@@ -874,29 +864,43 @@ def generate_bp_jsonl(
         log_info("full update mode: --full specified")
 
     # DDBJ XML と NCBI XML をそれぞれ処理
-    ddbj_xml_files = sorted(tmp_xml_dir.glob("ddbj_*.xml"))
-    ncbi_xml_files = sorted(tmp_xml_dir.glob("ncbi_*.xml"))
+    ddbj_xml_files = list_split_files(tmp_xml_dir, "ddbj")
+    ncbi_xml_files = list_split_files(tmp_xml_dir, "ncbi")
 
     log_info(f"found {len(ddbj_xml_files)} ddbj xml files and {len(ncbi_xml_files)} ncbi xml files")
 
-    tasks: list[tuple[Path, Path, bool, set[str] | None, str | None]] = []
+    # NCBI: 前回の JSONL 生成から要素のバイト列が変わっていない accession は、前回の時点で
+    # 出力済みか日付で除外済みなので parse しない
+    hash_store_path = content_hash_store_path(config.result_dir / BP_BASE_DIR_NAME, "ncbi")
+    unchanged_index: Path | None = None
+    if since is not None:
+        unchanged_index = build_unchanged_index(tmp_xml_dir, "ncbi", hash_store_path)
+        if unchanged_index is None:
+            log_info("no content hash store or manifest for ncbi; parsing all ncbi entries")
+
+    tasks: list[tuple[Path, Path, bool, set[str] | None, str | None, Path | None]] = []
     skipped_existing = 0
+    completed_ncbi_files: list[str] = []
     for xml_file in ddbj_xml_files:
-        output_path = output_dir.joinpath(xml_file.stem + ".jsonl")
+        output_path = output_dir.joinpath(split_file_stem(xml_file) + ".jsonl")
         if resume and output_path.exists():
             skipped_existing += 1
             continue
-        tasks.append((xml_file, output_path, True, ddbj_target_accessions, None))
+        tasks.append((xml_file, output_path, True, ddbj_target_accessions, None, None))
     for xml_file in ncbi_xml_files:
-        output_path = output_dir.joinpath(xml_file.stem + ".jsonl")
+        output_path = output_dir.joinpath(split_file_stem(xml_file) + ".jsonl")
         if resume and output_path.exists():
             skipped_existing += 1
+            completed_ncbi_files.append(xml_file.name)
             continue
-        tasks.append((xml_file, output_path, False, None, since))
+        tasks.append((xml_file, output_path, False, None, since, unchanged_index))
 
     if skipped_existing > 0:
         log_info(f"skipped {skipped_existing} existing files (resume mode)")
 
+    # 大きい分割ファイルから submit して、最後に重いファイルだけが残って待つのを避ける
+    tasks.sort(key=lambda task: task[0].stat().st_size, reverse=True)
+
     total_count = 0
     with ProcessPoolExecutor(max_workers=parallel_num) as executor:
         futures = {
@@ -910,14 +914,17 @@ def generate_bp_jsonl(
                 target_accessions,
                 since_param,
                 include_dbxrefs,
+                unchanged_param,
             ): (xml_path, is_ddbj)
-            for xml_path, output_path, is_ddbj, target_accessions, since_param in tasks
+            for xml_path, output_path, is_ddbj, target_accessions, since_param, unchanged_param in tasks
         }
         for future in as_completed(futures):
-            xml_path, _is_ddbj = futures[future]
+            xml_path, is_ddbj = futures[future]
             try:
                 count = future.result()
                 total_count += count
+                if not is_ddbj:
+                    completed_ncbi_files.append(xml_path.name)
             except Exception as e:
                 log_error(f"failed to process {xml_path}: {e}", error=e, file=str(xml_path))
 
@@ -927,6 +934,10 @@ def generate_bp_jsonl(
     write_last_run(config, "bioproject")
     log_info("updated last_run.json for bioproject")
 
+    # 失敗した分割ファイルの hash は記録しない (次回 parse し直す)
+    hash_count = commit_content_hashes(tmp_xml_dir, "ncbi", hash_store_path, completed_ncbi_files)
+    log_info(f"recorded content hashes of {hash_count} ncbi entries")
+
 
 # === CLI ===
 
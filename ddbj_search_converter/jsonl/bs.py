@@ -2,6 +2,7 @@
 
 import argparse
 import sys
+from collections.abc import Callable, Iterator
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
@@ -22,11 +23,12 @@ from ddbj_search_converter.dblink.utils import load_blacklist
 from ddbj_search_converter.id_patterns import BIOSAMPLE_ID_FINDALL_RE
 from ddbj_search_converter.jsonl.distribution import make_bs_distribution
 from ddbj_search_converter.jsonl.utils import (
+    EntryFilter,
     _build_url,
+    attach_dbxrefs,
     build_search_entry_self_url,
     deduplicate_organizations,
     ensure_attribute_list,
-    get_dbxref_map,
     write_jsonl,
 )
 from ddbj_search_converter.logging.logger import log_debug, log_error, log_info, log_warn, run_logger
@@ -40,7 +42,14 @@ from ddbj_search_converter.schema import (
     Status,
     Xref,
 )
-from ddbj_search_converter.xml_utils import iterate_xml_element, parse_xml
+from ddbj_search_converter.xml_manifest import (
+    build_unchanged_index,
+    commit_content_hashes,
+    content_hash_store_path,
+    load_unchanged_accessions,
+    sniff_bs_accession,
+)
+from ddbj_search_converter.xml_utils import iterate_xml_element, list_split_files, parse_xml, split_file_stem
 
 DEFAULT_BATCH_SIZE = 2000
 DEFAULT_PARALLEL_NUM = 64
@@ -459,6 +468,10 @@ def xml_entry_to_bs_instance(entry: dict[str, Any], is_ddbj: bool) -> BioSample:
     sample = entry["BioSample"]
     accession = parse_accession(sample, is_ddbj)
 
+    # NCBI の日付は XML の属性にあるので、この parse 結果からそのまま取る
+    # (DDBJ は後で date cache から更新する)
+    date_created, date_modified, date_published = (None, None, None) if is_ddbj else parse_date_from_xml(sample)
+
     normalize_properties(sample)
     ensure_attribute_list(sample, BS_ATTRIBUTE_PATHS)
 
@@ -486,12 +499,80 @@ def xml_entry_to_bs_instance(entry: dict[str, Any], is_ddbj: bool) -> BioSample:
         sameAs=parse_same_as(sample, accession),
         status=parse_status(sample, accession),
         accessibility=parse_accessibility(sample, accession),
-        dateCreated=None,  # 後で更新
-        dateModified=None,  # 後で更新
-        datePublished=None,  # 後で更新
+        dateCreated=date_created,
+        dateModified=date_modified,
+        datePublished=date_published,
     )
 
 
+# === Entry cache ===
+#
+# create_dblink_bp_bs_relations --write-entry-cache が分割ファイルを parse した
+# ついでに、変換済みの BioSample (blacklist / dbXrefs / status / DDBJ の日付を
+# 反映する前) を分割ファイルの隣に JSONL で書き出す。generate_bs_jsonl は
+# これがあれば XML を parse し直さずに読む。
+
+
+ENTRY_CACHE_SUFFIX = ".entries.jsonl"
+
+
+def entry_cache_path(xml_path: Path) -> Path:
+    """分割ファイル ({prefix}_{n}.xml) に対応する entry cache のパス。"""
+    return xml_path.with_name(split_file_stem(xml_path) + ENTRY_CACHE_SUFFIX)
+
+
+def entry_cache_usable(xml_path: Path) -> bool:
+    """entry cache があり、分割ファイルより新しいか。
+
+    同じ日付ディレクトリで分割をやり直すと分割ファイルの方が新しくなるので、
+    古い cache は使わない。
+    """
+    cache_path = entry_cache_path(xml_path)
+    if not cache_path.exists():
+        return False
+    return cache_path.stat().st_mtime >= xml_path.stat().st_mtime
+
+
+def write_entry_cache(xml_path: Path, docs: list[BioSample]) -> Path:
+    """entry cache を書く。途中で落ちても壊れた cache が残らないよう rename で置き換える。"""
+    cache_path = entry_cache_path(xml_path)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    write_jsonl(tmp_path, docs)
+    tmp_path.replace(cache_path)
+    return cache_path
+
+
+def iter_bs_instances(
+    xml_path: Path,
+    is_ddbj: bool,
+    accept: Callable[[str], bool] | None = None,
+) -> Iterator[BioSample]:
+    """分割ファイルの BioSample を変換して yield する。entry cache が使えればそちらを読む。
+
+    ``accept`` を渡すと、XML の要素は parse する前にバイト列から取り出した accession
+    (``sniff_bs_accession``) で、entry cache の行は読み込んだ identifier で判定し、
+    False のものを捨てる。accession を取り出せない要素は parse する。
+    """
+    if entry_cache_usable(xml_path):
+        log_debug(f"reading entry cache for {xml_path.name}", file=str(xml_path))
+        with entry_cache_path(xml_path).open("r", encoding="utf-8") as f:
+            for line in f:
+                bs_instance = BioSample.model_validate_json(line)
+                if accept is None or accept(bs_instance.identifier):
+                    yield bs_instance
+        return
+
+    for xml_element in iterate_xml_element(xml_path, "BioSample"):
+        if accept is not None:
+            accession = sniff_bs_accession(xml_element, is_ddbj)
+            if accession is not None and not accept(accession):
+                continue
+        try:
+            yield xml_entry_to_bs_instance(parse_xml(xml_element), is_ddbj)
+        except Exception as e:
+            log_warn(f"failed to parse xml element: {e}", file=str(xml_path))
+
+
 # === Processing ===
 
 
@@ -526,24 +607,6 @@ def _fetch_dates_ddbj(config: Config, docs: dict[str, BioSample]) -> None:
             docs[acc].datePublished = dp
 
 
-def _fetch_dates_ncbi(xml_path: Path, docs: dict[str, BioSample], is_ddbj: bool) -> None:
-    """NCBI BioSample の日付を XML から取得して設定する。"""
-    for xml_element in iterate_xml_element(xml_path, "BioSample"):
-        try:
-            metadata = parse_xml(xml_element)
-            sample = metadata["BioSample"]
-            accession = parse_accession(sample, is_ddbj)
-            if accession in docs:
-                date_created, date_modified, date_published = parse_date_from_xml(sample)
-                docs[accession].dateCreated = date_created
-                docs[accession].dateModified = date_modified
-                docs[accession].datePublished = date_published
-        except Exception as e:
-            log_debug(
-                f"failed to fetch ncbi dates from xml element: {e}", debug_category=DebugCategory.FETCH_DATES_FAILED
-            )
-
-
 def _process_xml_file_worker(
     config: Config,
     xml_path: Path,
@@ -553,6 +616,7 @@ def _process_xml_file_worker(
     target_accessions: set[str] | None = None,
     since: str | None = None,
     include_dbxrefs: bool = False,
+    unchanged_index: Path | None = None,
 ) -> int:
     """
     XML ファイルを処理して JSONL を出力するワーカー関数。
@@ -566,49 +630,34 @@ def _process_xml_file_worker(
         target_accessions: 処理対象の accession の集合 (DDBJ 差分更新用)。None の場合は全件処理。
         since: 差分更新の基準日時 (NCBI 用)。None の場合は全件処理。
         include_dbxrefs: True の場合は dbXrefs を含める
+        unchanged_index: 前回の JSONL 生成から内容が変わっていない accession の一覧
+            (NCBI 差分更新用、``build_unchanged_index``)。該当する要素は parse しない。
     """
     log_info(f"processing {xml_path.name} -> {output_path.name}")
 
     docs: dict[str, BioSample] = {}
-    skipped_count = 0
-    filtered_count = 0
-
-    for xml_element in iterate_xml_element(xml_path, "BioSample"):
-        try:
-            metadata = parse_xml(xml_element)
-            bs_instance = xml_entry_to_bs_instance(metadata, is_ddbj)
 
-            # blacklist チェック
-            if bs_instance.identifier in bs_blacklist:
-                skipped_count += 1
-                continue
-
-            # DDBJ 差分更新: target_accessions に含まれないものはスキップ
-            if is_ddbj and target_accessions is not None and bs_instance.identifier not in target_accessions:
-                filtered_count += 1
-                continue
-
-            docs[bs_instance.identifier] = bs_instance
-        except Exception as e:
-            log_warn(f"failed to parse xml element: {e}", file=str(xml_path))
+    # blacklist / DDBJ 差分更新の対象外 / 内容が変わっていないものは parse 前に落とす
+    entry_filter = EntryFilter(
+        blacklist=bs_blacklist,
+        target_accessions=target_accessions if is_ddbj else None,
+        unchanged=load_unchanged_accessions(unchanged_index, xml_path.name) if unchanged_index is not None else set(),
+    )
+    for bs_instance in iter_bs_instances(xml_path, is_ddbj, entry_filter):
+        # accession を sniff できずに parse した要素は、ここで判定する
+        if not entry_filter(bs_instance.identifier):
+            continue
+        docs[bs_instance.identifier] = bs_instance
 
-    if skipped_count > 0:
-        log_info(f"skipped {skipped_count} blacklisted entries")
-    if filtered_count > 0:
-        log_info(f"filtered {filtered_count} entries (not in target_accessions)")
+    entry_filter.log_counts()
 
     # dbXrefs を一括取得
     if include_dbxrefs:
-        dbxref_map = get_dbxref_map(config, "biosample", list(docs.keys()))
-        for accession, xrefs in dbxref_map.items():
-            if accession in docs:
-                docs[accession].dbXrefs = xrefs
+        attach_dbxrefs(config, "biosample", docs)
 
-    # 日付を取得
+    # 日付を取得 (NCBI は xml_entry_to_bs_instance で設定済み)
     if is_ddbj:
         _fetch_dates_ddbj(config, docs)
-    else:
-        _fetch_dates_ncbi(xml_path, docs, is_ddbj)
 
     # ステータスをキャッシュから取得して上書き
     _fetch_statuses(config, docs)
@@ -662,6 +711,7 @@ def generate_bs_jsonl(
     BioSample JSONL ファイルを生成する。
 
     tmp_xml ディレクトリから分割済み XML を取得して並列処理する。
+    分割ファイルごとに entry cache があれば XML の代わりにそれを読む。
 
     Args:
         config: Config オブジェクト
@@ -710,29 +760,43 @@ def generate_bs_jsonl(
         log_info("full update mode: --full specified")
 
     # DDBJ XML と NCBI XML をそれぞれ処理
-    ddbj_xml_files = sorted(tmp_xml_dir.glob("ddbj_*.xml"))
-    ncbi_xml_files = sorted(tmp_xml_dir.glob("ncbi_*.xml"))
+    ddbj_xml_files = list_split_files(tmp_xml_dir, "ddbj")
+    ncbi_xml_files = list_split_files(tmp_xml_dir, "ncbi")
 
     log_info(f"found {len(ddbj_xml_files)} ddbj xml files and {len(ncbi_xml_files)} ncbi xml files")
 
-    tasks: list[tuple[Path, Path, bool, set[str] | None, str | None]] = []
+    # NCBI: 前回の JSONL 生成から要素のバイト列が変わっていない accession は、前回の時点で
+    # 出力済みか日付で除外済みなので parse しない
+    hash_store_path = content_hash_store_path(config.result_dir / BS_BASE_DIR_NAME, "ncbi")
+    unchanged_index: Path | None = None
+    if since is not None:
+        unchanged_index = build_unchanged_index(tmp_xml_dir, "ncbi", hash_store_path)
+        if unchanged_index is None:
+            log_info("no content hash store or manifest for ncbi; parsing all ncbi entries")
+
+    tasks: list[tuple[Path, Path, bool, set[str] | None, str | None, Path | None]] = []
     skipped_existing = 0
+    completed_ncbi_files: list[str] = []
     for xml_file in ddbj_xml_files:
-        output_path = output_dir.joinpath(xml_file.stem + ".jsonl")
+        output_path = output_dir.joinpath(split_file_stem(xml_file) + ".jsonl")
         if resume and output_path.exists():
             skipped_existing += 1
             continue
-        tasks.append((xml_file, output_path, True, ddbj_target_accessions, None))
+        tasks.append((xml_file, output_path, True, ddbj_target_accessions, None, None))
     for xml_file in ncbi_xml_files:
-        output_path = output_dir.joinpath(xml_file.stem + ".jsonl")
+        output_path = output_dir.joinpath(split_file_stem(xml_file) + ".jsonl")
         if resume and output_path.exists():
             skipped_existing += 1
+            completed_ncbi_files.append(xml_file.name)
             continue
-        tasks.append((xml_file, output_path, False, None, since))
+        tasks.append((xml_file, output_path, False, None, since, unchanged_index))
 
     if skipped_existing > 0:
         log_info(f"skipped {skipped_existing} existing files (resume mode)")
 
+    # 大きい分割ファイルから submit して、最後に重いファイルだけが残って待つのを避ける
+    tasks.sort(key=lambda task: task[0].stat().st_size, reverse=True)
+
     total_count = 0
     with ProcessPoolExecutor(max_workers=parallel_num) as executor:
         futures = {
@@ -746,14 +810,17 @@ def generate_bs_jsonl(
                 target_accessions,
                 since_param,
                 include_dbxrefs,
+                unchanged_param,
             ): (xml_path, is_ddbj)
-            for xml_path, output_path, is_ddbj, target_accessions, since_param in tasks
+            for xml_path, output_path, is_ddbj, target_accessions, since_param, unchanged_param in tasks
         }
         for future in as_completed(futures):
-            xml_path, _is_ddbj = futures[future]
+            xml_path, is_ddbj = futures[future]
             try:
                 count = future.result()
                 total_count += count
+                if not is_ddbj:
+                    completed_ncbi_files.append(xml_path.name)
             except Exception as e:
                 log_error(f"failed to process {xml_path}: {e}", error=e, file=str(xml_path))
 
@@ -763,6 +830,10 @@ def generate_bs_jsonl(
     write_last_run(config, "biosample")
     log_info("updated last_run.json for biosample")
 
+    # 失敗した分割ファイルの hash は記録しない (次回 parse し直す)
+    hash_count = commit_content_hashes(tmp_xml_dir, "ncbi", hash_store_path, completed_ncbi_files)
+    log_info(f"recorded content hashes of {hash_count} ncbi entries")
+
 
 # === CLI ===
 
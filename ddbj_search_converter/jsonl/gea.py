@@ -20,7 +20,7 @@ from ddbj_search_converter.jsonl.idf_common import (
     parse_pubmed_doi_publications,
     parse_submitter_affiliations,
 )
-from ddbj_search_converter.jsonl.utils import build_search_entry_self_url, get_dbxref_map, write_jsonl
+from ddbj_search_converter.jsonl.utils import attach_dbxrefs, build_search_entry_self_url, write_jsonl
 from ddbj_search_converter.logging.logger import log_debug, log_info, log_warn, run_logger
 from ddbj_search_converter.schema import GEA, Xref
 
@@ -131,10 +131,7 @@ def generate_gea_jsonl(
     log_info(f"processed {len(gea_instances)} gea entries from {gea_base_path}")
 
     if include_dbxrefs:
-        accessions = list(gea_instances.keys())
-        dbxref_map = get_dbxref_map(config, "gea", accessions)
-        for accession, xrefs in dbxref_map.items():
-            gea_instances[accession].dbXrefs = xrefs
+        attach_dbxrefs(config, "gea", gea_instances)
 
     output_path = output_dir / "gea.jsonl"
     write_jsonl(output_path, list(gea_instances.values()))
@@ -21,11 +21,11 @@ from ddbj_search_converter.dblink.db import AccessionType
 from ddbj_search_converter.dblink.utils import load_jga_blacklist
 from ddbj_search_converter.jsonl.distribution import make_jga_distribution
 from ddbj_search_converter.jsonl.utils import (
+    attach_dbxrefs,
     build_pubmed_url,
     build_search_entry_self_url,
     deduplicate_organizations,
     ensure_attribute_list,
-    get_dbxref_map,
     is_valid_external_url,
     normalize_publication_dbtype,
     write_jsonl,
@@ -537,13 +537,9 @@ def generate_jga_jsonl(
     if skipped_count > 0:
         log_info(f"skipped {skipped_count} entries by blacklist")
 
-    accessions = list(jga_instances.keys())
-
     # dbXrefs を取得して更新
     if include_dbxrefs:
-        dbxref_map = get_dbxref_map(config, INDEX_TO_ACCESSION_TYPE[index_name], accessions)
-        for accession, xrefs in dbxref_map.items():
-            jga_instances[accession].dbXrefs = xrefs
+        attach_dbxrefs(config, INDEX_TO_ACCESSION_TYPE[index_name], jga_instances)
 
     # 日付を取得して更新
     date_map = load_date_map(jga_base_path, index_name)
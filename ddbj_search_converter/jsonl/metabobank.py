@@ -20,7 +20,7 @@ from ddbj_search_converter.jsonl.idf_common import (
     parse_pubmed_doi_publications,
     parse_submitter_affiliations,
 )
-from ddbj_search_converter.jsonl.utils import build_search_entry_self_url, get_dbxref_map, write_jsonl
+from ddbj_search_converter.jsonl.utils import attach_dbxrefs, build_search_entry_self_url, write_jsonl
 from ddbj_search_converter.logging.logger import log_debug, log_info, log_warn, run_logger
 from ddbj_search_converter.schema import (
     MetaboBank,
@@ -148,10 +148,7 @@ def generate_metabobank_jsonl(
     log_info(f"processed {len(entries)} metabobank entries from {metabobank_base_path}")
 
     if include_dbxrefs:
-        accessions = list(entries.keys())
-        dbxref_map = get_dbxref_map(config, "metabobank", accessions)
-        for accession, xrefs in dbxref_map.items():
-            entries[accession].dbXrefs = xrefs
+        attach_dbxrefs(config, "metabobank", entries)
 
     output_path = output_dir / "metabobank.jsonl"
     write_jsonl(output_path, list(entries.values()))
@@ -6,6 +6,7 @@ last_run.json は更新しない。
 
 import argparse
 import sys
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
@@ -23,10 +24,8 @@ from ddbj_search_converter.dblink.db import AccessionType
 from ddbj_search_converter.dblink.utils import load_blacklist, load_jga_blacklist, load_sra_blacklist
 from ddbj_search_converter.id_patterns import ID_PATTERN_MAP
 from ddbj_search_converter.jsonl.bp import _fetch_dates_ddbj as bp_fetch_dates_ddbj
-from ddbj_search_converter.jsonl.bp import _fetch_dates_ncbi as bp_fetch_dates_ncbi
 from ddbj_search_converter.jsonl.bp import xml_entry_to_bp_instance
 from ddbj_search_converter.jsonl.bs import _fetch_dates_ddbj as bs_fetch_dates_ddbj
-from ddbj_search_converter.jsonl.bs import _fetch_dates_ncbi as bs_fetch_dates_ncbi
 from ddbj_search_converter.jsonl.bs import xml_entry_to_bs_instance
 from ddbj_search_converter.jsonl.jga import (
     INDEX_TO_ACCESSION_TYPE,
@@ -37,7 +36,7 @@ from ddbj_search_converter.jsonl.jga import (
     load_jga_xml,
 )
 from ddbj_search_converter.jsonl.sra import XML_TYPES, process_submission_xml
-from ddbj_search_converter.jsonl.utils import get_dbxref_map, write_jsonl
+from ddbj_search_converter.jsonl.utils import attach_dbxrefs, write_jsonl
 from ddbj_search_converter.logging.logger import log_info, log_warn, run_logger
 from ddbj_search_converter.schema import XrefType
 from ddbj_search_converter.sra.tar_reader import SraXmlType, get_dra_tar_reader, get_ncbi_tar_reader
@@ -46,7 +45,11 @@ from ddbj_search_converter.sra_accessions_tab import (
     get_accession_info_bulk,
     lookup_submissions_for_accessions,
 )
-from ddbj_search_converter.xml_utils import iterate_xml_element, parse_xml
+from ddbj_search_converter.xml_manifest import lookup_manifest, manifest_available, read_manifest_elements
+from ddbj_search_converter.xml_utils import iterate_xml_element, list_split_files, parse_xml
+
+# tmp_xml ディレクトリの分割ファイルの prefix (prepare_{bioproject,biosample}_xml 参照)
+SPLIT_XML_PREFIXES = ("ddbj", "ncbi")
 
 # type ごとに受け入れる accession パターンを定義
 TYPE_PATTERNS: dict[str, list[AccessionType]] = {
@@ -97,6 +100,26 @@ def validate_accessions(data_type: str, accessions: set[str]) -> set[str]:
     return valid
 
 
+def _iter_candidate_elements(tmp_xml_dir: Path, tag: str, target_accessions: set[str]) -> Iterator[tuple[Path, bytes]]:
+    """target の候補要素を (分割ファイルのパス, 要素のバイト列) で yield する。
+
+    split 時に書かれた manifest があれば、該当要素だけを位置指定で読む。
+    manifest がなければ全分割ファイルの全要素を yield する。
+    どちらの場合も、呼び出し側で parse した accession を見て絞り込む。
+    """
+    if manifest_available(tmp_xml_dir, SPLIT_XML_PREFIXES):
+        entries = lookup_manifest(tmp_xml_dir, SPLIT_XML_PREFIXES, target_accessions)
+        log_info(f"found {len(entries)} element(s) via manifest in {tmp_xml_dir}")
+        yield from read_manifest_elements(tmp_xml_dir, entries)
+        return
+
+    xml_files = sorted(xml_file for prefix in SPLIT_XML_PREFIXES for xml_file in list_split_files(tmp_xml_dir, prefix))
+    log_info(f"manifest not found, scanning {len(xml_files)} xml files in {tmp_xml_dir}")
+    for xml_path in xml_files:
+        for xml_element in iterate_xml_element(xml_path, tag):
+            yield xml_path, xml_element
+
+
 # === BioProject ===
 
 
@@ -113,30 +136,25 @@ def regenerate_bp_jsonl(
 
     bp_blacklist, _ = load_blacklist(config)
 
-    # DDBJ XML + NCBI XML の全ファイルを処理
-    xml_files = sorted(list(tmp_xml_dir.glob("ddbj_*.xml")) + list(tmp_xml_dir.glob("ncbi_*.xml")))
-    log_info(f"found {len(xml_files)} xml files in {tmp_xml_dir}")
-
     docs: dict[str, Any] = {}
     found_accessions: set[str] = set()
 
-    for xml_path in xml_files:
+    for xml_path, xml_element in _iter_candidate_elements(tmp_xml_dir, "Package", target_accessions):
         is_ddbj = xml_path.name.startswith("ddbj_")
-        for xml_element in iterate_xml_element(xml_path, "Package"):
-            try:
-                metadata = parse_xml(xml_element)
-                bp_instance = xml_entry_to_bp_instance(metadata["Package"], is_ddbj)
+        try:
+            metadata = parse_xml(xml_element)
+            bp_instance = xml_entry_to_bp_instance(metadata["Package"], is_ddbj)
 
-                if bp_instance.identifier not in target_accessions:
-                    continue
-                if bp_instance.identifier in bp_blacklist:
-                    log_warn(f"accession {bp_instance.identifier} is in blacklist, skipping")
-                    continue
+            if bp_instance.identifier not in target_accessions:
+                continue
+            if bp_instance.identifier in bp_blacklist:
+                log_warn(f"accession {bp_instance.identifier} is in blacklist, skipping")
+                continue
 
-                docs[bp_instance.identifier] = bp_instance
-                found_accessions.add(bp_instance.identifier)
-            except Exception as e:
-                log_warn(f"failed to parse xml element: {e}", file=str(xml_path))
+            docs[bp_instance.identifier] = bp_instance
+            found_accessions.add(bp_instance.identifier)
+        except Exception as e:
+            log_warn(f"failed to parse xml element: {e}", file=str(xml_path))
 
     not_found = target_accessions - found_accessions
     if not_found:
@@ -148,26 +166,17 @@ def regenerate_bp_jsonl(
 
     # dbXrefs
     if include_dbxrefs:
-        dbxref_map = get_dbxref_map(config, "bioproject", list(docs.keys()))
-        for accession, xrefs in dbxref_map.items():
-            if accession in docs:
-                docs[accession].dbXrefs = xrefs
+        attach_dbxrefs(config, "bioproject", docs)
 
     # parent/child BioProject 関連を取得
     from ddbj_search_converter.jsonl.utils import enrich_umbrella_relations
 
     enrich_umbrella_relations(config, docs)
 
-    # 日付取得: DDBJ と NCBI の docs を分けて処理
+    # 日付取得: DDBJ は date cache から (NCBI は XML から変換時に設定済み)
     ddbj_docs = {acc: doc for acc, doc in docs.items() if acc.startswith("PRJD")}
-    ncbi_docs = {acc: doc for acc, doc in docs.items() if not acc.startswith("PRJD")}
-
     if ddbj_docs:
         bp_fetch_dates_ddbj(config, ddbj_docs)
-    if ncbi_docs:
-        # NCBI の日付は XML から取得するため、全 NCBI XML を再走査
-        for xml_path in sorted(tmp_xml_dir.glob("ncbi_*.xml")):
-            bp_fetch_dates_ncbi(xml_path, ncbi_docs)
 
     # ステータスをキャッシュから取得して上書き
     from ddbj_search_converter.jsonl.bp import _fetch_statuses as bp_fetch_statuses
@@ -195,29 +204,25 @@ def regenerate_bs_jsonl(
 
     _, bs_blacklist = load_blacklist(config)
 
-    xml_files = sorted(list(tmp_xml_dir.glob("ddbj_*.xml")) + list(tmp_xml_dir.glob("ncbi_*.xml")))
-    log_info(f"found {len(xml_files)} xml files in {tmp_xml_dir}")
-
     docs: dict[str, Any] = {}
     found_accessions: set[str] = set()
 
-    for xml_path in xml_files:
+    for xml_path, xml_element in _iter_candidate_elements(tmp_xml_dir, "BioSample", target_accessions):
         is_ddbj = xml_path.name.startswith("ddbj_")
-        for xml_element in iterate_xml_element(xml_path, "BioSample"):
-            try:
-                metadata = parse_xml(xml_element)
-                bs_instance = xml_entry_to_bs_instance(metadata, is_ddbj)
+        try:
+            metadata = parse_xml(xml_element)
+            bs_instance = xml_entry_to_bs_instance(metadata, is_ddbj)
 
-                if bs_instance.identifier not in target_accessions:
-                    continue
-                if bs_instance.identifier in bs_blacklist:
-                    log_warn(f"accession {bs_instance.identifier} is in blacklist, skipping")
-                    continue
+            if bs_instance.identifier not in target_accessions:
+                continue
+            if bs_instance.identifier in bs_blacklist:
+                log_warn(f"accession {bs_instance.identifier} is in blacklist, skipping")
+                continue
 
-                docs[bs_instance.identifier] = bs_instance
-                found_accessions.add(bs_instance.identifier)
-            except Exception as e:
-                log_warn(f"failed to parse xml element: {e}", file=str(xml_path))
+            docs[bs_instance.identifier] = bs_instance
+            found_accessions.add(bs_instance.identifier)
+        except Exception as e:
+            log_warn(f"failed to parse xml element: {e}", file=str(xml_path))
 
     not_found = target_accessions - found_accessions
     if not_found:
@@ -229,21 +234,12 @@ def regenerate_bs_jsonl(
 
     # dbXrefs
     if include_dbxrefs:
-        dbxref_map = get_dbxref_map(config, "biosample", list(docs.keys()))
-        for accession, xrefs in dbxref_map.items():
-            if accession in docs:
-                docs[accession].dbXrefs = xrefs
+        attach_dbxrefs(config, "biosample", docs)
 
-    # 日付取得
+    # 日付取得: DDBJ は date cache から (NCBI は XML から変換時に設定済み)
     ddbj_docs = {acc: doc for acc, doc in docs.items() if acc.startswith("SAMD")}
-    ncbi_docs = {acc: doc for acc, doc in docs.items() if not acc.startswith("SAMD")}
-
     if ddbj_docs:
         bs_fetch_dates_ddbj(config, ddbj_docs)
-    if ncbi_docs:
-        for xml_path in sorted(tmp_xml_dir.glob("ncbi_*.xml")):
-            is_ddbj = False
-            bs_fetch_dates_ncbi(xml_path, ncbi_docs, is_ddbj)
 
     # ステータスをキャッシュから取得して上書き
     from ddbj_search_converter.jsonl.bs import _fetch_statuses as bs_fetch_statuses
@@ -420,12 +416,9 @@ def regenerate_sra_jsonl(
         }
         for xml_type in XML_TYPES:
             entity_type = xref_type_map[xml_type]
-            accessions = [e.identifier for e in all_entries[xml_type]]
-            if accessions:
-                dbxref_map = get_dbxref_map(config, entity_type, accessions)
-                for entry in all_entries[xml_type]:
-                    if entry.identifier in dbxref_map:
-                        entry.dbXrefs = dbxref_map[entry.identifier]
+            entry_map = {e.identifier: e for e in all_entries[xml_type]}
+            if entry_map:
+                attach_dbxrefs(config, entity_type, entry_map)
 
     # JSONL を出力 (空の場合はファイル作成しない)
     for xml_type in XML_TYPES:
@@ -513,11 +506,7 @@ def regenerate_jga_jsonl(
 
         # dbXrefs
         if include_dbxrefs:
-            accession_list = list(jga_instances.keys())
-            dbxref_map = get_dbxref_map(config, INDEX_TO_ACCESSION_TYPE[index_name], accession_list)
-            for accession, xrefs in dbxref_map.items():
-                if accession in jga_instances:
-                    jga_instances[accession].dbXrefs = xrefs
+            attach_dbxrefs(config, INDEX_TO_ACCESSION_TYPE[index_name], jga_instances)
 
         # 日付
         try:
@@ -4,17 +4,20 @@ DRA (DDBJ) と NCBI SRA の XML を tar ファイルから読み込み、
 6 種類 (submission, study, experiment, run, sample, analysis) の JSONL を生成する。
 
 並列処理アーキテクチャ:
-    Producer-Worker パターンを採用。tar reader はシングルスレッドで動作し、
-    batch 分の XML を読み込んだら ProcessPoolExecutor の worker に submit する。
-    各 worker は独立して DB クエリ、XML パース、dbXrefs 取得、JSONL 出力を行う。
+    Producer-Worker パターンを採用。producer (メインプロセス) は tar の index から
+    batch 分の XML のデータ位置 (member 名, offset_data, size) だけを引いて
+    ProcessPoolExecutor の worker に submit する。各 worker は tar を ``os.pread`` で
+    直接読み、独立して DB クエリ、XML パース、dbXrefs 取得、JSONL 出力を行う。
+    XML のバイト列はメインプロセスを経由しない (読み込みと pickle が律速にならない)。
 """
 
 from __future__ import annotations
 
 import argparse
 import gc
+import itertools
 import sys
-from collections.abc import Callable, Iterator
+from collections.abc import Callable, Iterator, Mapping
 from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from pathlib import Path
 from typing import Any, Literal
@@ -31,16 +34,17 @@ from ddbj_search_converter.config import (
 from ddbj_search_converter.dblink.utils import load_sra_blacklist
 from ddbj_search_converter.id_patterns import BIOSAMPLE_ID_FINDALL_RE, is_ddbj_sra_accession
 from ddbj_search_converter.jsonl.distribution import make_sra_distribution
+from ddbj_search_converter.jsonl.sra_checkpoint import BatchCheckpoint
 from ddbj_search_converter.jsonl.utils import (
     _build_url,
+    attach_dbxrefs,
     build_pubmed_url,
     build_search_entry_self_url,
     deduplicate_organizations,
     ensure_attribute_list,
-    get_dbxref_map,
     write_jsonl,
 )
-from ddbj_search_converter.logging.logger import log_debug, log_info, log_warn, run_logger
+from ddbj_search_converter.logging.logger import log_debug, log_error, log_info, log_warn, run_logger
 from ddbj_search_converter.logging.schema import DebugCategory
 from ddbj_search_converter.schema import (
     SRA,
@@ -53,7 +57,14 @@ from ddbj_search_converter.schema import (
     Xref,
     XrefType,
 )
-from ddbj_search_converter.sra.tar_reader import SraXmlType, TarXMLReader, get_dra_tar_path, get_ncbi_tar_path
+from ddbj_search_converter.sra.tar_reader import (
+    SraXmlType,
+    TarMemberLocation,
+    TarXMLReader,
+    get_dra_tar_path,
+    get_ncbi_tar_path,
+    read_member_at,
+)
 from ddbj_search_converter.sra_accessions_tab import (
     SourceKind,
     get_accession_info_bulk,
@@ -66,6 +77,12 @@ from ddbj_search_converter.xml_utils import parse_xml
 DEFAULT_BATCH_SIZE = 5000
 DEFAULT_PARALLEL_NUM = 8
 
+# {submission: {xml_type: tar 内のデータ位置 or None}}
+BatchXmlLocations = dict[str, dict[SraXmlType, TarMemberLocation | None]]
+
+# parse_xml 済みの XML ({root_tag: {...}})。worker では XML 1 つにつき 1 回だけ parse する
+ParsedXml = dict[str, Any]
+
 # XML types
 XML_TYPES: list[SraXmlType] = ["submission", "study", "experiment", "run", "sample", "analysis"]
 
@@ -101,6 +118,11 @@ SRA_ATTRIBUTE_PATHS: dict[SraXmlType, list[list[str]]] = {
 # === Parse functions ===
 
 
+def _as_parsed(xml: bytes | ParsedXml) -> ParsedXml:
+    """parse_* には XML のバイト列と parse 済みの dict のどちらも渡せる。"""
+    return parse_xml(xml) if isinstance(xml, bytes) else xml
+
+
 def _get_entries(parsed: dict[str, Any], set_key: str, entry_key: str) -> list[dict[str, Any]]:
     """SET から entry のリストを取得する。"""
     entry_set = parsed.get(set_key) or {}
@@ -164,7 +186,7 @@ def _normalize_accessibility(accessibility: str | None) -> Accessibility:
 
 
 def parse_submission(
-    xml_bytes: bytes,
+    xml: bytes | ParsedXml,
     accession: str,
 ) -> dict[str, Any] | None:
     """submission XML をパースする。
@@ -173,7 +195,7 @@ def parse_submission(
     (他 type は `{TYPE}_SET.{TYPE}` の 2 階層)。
     """
     try:
-        parsed = parse_xml(xml_bytes)
+        parsed = _as_parsed(xml)
         submission = parsed.get("SUBMISSION")
         if submission is None:
             return None
@@ -193,13 +215,13 @@ def parse_submission(
 
 
 def parse_study(
-    xml_bytes: bytes,
+    xml: bytes | ParsedXml,
     accession: str,
 ) -> list[dict[str, Any]]:
     """study XML をパースする。複数の STUDY を返す。"""
     results: list[dict[str, Any]] = []
     try:
-        parsed = parse_xml(xml_bytes)
+        parsed = _as_parsed(xml)
         studies = _get_entries(parsed, "STUDY_SET", "STUDY")
 
         for study in studies:
@@ -222,13 +244,13 @@ def parse_study(
 
 
 def parse_experiment(
-    xml_bytes: bytes,
+    xml: bytes | ParsedXml,
     accession: str,
 ) -> list[dict[str, Any]]:
     """experiment XML をパースする。複数の EXPERIMENT を返す。"""
     results: list[dict[str, Any]] = []
     try:
-        parsed = parse_xml(xml_bytes)
+        parsed = _as_parsed(xml)
         experiments = _get_entries(parsed, "EXPERIMENT_SET", "EXPERIMENT")
 
         for exp in experiments:
@@ -252,12 +274,12 @@ def parse_experiment(
 
 
 def parse_run(
-    xml_bytes: bytes,
+    xml: bytes | ParsedXml,
     accession: str,
 ) -> list[dict[str, Any]]:
     """run XML をパースする。複数の RUN を返す。"""
     try:
-        parsed = parse_xml(xml_bytes)
+        parsed = _as_parsed(xml)
         runs = _get_entries(parsed, "RUN_SET", "RUN")
 
         return [
@@ -332,13 +354,13 @@ def _parse_sample_derived_from(sample: Any) -> list[Xref]:
 
 
 def parse_sample(
-    xml_bytes: bytes,
+    xml: bytes | ParsedXml,
     accession: str,
 ) -> list[dict[str, Any]]:
     """sample XML をパースする。複数の SAMPLE を返す。"""
     results: list[dict[str, Any]] = []
     try:
-        parsed = parse_xml(xml_bytes)
+        parsed = _as_parsed(xml)
         samples = _get_entries(parsed, "SAMPLE_SET", "SAMPLE")
 
         for sample in samples:
@@ -373,12 +395,12 @@ def parse_sample(
 
 
 def parse_analysis(
-    xml_bytes: bytes,
+    xml: bytes | ParsedXml,
     accession: str,
 ) -> list[dict[str, Any]]:
     """analysis XML をパースする。複数の ANALYSIS を返す。"""
     try:
-        parsed = parse_xml(xml_bytes)
+        parsed = _as_parsed(xml)
         analyses = _get_entries(parsed, "ANALYSIS_SET", "ANALYSIS")
 
         return [
@@ -694,7 +716,7 @@ def process_submission_xml(
     submission: str,
     blacklist: set[str],
     accession_info: dict[str, tuple[str, str, str | None, str | None, str | None, str]],
-    xml_cache: dict[SraXmlType, bytes | None],
+    xml_cache: Mapping[SraXmlType, bytes | ParsedXml | None],
     *,
     is_ddbj_origin: bool = False,
     fastq_dirs: set[str] | None = None,
@@ -708,7 +730,7 @@ def process_submission_xml(
         submission: submission accession
         blacklist: blacklist
         accession_info: {accession: (status, accessibility, received, updated, published, type)}
-        xml_cache: 事前に読み込んだ XML データのキャッシュ
+        xml_cache: 事前に読み込んだ XML データのキャッシュ (バイト列か parse 済みの dict)
         is_ddbj_origin: DDBJ-origin (DRA/DRR/DRX/DRZ/DRS/DRP) かどうか
         fastq_dirs: FASTQ ディレクトリが存在する experiment の集合
         sra_file_runs: .sra ファイルが存在する run の集合
@@ -720,17 +742,17 @@ def process_submission_xml(
     results: dict[SraXmlType, list[Any]] = {t: [] for t in XML_TYPES}
 
     for xml_type in XML_TYPES:
-        xml_bytes = xml_cache.get(xml_type)
-        if not xml_bytes:
+        xml = xml_cache.get(xml_type)
+        if not xml:
             continue
 
         parse_fn = _PARSE_FNS[xml_type]
 
         if xml_type == "submission":
-            parsed = parse_fn(xml_bytes, submission)
+            parsed = parse_fn(xml, submission)
             parsed_list = [parsed] if parsed and parsed.get("accession") else []
         else:
-            parsed_list = parse_fn(xml_bytes, submission)
+            parsed_list = parse_fn(xml, submission)
 
         for entry in parsed_list:
             acc = entry.get("accession")
@@ -769,42 +791,83 @@ def process_submission_xml(
 # === Batch processing ===
 
 
-def _read_batch_xml(
+def _iter_location_batches(
     tar_reader: TarXMLReader,
-    batch_subs: list[str],
-) -> dict[str, dict[SraXmlType, bytes | None]]:
+    submissions: list[str],
+    batch_size: int,
+) -> Iterator[BatchXmlLocations]:
     """
-    バッチ分の submission から全 XML を読み込む。
+    submission を tar の offset 順に並べ、batch_size 件ずつ全 XML のデータ位置を yield する。
 
     Args:
         tar_reader: TarXMLReader
-        batch_subs: バッチ内の submission accession リスト
+        submissions: 対象の submission accession リスト
+        batch_size: 1 batch の submission 数
+
+    Yields:
+        {submission: {xml_type: TarMemberLocation or None}}
+    """
+    located = tar_reader.iter_submission_locations(submissions)
+    while batch := dict(itertools.islice(located, batch_size)):
+        yield batch
+
+
+def _batch_output_names(prefix: str, batch_num: int) -> list[str]:
+    """batch が書く JSONL のファイル名 (xml_type ごとに 1 つ)。"""
+    return [f"{prefix}_{xml_type}_{batch_num:04d}.jsonl" for xml_type in XML_TYPES]
+
+
+def _read_batch_xml(
+    tar_path: Path,
+    xml_locations: BatchXmlLocations,
+) -> dict[str, dict[SraXmlType, bytes | None]]:
+    """
+    ``_iter_location_batches`` の位置から、バッチ分の XML を tar から直接読み込む (worker 側)。
 
     Returns:
         {submission: {xml_type: xml_bytes or None}}
     """
     xml_data: dict[str, dict[SraXmlType, bytes | None]] = {}
-    for sub in batch_subs:
-        xml_data[sub] = {}
-        for xml_type in XML_TYPES:
-            xml_data[sub][xml_type] = tar_reader.read_xml(sub, xml_type)
+    with tar_path.open("rb") as f:
+        fd = f.fileno()
+        for sub, locations in xml_locations.items():
+            xml_data[sub] = {
+                xml_type: None if location is None else read_member_at(fd, location)
+                for xml_type, location in locations.items()
+            }
     return xml_data
 
 
+def _parse_submission_xmls(
+    sub: str,
+    xml_data: dict[SraXmlType, bytes | None],
+) -> dict[SraXmlType, ParsedXml | None]:
+    """submission の各 XML を parse する。parse できなかったものは None にする。"""
+    parsed_data: dict[SraXmlType, ParsedXml | None] = {}
+    for xml_type, xml_bytes in xml_data.items():
+        parsed_data[xml_type] = None
+        if not xml_bytes:
+            continue
+        try:
+            parsed_data[xml_type] = parse_xml(xml_bytes)
+        except Exception as e:
+            log_warn(f"failed to parse {xml_type} xml: {e}", accession=sub)
+    return parsed_data
+
+
 def _extract_accessions_from_xml(
-    xml_bytes: bytes | None,
+    parsed: ParsedXml | None,
     xml_type: SraXmlType,
     sub: str,
 ) -> list[str]:
-    """XML から accession を抽出する。"""
-    if not xml_bytes:
+    """parse 済みの XML から accession を抽出する。"""
+    if not parsed:
         return []
 
     if xml_type == "submission":
         return []
 
     try:
-        parsed = parse_xml(xml_bytes)
         set_key = f"{xml_type.upper()}_SET"
         entry_key = xml_type.upper()
         accessions = []
@@ -828,7 +891,8 @@ def _process_batch_worker(
     batch_num: int,
     total_batches: int,
     batch_subs: list[str],
-    xml_data: dict[str, dict[SraXmlType, bytes | None]],
+    tar_path: Path,
+    xml_locations: BatchXmlLocations,
     blacklist: set[str],
     output_dir: Path,
     is_ddbj_origin: bool,
@@ -843,7 +907,8 @@ def _process_batch_worker(
         batch_num: バッチ番号
         total_batches: 総バッチ数
         batch_subs: バッチ内の submission リスト
-        xml_data: {submission: {xml_type: xml_bytes}}
+        tar_path: 読み込む tar ファイルのパス
+        xml_locations: {submission: {xml_type: tar 内のデータ位置}}
         blacklist: blacklist
         output_dir: 出力ディレクトリ
         is_ddbj_origin: DDBJ-origin (DRA/DRR/DRX/DRZ/DRS/DRP) かどうか
@@ -854,13 +919,18 @@ def _process_batch_worker(
     """
     prefix = "dra" if is_ddbj_origin else "ncbi"
 
-    # Step 1: accession 収集
+    # Step 0: tar から XML を読み込み、1 つにつき 1 回だけ parse する
+    xml_data = _read_batch_xml(tar_path, xml_locations)
+    parsed_data = {sub: _parse_submission_xmls(sub, xml_data[sub]) for sub in batch_subs}
+    del xml_data
+
+    # Step 1: accession 収集 (parse 済みの dict から)
     all_accessions: list[str] = []
     for sub in batch_subs:
         all_accessions.append(sub)
         for xml_type in XML_TYPES:
             accessions = _extract_accessions_from_xml(
-                xml_data[sub].get(xml_type),
+                parsed_data[sub].get(xml_type),
                 xml_type,
                 sub,
             )
@@ -886,7 +956,7 @@ def _process_batch_worker(
             analysis_dirs_map = query_analysis_dirs_bulk(config, batch_subs)
             all_runs: list[str] = []
             for sub in batch_subs:
-                all_runs.extend(_extract_accessions_from_xml(xml_data[sub].get("run"), "run", sub))
+                all_runs.extend(_extract_accessions_from_xml(parsed_data[sub].get("run"), "run", sub))
             if all_runs:
                 sra_file_runs = query_sra_files_bulk(config, all_runs)
 
@@ -900,7 +970,7 @@ def _process_batch_worker(
             submission=sub,
             blacklist=blacklist,
             accession_info=accession_info,
-            xml_cache=xml_data[sub],
+            xml_cache=parsed_data[sub],
             is_ddbj_origin=is_ddbj_origin,
             fastq_dirs=fastq_dirs_map.get(sub, set()),
             sra_file_runs=sra_file_runs,
@@ -915,17 +985,13 @@ def _process_batch_worker(
     # Step 4: dbXrefs 取得（バッチ全体で一括取得）
     if include_dbxrefs:
         for xml_type in XML_TYPES:
-            accessions = [e.identifier for e in batch_entries[xml_type]]
-            if accessions:
-                dbxref_map = get_dbxref_map(config, XREF_TYPE_MAP[xml_type], accessions)
-                for entry in batch_entries[xml_type]:
-                    if entry.identifier in dbxref_map:
-                        entry.dbXrefs = dbxref_map[entry.identifier]
+            entry_map = {e.identifier: e for e in batch_entries[xml_type]}
+            if entry_map:
+                attach_dbxrefs(config, XREF_TYPE_MAP[xml_type], entry_map)
 
     # Step 5: JSONL 出力（XML type ごとに分割ファイル）
-    for xml_type in XML_TYPES:
-        output_path = output_dir / f"{prefix}_{xml_type}_{batch_num:04d}.jsonl"
-        write_jsonl(output_path, batch_entries[xml_type])
+    for xml_type, output_name in zip(XML_TYPES, _batch_output_names(prefix, batch_num), strict=True):
+        write_jsonl(output_dir / output_name, batch_entries[xml_type])
         counts[xml_type] = len(batch_entries[xml_type])
 
     log_info(f"completed batch {batch_num}/{total_batches}")
@@ -944,13 +1010,17 @@ def process_source(
     since: str | None,
     parallel_num: int = DEFAULT_PARALLEL_NUM,
     include_dbxrefs: bool = False,
+    checkpoint: BatchCheckpoint | None = None,
 ) -> dict[str, int]:
     """
     DRA または NCBI SRA を処理する。
 
     Producer-Worker パターンで並列処理:
-    - Producer (メインスレッド): tar から XML を読み込み、buffer に蓄積
-    - Worker (worker プロセス): バッチ処理して JSONL 出力
+    - Producer (メインスレッド): tar の index から XML のデータ位置を引いて submit
+    - Worker (worker プロセス): tar から XML を読み、バッチ処理して JSONL 出力
+
+    checkpoint を渡すと、batch の完了・失敗を記録し、同じ submission で完了済みの
+    batch は処理せずに記録済みの件数を数える。
 
     Args:
         config: Config オブジェクト
@@ -961,11 +1031,13 @@ def process_source(
         since: 差分更新の基準日時
         parallel_num: Worker プロセス数
         include_dbxrefs: True の場合は dbXrefs を含める
+        checkpoint: batch の完了状況 (None なら記録しない)
 
     Returns:
         {xml_type: count}
     """
     is_ddbj_origin = source == "dra"
+    prefix = "dra" if is_ddbj_origin else "ncbi"
 
     log_info(f"processing {source.upper()}...")
 
@@ -987,51 +1059,33 @@ def process_source(
         log_info(f"no submissions to process for {source}")
         return dict.fromkeys(XML_TYPES, 0)
 
-    # tar を開く
+    # tar のインデックス (キャッシュがなければ作る)
     tar_reader = TarXMLReader(tar_path)
 
-    # submission を tar の offset 順にソート（シーケンシャル読み込み最適化）
-    log_info("sorting submissions by tar offset...")
-    offsets = tar_reader.get_submission_offsets(submissions)
-    sorted_submissions = sorted(submissions, key=lambda s: offsets.get(s, float("inf")))
-
     batch_size = DEFAULT_BATCH_SIZE
-    total_batches = (len(sorted_submissions) - 1) // batch_size + 1
+    total_batches = (len(submissions) - 1) // batch_size + 1
     log_info(f"batch_size={batch_size}, total_batches={total_batches}, parallel_num={parallel_num}")
 
-    # バッチイテレータ
-    def batch_iter() -> Iterator[tuple[int, list[str]]]:
-        for i in range(0, len(sorted_submissions), batch_size):
-            batch_num = i // batch_size + 1
-            batch_subs = sorted_submissions[i : i + batch_size]
-            yield batch_num, batch_subs
-
-    batches = batch_iter()
-    buffer: list[tuple[int, list[str], dict[str, dict[SraXmlType, bytes | None]]]] = []
-    batches_exhausted = False
+    # submission を tar の offset 順に並べて batch に切る（シーケンシャル読み込み最適化）
+    batches: Iterator[tuple[int, BatchXmlLocations]] = enumerate(
+        _iter_location_batches(tar_reader, submissions, batch_size), start=1
+    )
 
     # 合計カウント
     total_counts: dict[str, int] = dict.fromkeys(XML_TYPES, 0)
     completed_batches = 0
+    failed_batches = 0
+
+    if checkpoint is not None:
+        batches = _skip_completed_batches(batches, checkpoint, source, total_counts)
 
     with ProcessPoolExecutor(max_workers=parallel_num) as executor:
-        pending: set[Future[dict[str, int]]] = set()
+        pending: dict[Future[dict[str, int]], tuple[int, list[str]]] = {}
 
         while True:
-            # バッファが空いていれば先読み（tar reader は止まらない）
-            while not batches_exhausted and len(buffer) < parallel_num + 1:
-                try:
-                    batch_num, batch_subs = next(batches)
-                    xml_data = _read_batch_xml(tar_reader, batch_subs)
-                    buffer.append((batch_num, batch_subs, xml_data))
-                    log_info(f"read batch {batch_num}/{total_batches} into buffer ({len(batch_subs)} submissions)")
-                except StopIteration:
-                    batches_exhausted = True
-                    break
-
-            # worker が空いていて、バッファにデータがあれば submit
-            while len(pending) < parallel_num and buffer:
-                batch_num, batch_subs, xml_data = buffer.pop(0)
+            # worker が空いていれば submit (渡すのはデータ位置だけなので先読みは不要)
+            for batch_num, xml_locations in itertools.islice(batches, parallel_num - len(pending)):
+                batch_subs = list(xml_locations)
                 future = executor.submit(
                     _process_batch_worker,
                     config,
@@ -1039,31 +1093,44 @@ def process_source(
                     batch_num,
                     total_batches,
                     batch_subs,
-                    xml_data,
+                    tar_path,
+                    xml_locations,
                     blacklist,
                     output_dir,
                     is_ddbj_origin,
                     include_dbxrefs,
                 )
-                pending.add(future)
-                log_info(f"submitted batch {batch_num}/{total_batches}")
-                del xml_data  # pickle 化後に参照を解放
+                pending[future] = (batch_num, batch_subs)
+                log_info(f"submitted batch {batch_num}/{total_batches} ({len(batch_subs)} submissions)")
 
             # 終了条件
             if not pending:
                 break
 
             # 1つ完了するまで待機
-            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
             for f in done:
+                batch_num, batch_subs = pending.pop(f)
                 try:
                     counts = f.result()
-                    completed_batches += 1
-                    for xml_type, count in counts.items():
-                        total_counts[xml_type] += count
-                    log_info(f"completed batch ({completed_batches}/{total_batches})")
                 except Exception as e:
-                    log_warn(f"batch processing failed: {e}")
+                    failed_batches += 1
+                    log_error(
+                        f"batch {batch_num}/{total_batches} failed "
+                        f"({batch_subs[0]} .. {batch_subs[-1]}, {len(batch_subs)} submissions): {e}",
+                        error=e,
+                    )
+                    if checkpoint is not None:
+                        checkpoint.mark_failed(source, batch_num, batch_subs, repr(e))
+                    continue
+                completed_batches += 1
+                for xml_type, count in counts.items():
+                    total_counts[xml_type] += count
+                if checkpoint is not None:
+                    checkpoint.mark_completed(
+                        source, batch_num, batch_subs, _batch_output_names(prefix, batch_num), counts
+                    )
+                log_info(f"completed batch ({completed_batches}/{total_batches})")
 
             # 定期的にガベージコレクションを実行してメモリを解放
             if completed_batches % 10 == 0:
@@ -1073,18 +1140,41 @@ def process_source(
     tar_reader.close()
 
     # 結果をログ出力
+    if failed_batches > 0:
+        log_warn(f"{failed_batches} {source} batches failed")
     for xml_type in XML_TYPES:
         log_info(f"{source} {xml_type}: {total_counts[xml_type]} entries")
 
     return total_counts
 
 
+def _skip_completed_batches(
+    batches: Iterator[tuple[int, BatchXmlLocations]],
+    checkpoint: BatchCheckpoint,
+    source: SourceKind,
+    total_counts: dict[str, int],
+) -> Iterator[tuple[int, BatchXmlLocations]]:
+    """checkpoint で完了済みの batch を飛ばし、その件数を total_counts に足す。"""
+    skipped = 0
+    for batch_num, xml_locations in batches:
+        counts = checkpoint.completed_counts(source, batch_num, list(xml_locations))
+        if counts is None:
+            yield batch_num, xml_locations
+            continue
+        skipped += 1
+        for xml_type, count in counts.items():
+            total_counts[xml_type] += count
+    if skipped > 0:
+        log_info(f"skipped {skipped} completed {source} batches (resume mode)")
+
+
 def generate_sra_jsonl(
     config: Config,
     output_dir: Path,
     parallel_num: int = DEFAULT_PARALLEL_NUM,
     full: bool = False,
     include_dbxrefs: bool = False,
+    resume: bool = False,
 ) -> None:
     """
     SRA JSONL ファイルを生成する。
@@ -1093,39 +1183,58 @@ def generate_sra_jsonl(
     出力ファイル名: {prefix}_{xml_type}_{batch_num:04d}.jsonl
     例: dra_submission_0001.jsonl, ncbi_run_0042.jsonl
 
+    batch の完了状況は出力ディレクトリの checkpoint (``sra_checkpoint``) に記録する。
+    失敗した batch が残った場合は last_run.json を更新しない (``--resume`` で再実行するか、
+    失敗した submission の一覧を ``regenerate_jsonl`` に渡す)。
+
     Args:
         config: Config オブジェクト
         output_dir: 出力ディレクトリ ({result_dir}/sra/jsonl/{date}/)
         parallel_num: Worker プロセス数
         full: True の場合は全件処理、False の場合は差分更新
         include_dbxrefs: True の場合は dbXrefs を含める
+        resume: True の場合は checkpoint で完了済みの batch をスキップする
     """
     # blacklist を読み込む
     blacklist = load_sra_blacklist(config)
     log_info(f"loaded {len(blacklist)} blacklisted accessions")
 
-    # 差分更新の基準日時を取得
-    since: str | None = None
-    if not full:
-        last_run = read_last_run(config)
-        since = last_run.get("sra")
-        if since is not None:
-            log_info(f"incremental update mode: since={since}")
-        else:
-            log_info("full update mode: no previous run found")
+    checkpoint = BatchCheckpoint.load(output_dir, full, DEFAULT_BATCH_SIZE) if resume else None
+    if checkpoint is not None:
+        # 前回と同じ batch 分けになるよう、前回の since を使う
+        since = checkpoint.since
+        log_info(f"resume mode: using batch checkpoint {checkpoint.path} (since={since})")
     else:
-        log_info("full update mode: --full specified")
+        if resume:
+            log_info("resume mode: no usable batch checkpoint found, processing all batches")
+        # 差分更新の基準日時を取得
+        since = None
+        if not full:
+            last_run = read_last_run(config)
+            since = last_run.get("sra")
+            if since is not None:
+                log_info(f"incremental update mode: since={since}")
+            else:
+                log_info("full update mode: no previous run found")
+        else:
+            log_info("full update mode: --full specified")
+        checkpoint = BatchCheckpoint(output_dir, full, since, DEFAULT_BATCH_SIZE)
 
     # 出力ディレクトリを作成
     output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint.save()
 
     # DRA を処理
-    dra_counts = process_source(config, "dra", output_dir, blacklist, full, since, parallel_num, include_dbxrefs)
+    dra_counts = process_source(
+        config, "dra", output_dir, blacklist, full, since, parallel_num, include_dbxrefs, checkpoint
+    )
     total_dra = sum(dra_counts.values())
     log_info(f"dra total: {total_dra} entries")
 
     # NCBI SRA を処理
-    sra_counts = process_source(config, "sra", output_dir, blacklist, full, since, parallel_num, include_dbxrefs)
+    sra_counts = process_source(
+        config, "sra", output_dir, blacklist, full, since, parallel_num, include_dbxrefs, checkpoint
+    )
     total_sra = sum(sra_counts.values())
     log_info(f"ncbi sra total: {total_sra} entries")
 
@@ -1134,6 +1243,17 @@ def generate_sra_jsonl(
         total = dra_counts.get(xml_type, 0) + sra_counts.get(xml_type, 0)
         log_info(f"total {xml_type}: {total} entries")
 
+    # 失敗した batch が残っていれば、次回の差分更新でも拾えるよう last_run.json は進めない
+    failed = checkpoint.failed_batches()
+    if failed:
+        log_warn(
+            f"{len(failed)} batches failed; last_run.json for sra is not updated. "
+            f"re-run with --resume, or pass {checkpoint.failed_submissions_path} "
+            "to regenerate_jsonl --accession-file",
+            file=str(checkpoint.path),
+        )
+        return
+
     # last_run.json を更新
     write_last_run(config, "sra")
     log_info("updated last_run.json for sra")
@@ -1142,7 +1262,7 @@ def generate_sra_jsonl(
 # === CLI ===
 
 
-def parse_args(args: list[str]) -> tuple[Config, Path, int, bool, bool]:
+def parse_args(args: list[str]) -> tuple[Config, Path, int, bool, bool, bool]:
     """コマンドライン引数をパースする。"""
     parser = argparse.ArgumentParser(description="Generate SRA JSONL files from tar archives.")
     parser.add_argument(
@@ -1156,6 +1276,11 @@ def parse_args(args: list[str]) -> tuple[Config, Path, int, bool, bool]:
         help="Process all entries instead of incremental update.",
         action="store_true",
     )
+    parser.add_argument(
+        "--resume",
+        help="Skip batches recorded as completed in the batch checkpoint and retry only the rest.",
+        action="store_true",
+    )
     parser.add_argument(
         "--include-dbxrefs",
         help="Include dbXrefs in JSONL output.",
@@ -1169,21 +1294,22 @@ def parse_args(args: list[str]) -> tuple[Config, Path, int, bool, bool]:
     sra_base_dir = config.result_dir / SRA_BASE_DIR_NAME
     output_dir = sra_base_dir / JSONL_DIR_NAME / TODAY_STR
 
-    return config, output_dir, parsed.parallel_num, parsed.full, parsed.include_dbxrefs
+    return config, output_dir, parsed.parallel_num, parsed.full, parsed.resume, parsed.include_dbxrefs
 
 
 def main() -> None:
     """CLI エントリポイント。"""
-    config, output_dir, parallel_num, full, include_dbxrefs = parse_args(sys.argv[1:])
+    config, output_dir, parallel_num, full, resume, include_dbxrefs = parse_args(sys.argv[1:])
 
     with run_logger(run_name="generate_sra_jsonl", config=config):
         log_debug(f"config: {config.model_dump_json(indent=2)}")
         log_debug(f"output directory: {output_dir}")
         log_debug(f"consumer processes: {parallel_num}")
         log_debug(f"full update: {full}")
+        log_debug(f"resume: {resume}")
         log_debug(f"include dbxrefs: {include_dbxrefs}")
 
-        generate_sra_jsonl(config, output_dir, parallel_num, full, include_dbxrefs)
+        generate_sra_jsonl(config, output_dir, parallel_num, full, include_dbxrefs, resume)
 
 
 if __name__ == "__main__":
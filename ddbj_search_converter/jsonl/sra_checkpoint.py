@@ -0,0 +1,179 @@
+"""SRA JSONL 生成の batch checkpoint。
+
+``generate_sra_jsonl`` は NCBI SRA 分だけで数時間かかる。batch が終わるたびに結果を
+出力ディレクトリの manifest に記録しておき、``--resume`` で再実行したときは完了済みの
+batch を読み飛ばして、失敗した (または未到達の) batch だけを処理する。
+
+ファイルパス:
+    - manifest: {output_dir}/sra_batches.json
+    - 失敗した batch の submission 一覧: {output_dir}/sra_failed_submissions.txt
+      (1 行 1 submission。``regenerate_jsonl --type sra --accession-file`` にそのまま渡せる)
+
+batch は対象 submission を tar の offset 順に並べて batch_size 件ずつ切ったものなので、
+同じ対象 (同じ since) で再実行すれば同じ番号の batch に同じ submission が入る。resume 時は
+manifest に記録した since を使う。それでも tar や Accessions DB が更新されていれば中身が
+ずれるため、batch ごとに submission 列の hash を記録し、一致しない batch は処理し直す。
+
+manifest は一時ファイルに書いてから置き換える (途中で落ちても直前の状態が残る)。
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from ddbj_search_converter.logging.logger import log_warn
+
+CHECKPOINT_FILE_NAME = "sra_batches.json"
+FAILED_SUBMISSIONS_FILE_NAME = "sra_failed_submissions.txt"
+
+
+def get_checkpoint_path(output_dir: Path) -> Path:
+    return output_dir.joinpath(CHECKPOINT_FILE_NAME)
+
+
+def get_failed_submissions_path(output_dir: Path) -> Path:
+    return output_dir.joinpath(FAILED_SUBMISSIONS_FILE_NAME)
+
+
+def _submissions_hash(batch_subs: list[str]) -> str:
+    return hashlib.blake2b("\n".join(batch_subs).encode(), digest_size=16).hexdigest()
+
+
+def _batch_record(batch_subs: list[str]) -> dict[str, Any]:
+    return {
+        "first_submission": batch_subs[0] if batch_subs else None,
+        "last_submission": batch_subs[-1] if batch_subs else None,
+        "submission_count": len(batch_subs),
+        "submissions_hash": _submissions_hash(batch_subs),
+    }
+
+
+class BatchCheckpoint:
+    """generate_sra_jsonl 1 回分の、source ごとの batch の完了状況。
+
+    batch の記録:
+        - completed: submission の範囲と hash、出力ファイル名、xml_type ごとの件数
+        - failed: submission の範囲と hash、エラー、submission の一覧
+    """
+
+    def __init__(self, output_dir: Path, full: bool, since: str | None, batch_size: int) -> None:
+        self.output_dir = output_dir
+        self.full = full
+        self.since = since
+        self.batch_size = batch_size
+        # {source: {batch_num (str): record}}
+        self.batches: dict[str, dict[str, dict[str, Any]]] = {}
+
+    @property
+    def path(self) -> Path:
+        return get_checkpoint_path(self.output_dir)
+
+    @property
+    def failed_submissions_path(self) -> Path:
+        return get_failed_submissions_path(self.output_dir)
+
+    @classmethod
+    def load(cls, output_dir: Path, full: bool, batch_size: int) -> "BatchCheckpoint | None":
+        """前回の manifest を読む。ない、読めない、または実行条件が違う場合は None。"""
+        path = get_checkpoint_path(output_dir)
+        if not path.exists():
+            return None
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data["full"] != full or data["batch_size"] != batch_size:
+                log_warn(
+                    f"batch checkpoint was written with different options "
+                    f"(full={data['full']}, batch_size={data['batch_size']}), ignoring it",
+                    file=str(path),
+                )
+                return None
+            checkpoint = cls(output_dir, full, data["since"], batch_size)
+            checkpoint.batches = data["batches"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log_warn(f"failed to read batch checkpoint, ignoring it: {e}", file=str(path))
+            return None
+
+        return checkpoint
+
+    def completed_counts(self, source: str, batch_num: int, batch_subs: list[str]) -> dict[str, int] | None:
+        """batch が同じ submission で完了済みなら件数を返す。処理が必要なら None。
+
+        出力ファイルが消えている batch も処理し直す。
+        """
+        record = self.batches.get(source, {}).get(str(batch_num))
+        if record is None or record["status"] != "completed":
+            return None
+        if record["submissions_hash"] != _submissions_hash(batch_subs):
+            return None
+        if not all(self.output_dir.joinpath(name).exists() for name in record["files"]):
+            return None
+
+        return dict(record["counts"])
+
+    def mark_completed(
+        self,
+        source: str,
+        batch_num: int,
+        batch_subs: list[str],
+        files: list[str],
+        counts: dict[str, int],
+    ) -> None:
+        record = _batch_record(batch_subs)
+        record.update(status="completed", files=files, counts=counts)
+        self.batches.setdefault(source, {})[str(batch_num)] = record
+        self.save()
+
+    def mark_failed(self, source: str, batch_num: int, batch_subs: list[str], error: str) -> None:
+        record = _batch_record(batch_subs)
+        record.update(status="failed", error=error, submissions=batch_subs)
+        self.batches.setdefault(source, {})[str(batch_num)] = record
+        self.save()
+
+    def failed_batches(self) -> list[tuple[str, int]]:
+        """失敗したままの batch を (source, batch_num) で返す。"""
+        return [
+            (source, int(batch_num))
+            for source, records in self.batches.items()
+            for batch_num, record in records.items()
+            if record["status"] == "failed"
+        ]
+
+    def failed_submissions(self) -> list[str]:
+        return sorted(
+            {
+                sub
+                for records in self.batches.values()
+                for record in records.values()
+                if record["status"] == "failed"
+                for sub in record["submissions"]
+            }
+        )
+
+    def save(self) -> None:
+        """manifest と失敗した submission の一覧を書く。"""
+        data = {
+            "full": self.full,
+            "since": self.since,
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.path, json.dumps(data, indent=2) + "\n")
+
+        failed = self.failed_submissions()
+        if failed:
+            _write_atomic(self.failed_submissions_path, "".join(f"{sub}\n" for sub in failed))
+        else:
+            self.failed_submissions_path.unlink(missing_ok=True)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp_path.replace(path)
@@ -1,12 +1,15 @@
 """JSONL 生成用の共通ユーティリティ関数。"""
 
 import re
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Literal, TypeGuard
 
 from ddbj_search_converter.config import SEARCH_BASE_URL, Config
-from ddbj_search_converter.dblink.db import AccessionType, get_linked_entities_bulk
+from ddbj_search_converter.dblink.db import AccessionType, get_linked_entities_capped
 from ddbj_search_converter.id_patterns import ID_PATTERN_MAP
+from ddbj_search_converter.logging.logger import log_info
 from ddbj_search_converter.schema import Organization, PublicationDbType, Xref, XrefType
 
 SearchEntryExt = Literal["json", "jsonld", "xml"]
@@ -216,6 +219,45 @@ def _apply_attribute_list(node: Any, path: list[str]) -> None:
         node[head] = [value]
 
 
+@dataclass
+class EntryFilter:
+    """BioProject / BioSample の JSONL worker で出力しない accession を判定する。
+
+    parse 前 (要素のバイト列から sniff した accession) と parse 後 (identifier) の
+    両方に同じ判定を使う。DDBJ の差分更新では対象が全体のごく一部なので、
+    parse 前に落とせれば DOM 構築と Pydantic 変換の大半を省ける。
+    """
+
+    blacklist: set[str]
+    # DDBJ 差分更新の対象 accession。None の場合は絞り込まない
+    target_accessions: set[str] | None = None
+    # 前回の JSONL 生成から内容が変わっていない accession (NCBI 差分更新)
+    unchanged: set[str] = field(default_factory=set)
+    skipped_count: int = 0
+    filtered_count: int = 0
+    unchanged_count: int = 0
+
+    def __call__(self, accession: str) -> bool:
+        if accession in self.blacklist:
+            self.skipped_count += 1
+            return False
+        if self.target_accessions is not None and accession not in self.target_accessions:
+            self.filtered_count += 1
+            return False
+        if accession in self.unchanged:
+            self.unchanged_count += 1
+            return False
+        return True
+
+    def log_counts(self) -> None:
+        if self.skipped_count > 0:
+            log_info(f"skipped {self.skipped_count} blacklisted entries")
+        if self.filtered_count > 0:
+            log_info(f"filtered {self.filtered_count} entries (not in target_accessions)")
+        if self.unchanged_count > 0:
+            log_info(f"skipped {self.unchanged_count} entries unchanged since the last run")
+
+
 def write_jsonl(output_path: Path, docs: list[Any]) -> None:
     """Pydantic モデルインスタンスのリストを JSONL ファイルに書き込む。"""
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -246,29 +288,62 @@ def enrich_umbrella_relations(config: Config, docs: dict[str, Any]) -> None:
             docs[acc].childBioProjects = sorted(child_xrefs, key=lambda x: x.identifier)
 
 
+@dataclass
+class DbXrefs:
+    """1 エントリ分の dbXrefs。``counts`` は上限で切り詰める前の type ごとの件数。"""
+
+    xrefs: list[Xref]
+    counts: dict[XrefType, int]
+    # 上限を超えた type があったときだけ、その上限値
+    limit: int | None = None
+
+
 def get_dbxref_map(
     config: Config,
     entity_type: AccessionType,
     accessions: list[str],
-) -> dict[str, list[Xref]]:
-    """dblink DB から関連エントリを取得し、Xref リストに変換する。"""
+) -> dict[str, DbXrefs]:
+    """dblink DB から関連エントリを取得し、Xref リストに変換する。
+
+    関連が ``config.dbxref_max_per_type`` 件を超える type は、identifier の sort 順で
+    先頭から上限件だけを Xref にする (同じ DB からは毎回同じ部分集合になる)。
+    数百万件の関連を持つ hub エントリで Xref と JSON 文字列が worker のメモリを
+    占有しないようにするため、上限での切り詰めは lookup 側
+    (``get_linked_entities_capped``) で行う。全件は DBLink DB / TSV に残る。
+    """
     if not accessions:
         return {}
 
-    linked_map = get_linked_entities_bulk(config, entity_type=entity_type, accessions=accessions)
+    max_per_type = config.dbxref_max_per_type
+    linked_map = get_linked_entities_capped(
+        config, entity_type=entity_type, accessions=accessions, max_per_type=max_per_type
+    )
 
-    result: dict[str, list[Xref]] = {}
-    for accession, related_list in linked_map.items():
-        xrefs: list[Xref] = []
-        for related_type, related_id in related_list:
-            xref = to_xref(related_id, type_hint=related_type)
-            xrefs.append(xref)
+    result: dict[str, DbXrefs] = {}
+    for accession, (related_list, related_counts) in linked_map.items():
+        xrefs = [to_xref(related_id, type_hint=related_type) for related_type, related_id in related_list]
         xrefs.sort(key=lambda x: x.identifier)
-        result[accession] = xrefs
+
+        counts: dict[XrefType, int] = dict(sorted(related_counts.items()))
+        limit = max_per_type if 0 < max_per_type < max(counts.values()) else None
+        if limit is not None:
+            log_info(f"capped dbXrefs at {limit} per type: {counts}", accession=accession)
+        result[accession] = DbXrefs(xrefs=xrefs, counts=counts, limit=limit)
 
     return result
 
 
+def attach_dbxrefs(config: Config, entity_type: AccessionType, docs: Mapping[str, Any]) -> None:
+    """``get_dbxref_map`` の結果を各 doc の dbXrefs / dbXrefsCount / dbXrefsLimit に設定する。"""
+    dbxref_map = get_dbxref_map(config, entity_type, list(docs.keys()))
+    for accession, dbxrefs in dbxref_map.items():
+        if accession in docs:
+            doc = docs[accession]
+            doc.dbXrefs = dbxrefs.xrefs
+            doc.dbXrefsCount = dbxrefs.counts
+            doc.dbXrefsLimit = dbxrefs.limit
+
+
 def deduplicate_organizations(organizations: list[Organization]) -> list[Organization]:
     """Organization list を ``(name, role, organizationType)`` で重複排除する。
 
@@ -53,9 +53,6 @@ class DebugCategory(str, Enum):
     NORMALIZE_OWNER_NAME = "normalize_owner_name"
     NORMALIZE_MODEL = "normalize_model"
 
-    # Date fetch failures
-    FETCH_DATES_FAILED = "fetch_dates_failed"
-
     # XML accession collection failure (sra.py)
     XML_ACCESSION_COLLECT_FAILED = "xml_accession_collect_failed"
 
@@ -299,6 +299,21 @@ class BioProject(_Base):
             "Populated only when the JSONL was generated with `--include-dbxrefs`."
         ),
     )
+    dbXrefsCount: dict[XrefType, int] = Field(
+        default_factory=dict,
+        description=(
+            "Number of dblink edges per peer type, counted before `dbXrefs` is capped. "
+            "Key is always emitted, even when empty."
+        ),
+    )
+    dbXrefsLimit: int | None = Field(
+        default=None,
+        description=(
+            "Per-type cap applied to `dbXrefs`. Set only when some peer type exceeded it; "
+            "`dbXrefs` then holds the first N identifiers of that type in sort order and "
+            "the full adjacency stays in the DBLink DB / TSV. None when `dbXrefs` is complete."
+        ),
+    )
     parentBioProjects: list[Xref] = Field(
         description=("Parent BioProjects in the umbrella DAG. Key is always emitted, even when empty."),
     )
@@ -412,6 +427,21 @@ class BioSample(_Base):
             "Populated only when the JSONL was generated with `--include-dbxrefs`."
         ),
     )
+    dbXrefsCount: dict[XrefType, int] = Field(
+        default_factory=dict,
+        description=(
+            "Number of dblink edges per peer type, counted before `dbXrefs` is capped. "
+            "Key is always emitted, even when empty."
+        ),
+    )
+    dbXrefsLimit: int | None = Field(
+        default=None,
+        description=(
+            "Per-type cap applied to `dbXrefs`. Set only when some peer type exceeded it; "
+            "`dbXrefs` then holds the first N identifiers of that type in sort order and "
+            "the full adjacency stays in the DBLink DB / TSV. None when `dbXrefs` is complete."
+        ),
+    )
     sameAs: list[Xref] = Field(
         description="Alias accessions of this entry. Key is always emitted, even when empty.",
     )
@@ -531,6 +561,21 @@ class SRA(_Base):
             "Populated only when the JSONL was generated with `--include-dbxrefs`."
         ),
     )
+    dbXrefsCount: dict[XrefType, int] = Field(
+        default_factory=dict,
+        description=(
+            "Number of dblink edges per peer type, counted before `dbXrefs` is capped. "
+            "Key is always emitted, even when empty."
+        ),
+    )
+    dbXrefsLimit: int | None = Field(
+        default=None,
+        description=(
+            "Per-type cap applied to `dbXrefs`. Set only when some peer type exceeded it; "
+            "`dbXrefs` then holds the first N identifiers of that type in sort order and "
+            "the full adjacency stays in the DBLink DB / TSV. None when `dbXrefs` is complete."
+        ),
+    )
     sameAs: list[Xref] = Field(
         description="Alias accessions of this entry. Key is always emitted, even when empty.",
     )
@@ -609,6 +654,21 @@ class JGA(_Base):
             "Populated only when the JSONL was generated with `--include-dbxrefs`."
         ),
     )
+    dbXrefsCount: dict[XrefType, int] = Field(
+        default_factory=dict,
+        description=(
+            "Number of dblink edges per peer type, counted before `dbXrefs` is capped. "
+            "Key is always emitted, even when empty."
+        ),
+    )
+    dbXrefsLimit: int | None = Field(
+        default=None,
+        description=(
+            "Per-type cap applied to `dbXrefs`. Set only when some peer type exceeded it; "
+            "`dbXrefs` then holds the first N identifiers of that type in sort order and "
+            "the full adjacency stays in the DBLink DB / TSV. None when `dbXrefs` is complete."
+        ),
+    )
     sameAs: list[Xref] = Field(
         description=("Alias accessions (e.g. JGA Secondary IDs). Key is always emitted, even when empty."),
     )
@@ -681,6 +741,21 @@ class GEA(_Base):
             "Populated only when the JSONL was generated with `--include-dbxrefs`."
         ),
     )
+    dbXrefsCount: dict[XrefType, int] = Field(
+        default_factory=dict,
+        description=(
+            "Number of dblink edges per peer type, counted before `dbXrefs` is capped. "
+            "Key is always emitted, even when empty."
+        ),
+    )
+    dbXrefsLimit: int | None = Field(
+        default=None,
+        description=(
+            "Per-type cap applied to `dbXrefs`. Set only when some peer type exceeded it; "
+            "`dbXrefs` then holds the first N identifiers of that type in sort order and "
+            "the full adjacency stays in the DBLink DB / TSV. None when `dbXrefs` is complete."
+        ),
+    )
     sameAs: list[Xref] = Field(
         description="Alias accessions of this entry. Key is always emitted, even when empty.",
     )
@@ -753,6 +828,21 @@ class MetaboBank(_Base):
             "Populated only when the JSONL was generated with `--include-dbxrefs`."
         ),
     )
+    dbXrefsCount: dict[XrefType, int] = Field(
+        default_factory=dict,
+        description=(
+            "Number of dblink edges per peer type, counted before `dbXrefs` is capped. "
+            "Key is always emitted, even when empty."
+        ),
+    )
+    dbXrefsLimit: int | None = Field(
+        default=None,
+        description=(
+            "Per-type cap applied to `dbXrefs`. Set only when some peer type exceeded it; "
+            "`dbXrefs` then holds the first N identifiers of that type in sort order and "
+            "the full adjacency stays in the DBLink DB / TSV. None when `dbXrefs` is complete."
+        ),
+    )
     sameAs: list[Xref] = Field(
         description="Alias accessions of this entry. Key is always emitted, even when empty.",
     )
@@ -2,7 +2,7 @@
 SRA/DRA XML tar management module.
 
 Provides functionality for:
-- Reading XML files from tar archives (TarXMLReader)
+- Reading XML files from tar archives (TarXMLReader, with a persistent Parquet index)
 - Syncing NCBI SRA Metadata tar.gz (ncbi_tar_sync)
 - Building DRA Metadata tar (dra_tar_builder)
 """
@@ -3,8 +3,23 @@
 DRA ファイルシステムをスキャンして FASTQ ディレクトリと SRA ファイルの
 存在情報を DuckDB インデックスとして構築する。
 JSONL 生成時にファイルシステムを直接叩かず、このインデックスを参照する。
+
+Lustre ではメタデータ操作の待ち時間が支配的なので、走査は thread pool で並列に
+``os.scandir`` する (``DirEntry.is_dir()`` は readdir の d_type で判定でき、stat しない)。
+結果は TSV に書き切ってから ``read_csv`` で一括ロードする。
+
+差分モードでは、submission ディレクトリの mtime が前回のインデックスと同じなら
+中身を読み直さず、前回の DB から行を引き継ぐ。DRX / DRZ サブディレクトリの追加・削除は
+submission ディレクトリの mtime を動かすので、直下だけを見るこのインデックスには十分。
+ただし mtime の粒度は粗い (Lustre は 1 秒) ので、走査中や走査直前の変更は mtime が
+変わらないまま取りこぼしうる。git の racy-clean と同じく、前回の走査開始時刻から
+``RACY_MTIME_WINDOW_NS`` 以内の mtime を持つ submission は一致していても読み直す。
 """
 
+import os
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import duckdb
@@ -15,10 +30,20 @@ from ddbj_search_converter.config import (
     TMP_DRA_FILE_INDEX_DB_FILE_NAME,
     Config,
 )
+from ddbj_search_converter.duckdb_bulk import load_tsv_into_table, write_rows_to_tsv
 from ddbj_search_converter.logging.logger import log_info
 from ddbj_search_converter.sra.dra_tar import iter_all_dra_submissions
 from ddbj_search_converter.sra.paths import get_sra_tar_dir
 
+DEFAULT_SCAN_THREADS = 32
+
+# 前回の走査開始時刻からこの幅以内の mtime は信用しない (mtime の粒度 + 時計のずれの分)
+RACY_MTIME_WINDOW_NS = 2 * 10**9
+
+# submission ディレクトリの走査結果: (mtime_ns, experiments, analyses)。
+# experiments / analyses が None のときは mtime が前回と同じで、中身を読んでいない。
+_SubmissionScan = tuple[int, list[str] | None, list[str] | None]
+
 
 def get_dra_file_index_db_path(config: Config) -> Path:
     """DRA ファイルインデックス DB のパスを返す。"""
@@ -37,12 +62,120 @@ def dra_file_index_exists(config: Config) -> bool:
     return get_dra_file_index_db_path(config).exists()
 
 
-def build_dra_file_index(config: Config) -> None:
+def _load_previous_mtimes(db_path: Path) -> dict[str, int]:
+    """前回のインデックスから submission ディレクトリの mtime を読む。
+
+    DB が無い、または mtime / 走査開始時刻を記録していない古いスキーマの場合は空 dict を返す
+    (全 submission を走査し直す)。前回の走査開始時刻から ``RACY_MTIME_WINDOW_NS`` 以内の
+    mtime は結果から除き、読み直させる。
+    """
+    if not db_path.exists():
+        return {}
+
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        tables = {row[0] for row in conn.execute("SHOW TABLES").fetchall()}
+        if not {"dra_submission_dir", "dra_file_index_meta"} <= tables:
+            return {}
+        row = conn.execute("SELECT scan_started_ns FROM dra_file_index_meta").fetchone()
+        if row is None:
+            return {}
+        rows = conn.execute(
+            "SELECT submission, mtime_ns FROM dra_submission_dir WHERE mtime_ns < ?",
+            [row[0] - RACY_MTIME_WINDOW_NS],
+        ).fetchall()
+
+    return dict(rows)
+
+
+def _scan_submission_dir(sub_dir: Path, previous_mtime_ns: int | None) -> _SubmissionScan | None:
+    """submission ディレクトリ直下の DRX / DRZ サブディレクトリを集める。
+
+    ディレクトリが無ければ None。mtime が ``previous_mtime_ns`` と同じなら中身は読まない。
+    """
+    try:
+        mtime_ns = sub_dir.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if mtime_ns == previous_mtime_ns:
+        return mtime_ns, None, None
+
+    experiments: list[str] = []
+    analyses: list[str] = []
+    try:
+        with os.scandir(sub_dir) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                if entry.name.startswith("DRX"):
+                    experiments.append(entry.name)
+                elif entry.name.startswith("DRZ"):
+                    analyses.append(entry.name)
+    except FileNotFoundError:
+        return None
+
+    return mtime_ns, experiments, analyses
+
+
+def _find_sra_runs(top_dir: str) -> list[str]:
+    """``top_dir`` 以下を再帰的に走査し、``*.sra`` の stem (run accession) を返す。"""
+    runs: list[str] = []
+    stack = [top_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".sra"):
+                        runs.append(entry.name[: -len(".sra")])
+        except FileNotFoundError:
+            continue
+
+    return runs
+
+
+def _iter_sra_runs(sra_base: Path, executor: ThreadPoolExecutor) -> Iterator[str]:
+    """SRA ツリーの直下ディレクトリごとに ``_find_sra_runs`` を並列に走らせる。"""
+    top_dirs: list[str] = []
+    with os.scandir(sra_base) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                top_dirs.append(entry.path)
+            elif entry.name.endswith(".sra"):
+                yield entry.name[: -len(".sra")]
+
+    for runs in executor.map(_find_sra_runs, top_dirs):
+        yield from runs
+
+
+def _bulk_load(
+    conn: duckdb.DuckDBPyConnection,
+    tmp_dir: Path,
+    table_name: str,
+    columns: list[str],
+    rows: Sequence[Sequence[str]],
+) -> None:
+    tsv_path = tmp_dir.joinpath(f"dra_file_index.{table_name}.tsv")
+    written = write_rows_to_tsv(tsv_path, rows)
+    load_tsv_into_table(conn, table_name, columns, tsv_path, written)
+    tsv_path.unlink()
+
+
+def build_dra_file_index(
+    config: Config,
+    *,
+    incremental: bool = False,
+    threads: int = DEFAULT_SCAN_THREADS,
+) -> None:
     """FS をスキャンして DRA ファイルインデックス DuckDB を構築する。
 
     FASTQ (experiment): 各 submission ディレクトリ内の DRX サブディレクトリ
     FASTQ (analysis): 各 submission ディレクトリ内の DRZ サブディレクトリ
     SRA: DRA_BASE_PATH/sra/ByExp/sra/DRX/ ツリーの .sra ファイルから run を抽出
+
+    ``incremental=True`` のときは、mtime が前回のインデックスと同じ submission
+    ディレクトリを読まずに前回の行を引き継ぐ (前回の走査開始時刻に近い mtime は除く)。
+    SRA ツリーは毎回全体を走査する。
     """
     tmp_path = _tmp_db_path(config)
     final_path = get_dra_file_index_db_path(config)
@@ -51,69 +184,97 @@ def build_dra_file_index(config: Config) -> None:
     # 既存の tmp を削除
     tmp_path.unlink(missing_ok=True)
 
+    previous_mtimes = _load_previous_mtimes(final_path) if incremental else {}
+    if incremental and not previous_mtimes:
+        log_info("no previous dra file index with submission mtimes, scanning all submissions")
+
     log_info("building dra file index...")
 
-    with duckdb.connect(str(tmp_path)) as conn:
-        conn.execute("CREATE TABLE dra_fastq_dir (submission TEXT NOT NULL, experiment TEXT NOT NULL)")
-        conn.execute("CREATE TABLE dra_fastq_analysis_dir (submission TEXT NOT NULL, analysis TEXT NOT NULL)")
-        conn.execute("CREATE TABLE dra_sra_file (run TEXT NOT NULL)")
+    submission_dir_rows: list[tuple[str, str]] = []
+    carried: list[tuple[str]] = []
+    fastq_rows: list[tuple[str, str]] = []
+    analysis_rows: list[tuple[str, str]] = []
+    sra_rows: list[tuple[str]] = []
+
+    # stat より前に取る。これ以降に変更された submission は次回の差分で racy 扱いになる
+    scan_started_ns = time.time_ns()
 
+    with ThreadPoolExecutor(max_workers=threads) as executor:
         # FASTQ ディレクトリをスキャン
-        fastq_count = 0
-        analysis_count = 0
+        submissions = list(iter_all_dra_submissions(config))
+        scans = executor.map(
+            lambda sub: _scan_submission_dir(
+                DRA_BASE_PATH.joinpath("fastq", sub[:6], sub),
+                previous_mtimes.get(sub),
+            ),
+            submissions,
+        )
         sub_count = 0
-        for submission in iter_all_dra_submissions(config):
-            sub_dir = DRA_BASE_PATH.joinpath("fastq", submission[:6], submission)
-            try:
-                entries = list(sub_dir.iterdir())
-            except FileNotFoundError:
+        for submission, scan in zip(submissions, scans, strict=True):
+            if scan is None:
                 continue
-
-            experiments: list[str] = []
-            analyses: list[str] = []
-            for e in entries:
-                if not e.is_dir():
-                    continue
-                if e.name.startswith("DRX"):
-                    experiments.append(e.name)
-                elif e.name.startswith("DRZ"):
-                    analyses.append(e.name)
-
-            if experiments:
-                conn.executemany(
-                    "INSERT INTO dra_fastq_dir VALUES (?, ?)",
-                    [(submission, exp) for exp in experiments],
-                )
-                fastq_count += len(experiments)
-
-            if analyses:
-                conn.executemany(
-                    "INSERT INTO dra_fastq_analysis_dir VALUES (?, ?)",
-                    [(submission, ana) for ana in analyses],
-                )
-                analysis_count += len(analyses)
+            mtime_ns, experiments, analyses = scan
+            submission_dir_rows.append((submission, str(mtime_ns)))
+            if experiments is None or analyses is None:
+                carried.append((submission,))
+            else:
+                fastq_rows.extend((submission, exp) for exp in experiments)
+                analysis_rows.extend((submission, ana) for ana in analyses)
 
             sub_count += 1
             if sub_count % 10000 == 0:
-                log_info(f"scanned {sub_count} submissions ({fastq_count} fastq dirs, {analysis_count} analysis dirs)")
+                log_info(
+                    f"scanned {sub_count} submissions ({len(carried)} unchanged, "
+                    f"{len(fastq_rows)} fastq dirs, {len(analysis_rows)} analysis dirs)"
+                )
 
         log_info(
-            f"fastq scan complete: {sub_count} submissions, "
-            f"{fastq_count} experiment dirs, {analysis_count} analysis dirs"
+            f"fastq scan complete: {sub_count} submissions ({len(carried)} unchanged), "
+            f"{len(fastq_rows)} experiment dirs, {len(analysis_rows)} analysis dirs rescanned"
         )
 
         # SRA ファイルをスキャン
         sra_base = DRA_BASE_PATH.joinpath("sra", "ByExp", "sra", "DRX")
-        sra_count = 0
         if sra_base.exists():
-            for sra_file in sra_base.rglob("*.sra"):
-                run_accession = sra_file.stem
-                conn.execute("INSERT INTO dra_sra_file VALUES (?)", [run_accession])
-                sra_count += 1
-                if sra_count % 10000 == 0:
-                    log_info(f"scanned {sra_count} sra files")
+            for run_accession in _iter_sra_runs(sra_base, executor):
+                sra_rows.append((run_accession,))
+                if len(sra_rows) % 10000 == 0:
+                    log_info(f"scanned {len(sra_rows)} sra files")
+
+        log_info(f"sra scan complete: {len(sra_rows)} sra files")
+
+    with duckdb.connect(str(tmp_path)) as conn:
+        conn.execute("CREATE TABLE dra_submission_dir (submission TEXT NOT NULL, mtime_ns BIGINT NOT NULL)")
+        conn.execute("CREATE TABLE dra_fastq_dir (submission TEXT NOT NULL, experiment TEXT NOT NULL)")
+        conn.execute("CREATE TABLE dra_fastq_analysis_dir (submission TEXT NOT NULL, analysis TEXT NOT NULL)")
+        conn.execute("CREATE TABLE dra_sra_file (run TEXT NOT NULL)")
+        conn.execute("CREATE TABLE dra_file_index_meta (scan_started_ns BIGINT NOT NULL)")
+        conn.execute("INSERT INTO dra_file_index_meta VALUES (?)", [scan_started_ns])
+
+        tmp_dir = tmp_path.parent
+        _bulk_load(conn, tmp_dir, "dra_submission_dir", ["submission", "mtime_ns"], submission_dir_rows)
+        _bulk_load(conn, tmp_dir, "dra_fastq_dir", ["submission", "experiment"], fastq_rows)
+        _bulk_load(conn, tmp_dir, "dra_fastq_analysis_dir", ["submission", "analysis"], analysis_rows)
+        _bulk_load(conn, tmp_dir, "dra_sra_file", ["run"], sra_rows)
+
+        # mtime が変わっていない submission は前回の DB から引き継ぐ
+        if carried:
+            conn.execute("CREATE TEMP TABLE carried_submission (submission TEXT NOT NULL)")
+            _bulk_load(conn, tmp_dir, "carried_submission", ["submission"], carried)
+            escaped_final_path = str(final_path).replace("'", "''")
+            conn.execute(f"ATTACH '{escaped_final_path}' AS previous (READ_ONLY)")
+            for table, column in (("dra_fastq_dir", "experiment"), ("dra_fastq_analysis_dir", "analysis")):
+                conn.execute(
+                    f"""
+                    INSERT INTO {table}
+                    SELECT submission, {column} FROM previous.{table}
+                    WHERE submission IN (SELECT submission FROM carried_submission)
+                    """
+                )
+            conn.execute("DETACH previous")
 
-        log_info(f"sra scan complete: {sra_count} sra files")
+        fastq_count = conn.execute("SELECT count(*) FROM dra_fastq_dir").fetchone()[0]  # type: ignore[index]
+        analysis_count = conn.execute("SELECT count(*) FROM dra_fastq_analysis_dir").fetchone()[0]  # type: ignore[index]
 
         # インデックス作成
         conn.execute("CREATE INDEX idx_dra_fastq_sub ON dra_fastq_dir(submission)")
@@ -125,7 +286,9 @@ def build_dra_file_index(config: Config) -> None:
         final_path.unlink()
     tmp_path.replace(final_path)
 
-    log_info(f"dra file index built: {fastq_count} fastq dirs, {analysis_count} analysis dirs, {sra_count} sra files")
+    log_info(
+        f"dra file index built: {fastq_count} fastq dirs, {analysis_count} analysis dirs, {len(sra_rows)} sra files"
+    )
 
 
 def query_fastq_dirs_bulk(config: Config, submissions: list[str]) -> dict[str, set[str]]:
@@ -312,10 +312,10 @@ def sync_dra_tar(config: Config) -> None:
     last_updated_path.write_text(TODAY.strftime("%Y%m%d"))
     log_info(f"updated dra_last_updated: {TODAY.strftime('%Y%m%d')}")
 
-    # Build DRA file index
+    # Update DRA file index (submission dirs unchanged since the last index are carried forward)
     from ddbj_search_converter.sra.dra_file_index import build_dra_file_index
 
-    build_dra_file_index(config)
+    build_dra_file_index(config, incremental=True)
 
 
 def repair_dra_tar(config: Config) -> None:
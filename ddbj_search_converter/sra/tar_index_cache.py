@@ -1,70 +1,230 @@
 """tar インデックスのファイルキャッシュ。
 
-並列 tar 読み込みで、各 worker がインデックスを再構築するのを避けるため、
-インデックスを pickle でキャッシュする。
+NCBI SRA Metadata tar は数百万 member あり、``tarfile.getmembers()`` で毎回走査すると
+時間がかかるうえ、``dict[str, TarInfo]`` は数 GB のメモリを使う。走査結果を Parquet に
+保存し、次回以降は DuckDB から必要な分だけを引く (Python 側にはインデックスを載せない)。
+
+ファイルパス: {tar_path}.index.parquet (例: NCBI_SRA_Metadata.tar.index.parquet)
+
+列:
+    - name: member 名 (同名の member は tar 内で後にあるものだけを残す)
+    - submission / xml_type: ``{submission}/{submission}.{xml_type}.xml`` 形式の member のみ値が入る
+    - offset: member header の開始位置
+    - offset_data: データの開始位置
+    - size: データのバイト長
+
+name 順に並べて書くため、name で 1 件引くときは row group の min/max 統計で読み飛ばせる。
+
+差分更新:
+    ``sync_ncbi_tar`` / ``sync_dra_tar`` は ``tar -A`` で既存 tar の末尾 (end-of-archive の
+    位置) に member を追記するだけなので、走査済みの範囲は変わらない。Parquet の
+    key-value metadata に走査済みの終端 (``covered_offset``) を記録し、次回はそこから先だけを
+    走査して既存のインデックスにマージする (同名は後の member が勝つ)。
+    tar が作り直された (Full の取り直しなど) ことは、走査済みの最後の member header の
+    hash (``anchor_hash``) が一致しないことで検出し、全体を走査し直す。
 """
 
-import pickle
+import hashlib
+import os
 import tarfile
+import tempfile
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Any, cast
+from typing import NamedTuple
 
-from ddbj_search_converter.logging.logger import log_info
+import duckdb
+
+from ddbj_search_converter.logging.logger import log_info, log_warn
+
+# 走査中に TarFile.members を捨てる間隔 (TarFile は読んだ member を全て保持するため)
+_MEMBER_FLUSH_INTERVAL = 100_000
+
+
+class IndexCacheMeta(NamedTuple):
+    # 走査済みの範囲の終端 (次に追記される member の header 位置)
+    covered_offset: int
+    # 走査済みの最後の member header の位置と、その 512 byte の hash
+    anchor_offset: int
+    anchor_hash: str
 
 
 def get_index_cache_path(tar_path: Path) -> Path:
     """インデックスキャッシュファイルのパスを返す。"""
-    return tar_path.with_suffix(".tar.index.pkl")
+    return tar_path.with_name(f"{tar_path.name}.index.parquet")
 
 
-def save_index_cache(tar_path: Path, members: dict[str, tarfile.TarInfo]) -> None:
-    """インデックスをキャッシュファイルに保存する。"""
+def read_index_cache_meta(tar_path: Path) -> IndexCacheMeta | None:
+    """キャッシュの走査済み範囲を読む。キャッシュがない、または読めない場合は None。"""
     cache_path = get_index_cache_path(tar_path)
-    log_info(f"saving tar index cache: {cache_path}")
+    if not cache_path.exists():
+        return None
+    try:
+        with duckdb.connect() as conn:
+            rows = conn.execute("SELECT key, value FROM parquet_kv_metadata(?)", (str(cache_path),)).fetchall()
+        kv = {bytes(key).decode(): bytes(value).decode() for key, value in rows}
+        return IndexCacheMeta(int(kv["covered_offset"]), int(kv["anchor_offset"]), kv["anchor_hash"])
+    except (duckdb.Error, KeyError, ValueError) as e:
+        log_warn(f"failed to read tar index cache metadata, will rebuild: {e}", file=str(cache_path))
+        return None
+
+
+def _header_hash(tar_path: Path, offset: int) -> str:
+    with tar_path.open("rb") as f:
+        return hashlib.blake2b(os.pread(f.fileno(), tarfile.BLOCKSIZE, offset), digest_size=16).hexdigest()
 
-    # TarInfo から必要な属性のみ抽出（軽量化）
-    index_data = {
-        name: {
-            "name": info.name,
-            "offset": info.offset,
-            "offset_data": info.offset_data,
-            "size": info.size,
-        }
-        for name, info in members.items()
-    }
 
-    with cache_path.open("wb") as f:
-        pickle.dump(index_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+def is_cache_valid(tar_path: Path) -> bool:
+    """キャッシュの走査済み範囲が、今の tar の先頭部分と一致するかを判定する。
 
-    log_info(f"tar index cache saved: {len(members)} entries")
+    True でも tar に追記があれば、``ensure_index_cache`` が末尾だけを走査して取り込む。
+    """
+    meta = read_index_cache_meta(tar_path)
+    if meta is None or tar_path.stat().st_size < meta.covered_offset:
+        return False
+    return _header_hash(tar_path, meta.anchor_offset) == meta.anchor_hash
 
 
-def load_index_cache(tar_path: Path) -> dict[str, dict[str, Any]] | None:
-    """キャッシュからインデックスを読み込む。
+def iter_tar_members(tar_path: Path, start: int = 0) -> Iterator[tarfile.TarInfo]:
+    """tar の ``start`` 以降の member を順に yield する (offset は tar 先頭からの位置)。
 
-    キャッシュが存在しない、または tar より古い場合は None を返す。
+    ``getmembers()`` と違い、読み終えた TarInfo を保持し続けない。
     """
+    with tar_path.open("rb") as f:
+        f.seek(start)
+        if not f.read(tarfile.BLOCKSIZE).strip(b"\0"):
+            # 追記がない (end-of-archive か終端)
+            return
+        f.seek(start)
+        with tarfile.open(fileobj=f, mode="r:") as tar:
+            count = 0
+            while (member := tar.next()) is not None:
+                yield member
+                count += 1
+                if count % _MEMBER_FLUSH_INTERVAL == 0:
+                    tar.members = []  # type: ignore[attr-defined]
+
+
+def _write_index(
+    tar_path: Path,
+    tsv_path: Path,
+    base_path: Path | None,
+    meta: IndexCacheMeta,
+) -> int:
+    """走査結果の TSV (と既存のインデックス) からインデックスキャッシュを書き、件数を返す。"""
     cache_path = get_index_cache_path(tar_path)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    base_sql = "SELECT * FROM read_parquet(?) UNION ALL BY NAME" if base_path is not None else ""
+    params = [str(base_path)] if base_path is not None else []
+
+    with duckdb.connect() as conn:
+        conn.execute(
+            f"""
+            COPY (
+                SELECT name, submission, xml_type, "offset", offset_data, size
+                FROM (
+                    {base_sql}
+                    SELECT
+                        name,
+                        CASE WHEN parts.dir <> '' AND parts.dir = parts.stem THEN parts.dir END AS submission,
+                        CASE WHEN parts.dir <> '' AND parts.dir = parts.stem THEN parts.xml_type END AS xml_type,
+                        "offset",
+                        offset_data,
+                        size
+                    FROM (
+                        SELECT
+                            *,
+                            regexp_extract(
+                                name, '^([^/]+)/([^/]+)\\.([a-z]+)\\.xml$', ['dir', 'stem', 'xml_type']
+                            ) AS parts
+                        FROM read_csv(
+                            ?,
+                            auto_detect=false,
+                            header=false,
+                            delim=chr(9),
+                            quote='',
+                            escape='',
+                            columns={{
+                                'name': 'VARCHAR',
+                                'offset': 'BIGINT',
+                                'offset_data': 'BIGINT',
+                                'size': 'BIGINT'
+                            }}
+                        )
+                    )
+                )
+                QUALIFY row_number() OVER (PARTITION BY name ORDER BY "offset" DESC) = 1
+                ORDER BY name
+            ) TO '{str(tmp_path).replace("'", "''")}' (
+                FORMAT parquet,
+                KV_METADATA {{
+                    covered_offset: '{meta.covered_offset}',
+                    anchor_offset: '{meta.anchor_offset}',
+                    anchor_hash: '{meta.anchor_hash}'
+                }}
+            )
+            """,
+            (*params, str(tsv_path)),
+        )
+        row = conn.execute("SELECT count(*) FROM read_parquet(?)", (str(tmp_path),)).fetchone()
+    tmp_path.replace(cache_path)
+
+    return int(row[0]) if row else 0
+
+
+def _scan_and_write(tar_path: Path, base: IndexCacheMeta | None) -> int:
+    """tar を ``base`` の走査済み範囲の先から走査してインデックスに取り込み、新しい member 数を返す。
+
+    base が None なら先頭から走査して作り直す。新しい member がなければキャッシュは書き換えない。
+    """
+    start = base.covered_offset if base is not None else 0
+    cache_path = get_index_cache_path(tar_path)
+    with tempfile.TemporaryDirectory(dir=cache_path.parent) as tmp_dir:
+        tsv_path = Path(tmp_dir).joinpath("members.tsv")
+        scanned = 0
+        covered_offset = start
+        anchor_offset = -1
+        with tsv_path.open("w", encoding="utf-8") as f:
+            for member in iter_tar_members(tar_path, start):
+                f.write(f"{member.name}\t{member.offset}\t{member.offset_data}\t{member.size}\n")
+                scanned += 1
+                anchor_offset = member.offset
+                # データは 512 byte 境界まで埋められ、次の header はその直後
+                covered_offset = member.offset_data + -(-member.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
 
-    if not cache_path.exists():
-        return None
+        if scanned == 0:
+            return 0
 
-    # キャッシュが tar より古い場合は無効
-    if cache_path.stat().st_mtime < tar_path.stat().st_mtime:
-        log_info("tar index cache is stale, will rebuild")
-        return None
+        meta = IndexCacheMeta(covered_offset, anchor_offset, _header_hash(tar_path, anchor_offset))
+        total = _write_index(tar_path, tsv_path, cache_path if base is not None else None, meta)
 
-    log_info(f"loading tar index cache: {cache_path}")
-    with cache_path.open("rb") as f:
-        index_data = cast("dict[str, dict[str, Any]]", pickle.load(f))
-    log_info(f"tar index cache loaded: {len(index_data)} entries")
+    log_info(f"tar index cache saved: {cache_path} ({scanned} members scanned, {total} entries)")
+    return scanned
 
-    return index_data
 
+def build_index_cache(tar_path: Path) -> Path:
+    """tar 全体を走査してインデックスキャッシュを書く。"""
+    log_info(f"building tar index (this may take a few minutes): {tar_path}")
+    _scan_and_write(tar_path, None)
+    return get_index_cache_path(tar_path)
 
-def is_cache_valid(tar_path: Path) -> bool:
-    """キャッシュが有効かどうかを判定する。"""
+
+def ensure_index_cache(tar_path: Path) -> Path:
+    """最新のインデックスキャッシュのパスを返す。
+
+    キャッシュがなければ作り、tar に追記があれば末尾だけを走査して取り込む。
+    tar が作り直されていれば全体を走査し直す。
+    """
     cache_path = get_index_cache_path(tar_path)
-    if not cache_path.exists():
-        return False
-    return cache_path.stat().st_mtime >= tar_path.stat().st_mtime
+    if not is_cache_valid(tar_path):
+        if cache_path.exists():
+            log_info("tar index cache does not match the tar, will rebuild")
+        return build_index_cache(tar_path)
+
+    meta = read_index_cache_meta(tar_path)
+    assert meta is not None
+    log_info(f"using tar index cache: {cache_path} (covered up to {meta.covered_offset} bytes)")
+    appended = _scan_and_write(tar_path, meta)
+    if appended > 0:
+        log_info(f"merged {appended} appended members into tar index cache")
+
+    return cache_path
@@ -1,138 +1,146 @@
 """\
-TarXMLReader: Read XML files from tar archives with in-memory index.
+TarXMLReader: Read XML files from tar archives with a persistent index.
 
-The index is built by iterating through all tar members on first access.
-For duplicate entries (same filename), the last occurrence wins.
+The index is built by iterating through all tar members on first access and is
+saved next to the tar (see ``tar_index_cache``); later runs reuse it until the
+tar is modified. For duplicate entries (same filename), the last occurrence wins.
 This supports append-based daily updates where newer entries are appended.
+
+The tar is uncompressed, so a member's data is read directly with
+``os.pread`` from its ``offset_data`` (see ``TarMemberLocation``).
 """
 
-import tarfile
+import itertools
+import os
 import types
+from collections.abc import Iterator, Sequence
 from pathlib import Path
-from typing import Any, Literal
+from typing import IO, Any, Literal, NamedTuple
+
+import duckdb
 
 from ddbj_search_converter.config import DRA_TAR_FILE_NAME, NCBI_SRA_TAR_FILE_NAME, Config
-from ddbj_search_converter.logging.logger import log_info
 from ddbj_search_converter.sra.paths import get_sra_tar_dir
+from ddbj_search_converter.sra.tar_index_cache import ensure_index_cache
 
 # SRA XML types
 SraXmlType = Literal["submission", "study", "experiment", "run", "sample", "analysis"]
 SRA_XML_TYPES: list[SraXmlType] = ["submission", "study", "experiment", "run", "sample", "analysis"]
 
+# iter_submission_locations で DuckDB から一度に取り出す行数
+_FETCH_SIZE = 100_000
+
+
+class TarMemberLocation(NamedTuple):
+    """tar 内の member のデータ位置。worker に渡して ``read_member_at`` で直接読む。"""
+
+    name: str
+    offset_data: int
+    size: int
+
 
 class TarXMLReader:
-    """Read XML files from a tar archive using an in-memory index."""
+    """Read XML files from a tar archive using a persistent index."""
 
-    def __init__(self, tar_path: Path, index_data: dict[str, dict[str, Any]] | None = None):
+    def __init__(self, tar_path: Path):
         """
         Args:
             tar_path: tar ファイルのパス
-            index_data: 事前にロードしたインデックスデータ（キャッシュから）
         """
         self.tar_path = tar_path
-        self._tar: tarfile.TarFile | None = None
-        self._members: dict[str, tarfile.TarInfo] | None = None
-        self._index_data = index_data
-
-    def _ensure_open(self) -> None:
-        if self._tar is None:
-            log_info(f"opening tar: {self.tar_path}")
-            self._tar = tarfile.open(self.tar_path, "r")
-
-    def _build_index(self) -> None:
-        """Build the in-memory index. Later entries overwrite earlier ones."""
-        if self._members is not None:
-            return
-
-        # キャッシュデータがあればそれを使用
-        if self._index_data is not None:
-            log_info("using cached tar index")
-            self._members = {}
-            for name, data in self._index_data.items():
-                info = tarfile.TarInfo()
-                info.name = data["name"]
-                info.offset = data["offset"]
-                info.offset_data = data["offset_data"]
-                info.size = data["size"]
-                self._members[name] = info
-            log_info(f"tar index restored from cache: {len(self._members)} entries")
-            return
-
-        # キャッシュがなければ tar をスキャン
-        self._ensure_open()
-        assert self._tar is not None
-
-        log_info("building tar index (this may take a few minutes)...")
-        # Later entries overwrite earlier ones (append-based update support)
-        self._members = {}
-        for member in self._tar.getmembers():
-            self._members[member.name] = member
-
-        log_info(f"tar index built: {len(self._members)} entries")
-
-    def get_index_for_cache(self) -> dict[str, tarfile.TarInfo]:
-        """キャッシュ保存用のインデックスを取得する。"""
-        self._build_index()
-        assert self._members is not None
-        return self._members
-
-    def get_submission_offsets(self, submissions: list[str]) -> dict[str, int]:
-        """指定された submission の最小 offset を取得する。
-
-        各 submission の XML ファイル群のうち最小の offset を返す。
-        tar 内の物理的な位置順でソートするために使用。
-        """
-        self._build_index()
-        assert self._members is not None
-
-        result: dict[str, int] = {}
-        for sub in submissions:
-            min_offset = float("inf")
-            for xml_type in SRA_XML_TYPES:
-                key = f"{sub}/{sub}.{xml_type}.xml"
-                member = self._members.get(key)
-                if member is not None and member.offset < min_offset:
-                    min_offset = member.offset
-            if min_offset < float("inf"):
-                result[sub] = int(min_offset)
-        return result
+        self._index_path: Path | None = None
+        self._file: IO[bytes] | None = None
 
     @property
-    def members(self) -> dict[str, tarfile.TarInfo]:
-        """Get the member index, building it if necessary."""
-        self._build_index()
-        assert self._members is not None
-        return self._members
+    def index_path(self) -> Path:
+        """インデックスキャッシュのパス。初回アクセス時に必要なら tar を走査して作る。"""
+        if self._index_path is None:
+            self._index_path = ensure_index_cache(self.tar_path)
+        return self._index_path
+
+    def _query(self, sql: str, params: Sequence[Any]) -> list[tuple[Any, ...]]:
+        with duckdb.connect() as conn:
+            return conn.execute(sql, (str(self.index_path), *params)).fetchall()
+
+    def iter_submission_locations(
+        self, submissions: list[str]
+    ) -> Iterator[tuple[str, dict[SraXmlType, TarMemberLocation | None]]]:
+        """submission ごとに全 XML のデータ位置を、tar 内の物理的な位置順で yield する。
+
+        1 件ずつ ``locate_xml`` する代わりに、1 回のクエリでまとめて引く。submission は
+        改行区切りの 1 つの文字列で渡して SQL 側で分割する (数百万件を list のまま渡すと
+        要素ごとの変換が遅い)。tar にない submission は最後に元の順で yield する
+        (データ位置は全て None)。
+        """
+        if not submissions:
+            return
+        with duckdb.connect() as conn:
+            conn.execute(
+                """
+                WITH targets AS (
+                    SELECT UNNEST(l) AS submission, UNNEST(range(len(l))) AS ord
+                    FROM (SELECT string_split(?, chr(10)) AS l)
+                ),
+                located AS (
+                    SELECT
+                        t.submission,
+                        t.ord,
+                        i.xml_type,
+                        i.name,
+                        i.offset_data,
+                        i.size,
+                        min(i."offset") OVER (PARTITION BY t.submission) AS first_offset
+                    FROM targets AS t
+                    LEFT JOIN (
+                        SELECT * FROM read_parquet(?) WHERE xml_type IN (SELECT UNNEST(?))
+                    ) AS i ON i.submission = t.submission
+                )
+                SELECT submission, xml_type, name, offset_data, size
+                FROM located
+                ORDER BY first_offset NULLS LAST, ord
+                """,
+                ("\n".join(submissions), str(self.index_path), SRA_XML_TYPES),
+            )
+            rows = iter(lambda: conn.fetchmany(_FETCH_SIZE), [])
+            for submission, group in itertools.groupby(itertools.chain.from_iterable(rows), key=lambda row: row[0]):
+                locations: dict[SraXmlType, TarMemberLocation | None] = dict.fromkeys(SRA_XML_TYPES)
+                for _, xml_type, name, offset_data, size in group:
+                    if xml_type is not None:
+                        locations[xml_type] = TarMemberLocation(name, offset_data, size)
+                yield submission, locations
 
     def exists(self, submission: str, xml_type: SraXmlType) -> bool:
         """Check if an XML file exists in the tar."""
+        return self.locate_xml(submission, xml_type) is not None
+
+    def locate_xml(self, submission: str, xml_type: SraXmlType) -> TarMemberLocation | None:
+        """XML ファイルのデータ位置を返す (tar は読まない)。"""
         key = f"{submission}/{submission}.{xml_type}.xml"
-        return key in self.members
+        rows = self._query("SELECT name, offset_data, size FROM read_parquet(?) WHERE name = ?", (key,))
+        if not rows:
+            return None
+        return TarMemberLocation(*rows[0])
 
     def read_xml(self, submission: str, xml_type: SraXmlType) -> bytes | None:
         """Read an XML file from the tar archive."""
-        key = f"{submission}/{submission}.{xml_type}.xml"
-        member = self.members.get(key)
-        if member is None:
+        location = self.locate_xml(submission, xml_type)
+        if location is None:
             return None
 
-        self._ensure_open()
-        assert self._tar is not None
-
-        extracted = self._tar.extractfile(member)
-        if extracted is None:
-            return None
-        return extracted.read()
+        if self._file is None:
+            self._file = self.tar_path.open("rb")
+        return read_member_at(self._file.fileno(), location)
 
     def get_member_count(self) -> int:
         """Get the number of entries in the tar."""
-        return len(self.members)
+        rows = self._query("SELECT count(*) FROM read_parquet(?)", ())
+        return int(rows[0][0])
 
     def close(self) -> None:
         """Close the tar file."""
-        if self._tar is not None:
-            self._tar.close()
-            self._tar = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
     def __enter__(self) -> "TarXMLReader":
         return self
@@ -146,6 +154,11 @@ class TarXMLReader:
         self.close()
 
 
+def read_member_at(fd: int, location: TarMemberLocation) -> bytes:
+    """``locate_xml`` で得た位置から member のデータを読む。"""
+    return os.pread(fd, location.size, location.offset_data)
+
+
 def get_ncbi_tar_path(config: Config) -> Path:
     """Get the path to the NCBI SRA Metadata tar."""
     return get_sra_tar_dir(config).joinpath(NCBI_SRA_TAR_FILE_NAME)
@@ -41,7 +41,12 @@ from ddbj_search_converter.logging.logger import log_info, run_logger
 from ddbj_search_converter.schema import Status
 
 TABLE_NAME = "accessions"
-QUERY_BATCH_SIZE = 10000
+QUERY_BATCH_SIZE = 100_000
+
+# 検索キーは ``IN (?, ?, ...)`` にすると placeholder の bind と plan に時間がかかり、
+# list のまま DuckDB に渡すと要素ごとの変換が遅い。改行区切りの 1 つの文字列で渡して
+# SQL 側で分割し、accessions と JOIN する (benchmarks/bench_accessions_lookup.py)
+_KEYS_SQL = "SELECT DISTINCT UNNEST(string_split(?, chr(10))) AS key"
 
 
 def _tmp_sra_db_path(config: Config) -> Path:
@@ -172,8 +177,39 @@ def load_tsv_to_tmp_db(
         )
 
 
+def create_resolved_table(conn: duckdb.DuckDBPyConnection) -> None:
+    """
+    accessions から 1 accession 1 行の ``accession_resolved`` テーブルを作る。
+
+    同一 accession の重複行は ``STATUS_PRIORITY`` で 1 つに決め (tie はロード順で先勝ち)、
+    NULL の既定値・``normalize_status`` 相当の正規化・日付の ISO8601 化も済ませておく。
+    lookup 側 (``get_accession_info_bulk`` / ``es.status_sync``) は Python で集約せずに済む。
+    """
+    conn.execute("DROP TABLE IF EXISTS accession_resolved")
+    conn.execute(
+        f"""
+        CREATE TABLE accession_resolved AS
+        SELECT
+            Accession,
+            COALESCE(Status, 'public') AS Status,
+            {_NORMALIZED_STATUS_SQL} AS NormalizedStatus,
+            COALESCE(Visibility, 'public') AS Visibility,
+            strftime(Received, '{ISO8601_UTC_FORMAT}') AS Received,
+            strftime(Updated, '{ISO8601_UTC_FORMAT}') AS Updated,
+            strftime(Published, '{ISO8601_UTC_FORMAT}') AS Published,
+            COALESCE(Type, '') AS Type
+        FROM accessions
+        WHERE Accession IS NOT NULL
+        QUALIFY row_number() OVER (PARTITION BY Accession ORDER BY {_STATUS_PRIORITY_SQL}, rowid) = 1
+        ORDER BY Accession
+        """
+    )
+    conn.execute("CREATE UNIQUE INDEX idx_resolved_acc ON accession_resolved(Accession)")
+
+
 def finalize_db(tmp_path: Path, final_path: Path) -> None:
     with duckdb.connect(tmp_path) as conn:
+        create_resolved_table(conn)
         conn.execute("CREATE INDEX idx_bp ON accessions(BioProject)")
         conn.execute("CREATE INDEX idx_bs ON accessions(BioSample)")
         conn.execute("CREATE INDEX idx_acc ON accessions(Accession)")
@@ -266,9 +302,9 @@ def _iter_relation(
     yield from rows
 
 
-# 23 個の `iter_*_relations` は (col_a, col_b, type_filter) のみが異なる薄い wrapper。
-# 重複を `_iter_relation` 経由で 1 行ずつに集約しつつ、関数名は明示する (mypy / IDE 補完
-# のため、また `from ddbj_search_converter.sra_accessions_tab import iter_*` 互換のため)。
+# SRA 内部関連と BioProject/BioSample <-> SRA 関連は dblink/sra_internal.py が
+# SRA_RELATION_SPECS に従って SQL で一括抽出する。ここに残すのは bp_bs が使う
+# BioProject <-> BioSample だけ。
 
 
 def iter_bp_bs_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
@@ -276,112 +312,6 @@ def iter_bp_bs_relations(config: Config, *, source: SourceKind) -> Iterator[tupl
     yield from _iter_relation(config, source=source, col_a="BioProject", col_b="BioSample")
 
 
-def iter_study_experiment_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Study <-> Experiment (Type='EXPERIMENT')。"""
-    yield from _iter_relation(config, source=source, col_a="Study", col_b="Accession", type_filter="EXPERIMENT")
-
-
-def iter_experiment_run_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Experiment <-> Run (Type='RUN')。"""
-    yield from _iter_relation(config, source=source, col_a="Experiment", col_b="Accession", type_filter="RUN")
-
-
-def iter_experiment_sample_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Experiment <-> Sample (Type='EXPERIMENT')。"""
-    yield from _iter_relation(config, source=source, col_a="Accession", col_b="Sample", type_filter="EXPERIMENT")
-
-
-def iter_run_sample_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Run <-> Sample (Type='RUN')。"""
-    yield from _iter_relation(config, source=source, col_a="Accession", col_b="Sample", type_filter="RUN")
-
-
-def iter_submission_study_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Submission <-> Study (Type='STUDY')。"""
-    yield from _iter_relation(config, source=source, col_a="Submission", col_b="Accession", type_filter="STUDY")
-
-
-def iter_study_analysis_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Study <-> Analysis (Type='ANALYSIS')。"""
-    yield from _iter_relation(config, source=source, col_a="Study", col_b="Accession", type_filter="ANALYSIS")
-
-
-def iter_submission_analysis_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Submission <-> Analysis (Type='ANALYSIS')。Study が NULL でも Submission 経由で関連を保つ。"""
-    yield from _iter_relation(config, source=source, col_a="Submission", col_b="Accession", type_filter="ANALYSIS")
-
-
-# === SRA 階層横断関連 iterators ===
-
-
-def iter_submission_experiment_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Submission <-> Experiment (Type='EXPERIMENT')。"""
-    yield from _iter_relation(config, source=source, col_a="Submission", col_b="Accession", type_filter="EXPERIMENT")
-
-
-def iter_submission_run_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Submission <-> Run (Type='RUN')。"""
-    yield from _iter_relation(config, source=source, col_a="Submission", col_b="Accession", type_filter="RUN")
-
-
-def iter_submission_sample_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Submission <-> Sample (Type='SAMPLE')。"""
-    yield from _iter_relation(config, source=source, col_a="Submission", col_b="Accession", type_filter="SAMPLE")
-
-
-def iter_study_run_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Study <-> Run (Type='RUN')。"""
-    yield from _iter_relation(config, source=source, col_a="Study", col_b="Accession", type_filter="RUN")
-
-
-def iter_study_sample_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """Study <-> Sample (Type='EXPERIMENT')。EXPERIMENT 行の Study と Sample カラムから抽出。"""
-    yield from _iter_relation(config, source=source, col_a="Study", col_b="Sample", type_filter="EXPERIMENT")
-
-
-# === BioProject/BioSample <-> SRA relation iterators ===
-
-
-def iter_bp_study_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """BioProject <-> Study (Type='STUDY')。"""
-    yield from _iter_relation(config, source=source, col_a="BioProject", col_b="Accession", type_filter="STUDY")
-
-
-def iter_bp_experiment_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """BioProject <-> Experiment (Type='EXPERIMENT')。"""
-    yield from _iter_relation(config, source=source, col_a="BioProject", col_b="Accession", type_filter="EXPERIMENT")
-
-
-def iter_bp_run_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """BioProject <-> Run (Type='RUN')。"""
-    yield from _iter_relation(config, source=source, col_a="BioProject", col_b="Accession", type_filter="RUN")
-
-
-def iter_bp_analysis_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """BioProject <-> Analysis (Type='ANALYSIS')。"""
-    yield from _iter_relation(config, source=source, col_a="BioProject", col_b="Accession", type_filter="ANALYSIS")
-
-
-def iter_bs_sample_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """BioSample <-> Sample (Type='SAMPLE')。"""
-    yield from _iter_relation(config, source=source, col_a="BioSample", col_b="Accession", type_filter="SAMPLE")
-
-
-def iter_bs_experiment_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """BioSample <-> Experiment (Type='EXPERIMENT')。"""
-    yield from _iter_relation(config, source=source, col_a="BioSample", col_b="Accession", type_filter="EXPERIMENT")
-
-
-def iter_bs_run_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """BioSample <-> Run (Type='RUN')。"""
-    yield from _iter_relation(config, source=source, col_a="BioSample", col_b="Accession", type_filter="RUN")
-
-
-def iter_bs_analysis_relations(config: Config, *, source: SourceKind) -> Iterator[tuple[str, str]]:
-    """BioSample <-> Analysis (Type='ANALYSIS')。"""
-    yield from _iter_relation(config, source=source, col_a="BioSample", col_b="Accession", type_filter="ANALYSIS")
-
-
 # === Query functions for JSONL generation ===
 
 
@@ -407,6 +337,18 @@ def status_strength(status: str | None) -> int:
     return STATUS_PRIORITY.get(status, _DEFAULT_STATUS_STRENGTH)
 
 
+# Accessions.tab の status (小文字化後) -> INSDC 標準。ここに無い値と NULL は public。
+_NORMALIZED_STATUS: dict[str, Status] = {
+    "live": "public",
+    "public": "public",
+    "unpublished": "private",
+    "suppressed": "suppressed",
+    "replaced": "suppressed",
+    "withdrawn": "withdrawn",
+    "killed": "withdrawn",
+}
+
+
 def normalize_status(status: str | None) -> Status:
     """
     Accessions.tab の status を INSDC 標準に正規化する。
@@ -423,16 +365,21 @@ def normalize_status(status: str | None) -> Status:
     """
     if status is None:
         return "public"
-    status_lower = status.lower()
-    if status_lower in ("live", "public"):
-        return "public"
-    if status_lower == "unpublished":
-        return "private"
-    if status_lower in ("suppressed", "replaced"):
-        return "suppressed"
-    if status_lower in ("withdrawn", "killed"):
-        return "withdrawn"
-    return "public"
+    return _NORMALIZED_STATUS.get(status.lower(), "public")
+
+
+# ``create_resolved_table`` で使う、STATUS_PRIORITY / normalize_status と同じ判定の SQL 式。
+# 値はすべてモジュール内の定数なので f-string で埋め込んでよい。
+_STATUS_PRIORITY_SQL = (
+    "CASE Status "
+    + " ".join(f"WHEN '{status}' THEN {priority}" for status, priority in STATUS_PRIORITY.items())
+    + f" ELSE {_DEFAULT_STATUS_STRENGTH} END"
+)
+_NORMALIZED_STATUS_SQL = (
+    "CASE lower(Status) "
+    + " ".join(f"WHEN '{status}' THEN '{normalized}'" for status, normalized in _NORMALIZED_STATUS.items())
+    + " ELSE 'public' END"
+)
 
 
 def get_accession_info_bulk(
@@ -451,8 +398,9 @@ def get_accession_info_bulk(
     Returns:
         {accession: (status, visibility, received, updated, published, type)}
 
-    同一 accession が複数行ある場合、``STATUS_PRIORITY`` の小さい順 (live > public
-    > suppressed > withdrawn) で 1 件に集約する。tie は先勝ち。
+    同一 accession が複数行ある場合は ``STATUS_PRIORITY`` の小さい順 (live > public
+    > suppressed > withdrawn、tie は先勝ち) で 1 件に集約した値になる。集約は DB 構築時に
+    ``create_resolved_table`` で済ませてあり、ここでは ``accession_resolved`` を引くだけ。
     """
     if not accessions:
         return {}
@@ -464,36 +412,17 @@ def get_accession_info_bulk(
     with duckdb.connect(db_path, read_only=True) as conn:
         for i in range(0, len(accessions), QUERY_BATCH_SIZE):
             batch = accessions[i : i + QUERY_BATCH_SIZE]
-            placeholders = ", ".join(["?"] * len(batch))
             rows = conn.execute(
                 f"""
-                SELECT
-                    Accession,
-                    Status,
-                    Visibility,
-                    strftime(Received, '{ISO8601_UTC_FORMAT}'),
-                    strftime(Updated, '{ISO8601_UTC_FORMAT}'),
-                    strftime(Published, '{ISO8601_UTC_FORMAT}'),
-                    Type
-                FROM accessions
-                WHERE Accession IN ({placeholders})
+                SELECT Accession, Status, Visibility, Received, Updated, Published, Type
+                FROM accession_resolved
+                JOIN ({_KEYS_SQL}) AS keys ON Accession = keys.key
                 """,
-                batch,
+                ("\n".join(batch),),
             ).fetchall()
 
-            for row in rows:
-                acc, status, visibility, received, updated, published, type_ = row
-                new_info: AccessionInfo = (
-                    status or "public",
-                    visibility or "public",
-                    received,
-                    updated,
-                    published,
-                    type_ or "",
-                )
-                existing = result.get(acc)
-                if existing is None or status_strength(new_info[0]) < status_strength(existing[0]):
-                    result[acc] = new_info
+            for acc, status, visibility, received, updated, published, type_ in rows:
+                result[acc] = (status, visibility, received, updated, published, type_)
 
     return result
 
@@ -610,15 +539,14 @@ def lookup_submissions_for_accessions(
     with duckdb.connect(db_path, read_only=True) as conn:
         for i in range(0, len(accessions), QUERY_BATCH_SIZE):
             batch = accessions[i : i + QUERY_BATCH_SIZE]
-            placeholders = ", ".join(["?"] * len(batch))
             rows = conn.execute(
                 f"""
                 SELECT DISTINCT Accession, Submission
                 FROM accessions
-                WHERE Accession IN ({placeholders})
-                    AND Submission IS NOT NULL
+                JOIN ({_KEYS_SQL}) AS keys ON Accession = keys.key
+                WHERE Submission IS NOT NULL
                 """,
-                batch,
+                ("\n".join(batch),),
             ).fetchall()
 
             result.update(dict(rows))
@@ -653,15 +581,14 @@ def get_submission_accessions(
         submission_list = list(submissions)
         for i in range(0, len(submission_list), QUERY_BATCH_SIZE):
             batch = submission_list[i : i + QUERY_BATCH_SIZE]
-            placeholders = ", ".join(["?"] * len(batch))
             rows = conn.execute(
                 f"""
                 SELECT Submission, Accession
                 FROM accessions
-                WHERE Submission IN ({placeholders})
+                JOIN ({_KEYS_SQL}) AS keys ON Submission = keys.key
                 ORDER BY Submission, Accession
                 """,
-                batch,
+                ("\n".join(batch),),
             ).fetchall()
 
             for submission, accession in rows:
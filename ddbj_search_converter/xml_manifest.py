@@ -0,0 +1,319 @@
+"""
+分割 XML の accession → 格納位置 manifest。
+
+``split_xml`` が分割と同時に書き出し、``regenerate_jsonl`` が参照する。
+manifest があれば、数件の accession を再生成するために全分割ファイルを
+parse し直す必要がなく、該当要素だけを ``os.pread`` で読める。
+
+ファイルパス:
+    - manifest: {tmp_xml_dir}/{prefix}_manifest.parquet
+    - 書き出し中の断片 TSV: {tmp_xml_dir}/{prefix}_manifest.{n}.tsv (完成後に削除)
+
+列:
+    - accession: 要素の accession
+    - file: 分割ファイル名 (tmp_xml_dir からの相対)
+    - offset: 分割ファイル内での要素の開始バイト位置 (圧縮ファイルは展開後の位置)
+    - length: 要素のバイト長
+    - content_hash: 要素のバイト列の hash (``content_hash``)
+
+content_hash は差分更新で「前回の JSONL 生成から要素が 1 バイトも変わっていない」
+エントリを parse せずに読み飛ばすために使う:
+    - {base_dir}/{prefix}_content_hash.parquet: 前回 JSONL 生成に成功した分割ファイルの
+      accession → content_hash (``commit_content_hashes`` が JSONL 生成の最後に書く)
+    - {tmp_xml_dir}/{prefix}_unchanged.parquet: 当日の manifest と上記が一致する
+      accession を分割ファイル順に並べたもの (``build_unchanged_index``)
+
+Parquet は accession 順に並べて書くため、row group の min/max 統計で
+対象外の row group を読み飛ばせる。
+"""
+
+import hashlib
+import itertools
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import IO, NamedTuple
+
+import duckdb
+
+# 要素のバイト列から accession を取り出す関数。split_xml の並列版で worker に
+# 渡すため、module レベルの関数か functools.partial にしておく。
+ManifestSniffer = Callable[[bytes], str | None]
+
+_NCBI_BS_ACCESSION_PATTERN = re.compile(rb'\saccession="([^"]+)"')
+_DDBJ_BS_ACCESSION_PATTERN = re.compile(rb'<Id\b[^>]*\bnamespace="BioSample"[^>]*>\s*([^<\s]+)\s*</Id>')
+_BP_ACCESSION_PATTERN = re.compile(rb'<ArchiveID\b[^>]*\baccession="([^"]+)"')
+
+# 圧縮された分割ファイルで目的の要素まで読み飛ばすときの 1 回あたりの読み込みサイズ
+_SKIP_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class ManifestEntry(NamedTuple):
+    accession: str
+    file: str
+    offset: int
+    length: int
+
+
+def manifest_path(tmp_xml_dir: Path, prefix: str) -> Path:
+    return tmp_xml_dir.joinpath(f"{prefix}_manifest.parquet")
+
+
+def manifest_part_path(tmp_xml_dir: Path, prefix: str, part: int) -> Path:
+    return tmp_xml_dir.joinpath(f"{prefix}_manifest.{part}.tsv")
+
+
+def content_hash_store_path(base_dir: Path, prefix: str) -> Path:
+    return base_dir.joinpath(f"{prefix}_content_hash.parquet")
+
+
+def unchanged_index_path(tmp_xml_dir: Path, prefix: str) -> Path:
+    return tmp_xml_dir.joinpath(f"{prefix}_unchanged.parquet")
+
+
+def content_hash(element: bytes) -> int:
+    """要素のバイト列の 64 bit hash。DuckDB の BIGINT に入るよう符号付きで返す。"""
+    return int.from_bytes(hashlib.blake2b(element, digest_size=8).digest(), "big", signed=True)
+
+
+def _escape_path(path: Path) -> str:
+    # COPY TO の出力先は prepared statement の引数にできない
+    return str(path).replace("'", "''")
+
+
+# === accession sniffer ===
+
+
+def sniff_bp_accession(element: bytes) -> str | None:
+    """``<Package>`` 要素のバイト列から accession を取り出す (parse しない)。
+
+    ``Project/Project/ProjectID/ArchiveID@accession`` は Package 内で最初に現れる
+    ArchiveID なので、最初の一致を返す。
+    """
+    m = _BP_ACCESSION_PATTERN.search(element)
+    return m.group(1).decode() if m else None
+
+
+def sniff_bs_accession(element: bytes, is_ddbj: bool) -> str | None:
+    """``<BioSample>`` 要素のバイト列から accession を取り出す (parse しない)。
+
+    ``jsonl.bs.parse_accession`` と同じ場所を見る。
+    NCBI は開始タグの ``accession`` 属性、DDBJ は ``<Id namespace="BioSample">`` の値。
+    """
+    if is_ddbj:
+        m = _DDBJ_BS_ACCESSION_PATTERN.search(element)
+    else:
+        m = _NCBI_BS_ACCESSION_PATTERN.search(element, 0, element.find(b">"))
+    return m.group(1).decode() if m else None
+
+
+# === 書き出し ===
+
+
+def write_manifest_rows(
+    f: IO[str],
+    file_name: str,
+    elements: Iterable[bytes],
+    first_offset: int,
+    sniffer: ManifestSniffer,
+) -> None:
+    """分割ファイル 1 つ分の manifest 行を TSV に書く。
+
+    accession を取り出せなかった要素は書かない (regenerate では not found 扱い)。
+    """
+    offset = first_offset
+    for element in elements:
+        accession = sniffer(element)
+        if accession is not None:
+            f.write(f"{accession}\t{file_name}\t{offset}\t{len(element)}\t{content_hash(element)}\n")
+        offset += len(element)
+
+
+def build_manifest(tmp_xml_dir: Path, prefix: str, part_paths: Sequence[Path]) -> Path:
+    """断片 TSV をまとめて accession 順の Parquet にし、断片を削除する。"""
+    output_path = manifest_path(tmp_xml_dir, prefix)
+    tmp_path = output_path.with_suffix(".parquet.tmp")
+    with duckdb.connect() as conn:
+        conn.execute(
+            f"""
+            COPY (
+                SELECT * FROM read_csv(
+                    ?,
+                    auto_detect=false,
+                    header=false,
+                    delim=chr(9),
+                    quote='',
+                    columns={{
+                        'accession': 'VARCHAR',
+                        'file': 'VARCHAR',
+                        'offset': 'BIGINT',
+                        'length': 'BIGINT',
+                        'content_hash': 'BIGINT'
+                    }}
+                )
+                ORDER BY accession
+            ) TO '{_escape_path(tmp_path)}' (FORMAT parquet)
+            """,
+            ([str(p) for p in part_paths],),
+        )
+    tmp_path.replace(output_path)
+    for part_path in part_paths:
+        part_path.unlink()
+
+    return output_path
+
+
+# === 参照 ===
+
+
+def manifest_available(tmp_xml_dir: Path, prefixes: Iterable[str]) -> bool:
+    """分割ファイルがある prefix 全てに manifest があるかを返す。
+
+    一部の prefix だけ manifest がない (古い分割結果が残っている) 場合に
+    manifest だけを引くと、そちらの accession が黙って見つからなくなるため。
+    """
+    from ddbj_search_converter.xml_utils import list_split_files
+
+    found = False
+    for prefix in prefixes:
+        if not list_split_files(tmp_xml_dir, prefix):
+            continue
+        if not manifest_path(tmp_xml_dir, prefix).exists():
+            return False
+        found = True
+
+    return found
+
+
+def lookup_manifest(tmp_xml_dir: Path, prefixes: Iterable[str], accessions: Iterable[str]) -> list[ManifestEntry]:
+    """accession の格納位置を manifest から引く。"""
+    accession_list = list(accessions)
+    paths = [str(p) for prefix in prefixes if (p := manifest_path(tmp_xml_dir, prefix)).exists()]
+    if not accession_list or not paths:
+        return []
+
+    with duckdb.connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT accession, file, "offset", length
+            FROM read_parquet(?)
+            WHERE accession IN (SELECT UNNEST(?))
+            ORDER BY file, "offset"
+            """,
+            (paths, accession_list),
+        ).fetchall()
+
+    return [ManifestEntry(*row) for row in rows]
+
+
+def read_manifest_elements(tmp_xml_dir: Path, entries: Iterable[ManifestEntry]) -> Iterator[tuple[Path, bytes]]:
+    """manifest の位置から要素のバイト列を読み、(分割ファイルのパス, 要素) を yield する。
+
+    entries は lookup_manifest の返り値と同じく file, offset 順に並んでいる前提。
+    圧縮された分割ファイル (.xml.gz / .xml.zst) は offset が展開後の位置なので、
+    ファイルごとに先頭から展開しながら読み進める。
+    """
+    for file_name, file_entries in itertools.groupby(entries, key=lambda entry: entry.file):
+        xml_path = tmp_xml_dir.joinpath(file_name)
+        if xml_path.suffix in (".gz", ".zst"):
+            for element in _read_compressed_elements(xml_path, list(file_entries)):
+                yield xml_path, element
+            continue
+        with xml_path.open("rb") as f:
+            for entry in file_entries:
+                yield xml_path, os.pread(f.fileno(), entry.length, entry.offset)
+
+
+def _read_compressed_elements(xml_path: Path, entries: list[ManifestEntry]) -> Iterator[bytes]:
+    from ddbj_search_converter.xml_utils import open_xml_stream
+
+    with open_xml_stream(xml_path) as f:
+        pos = 0
+        for entry in entries:
+            while pos < entry.offset:
+                skipped = f.read(min(entry.offset - pos, _SKIP_CHUNK_SIZE))
+                if not skipped:
+                    return
+                pos += len(skipped)
+            element = f.read(entry.length)
+            pos += len(element)
+            yield element
+        # 途中で pipe を閉じると展開コマンドが異常終了扱いになるので、最後まで読む
+        while f.read(_SKIP_CHUNK_SIZE):
+            pass
+
+
+# === content hash ===
+
+
+def build_unchanged_index(tmp_xml_dir: Path, prefix: str, store_path: Path) -> Path | None:
+    """前回の JSONL 生成時から内容が変わっていない accession の一覧を書く。
+
+    当日の manifest と store の content_hash が一致する accession を、分割ファイル名順に
+    並べて Parquet にする (worker が自分のファイルの分だけを row group 単位で読めるように)。
+    manifest か store がなければ None (全件を parse する)。
+    """
+    current_path = manifest_path(tmp_xml_dir, prefix)
+    if not current_path.exists() or not store_path.exists():
+        return None
+
+    output_path = unchanged_index_path(tmp_xml_dir, prefix)
+    tmp_path = output_path.with_suffix(".parquet.tmp")
+    with duckdb.connect() as conn:
+        conn.execute(
+            f"""
+            COPY (
+                SELECT m.file, m.accession
+                FROM read_parquet(?) AS m
+                JOIN read_parquet(?) AS s
+                  ON m.accession = s.accession AND m.content_hash = s.content_hash
+                ORDER BY m.file, m.accession
+            ) TO '{_escape_path(tmp_path)}' (FORMAT parquet)
+            """,
+            (str(current_path), str(store_path)),
+        )
+    tmp_path.replace(output_path)
+
+    return output_path
+
+
+def load_unchanged_accessions(index_path: Path, file_name: str) -> set[str]:
+    """``build_unchanged_index`` の結果から、分割ファイル 1 つ分の accession を読む。"""
+    with duckdb.connect() as conn:
+        rows = conn.execute(
+            "SELECT accession FROM read_parquet(?) WHERE file = ?",
+            (str(index_path), file_name),
+        ).fetchall()
+
+    return {row[0] for row in rows}
+
+
+def commit_content_hashes(tmp_xml_dir: Path, prefix: str, store_path: Path, file_names: Iterable[str]) -> int:
+    """JSONL を書き終えた分割ファイルの accession → content_hash で store を置き換える。
+
+    失敗した分割ファイルの accession は store に入れない。次回は「変わった」扱いになり、
+    parse し直される。manifest がなければ store は触らず 0 を返す。
+    """
+    current_path = manifest_path(tmp_xml_dir, prefix)
+    if not current_path.exists():
+        return 0
+
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = store_path.with_suffix(".parquet.tmp")
+    with duckdb.connect() as conn:
+        conn.execute(
+            f"""
+            COPY (
+                SELECT accession, content_hash
+                FROM read_parquet(?)
+                WHERE file IN (SELECT UNNEST(?))
+                ORDER BY accession
+            ) TO '{_escape_path(tmp_path)}' (FORMAT parquet)
+            """,
+            (str(current_path), list(file_names)),
+        )
+        row = conn.execute("SELECT count(*) FROM read_parquet(?)", (str(tmp_path),)).fetchone()
+    tmp_path.replace(store_path)
+
+    return int(row[0]) if row else 0
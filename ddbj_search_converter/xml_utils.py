@@ -3,15 +3,29 @@ BioProject/BioSample の大規模 XML を効率的に処理するための関数
 """
 
 import gzip
+import itertools
+import mmap
+import os
 import shutil
-from collections.abc import Generator
+import subprocess
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import date
+from functools import partial
 from pathlib import Path
-from typing import Any, Literal
+from typing import IO, Any, Literal, cast
 
 from lxml import etree
 
 from ddbj_search_converter.config import DATE_FORMAT, TODAY, Config
+from ddbj_search_converter.xml_manifest import (
+    ManifestSniffer,
+    build_manifest,
+    manifest_part_path,
+    manifest_path,
+    write_manifest_rows,
+)
 
 
 def _element_to_dict(
@@ -21,24 +35,48 @@ def _element_to_dict(
     """lxml Element を dict に変換する。xmltodict と同じ出力形式を維持。"""
     result: dict[str, Any] = {}
     parent_nsmap = parent_nsmap or {}
+    nsmap = element.nsmap
 
     # 名前空間宣言を属性として追加（xmltodict の挙動に合わせる）
-    for prefix, uri in element.nsmap.items():
+    for prefix, uri in nsmap.items():
         if parent_nsmap.get(prefix) != uri:
             if prefix is None:
                 result["xmlns"] = uri
             else:
                 result[f"xmlns:{prefix}"] = uri
 
-    # 属性を追加（プレフィックスなし、attr_prefix="" に対応）
-    for attr_key, attr_value in element.attrib.items():
+    return _fold_element(element, result, partial(_element_to_dict, parent_nsmap=nsmap))
+
+
+def _plain_element_to_dict(element: etree._Element) -> dict[str, Any] | str | None:
+    """名前空間宣言を含まない XML 用の ``_element_to_dict``。出力は同じ。
+
+    ``_element_to_dict`` は要素ごとに ``nsmap`` (祖先を辿って dict を組み立てる) を
+    引くため、BioSample / BioProject のように名前空間を使わない大量の要素では
+    それが変換コストの大半を占める。宣言がなければ ``nsmap`` は常に空なので省く。
+    """
+    return _fold_element(element, {}, _plain_element_to_dict)
+
+
+_NO_CHILD = object()
+
+
+def _fold_element(
+    element: etree._Element,
+    result: dict[str, Any],
+    convert_child: Callable[[etree._Element], dict[str, Any] | str | None],
+) -> dict[str, Any] | str | None:
+    """``result`` に属性・テキスト・子要素 (``convert_child`` で変換) を畳み込む。"""
+    # 属性を追加（プレフィックスなし、attr_prefix="" に対応）。
+    # ``xml:lang`` のような予約 prefix の属性は宣言なしでも ``{uri}`` 付きになる
+    for attr_key, attr_value in element.items():
         key: str = str(attr_key)
         if "}" in key:
             key = key.split("}")[1]
         result[key] = attr_value
 
     # テキストコンテンツを処理
-    text = element.text
+    text: str | None = element.text
     if text is not None:
         text = text.strip()
         if text:
@@ -47,8 +85,9 @@ def _element_to_dict(
             elif len(element) == 0:  # 子要素がない場合
                 return text
 
-    # 子要素を処理
-    children: dict[str, list[Any]] = {}
+    # 子要素の値は dict / str / None のいずれかで list にはならないので、
+    # list かどうかで 2 件目以降かを判定できる。
+    children: dict[str, Any] = {}
     for child in element:
         # lxml の Comment / ProcessingInstruction タグは cyfunction 型で返る。
         # type stub は .tag を str と宣言しているが、実行時には cyfunction が来るため
@@ -60,18 +99,16 @@ def _element_to_dict(
         if "}" in child_tag:
             child_tag = child_tag.split("}")[1]
 
-        child_value = _element_to_dict(child, element.nsmap)
-        if child_tag in children:
-            children[child_tag].append(child_value)
+        child_value = convert_child(child)
+        existing = children.get(child_tag, _NO_CHILD)
+        if existing is _NO_CHILD:
+            children[child_tag] = child_value
+        elif isinstance(existing, list):
+            existing.append(child_value)
         else:
-            children[child_tag] = [child_value]
-
-    # 単一要素のリストを値に変換
-    for child_key, child_list in children.items():
-        if len(child_list) == 1:
-            result[child_key] = child_list[0]
-        else:
-            result[child_key] = child_list
+            children[child_tag] = [existing, child_value]
+    if children:
+        result.update(children)
 
     if not result:
         return None
@@ -90,11 +127,16 @@ _SAFE_PARSER = etree.XMLParser(
 
 
 def parse_xml(xml_bytes: bytes) -> dict[str, Any]:
-    """XML bytes を dict にパースする。lxml ベースで高速化。"""
+    """XML bytes を dict にパースする。lxml ベースで高速化。
+
+    名前空間宣言 (``xmlns``) を含まない場合は ``_plain_element_to_dict`` を使う。
+    """
     root = etree.fromstring(xml_bytes, parser=_SAFE_PARSER)
     root_tag: str = str(root.tag)
     if "}" in root_tag:
         root_tag = root_tag.split("}")[1]
+    if b"xmlns" not in xml_bytes:
+        return {root_tag: _plain_element_to_dict(root)}
     return {root_tag: _element_to_dict(root)}
 
 
@@ -115,42 +157,229 @@ def get_tmp_xml_dir(
     return tmp_dir
 
 
-def _is_tag_start(line: bytes, tag_start: bytes) -> bool:
-    """行がタグの開始であるか判定する。プレフィクスマッチを防止。"""
-    if not line.startswith(tag_start):
-        return False
-    if len(line) == len(tag_start):
-        return True
-    next_byte = line[len(tag_start) : len(tag_start) + 1]
-    return next_byte in (b">", b" ", b"\t", b"\n", b"\r", b"/")
+# 分割ファイルの圧縮形式。None は非圧縮。
+SplitCompression = Literal["gzip", "zstd"]
 
+_SPLIT_FILE_SUFFIXES: dict[SplitCompression | None, str] = {
+    None: ".xml",
+    "gzip": ".xml.gz",
+    "zstd": ".xml.zst",
+}
 
-def iterate_xml_element(xml_file: Path, tag: str) -> Generator[bytes, None, None]:
-    """行単位でタグを検出。属性付きタグ (<BioSample id="...") に対応するため startswith で判定。"""
+# 分割ファイルは小さいので、圧縮率より書き出しの速さを取る
+SPLIT_GZIP_LEVEL = 6
+
+
+def split_file_path(output_dir: Path, prefix: str, number: int, compression: SplitCompression | None = None) -> Path:
+    """分割ファイル ``{prefix}_{number}.xml[.gz|.zst]`` のパス。"""
+    return output_dir.joinpath(f"{prefix}_{number}{_SPLIT_FILE_SUFFIXES[compression]}")
+
+
+def list_split_files(tmp_xml_dir: Path, prefix: str) -> list[Path]:
+    """``{prefix}_{n}.xml`` と、その圧縮版 (``.xml.gz`` / ``.xml.zst``) を名前順で返す。"""
+    return sorted(
+        xml_file for suffix in _SPLIT_FILE_SUFFIXES.values() for xml_file in tmp_xml_dir.glob(f"{prefix}_*{suffix}")
+    )
+
+
+def split_file_stem(xml_file: Path) -> str:
+    """分割ファイル名から ``.xml[.gz|.zst]`` を除いた ``{prefix}_{n}`` を返す。
+
+    出力 JSONL 名など、圧縮の有無で変わってほしくない名前に使う。
+    """
+    name = xml_file.name
+    for suffix in sorted(_SPLIT_FILE_SUFFIXES.values(), key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return xml_file.stem
+
+
+def _require_command(name: str) -> str:
+    command = shutil.which(name)
+    if command is None:
+        raise RuntimeError(f"{name} command not found (required for {name} compressed split files)")
+    return command
+
+
+@contextmanager
+def open_xml_stream(xml_file: Path) -> Iterator[IO[bytes]]:
+    """XML を bytes の stream として開く。``.gz`` / ``.zst`` は展開しながら読む。
+
+    展開済みファイルをディスクに書き出さないための入口。pigz があれば別プロセスで
+    展開して pipe で受け取り (展開と後段の Python 処理が別コアで並行する)、
+    無ければ gzip module で展開する。``.zst`` は zstd コマンドで同様に展開する。
+    外部コマンドが異常終了した場合は、最後まで読み切ったときに
+    ``CalledProcessError`` を送出する (途中で読むのをやめた場合は送出しない)。
+    """
+    if xml_file.suffix == ".zst":
+        with _open_decompress_pipe([_require_command("zstd"), "-d", "-c", "-q", str(xml_file)]) as f:
+            yield f
+        return
+
+    if xml_file.suffix != ".gz":
+        with xml_file.open(mode="rb") as f:
+            yield f
+        return
+
+    pigz = shutil.which("pigz")
+    if pigz is None:
+        with gzip.open(xml_file, mode="rb") as gz:
+            yield cast("IO[bytes]", gz)
+        return
+
+    with _open_decompress_pipe([pigz, "-d", "-c", str(xml_file)]) as f:
+        yield f
+
+
+@contextmanager
+def _open_decompress_pipe(cmd: list[str]) -> Iterator[IO[bytes]]:
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    assert proc.stdout is not None
+    completed = False
+    try:
+        yield proc.stdout
+        completed = True
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if completed and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+# 開始タグ名の直後に来うるバイト。それ以外 (英数字など) が続く場合は
+# ``<BioSampleSet>`` のような別タグへのプレフィクスマッチなので読み飛ばす。
+_TAG_NAME_TERMINATORS = frozenset(b"> \t\n\r/")
+
+# 圧縮入力を stream で走査するときの 1 回あたりの読み込みサイズ。
+STREAM_CHUNK_SIZE = 8 * 1024 * 1024
+
+_COMPRESSED_SUFFIXES = frozenset({".gz", ".zst"})
+
+
+def _find_element_start(buf: bytes | mmap.mmap, tag_start: bytes, pos: int) -> int:
+    """``buf[pos:]`` にある最初の開始タグの位置を返す。
+
+    見つからなければ -1。buf の末尾で切れていてタグ名の終端を確認できない場合は
+    ``-(start + 2)`` を返す (stream 走査で次の chunk を待つため)。
+    """
+    buf_len = len(buf)
+    tag_start_len = len(tag_start)
+    while True:
+        start = buf.find(tag_start, pos)
+        if start == -1:
+            return -1
+        after = start + tag_start_len
+        if after >= buf_len:
+            return -(start + 2)
+        if buf[after] in _TAG_NAME_TERMINATORS:
+            return start
+        pos = after
+
+
+def _find_element_span(
+    buf: bytes | mmap.mmap,
+    tag_start: bytes,
+    tag_end: bytes,
+    pos: int,
+) -> tuple[int, int]:
+    """``buf[pos:]`` にある最初の要素の ``(start, end)`` を返す。
+
+    start は ``<tag`` の位置、end は ``</tag>`` の直後 (直後の改行まで含める)。
+    開始タグが無ければ ``(-1, -1)``、開始タグはあるが buf 内で閉じていなければ
+    ``(start, -1)`` を返す。終了タグの位置 (行頭か、同一行か) には依存しない。
+    """
+    start = _find_element_start(buf, tag_start, pos)
+    if start < 0:
+        return (-1, -1) if start == -1 else (-start - 2, -1)
+
+    close = buf.find(tag_end, start + len(tag_start))
+    if close == -1:
+        return start, -1
+    end = close + len(tag_end)
+    if buf[end : end + 1] == b"\n":
+        end += 1
+    elif buf[end : end + 2] == b"\r\n":
+        end += 2
+    return start, end
+
+
+def _iter_element_spans(
+    buf: bytes | mmap.mmap,
+    tag_start: bytes,
+    tag_end: bytes,
+    pos: int = 0,
+) -> Generator[tuple[int, int], None, None]:
+    while True:
+        start, end = _find_element_span(buf, tag_start, tag_end, pos)
+        if end == -1:
+            return
+        yield start, end
+        pos = end
+
+
+@contextmanager
+def _mmap_xml(xml_file: Path) -> Iterator[bytes | mmap.mmap]:
+    """非圧縮 XML を読み取り専用で mmap する。空ファイルは mmap できないので ``b""`` を返す。"""
+    with xml_file.open(mode="rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield mm
+
+
+def iterate_xml_element_spans(xml_file: Path, tag: str) -> Generator[tuple[int, int], None, None]:
+    """非圧縮 XML の要素ごとの ``(start, end)`` バイトオフセットを返す。
+
+    要素 bytes のコピーを作らないので、offset だけが要る処理はこちらを使う。
+    """
+    with _mmap_xml(xml_file) as buf:
+        yield from _iter_element_spans(buf, f"<{tag}".encode(), f"</{tag}>".encode())
+
+
+def _iterate_xml_element_stream(f: IO[bytes], tag: str) -> Generator[bytes, None, None]:
+    """seek できない stream (展開中の gzip 等) から chunk 単位で要素を切り出す。"""
     tag_start = f"<{tag}".encode()
     tag_end = f"</{tag}>".encode()
 
-    inside_element = False
-    buffer = bytearray()
+    buf = b""
+    pos = 0
+    eof = False
+    while True:
+        start, end = _find_element_span(buf, tag_start, tag_end, pos)
+        # buf の末尾付近で閉じた要素は、直後の改行 (``\r\n``) が次の chunk にある可能性がある
+        if end != -1 and (len(buf) - end >= 2 or eof):
+            yield buf[start:end]
+            pos = end
+            continue
+        if eof:
+            return
+        # 未完の要素、または chunk 境界で切れた開始タグの断片だけを残して継ぎ足す
+        keep = start if start != -1 else max(pos, len(buf) - len(tag_start))
+        chunk = f.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            eof = True
+        buf = buf[keep:] + chunk
+        pos = 0
 
-    with xml_file.open(mode="rb") as f:
-        for line in f:
-            stripped = line.strip()
-
-            if _is_tag_start(stripped, tag_start):
-                inside_element = True
-                buffer = bytearray(line)
-                if tag_end in stripped:
-                    inside_element = False
-                    yield bytes(buffer)
-                    buffer.clear()
-            elif inside_element and stripped.startswith(tag_end):
-                inside_element = False
-                buffer.extend(line)
-                yield bytes(buffer)
-                buffer.clear()
-            elif inside_element:
-                buffer.extend(line)
+
+def iterate_xml_element(xml_file: Path, tag: str) -> Generator[bytes, None, None]:
+    """XML から ``<tag ...>...</tag>`` 要素を 1 つずつ bytes で返す。
+
+    非圧縮ファイルは mmap 上を ``find`` で走査し、要素ごとに 1 回だけコピーする。
+    ``.gz`` / ``.zst`` は ``open_xml_stream`` 経由で展開しながら chunk 単位で走査する。
+    ``<BioSampleSet>`` のようなプレフィクスが一致する別タグは拾わない。
+    """
+    if xml_file.suffix in _COMPRESSED_SUFFIXES:
+        with open_xml_stream(xml_file) as f:
+            yield from _iterate_xml_element_stream(f, tag)
+        return
+
+    with _mmap_xml(xml_file) as buf:
+        for start, end in _iter_element_spans(buf, f"<{tag}".encode(), f"</{tag}>".encode()):
+            yield buf[start:end]
 
 
 def split_xml(
@@ -161,30 +390,295 @@ def split_xml(
     prefix: str,
     wrapper_start: bytes,
     wrapper_end: bytes,
+    parallel_num: int = 1,
+    sniffer: ManifestSniffer | None = None,
+    compression: SplitCompression | None = None,
+    max_bytes: int | None = None,
 ) -> list[Path]:
-    """並列処理用に XML を分割。出力: {prefix}_{n}.xml"""
+    """並列処理用に XML を分割。出力: {prefix}_{n}.xml
+
+    ``xml_file`` が ``.gz`` の場合は展開済みファイルを作らずに直接分割する。
+    ``parallel_num > 1`` かつ非圧縮の場合は ``_split_xml_parallel`` でバイト範囲ごとに
+    並列分割する。どちらの経路でも出力ファイルの番号と内容は同じになる。
+
+    ``sniffer`` を渡すと、分割と同時に accession → 格納位置の manifest
+    (``{prefix}_manifest.parquet``、``xml_manifest`` 参照) も書き出す。
+
+    ``compression`` を渡すと分割ファイルを圧縮して書く ({prefix}_{n}.xml.gz /
+    {prefix}_{n}.xml.zst)。読む側は ``iterate_xml_element`` / ``open_xml_stream`` で
+    拡張子から判断して展開する。manifest の offset は展開後の位置。
+
+    ``max_bytes`` を渡すと、要素数が ``batch_size`` に達する前でも、要素のバイト数の
+    合計が ``max_bytes`` 以上になった時点でファイルを閉じる。エントリのサイズは桁で
+    ばらつくので、件数だけで切ると分割ファイルごとの処理時間が大きく偏る。
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
+    # 古い manifest が残っていると、新しい分割ファイルと位置がずれる
+    manifest_path(output_dir, prefix).unlink(missing_ok=True)
+    # 前回と圧縮形式やファイル数が違うと、古い分割ファイルが残って二重に読まれる
+    for stale_file in list_split_files(output_dir, prefix):
+        stale_file.unlink()
+
+    if parallel_num > 1 and xml_file.suffix not in _COMPRESSED_SUFFIXES:
+        return _split_xml_parallel(
+            xml_file,
+            output_dir,
+            batch_size,
+            tag,
+            prefix,
+            wrapper_start,
+            wrapper_end,
+            parallel_num,
+            sniffer,
+            compression,
+            max_bytes,
+        )
 
     output_files: list[Path] = []
     batch_buffer: list[bytes] = []
+    batch_bytes = 0
     file_count = 1
 
-    for element in iterate_xml_element(xml_file, tag):
-        batch_buffer.append(element)
+    with _open_manifest_part(output_dir, prefix, 0, sniffer) as manifest_f:
+        for element in iterate_xml_element(xml_file, tag):
+            batch_buffer.append(element)
+            batch_bytes += len(element)
+
+            if _is_batch_full(len(batch_buffer), batch_bytes, batch_size, max_bytes):
+                output_file = split_file_path(output_dir, prefix, file_count, compression)
+                _write_split_file(
+                    output_file, batch_buffer, wrapper_start, wrapper_end, manifest_f, sniffer, compression
+                )
+                output_files.append(output_file)
+                file_count += 1
+                batch_buffer.clear()
+                batch_bytes = 0
+
+        # 残りの要素を書き出し
+        if batch_buffer:
+            output_file = split_file_path(output_dir, prefix, file_count, compression)
+            _write_split_file(output_file, batch_buffer, wrapper_start, wrapper_end, manifest_f, sniffer, compression)
+            output_files.append(output_file)
+            batch_buffer.clear()
+
+    if sniffer is not None:
+        build_manifest(output_dir, prefix, [manifest_part_path(output_dir, prefix, 0)])
+
+    return output_files
+
+
+def _is_batch_full(count: int, size: int, batch_size: int, max_bytes: int | None) -> bool:
+    """分割ファイルを閉じるかどうか。逐次版と並列版で同じ規則を使う。"""
+    return count >= batch_size or (max_bytes is not None and size >= max_bytes)
+
+
+def _chunk_bounds(sizes: list[int], batch_size: int, max_bytes: int | None) -> list[tuple[int, int]]:
+    """要素サイズの列から、各分割ファイルの ``(先頭要素, 末尾要素 + 1)`` の通し番号を返す。"""
+    bounds: list[tuple[int, int]] = []
+    chunk_start = 0
+    chunk_bytes = 0
+    for index, size in enumerate(sizes):
+        chunk_bytes += size
+        if _is_batch_full(index - chunk_start + 1, chunk_bytes, batch_size, max_bytes):
+            bounds.append((chunk_start, index + 1))
+            chunk_start = index + 1
+            chunk_bytes = 0
+    if chunk_start < len(sizes):
+        bounds.append((chunk_start, len(sizes)))
+    return bounds
+
+
+def split_size_summary(output_files: list[Path]) -> str:
+    """分割ファイルのディスク上のサイズの要約 (ログ用)。"""
+    if not output_files:
+        return "no split files"
+    sizes = sorted(output_file.stat().st_size for output_file in output_files)
+    mib = 1024 * 1024
+    return (
+        f"{len(sizes)} files, total {sum(sizes) / mib:.1f} MiB, "
+        f"min {sizes[0] / mib:.1f} MiB, median {sizes[len(sizes) // 2] / mib:.1f} MiB, "
+        f"max {sizes[-1] / mib:.1f} MiB"
+    )
+
+
+def sort_largest_first(xml_files: list[Path]) -> list[Path]:
+    """大きい分割ファイルから順に並べる。
+
+    ProcessPoolExecutor は submit 順に仕事を渡すので、重いファイルを先に出しておくと
+    最後に 1 つだけ重いファイルが残って待つことが減る。
+    """
+    return sorted(xml_files, key=lambda xml_file: xml_file.stat().st_size, reverse=True)
+
+
+@contextmanager
+def _open_manifest_part(
+    output_dir: Path, prefix: str, part: int, sniffer: ManifestSniffer | None
+) -> Iterator[IO[str] | None]:
+    """manifest の断片 TSV を開く。``sniffer`` がなければ何も開かず None を yield する。"""
+    if sniffer is None:
+        yield None
+        return
+    with manifest_part_path(output_dir, prefix, part).open("w", encoding="utf-8") as f:
+        yield f
+
+
+def _resync_offsets(xml_file: Path, tag: str, range_num: int) -> list[int]:
+    """ファイルを ``range_num`` 等分したオフセットを、それぞれ次の要素の開始位置に寄せる。
+
+    返り値は昇順・重複なしで、先頭は最初の要素の開始位置、末尾はファイルサイズ。
+    要素はネストしないので、開始タグを探すだけで要素境界に揃う。
+    """
+    tag_start = f"<{tag}".encode()
+    with _mmap_xml(xml_file) as buf:
+        size = len(buf)
+        offsets: list[int] = []
+        for i in range(range_num):
+            start = _find_element_start(buf, tag_start, size * i // range_num)
+            offsets.append(size if start < 0 else start)
+    return sorted(set(offsets) | {size})
+
+
+def _element_sizes_in_range(xml_file: Path, tag: str, range_start: int, range_end: int) -> list[int]:
+    """開始位置が ``[range_start, range_end)`` にある要素のバイト数を順に返す。"""
+    sizes: list[int] = []
+    with _mmap_xml(xml_file) as buf:
+        for start, end in _iter_element_spans(buf, f"<{tag}".encode(), f"</{tag}>".encode(), range_start):
+            if start >= range_end:
+                break
+            sizes.append(end - start)
+    return sizes
+
+
+def _write_split_range(
+    xml_file: Path,
+    output_dir: Path,
+    tag: str,
+    prefix: str,
+    wrapper_start: bytes,
+    wrapper_end: bytes,
+    range_start: int,
+    first_index: int,
+    chunks: list[tuple[int, int, int]],
+    part: int = 0,
+    sniffer: ManifestSniffer | None = None,
+    compression: SplitCompression | None = None,
+) -> list[Path]:
+    """先頭要素が ``[range_start, range_end)`` にある分割ファイルを書き出す。
+
+    ``first_index`` は範囲内最初の要素のファイル全体での通し番号 (0 始まり)。
+    ``chunks`` はこの範囲で始まる分割ファイルの ``(番号, 先頭要素, 末尾要素 + 1)``。
+    範囲の途中から始まる分割ファイルは、範囲の外 (次の範囲) まで読み進めて埋める。
+    範囲の先頭にある、前の範囲で始まった分割ファイルの残りは書かない。
+    manifest の行は断片 TSV ``part`` に書く。
+    """
+    output_files: list[Path] = []
+    if not chunks:
+        return output_files
 
-        if len(batch_buffer) >= batch_size:
-            output_file = output_dir.joinpath(f"{prefix}_{file_count}.xml")
-            _write_split_file(output_file, batch_buffer, wrapper_start, wrapper_end)
+    batch_buffer: list[bytes] = []
+    chunk_iter = iter(chunks)
+    file_count, chunk_start, chunk_end = next(chunk_iter)
+    index = first_index
+    with _mmap_xml(xml_file) as buf, _open_manifest_part(output_dir, prefix, part, sniffer) as manifest_f:
+        for start, end in _iter_element_spans(buf, f"<{tag}".encode(), f"</{tag}>".encode(), range_start):
+            if index < chunk_start:
+                index += 1
+                continue
+            batch_buffer.append(buf[start:end])
+            index += 1
+            if index < chunk_end:
+                continue
+
+            output_file = split_file_path(output_dir, prefix, file_count, compression)
+            _write_split_file(output_file, batch_buffer, wrapper_start, wrapper_end, manifest_f, sniffer, compression)
             output_files.append(output_file)
-            file_count += 1
             batch_buffer.clear()
+            next_chunk = next(chunk_iter, None)
+            if next_chunk is None:
+                break
+            file_count, chunk_start, chunk_end = next_chunk
+
+    return output_files
+
 
-    # 残りの要素を書き出し
-    if batch_buffer:
-        output_file = output_dir.joinpath(f"{prefix}_{file_count}.xml")
-        _write_split_file(output_file, batch_buffer, wrapper_start, wrapper_end)
-        output_files.append(output_file)
-        batch_buffer.clear()
+def _split_xml_parallel(
+    xml_file: Path,
+    output_dir: Path,
+    batch_size: int,
+    tag: str,
+    prefix: str,
+    wrapper_start: bytes,
+    wrapper_end: bytes,
+    parallel_num: int,
+    sniffer: ManifestSniffer | None = None,
+    compression: SplitCompression | None = None,
+    max_bytes: int | None = None,
+) -> list[Path]:
+    """非圧縮 XML をバイト範囲ごとに並列分割する。
+
+    1. ファイルを ``parallel_num`` 等分し、各オフセットを次の要素の開始位置に寄せる
+    2. 範囲ごとの要素サイズを並列に集め、逐次版と同じ規則 (``_is_batch_full``) で
+       全分割ファイルの先頭・末尾要素の通し番号を決める
+    3. 範囲ごとに、その範囲で始まる分割ファイルを並列に書き出す
+
+    分割ファイルの番号と境界を先に全体で決めるため、逐次版と同じ番号・同じ内容になる
+    (``--resume`` や下流の glob がそのまま動く)。
+    """
+    offsets = _resync_offsets(xml_file, tag, parallel_num)
+    ranges = list(itertools.pairwise(offsets))
+    if not ranges:
+        return []
+
+    with ProcessPoolExecutor(max_workers=parallel_num) as executor:
+        size_futures = [
+            executor.submit(_element_sizes_in_range, xml_file, tag, range_start, range_end)
+            for range_start, range_end in ranges
+        ]
+        range_sizes = [future.result() for future in size_futures]
+
+        first_indexes: list[int] = []
+        total = 0
+        for sizes in range_sizes:
+            first_indexes.append(total)
+            total += len(sizes)
+
+        # 分割ファイルを、先頭要素が属する範囲に割り当てる
+        bounds = _chunk_bounds(list(itertools.chain.from_iterable(range_sizes)), batch_size, max_bytes)
+        range_chunks: list[list[tuple[int, int, int]]] = [[] for _ in ranges]
+        range_index = 0
+        for file_count, (chunk_start, chunk_end) in enumerate(bounds, start=1):
+            while range_index + 1 < len(ranges) and chunk_start >= first_indexes[range_index + 1]:
+                range_index += 1
+            range_chunks[range_index].append((file_count, chunk_start, chunk_end))
+
+        futures = [
+            executor.submit(
+                _write_split_range,
+                xml_file,
+                output_dir,
+                tag,
+                prefix,
+                wrapper_start,
+                wrapper_end,
+                range_start,
+                first_index,
+                chunks,
+                part,
+                sniffer,
+                compression,
+            )
+            for part, ((range_start, _range_end), first_index, chunks) in enumerate(
+                zip(ranges, first_indexes, range_chunks, strict=True)
+            )
+        ]
+        output_files: list[Path] = []
+        for future in futures:
+            output_files.extend(future.result())
+
+    if sniffer is not None:
+        build_manifest(
+            output_dir, prefix, [manifest_part_path(output_dir, prefix, part) for part in range(len(ranges))]
+        )
 
     return output_files
 
@@ -194,8 +688,13 @@ def _write_split_file(
     elements: list[bytes],
     wrapper_start: bytes,
     wrapper_end: bytes,
+    manifest_f: IO[str] | None = None,
+    sniffer: ManifestSniffer | None = None,
+    compression: SplitCompression | None = None,
 ) -> None:
-    with output_file.open(mode="wb") as f:
+    if manifest_f is not None and sniffer is not None:
+        write_manifest_rows(manifest_f, output_file.name, elements, len(wrapper_start) + 1, sniffer)
+    with _open_split_output(output_file, compression) as f:
         f.write(wrapper_start)
         f.write(b"\n")
         for element in elements:
@@ -203,6 +702,32 @@ def _write_split_file(
         f.write(wrapper_end)
 
 
+@contextmanager
+def _open_split_output(output_file: Path, compression: SplitCompression | None) -> Iterator[IO[bytes]]:
+    """分割ファイルを書き出し用に開く。zstd は zstd コマンドに pipe で渡して圧縮する。"""
+    if compression is None:
+        with output_file.open(mode="wb") as f:
+            yield f
+        return
+
+    if compression == "gzip":
+        # mtime=0: 逐次版と並列版で同じバイト列になるようにする
+        with gzip.GzipFile(output_file, mode="wb", compresslevel=SPLIT_GZIP_LEVEL, mtime=0) as gz:
+            yield cast("IO[bytes]", gz)
+        return
+
+    cmd = [_require_command("zstd"), "-q", "-f", "-o", str(output_file)]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    assert proc.stdin is not None
+    try:
+        yield proc.stdin
+    finally:
+        proc.stdin.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
 def extract_gzip(gz_file: Path, output_dir: Path) -> Path:
     output_dir.mkdir(parents=True, exist_ok=True)
     output_file = output_dir.joinpath(gz_file.stem)
@@ -7,6 +7,7 @@
 #
 # Options:
 #   --date YYYYMMDD     Target date (default: today)
+#   --full              Rebuild DBLink dbxref from scratch (default: patch the previous DB)
 #   --from-step STEP    Start from specified step (use --list-steps to see available steps)
 #   --list-steps        Show available steps and exit
 #   --dry-run           Show what would be done without executing
@@ -62,6 +63,7 @@ declare -A STEP_DESC=(
 # Default values
 TARGET_DATE=""
 DRY_RUN=false
+FULL_MODE=false
 FROM_STEP=""
 FROM_STEP_ORDER=0
 
@@ -93,6 +95,10 @@ while [[ $# -gt 0 ]]; do
             DRY_RUN=true
             shift
             ;;
+        --full)
+            FULL_MODE=true
+            shift
+            ;;
         --from-step)
             FROM_STEP="$2"
             shift 2
@@ -102,7 +108,7 @@ while [[ $# -gt 0 ]]; do
             exit 0
             ;;
         -h|--help)
-            head -17 "$0" | tail -n +2 | sed 's/^# \?//'
+            head -18 "$0" | tail -n +2 | sed 's/^# \?//'
             exit 0
             ;;
         *)
@@ -323,7 +329,11 @@ main() {
         log_info "[SKIP] finalize_dblink (--from-step)"
     else
         log_info "Step 5: Finalizing DBLink DB..."
-        run_cmd "finalize_dblink_db"
+        if [[ "$FULL_MODE" == true ]]; then
+            run_cmd "finalize_dblink_db --full"
+        else
+            run_cmd "finalize_dblink_db"
+        fi
     fi
 
     # Step: dump_dblink
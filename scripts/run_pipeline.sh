@@ -7,7 +7,7 @@
 #
 # Options:
 #   --date YYYYMMDD     Target date (default: today)
-#   --full              Full mode: regenerate all JSONL (default: incremental)
+#   --full              Full mode: rebuild DBLink dbxref and regenerate all JSONL (default: incremental)
 #   --from-step STEP    Start from specified step (use --list-steps to see available steps)
 #   --list-steps        Show available steps and exit
 #   --dry-run           Show what would be done without executing
@@ -18,6 +18,8 @@
 #   DDBJ_SEARCH_CONVERTER_RESULT_DIR    Result directory
 #   DDBJ_SEARCH_CONVERTER_CONST_DIR     Constant files directory
 #   DDBJ_SEARCH_CONVERTER_ES_URL        Elasticsearch URL
+#   DDBJ_SEARCH_CONVERTER_DBXREF_MAX_PER_TYPE
+#                                       Per-type cap on dbXrefs in JSONL (default: 100000, 0 = no cap)
 #
 
 set -euo pipefail
@@ -40,6 +42,7 @@ STEP_NAMES=(
     "dblink_insdc"
     "finalize_dblink"
     "dump_dblink"
+    "dblink_index"
     "sync_tar"
     "jsonl_bp"
     "jsonl_bs"
@@ -78,6 +81,7 @@ declare -A STEP_DESC=(
     ["dblink_insdc"]="Create INSDC sequence accession relations"
     ["finalize_dblink"]="Finalize DBLink database"
     ["dump_dblink"]="Dump DBLink files"
+    ["dblink_index"]="Build dbxref lookup index for JSONL generation"
     ["sync_tar"]="Sync tar files and build date cache"
     ["jsonl_bp"]="Generate BioProject JSONL"
     ["jsonl_bs"]="Generate BioSample JSONL"
@@ -111,6 +115,7 @@ declare -A STEP_PHASE=(
     ["dblink_insdc"]="PHASE 1: DBLink Construction"
     ["finalize_dblink"]="PHASE 1: DBLink Construction"
     ["dump_dblink"]="PHASE 1: DBLink Construction"
+    ["dblink_index"]="PHASE 1: DBLink Construction"
     ["sync_tar"]="PHASE 2: JSONL Generation"
     ["jsonl_bp"]="PHASE 2: JSONL Generation"
     ["jsonl_bs"]="PHASE 2: JSONL Generation"
@@ -510,7 +515,7 @@ phase1_dblink() {
     if should_skip_step "dblink_bp_bs"; then
         log_info "[SKIP] dblink_bp_bs (--from-step)"
     else
-        run_cmd "create_dblink_bp_bs_relations"
+        run_cmd "create_dblink_bp_bs_relations --write-entry-cache"
     fi
 
     # Step: dblink_bp
@@ -567,7 +572,11 @@ phase1_dblink() {
         log_info "[SKIP] finalize_dblink (--from-step)"
     else
         log_info "Step 1-4: Finalizing DBLink DB..."
-        run_cmd "finalize_dblink_db"
+        if [[ "$FULL_MODE" == true ]]; then
+            run_cmd "finalize_dblink_db --full"
+        else
+            run_cmd "finalize_dblink_db"
+        fi
     fi
 
     # Step: dump_dblink
@@ -577,6 +586,14 @@ phase1_dblink() {
         log_info "Step 1-5: Dumping DBLink files..."
         run_cmd "dump_dblink_files"
     fi
+
+    # Step: dblink_index
+    if should_skip_step "dblink_index"; then
+        log_info "[SKIP] dblink_index (--from-step)"
+    else
+        log_info "Step 1-6: Building dbxref lookup index..."
+        run_cmd "build_dblink_lookup_index"
+    fi
 }
 
 # ============================================================
@@ -627,9 +644,10 @@ phase2_jsonl() {
         log_info "[SKIP] jsonl_bs (--from-step)"
     fi
 
-    # sra/jga: no --resume (sra doesn't support it, jga is fast enough)
+    # sra: --resume skips batches recorded as completed in the batch checkpoint
+    # jga: no --resume (fast enough)
     if ! should_skip_step "jsonl_sra"; then
-        jsonl_cmds+=("generate_sra_jsonl ${full_opt} ${parallel_opt}")
+        jsonl_cmds+=("generate_sra_jsonl ${full_opt} ${parallel_opt} --resume")
     else
         log_info "[SKIP] jsonl_sra (--from-step)"
     fi
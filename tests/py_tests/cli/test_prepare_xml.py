@@ -0,0 +1,27 @@
+"""Tests for ddbj_search_converter.cli.prepare_{bioproject,biosample}_xml argument parsing."""
+
+from collections.abc import Callable
+
+import pytest
+
+from ddbj_search_converter.cli import prepare_bioproject_xml, prepare_biosample_xml
+from ddbj_search_converter.xml_utils import SplitCompression
+
+ParseArgs = Callable[[list[str]], tuple[SplitCompression | None, int | None]]
+
+PARSE_ARGS: list[ParseArgs] = [prepare_bioproject_xml.parse_args, prepare_biosample_xml.parse_args]
+
+
+@pytest.mark.parametrize("parse_args", PARSE_ARGS)
+class TestMaxChunkMb:
+    def test_default_is_count_only(self, parse_args: ParseArgs) -> None:
+        assert parse_args([]) == (None, None)
+
+    def test_converts_to_bytes(self, parse_args: ParseArgs) -> None:
+        assert parse_args(["--max-chunk-mb", "64"]) == (None, 64 * 1024 * 1024)
+
+    @pytest.mark.parametrize("value", ["0", "-1"])
+    def test_rejects_non_positive(self, parse_args: ParseArgs, value: str) -> None:
+        """0 以下だと要素ごとに分割ファイルができてしまうので argparse で弾く。"""
+        with pytest.raises(SystemExit):
+            parse_args(["--max-chunk-mb", value])
@@ -1,21 +1,34 @@
 """Tests for ddbj_search_converter.dblink.bp_bs module.
 
 bp_bs は外部 XML ファイルと DB に依存するため、
-ここではユーティリティ関数のテストのみ行う。
+ここではユーティリティ関数と分割ファイル単位の処理のテストのみ行う。
 """
 
+import os
 from collections.abc import Generator
 from pathlib import Path
+from typing import Any
 
 import pytest
 
+from ddbj_search_converter.cli.prepare_biosample_xml import BIOSAMPLE_XML_FOOTER, BIOSAMPLE_XML_HEADER
 from ddbj_search_converter.config import Config
 from ddbj_search_converter.dblink.bp_bs import (
     IdMapping,
     load_id_mapping_tsv,
+    process_ddbj_xml_file,
+    process_ncbi_xml_file,
+    scan_biosample_xml_file,
     write_id_mapping_tsv,
 )
+from ddbj_search_converter.jsonl import bs as jsonl_bs
+from ddbj_search_converter.jsonl.bs import entry_cache_path, entry_cache_usable, iter_bs_instances
+from ddbj_search_converter.jsonl.utils import EntryFilter
 from ddbj_search_converter.logging.logger import _ctx, run_logger
+from ddbj_search_converter.schema import BioSample
+from ddbj_search_converter.xml_utils import SplitCompression, split_xml
+
+BS_FIXTURE_DIR = Path(__file__).resolve().parents[2] / "fixtures/usr/local/resources/biosample"
 
 
 @pytest.fixture
@@ -64,3 +77,137 @@ class TestIdMappingTsv:
             loaded = load_id_mapping_tsv(tsv_path)
 
             assert loaded["12345"] == "PRJDB12345"
+
+
+def _split_fixture(
+    tmp_path: Path, file_name: str, prefix: str, compression: SplitCompression | None = None
+) -> list[Path]:
+    return split_xml(
+        BS_FIXTURE_DIR / file_name,
+        tmp_path,
+        batch_size=4,
+        tag="BioSample",
+        prefix=prefix,
+        wrapper_start=BIOSAMPLE_XML_HEADER,
+        wrapper_end=BIOSAMPLE_XML_FOOTER,
+        compression=compression,
+    )
+
+
+class TestScanBiosampleXmlFile:
+    """1 回の parse で iterparse 版と同じ関連を集め、entry cache を書くこと。"""
+
+    @pytest.mark.parametrize(
+        ("file_name", "prefix", "is_ddbj"),
+        [("biosample_set.xml.gz", "ncbi", False), ("ddbj_biosample_set.xml.gz", "ddbj", True)],
+    )
+    @pytest.mark.parametrize("compression", [None, "gzip"])
+    def test_same_result_as_iterparse(
+        self,
+        tmp_path: Path,
+        clean_ctx: None,
+        file_name: str,
+        prefix: str,
+        is_ddbj: bool,
+        compression: SplitCompression | None,
+    ) -> None:
+        config = Config(result_dir=tmp_path, const_dir=tmp_path)
+        xml_files = _split_fixture(tmp_path / "tmp_xml", file_name, prefix, compression)
+        assert xml_files
+        worker = process_ddbj_xml_file if is_ddbj else process_ncbi_xml_file
+
+        with run_logger(config=config):
+            for xml_path in xml_files:
+                relations, skipped, id_mapping = worker(xml_path)
+                scanned_relations, scanned_skipped, scanned_id_mapping = scan_biosample_xml_file(xml_path, is_ddbj)
+
+                assert set(scanned_relations) == set(relations)
+                assert scanned_skipped == skipped
+                assert scanned_id_mapping == id_mapping
+
+    @pytest.mark.parametrize(
+        ("file_name", "prefix", "is_ddbj"),
+        [("biosample_set.xml.gz", "ncbi", False), ("ddbj_biosample_set.xml.gz", "ddbj", True)],
+    )
+    def test_entry_cache_matches_xml_conversion(
+        self, tmp_path: Path, clean_ctx: None, file_name: str, prefix: str, is_ddbj: bool
+    ) -> None:
+        config = Config(result_dir=tmp_path, const_dir=tmp_path)
+        xml_path = _split_fixture(tmp_path / "tmp_xml", file_name, prefix)[0]
+
+        with run_logger(config=config):
+            from_xml = [doc.model_dump_json(by_alias=True) for doc in iter_bs_instances(xml_path, is_ddbj)]
+            scan_biosample_xml_file(xml_path, is_ddbj)
+            assert entry_cache_usable(xml_path)
+            from_cache = [doc.model_dump_json(by_alias=True) for doc in iter_bs_instances(xml_path, is_ddbj)]
+
+        assert from_xml
+        assert from_cache == from_xml
+
+    @pytest.mark.parametrize("use_cache", [False, True])
+    def test_accept_skips_rejected_accessions(self, tmp_path: Path, clean_ctx: None, use_cache: bool) -> None:
+        """XML でも entry cache でも、accept が False を返した accession は yield しない。"""
+        config = Config(result_dir=tmp_path, const_dir=tmp_path)
+        xml_path = _split_fixture(tmp_path / "tmp_xml", "biosample_set.xml.gz", "ncbi")[0]
+
+        with run_logger(config=config):
+            if use_cache:
+                scan_biosample_xml_file(xml_path, is_ddbj=False)
+            all_ids = [doc.identifier for doc in iter_bs_instances(xml_path, is_ddbj=False)]
+            rejected = set(all_ids[::2])
+            accepted = [
+                doc.identifier
+                for doc in iter_bs_instances(xml_path, is_ddbj=False, accept=lambda acc: acc not in rejected)
+            ]
+
+        assert rejected
+        assert accepted == [acc for acc in all_ids if acc not in rejected]
+
+    def test_non_target_ddbj_elements_are_not_parsed(
+        self, tmp_path: Path, clean_ctx: None, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """DDBJ 差分更新で対象外の要素は、バイト列から accession を取った段階で落とす。"""
+        config = Config(result_dir=tmp_path, const_dir=tmp_path)
+        xml_path = _split_fixture(tmp_path / "tmp_xml", "ddbj_biosample_set.xml.gz", "ddbj")[0]
+
+        with run_logger(config=config):
+            all_ids = [doc.identifier for doc in iter_bs_instances(xml_path, is_ddbj=True)]
+            target = {all_ids[0]}
+
+            converted: list[str] = []
+            original = jsonl_bs.xml_entry_to_bs_instance
+
+            def counting(entry: dict[str, Any], is_ddbj: bool) -> BioSample:
+                bs_instance = original(entry, is_ddbj)
+                converted.append(bs_instance.identifier)
+                return bs_instance
+
+            monkeypatch.setattr(jsonl_bs, "xml_entry_to_bs_instance", counting)
+            entry_filter = EntryFilter(blacklist=set(), target_accessions=target)
+            result = [doc.identifier for doc in iter_bs_instances(xml_path, is_ddbj=True, accept=entry_filter)]
+
+        assert result == [all_ids[0]]
+        assert converted == [all_ids[0]]
+        assert entry_filter.filtered_count == len(all_ids) - 1
+
+    def test_entry_cache_name_for_compressed_split_file(self, tmp_path: Path, clean_ctx: None) -> None:
+        config = Config(result_dir=tmp_path, const_dir=tmp_path)
+        xml_path = _split_fixture(tmp_path / "tmp_xml", "biosample_set.xml.gz", "ncbi", "gzip")[0]
+        with run_logger(config=config):
+            scan_biosample_xml_file(xml_path, is_ddbj=False)
+
+        assert xml_path.name == "ncbi_1.xml.gz"
+        assert entry_cache_path(xml_path).name == "ncbi_1.entries.jsonl"
+        assert entry_cache_usable(xml_path)
+
+    def test_stale_entry_cache_is_not_used(self, tmp_path: Path, clean_ctx: None) -> None:
+        """分割をやり直して XML の方が新しくなったら cache は使わない。"""
+        config = Config(result_dir=tmp_path, const_dir=tmp_path)
+        xml_path = _split_fixture(tmp_path / "tmp_xml", "biosample_set.xml.gz", "ncbi")[0]
+        with run_logger(config=config):
+            scan_biosample_xml_file(xml_path, is_ddbj=False)
+        cache_stat = entry_cache_path(xml_path).stat()
+        if xml_path.stat().st_mtime <= cache_stat.st_mtime:
+            os.utime(xml_path, ns=(cache_stat.st_atime_ns, cache_stat.st_mtime_ns + 1_000_000))
+
+        assert entry_cache_usable(xml_path) is False
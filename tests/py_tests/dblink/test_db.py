@@ -12,23 +12,29 @@ from ddbj_search_converter.config import Config
 from ddbj_search_converter.dblink.db import (
     AccessionType,
     Edge,
+    EdgeSink,
     build_dbxref_table,
     export_edges,
     finalize_dblink_db,
     finalize_umbrella_db,
     get_linked_entities,
     get_linked_entities_bulk,
+    get_linked_entities_capped,
     get_umbrella_parent_child_maps,
     init_dblink_db,
     init_umbrella_db,
     load_edges_from_tsv,
+    load_to_db,
     normalize_edge,
+    patch_dbxref_table,
     save_umbrella_relations,
     write_edges_to_tsv,
 )
 from ddbj_search_converter.logging.logger import run_logger
 from tests.py_tests.strategies import st_accession_type
 
+from ._dbxref_assertions import assert_dbxref_symmetric
+
 
 class TestNormalizeEdge:
     """Tests for normalize_edge function."""
@@ -218,6 +224,94 @@ class TestLoadEdgesFromTsv:
             assert rows[0] == 1
 
 
+class TestEdgeSink:
+    """Tests for EdgeSink / load_to_db."""
+
+    @staticmethod
+    def _raw_edges(config: Config) -> list[tuple[str, str, str, str]]:
+        db_path = config.const_dir / "dblink" / "dblink.tmp.duckdb"
+        with duckdb.connect(str(db_path)) as conn:
+            return sorted(conn.execute("SELECT * FROM raw_edges").fetchall())
+
+    def test_normalizes_direction(self, test_config: Config) -> None:
+        init_dblink_db(test_config)
+        with EdgeSink(test_config) as sink:
+            sink.add_pairs([("SAMD1", "PRJDB1")], "biosample", "bioproject")
+            sink.add_pairs([("PRJDB2", "SAMD2")], "bioproject", "biosample")
+        assert self._raw_edges(test_config) == [
+            ("bioproject", "PRJDB1", "biosample", "SAMD1"),
+            ("bioproject", "PRJDB2", "biosample", "SAMD2"),
+        ]
+
+    def test_same_type_orders_by_accession(self, test_config: Config) -> None:
+        init_dblink_db(test_config)
+        with EdgeSink(test_config) as sink:
+            sink.add_pairs([("PRJDB9", "PRJDB1")], "bioproject", "bioproject")
+        assert self._raw_edges(test_config) == [("bioproject", "PRJDB1", "bioproject", "PRJDB9")]
+
+    def test_add_pairs_splits_batches(self, test_config: Config) -> None:
+        init_dblink_db(test_config)
+        pairs = [(f"SAMD{i}", f"PRJDB{i}") for i in range(10)]
+        with EdgeSink(test_config) as sink:
+            assert sink.add_pairs(pairs, "biosample", "bioproject", batch_size=3) == 10
+        assert len(self._raw_edges(test_config)) == 10
+
+    def test_empty_input(self, test_config: Config) -> None:
+        init_dblink_db(test_config)
+        with EdgeSink(test_config) as sink:
+            assert sink.add_pairs([], "biosample", "bioproject") == 0
+            sink.add_columns("biosample", [], "bioproject", [])
+        assert self._raw_edges(test_config) == []
+
+    def test_rejects_length_mismatch(self, test_config: Config) -> None:
+        init_dblink_db(test_config)
+        with EdgeSink(test_config) as sink, pytest.raises(ValueError, match="length mismatch"):
+            sink.add_columns("biosample", ["SAMD1", "SAMD2"], "bioproject", ["PRJDB1"])
+
+    def test_rejects_newline_in_accession(self, test_config: Config) -> None:
+        init_dblink_db(test_config)
+        with EdgeSink(test_config) as sink, pytest.raises(ValueError, match="newline"):
+            sink.add_pairs([("SAMD1\nSAMD2", "PRJDB1")], "biosample", "bioproject")
+        assert self._raw_edges(test_config) == []
+
+    def test_load_to_db_reuses_sink(self, test_config: Config) -> None:
+        init_dblink_db(test_config)
+        with run_logger(config=test_config):
+            with EdgeSink(test_config) as sink:
+                load_to_db(test_config, {("SAMD1", "PRJDB1")}, "biosample", "bioproject", sink=sink)
+                load_to_db(test_config, {("JGAS000001", "hum0001")}, "jga-study", "humandbs", sink=sink)
+            load_to_db(test_config, {("E-GEAD-1", "PRJDB1")}, "gea", "bioproject")
+        assert self._raw_edges(test_config) == [
+            ("bioproject", "PRJDB1", "biosample", "SAMD1"),
+            ("bioproject", "PRJDB1", "gea", "E-GEAD-1"),
+            ("humandbs", "hum0001", "jga-study", "JGAS000001"),
+        ]
+
+    @given(
+        type_pair=st.tuples(st_accession_type(), st_accession_type()),
+        pairs=st.lists(
+            st.tuples(
+                st.text(min_size=1, max_size=10, alphabet=st.characters(categories=("L", "N", "P"))),
+                st.text(min_size=1, max_size=10, alphabet=st.characters(categories=("L", "N", "P"))),
+            ),
+            max_size=30,
+        ),
+    )
+    def test_matches_normalize_edge(self, type_pair: tuple[str, str], pairs: list[tuple[str, str]]) -> None:
+        """PBT: SQL 側の正規化は ``normalize_edge`` と同じ行を生む。"""
+        type_src, type_dst = type_pair
+        with tempfile.TemporaryDirectory() as tmp:
+            config = Config(result_dir=Path(tmp), const_dir=Path(tmp) / "const")
+            init_dblink_db(config)
+            with EdgeSink(config) as sink:
+                sink.add_pairs(pairs, type_src, type_dst, batch_size=7)  # type: ignore[arg-type]
+            result = self._raw_edges(config)
+
+        expected = sorted(normalize_edge(type_src, a, type_dst, b) for a, b in pairs)  # type: ignore[arg-type]
+        assert result == expected
+
+
+@pytest.mark.usefixtures("with_logger_isolated")
 class TestBuildDbxrefTable:
     """Tests for build_dbxref_table function.
 
@@ -225,6 +319,25 @@ class TestBuildDbxrefTable:
     展開される。DISTINCT により ``raw_edges`` 段階での完全重複は dedup される。
     """
 
+    def test_splits_large_types_into_sorted_ranges(self, test_config: Config, monkeypatch: pytest.MonkeyPatch) -> None:
+        """閾値を超える accession_type は accession 範囲に分けて build し、連結しても sort 済み。"""
+        monkeypatch.setattr("ddbj_search_converter.dblink.db.DBXREF_PARTITION_ROWS", 5)
+        rows = [
+            *[("bioproject", f"PRJDB{i % 7}", "biosample", f"SAMD{i:03d}") for i in range(40)],
+            ("bioproject", "PRJDB1", "biosample", "SAMD001"),
+            ("biosample", "SAMD001", "sra-run", "DRR000001"),
+        ]
+        init_dblink_db(test_config)
+        db_path = test_config.const_dir / "dblink" / "dblink.tmp.duckdb"
+        with duckdb.connect(str(db_path)) as conn:
+            conn.executemany("INSERT INTO raw_edges VALUES (?, ?, ?, ?)", rows)
+        build_dbxref_table(test_config)
+
+        with duckdb.connect(str(db_path)) as conn:
+            result = conn.execute("SELECT * FROM dbxref").fetchall()
+        expected = {(a, b, c, d) for a, b, c, d in rows} | {(c, d, a, b) for a, b, c, d in rows}
+        assert result == sorted(expected)
+
     def test_removes_duplicates_and_expands(self, test_config: Config) -> None:
         """重複する canonical edge が dedup され、残った各 edge が半辺 2 行に展開される。"""
         init_dblink_db(test_config)
@@ -339,6 +452,7 @@ class TestBuildDbxrefTable:
         assert result == sorted(expected)
 
 
+@pytest.mark.usefixtures("with_logger_isolated")
 class TestFinalizeDblinkDb:
     """Tests for finalize_dblink_db function."""
 
@@ -361,6 +475,142 @@ class TestFinalizeDblinkDb:
             assert count[0] == 2
 
 
+class TestPatchDbxrefTable:
+    """Tests for the incremental path of finalize_dblink_db (patch_dbxref_table)."""
+
+    BASE_EDGES: list[Edge] = [
+        *[("bioproject", f"PRJDB{i}", "biosample", f"SAMD{i}") for i in range(60)],
+        *[("bioproject", f"PRJDB{i}", "insdc", f"AB{i:06d}") for i in range(38)],
+        ("bioproject", "PRJDB1", "bioproject", "PRJDB2"),
+        ("humandbs", "hum0001", "jga-study", "JGAS000001"),
+    ]
+
+    @staticmethod
+    def _run_day(config: Config, edges: list[Edge], *, full: bool = False) -> None:
+        init_dblink_db(config)
+        tmp_db_path = config.const_dir / "dblink" / "dblink.tmp.duckdb"
+        with duckdb.connect(str(tmp_db_path)) as conn:
+            conn.executemany("INSERT INTO raw_edges VALUES (?, ?, ?, ?)", edges)
+        with run_logger(config=config):
+            finalize_dblink_db(config, full=full)
+
+    @staticmethod
+    def _dbxref_rows(config: Config) -> list[tuple[str, str, str, str]]:
+        final_db_path = config.const_dir / "dblink" / "dblink.duckdb"
+        with duckdb.connect(str(final_db_path), read_only=True) as conn:
+            return conn.execute("SELECT * FROM dbxref").fetchall()
+
+    @staticmethod
+    def _half_edges(edges: list[Edge]) -> list[tuple[str, str, str, str]]:
+        return sorted({(a, b, c, d) for a, b, c, d in edges} | {(c, d, a, b) for a, b, c, d in edges})
+
+    def test_patch_matches_full_rebuild(self, test_config: Config) -> None:
+        self._run_day(test_config, self.BASE_EDGES)
+
+        # 100 edge 中 4 edge (same-type edge の削除を含む) だけ変える
+        next_edges = [
+            *self.BASE_EDGES[2:98],
+            ("humandbs", "hum0001", "jga-study", "JGAS000001"),
+            ("bioproject", "PRJDB100", "biosample", "SAMD100"),
+            ("biosample", "SAMD1", "gea", "E-GEAD-1"),
+        ]
+        self._run_day(test_config, next_edges)
+
+        assert sorted(self._dbxref_rows(test_config)) == self._half_edges(next_edges)
+        assert_dbxref_symmetric(test_config)
+        assert not (test_config.const_dir / "dblink" / "dblink.tmp.duckdb").exists()
+        assert not (test_config.const_dir / "dblink" / "dblink.patch.duckdb").exists()
+
+    def test_unchanged_edges_keep_dbxref(self, test_config: Config) -> None:
+        self._run_day(test_config, self.BASE_EDGES)
+        before = self._dbxref_rows(test_config)
+        self._run_day(test_config, self.BASE_EDGES)
+        assert self._dbxref_rows(test_config) == before
+
+    def test_large_delta_falls_back_to_full_rebuild(self, test_config: Config) -> None:
+        self._run_day(test_config, self.BASE_EDGES)
+        replaced: list[Edge] = [("bioproject", f"PRJDB{i}", "gea", f"E-GEAD-{i}") for i in range(10)]
+        self._run_day(test_config, replaced)
+
+        rows = self._dbxref_rows(test_config)
+        # 全件 rebuild なので物理 sort も保たれる
+        assert rows == self._half_edges(replaced)
+        assert_dbxref_symmetric(test_config)
+
+    def test_returns_false_without_touching_final(self, test_config: Config) -> None:
+        self._run_day(test_config, self.BASE_EDGES)
+        before = self._dbxref_rows(test_config)
+
+        init_dblink_db(test_config)
+        with run_logger(config=test_config):
+            assert patch_dbxref_table(test_config) is False
+        assert self._dbxref_rows(test_config) == before
+        assert (test_config.const_dir / "dblink" / "dblink.tmp.duckdb").exists()
+        assert not (test_config.const_dir / "dblink" / "dblink.patch.duckdb").exists()
+
+    @staticmethod
+    def _meta(config: Config) -> tuple[int, int]:
+        final_db_path = config.const_dir / "dblink" / "dblink.duckdb"
+        with duckdb.connect(str(final_db_path), read_only=True) as conn:
+            row = conn.execute("SELECT patch_count, patched_edges FROM dbxref_meta").fetchone()
+        assert row is not None
+        return row[0], row[1]
+
+    def test_patch_updates_meta(self, test_config: Config) -> None:
+        self._run_day(test_config, self.BASE_EDGES)
+        assert self._meta(test_config) == (0, 0)
+        self._run_day(test_config, self.BASE_EDGES[1:])
+        assert self._meta(test_config) == (1, 1)
+        self._run_day(test_config, self.BASE_EDGES[2:])
+        assert self._meta(test_config) == (2, 2)
+
+    def test_patch_count_limit_forces_full_rebuild(self, test_config: Config, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr("ddbj_search_converter.dblink.db.PATCH_MAX_COUNT", 1)
+        self._run_day(test_config, self.BASE_EDGES)
+        self._run_day(test_config, self.BASE_EDGES[1:])
+        assert self._meta(test_config) == (1, 1)
+
+        next_edges = [*self.BASE_EDGES[1:], ("biosample", "SAMD1", "gea", "E-GEAD-1")]
+        self._run_day(test_config, next_edges)
+        assert self._meta(test_config) == (0, 0)
+        # 全件 rebuild なので物理 sort も戻る
+        assert self._dbxref_rows(test_config) == self._half_edges(next_edges)
+
+    def test_cumulative_drift_forces_full_rebuild(self, test_config: Config, monkeypatch: pytest.MonkeyPatch) -> None:
+        """1 回ごとの差分は小さくても、累積が PATCH_MAX_DRIFT_RATIO を超えたら全件 rebuild する。"""
+        monkeypatch.setattr("ddbj_search_converter.dblink.db.PATCH_MAX_DRIFT_RATIO", 0.06)
+        self._run_day(test_config, self.BASE_EDGES)
+        self._run_day(test_config, self.BASE_EDGES[4:])
+        assert self._meta(test_config) == (1, 4)
+
+        next_edges = self.BASE_EDGES[8:]
+        self._run_day(test_config, next_edges)
+        assert self._meta(test_config) == (0, 0)
+        assert self._dbxref_rows(test_config) == self._half_edges(next_edges)
+
+    def test_missing_meta_forces_full_rebuild(self, test_config: Config) -> None:
+        self._run_day(test_config, self.BASE_EDGES)
+        final_db_path = test_config.const_dir / "dblink" / "dblink.duckdb"
+        with duckdb.connect(str(final_db_path)) as conn:
+            conn.execute("DROP TABLE dbxref_meta")
+
+        init_dblink_db(test_config)
+        with run_logger(config=test_config):
+            assert patch_dbxref_table(test_config) is False
+        assert not (test_config.const_dir / "dblink" / "dblink.patch.duckdb").exists()
+
+    def test_full_skips_patch(self, test_config: Config, monkeypatch: pytest.MonkeyPatch) -> None:
+        self._run_day(test_config, self.BASE_EDGES)
+
+        def fail(_config: Config) -> bool:
+            raise AssertionError("patch_dbxref_table must not be called with full=True")
+
+        monkeypatch.setattr("ddbj_search_converter.dblink.db.patch_dbxref_table", fail)
+        self._run_day(test_config, self.BASE_EDGES[:50], full=True)
+        assert self._dbxref_rows(test_config) == self._half_edges(self.BASE_EDGES[:50])
+
+
+@pytest.mark.usefixtures("with_logger_isolated")
 class TestGetLinkedEntities:
     """Tests for get_linked_entities function."""
 
@@ -396,6 +646,7 @@ class TestGetLinkedEntities:
         assert results == []
 
 
+@pytest.mark.usefixtures("with_logger_isolated")
 class TestGetLinkedEntitiesBulk:
     """Tests for get_linked_entities_bulk function."""
 
@@ -429,6 +680,56 @@ class TestGetLinkedEntitiesBulk:
         assert results == {}
 
 
+@pytest.mark.usefixtures("with_logger_isolated")
+class TestGetLinkedEntitiesCapped:
+    """Tests for get_linked_entities_capped function (DuckDB path)."""
+
+    @staticmethod
+    def _setup(config: Config) -> None:
+        init_dblink_db(config)
+        tmp_db_path = config.const_dir / "dblink" / "dblink.tmp.duckdb"
+        with duckdb.connect(str(tmp_db_path)) as conn:
+            conn.executemany(
+                "INSERT INTO raw_edges VALUES (?, ?, ?, ?)",
+                [
+                    *[("bioproject", "PRJDB1", "biosample", f"SAMD{i}") for i in (3, 1, 2)],
+                    ("bioproject", "PRJDB1", "gea", "E-GEAD-1"),
+                    ("bioproject", "PRJDB2", "biosample", "SAMD9"),
+                ],
+            )
+        finalize_dblink_db(config)
+
+    def test_caps_each_type_and_counts_all(self, test_config: Config) -> None:
+        self._setup(test_config)
+        results = get_linked_entities_capped(
+            test_config, entity_type="bioproject", accessions=["PRJDB1", "PRJDB2", "PRJDB404"], max_per_type=2
+        )
+        assert results == {
+            "PRJDB1": (
+                [("biosample", "SAMD1"), ("biosample", "SAMD2"), ("gea", "E-GEAD-1")],
+                {"biosample": 3, "gea": 1},
+            ),
+            "PRJDB2": ([("biosample", "SAMD9")], {"biosample": 1}),
+        }
+
+    def test_zero_keeps_all(self, test_config: Config) -> None:
+        self._setup(test_config)
+        results = get_linked_entities_capped(
+            test_config, entity_type="bioproject", accessions=["PRJDB1", "PRJDB1"], max_per_type=0
+        )
+        assert results == {
+            "PRJDB1": (
+                [("biosample", "SAMD1"), ("biosample", "SAMD2"), ("biosample", "SAMD3"), ("gea", "E-GEAD-1")],
+                {"biosample": 3, "gea": 1},
+            ),
+        }
+
+    def test_returns_empty_dict_for_empty_input(self, test_config: Config) -> None:
+        self._setup(test_config)
+        assert get_linked_entities_capped(test_config, entity_type="bioproject", accessions=[], max_per_type=2) == {}
+
+
+@pytest.mark.usefixtures("with_logger_isolated")
 class TestExportEdges:
     """Tests for export_edges function."""
 
@@ -0,0 +1,201 @@
+"""Tests for ddbj_search_converter.dblink.lookup_index module."""
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from ddbj_search_converter.config import TODAY_STR, Config
+from ddbj_search_converter.dblink import lookup_index
+from ddbj_search_converter.dblink.db import (
+    Edge,
+    _apply_duckdb_limits,
+    finalize_dblink_db,
+    get_linked_entities_bulk,
+    get_linked_entities_capped,
+    init_dblink_db,
+)
+from ddbj_search_converter.dblink.lookup_index import build_lookup_index, close_lookup_indexes, open_lookup_index
+from ddbj_search_converter.logging.logger import _ctx, init_logger
+
+EDGES: list[Edge] = [
+    ("bioproject", "PRJDB1", "biosample", "SAMD00000001"),
+    ("bioproject", "PRJDB1", "biosample", "SAMD00000002"),
+    ("bioproject", "PRJDB2", "biosample", "SAMD00000002"),
+    ("bioproject", "PRJDB1", "humandbs", "hum0001"),
+    ("biosample", "SAMD00000002", "sra-sample", "DRS000001"),
+    ("bioproject", "PRJDB10", "bioproject", "PRJDB2"),
+    ("bioproject", "PRJDB10", "insdc", "AB000001"),
+    ("bioproject", "PRJDB10", "insdc", "AB000002"),
+    ("bioproject", "PRJDB10", "insdc-assembly", "GCA_000000001.1"),
+    ("biosample", "SAMD00000003", "gea", "E-GEAD-1"),
+]
+
+
+@pytest.fixture(autouse=True)
+def _setup(test_config: Config) -> Iterator[None]:
+    init_logger(run_name="test_lookup_index", config=test_config)
+    init_dblink_db(test_config)
+    tmp_db_path = test_config.const_dir / "dblink" / "dblink.tmp.duckdb"
+    with duckdb.connect(str(tmp_db_path)) as conn:
+        conn.executemany("INSERT INTO raw_edges VALUES (?, ?, ?, ?)", EDGES)
+    finalize_dblink_db(test_config)
+    close_lookup_indexes()
+    yield
+    close_lookup_indexes()
+    _ctx.set(None)
+
+
+def _sql_lookup(config: Config, entity_type: str, accessions: list[str]) -> dict[str, list[tuple[str, str]]]:
+    db_path = config.const_dir / "dblink" / "dblink.duckdb"
+    result: dict[str, list[tuple[str, str]]] = {}
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        for accession in accessions:
+            rows = conn.execute(
+                "SELECT linked_type, linked_accession FROM dbxref WHERE accession_type = ? AND accession = ?",
+                (entity_type, accession),
+            ).fetchall()
+            if rows:
+                result[accession] = sorted(rows)
+    return result
+
+
+class TestLookupIndex:
+    """Tests for build_lookup_index / open_lookup_index."""
+
+    @pytest.mark.parametrize(
+        ("entity_type", "accessions"),
+        [
+            ("bioproject", ["PRJDB1", "PRJDB2", "PRJDB10", "PRJDB3", "PRJDB0", "PRJDB99"]),
+            ("biosample", ["SAMD00000001", "SAMD00000002", "SAMD00000003", "SAMD00000000", "SAMD99999999"]),
+            ("gea", ["E-GEAD-1", "E-GEAD-2"]),
+        ],
+    )
+    def test_matches_dbxref(self, test_config: Config, entity_type: str, accessions: list[str]) -> None:
+        build_lookup_index(test_config)
+        index = open_lookup_index(test_config, entity_type)
+        assert index is not None
+        result = {acc: sorted(linked) for acc, linked in index.get_bulk(accessions).items()}
+        assert result == _sql_lookup(test_config, entity_type, accessions)
+
+    def test_get_linked_entities_bulk_uses_index(
+        self,
+        test_config: Config,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        build_lookup_index(test_config)
+
+        def fail(*_args: object, **_kwargs: object) -> None:
+            raise AssertionError("dblink.duckdb must not be opened when the index is fresh")
+
+        monkeypatch.setattr("ddbj_search_converter.dblink.db.duckdb.connect", fail)
+        result = get_linked_entities_bulk(test_config, entity_type="bioproject", accessions=["PRJDB1", "PRJDB404"])
+        assert sorted(result["PRJDB1"]) == [
+            ("biosample", "SAMD00000001"),
+            ("biosample", "SAMD00000002"),
+            ("humandbs", "hum0001"),
+        ]
+        assert "PRJDB404" not in result
+
+    def test_missing_index_returns_none(self, test_config: Config) -> None:
+        assert open_lookup_index(test_config, "bioproject") is None
+
+    def test_missing_type_returns_none(self, test_config: Config) -> None:
+        build_lookup_index(test_config)
+        assert open_lookup_index(test_config, "jga-study") is None
+
+    def test_stale_index_is_ignored(self, test_config: Config) -> None:
+        build_lookup_index(test_config)
+        final_db_path = test_config.const_dir / "dblink" / "dblink.duckdb"
+        stat = final_db_path.stat()
+        os.utime(final_db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert open_lookup_index(test_config, "bioproject") is None
+        # DuckDB への fallback で同じ結果が返る
+        result = get_linked_entities_bulk(test_config, entity_type="gea", accessions=["E-GEAD-1"])
+        assert result == {"E-GEAD-1": [("biosample", "SAMD00000003")]}
+
+    def test_rebuild_replaces_index(self, test_config: Config) -> None:
+        build_lookup_index(test_config)
+        build_lookup_index(test_config)
+        index_dir = test_config.const_dir / "dblink" / "dbxref_index"
+        assert index_dir.joinpath("manifest.json").exists()
+        assert not index_dir.with_name("dbxref_index.tmp").exists()
+        assert not list(index_dir.glob("*.part"))
+
+    def test_offsets_survive_flush(self, test_config: Config, monkeypatch: pytest.MonkeyPatch) -> None:
+        """offset 配列を途中で file に flush しても、key と隣接の対応が崩れない。"""
+        monkeypatch.setattr(lookup_index, "_FETCH_SIZE", 1)
+        monkeypatch.setattr(lookup_index, "_OFFSET_FLUSH_SIZE", 2)
+        build_lookup_index(test_config)
+        index = open_lookup_index(test_config, "biosample")
+        assert index is not None
+        accessions = ["SAMD00000001", "SAMD00000002", "SAMD00000003"]
+        result = {acc: sorted(linked) for acc, linked in index.get_bulk(accessions).items()}
+        assert result == _sql_lookup(test_config, "biosample", accessions)
+
+    @pytest.mark.parametrize("max_per_type", [0, 1, 2, 5])
+    def test_capped_matches_duckdb(self, test_config: Config, max_per_type: int) -> None:
+        """index の type ごとの切り出しと DuckDB の row_number() が同じ隣接と件数を返す。"""
+        accessions = ["PRJDB1", "PRJDB2", "PRJDB10", "PRJDB404"]
+        expected = get_linked_entities_capped(
+            test_config, entity_type="bioproject", accessions=accessions, max_per_type=max_per_type
+        )
+        build_lookup_index(test_config)
+        assert open_lookup_index(test_config, "bioproject") is not None
+        result = get_linked_entities_capped(
+            test_config, entity_type="bioproject", accessions=accessions, max_per_type=max_per_type
+        )
+        assert result == expected
+
+    def test_get_capped_slices_per_type(self, test_config: Config) -> None:
+        build_lookup_index(test_config)
+        index = open_lookup_index(test_config, "bioproject")
+        assert index is not None
+        assert index.get_capped("PRJDB1", 1) == (
+            [("biosample", "SAMD00000001"), ("humandbs", "hum0001")],
+            {"biosample": 2, "humandbs": 1},
+        )
+        assert index.get_capped("PRJDB404", 1) is None
+
+    def test_applies_duckdb_limits(self, test_config: Config, monkeypatch: pytest.MonkeyPatch) -> None:
+        """全 accession の string_agg は spill しうるので、dbxref の build と同じ limit を掛ける。"""
+        calls: list[Path] = []
+
+        def record(conn: duckdb.DuckDBPyConnection, spill_dir: Path) -> None:
+            calls.append(spill_dir)
+            _apply_duckdb_limits(conn, spill_dir)
+
+        monkeypatch.setattr("ddbj_search_converter.dblink.db._apply_duckdb_limits", record)
+        build_lookup_index(test_config)
+
+        assert calls == [test_config.result_dir / "dblink" / "duckdb_tmp" / TODAY_STR]
+        assert calls[0].is_dir()
+
+    def test_replaced_source_closes_stale_indexes(self, test_config: Config) -> None:
+        """dblink.duckdb が置き換わったら、前の DB 向けに開いた index は閉じて捨てる。"""
+        build_lookup_index(test_config)
+        stale = open_lookup_index(test_config, "bioproject")
+        assert stale is not None
+        assert open_lookup_index(test_config, "bioproject") is stale
+
+        final_db_path = test_config.const_dir / "dblink" / "dblink.duckdb"
+        stat = final_db_path.stat()
+        os.utime(final_db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        build_lookup_index(test_config)
+
+        fresh = open_lookup_index(test_config, "bioproject")
+        assert fresh is not None
+        assert fresh is not stale
+        assert stale._mm.closed
+        assert [indexes for _, indexes in lookup_index._OPENED.values()] == [{"bioproject": fresh}]
+
+    def test_context_manager_closes_mmap(self, test_config: Config) -> None:
+        build_lookup_index(test_config)
+        path = test_config.const_dir / "dblink" / "dbxref_index" / "bioproject.idx"
+        with lookup_index.LookupIndex(path) as index:
+            assert index.get("PRJDB2") == [("bioproject", "PRJDB10"), ("biosample", "SAMD00000002")]
+        assert index._mm.closed
+        index.close()
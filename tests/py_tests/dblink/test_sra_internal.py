@@ -1,7 +1,7 @@
 """Tests for ddbj_search_converter.dblink.sra_internal module.
 
 process_sra_internal_relations の統合テスト。
-BioProject/BioSample <-> SRA 関連の抽出・フィルタを検証する。
+SRA 内部関連と BioProject/BioSample <-> SRA 関連の抽出・フィルタを検証する。
 """
 
 from collections.abc import Generator
@@ -12,8 +12,9 @@ import pytest
 
 from ddbj_search_converter.config import Config
 from ddbj_search_converter.dblink.db import init_dblink_db
-from ddbj_search_converter.dblink.sra_internal import process_sra_internal_relations
+from ddbj_search_converter.dblink.sra_internal import SRA_RELATION_SPECS, process_sra_internal_relations
 from ddbj_search_converter.logging.logger import _ctx, run_logger
+from ddbj_search_converter.sra_accessions_tab import SourceKind
 
 
 @pytest.fixture
@@ -78,6 +79,116 @@ def _default_kwargs() -> dict:  # type: ignore[type-arg]
     }
 
 
+# 関連ごとの仕様: (a_type, b_type, a 側の列, b 側の列, accessions.Type)
+_RELATIONS: list[tuple[str, str, str, str, str]] = [
+    # SRA 内部関連
+    ("sra-submission", "sra-study", "Submission", "Accession", "STUDY"),
+    ("sra-study", "sra-experiment", "Study", "Accession", "EXPERIMENT"),
+    ("sra-study", "sra-analysis", "Study", "Accession", "ANALYSIS"),
+    ("sra-submission", "sra-analysis", "Submission", "Accession", "ANALYSIS"),
+    ("sra-experiment", "sra-run", "Experiment", "Accession", "RUN"),
+    ("sra-experiment", "sra-sample", "Accession", "Sample", "EXPERIMENT"),
+    ("sra-run", "sra-sample", "Accession", "Sample", "RUN"),
+    # SRA 階層横断関連
+    ("sra-submission", "sra-experiment", "Submission", "Accession", "EXPERIMENT"),
+    ("sra-submission", "sra-run", "Submission", "Accession", "RUN"),
+    ("sra-submission", "sra-sample", "Submission", "Accession", "SAMPLE"),
+    ("sra-study", "sra-run", "Study", "Accession", "RUN"),
+    ("sra-study", "sra-sample", "Study", "Sample", "EXPERIMENT"),
+    # BioProject <-> SRA
+    ("bioproject", "sra-study", "BioProject", "Accession", "STUDY"),
+    ("bioproject", "sra-experiment", "BioProject", "Accession", "EXPERIMENT"),
+    ("bioproject", "sra-run", "BioProject", "Accession", "RUN"),
+    ("bioproject", "sra-analysis", "BioProject", "Accession", "ANALYSIS"),
+    # BioSample <-> SRA
+    ("biosample", "sra-sample", "BioSample", "Accession", "SAMPLE"),
+    ("biosample", "sra-experiment", "BioSample", "Accession", "EXPERIMENT"),
+    ("biosample", "sra-run", "BioSample", "Accession", "RUN"),
+    ("biosample", "sra-analysis", "BioSample", "Accession", "ANALYSIS"),
+]
+
+# type ごとの ID_PATTERN_MAP に通る accession
+_VALID_IDS: dict[str, str] = {
+    "sra-submission": "DRA000001",
+    "sra-study": "DRP000001",
+    "sra-experiment": "DRX000001",
+    "sra-run": "DRR000001",
+    "sra-sample": "DRS000001",
+    "sra-analysis": "DRZ000001",
+    "bioproject": "PRJDB1",
+    "biosample": "SAMD00000001",
+}
+
+_ACCESSIONS_COLUMNS = ["Accession", "Submission", "BioSample", "BioProject", "Study", "Experiment", "Sample"]
+
+
+def _relation_id(spec: tuple[str, str, str, str, str]) -> str:
+    return f"{spec[0]}-{spec[1]}"
+
+
+def _make_row(type_val: str, values: dict[str, str | None]) -> tuple:  # type: ignore[type-arg]
+    """指定した列だけ値を入れた accessions の行を作る。"""
+    return (*(values.get(column) for column in _ACCESSIONS_COLUMNS), type_val, "live", "public", None, None, None)
+
+
+def _relation_row(spec: tuple[str, str, str, str, str], *, type_val: str | None = None, b: str | None = "") -> tuple:  # type: ignore[type-arg]
+    a_type, b_type, col_a, col_b, type_filter = spec
+    b_val = _VALID_IDS[b_type] if b == "" else b
+    return _make_row(type_val or type_filter, {col_a: _VALID_IDS[a_type], col_b: b_val})
+
+
+def _expected_edge(spec: tuple[str, str, str, str, str]) -> tuple[str, str, str, str]:
+    a = (spec[0], _VALID_IDS[spec[0]])
+    b = (spec[1], _VALID_IDS[spec[1]])
+    lo, hi = min(a, b), max(a, b)
+    return (*lo, *hi)
+
+
+def _run(config: Config, source: SourceKind) -> list[tuple[str, str, str, str]]:
+    with run_logger(config=config):
+        process_sra_internal_relations(config, source=source, **_default_kwargs())
+    return _get_relations(config)
+
+
+class TestRelationSpecs:
+    """関連ごとの列・Type の対応を SQL 経路 (process_sra_internal_relations) で検証する。"""
+
+    def test_specs_cover_all_relations(self) -> None:
+        assert sorted(SRA_RELATION_SPECS) == sorted(_RELATIONS)
+
+    @pytest.mark.parametrize("spec", _RELATIONS, ids=_relation_id)
+    @pytest.mark.parametrize("source", ["sra", "dra"])
+    def test_matching_row_returned(self, tmp_path: Path, clean_ctx: None, spec: tuple, source: SourceKind) -> None:  # type: ignore[type-arg]
+        """列と Type が合う行から edge が 1 本できる (sra/dra 両 source)。"""
+        config = _make_config(tmp_path, source, [_relation_row(spec)])
+        assert _run(config, source) == [_expected_edge(spec)]
+
+    @pytest.mark.parametrize("spec", _RELATIONS, ids=_relation_id)
+    def test_wrong_type_excluded(self, tmp_path: Path, clean_ctx: None, spec: tuple) -> None:  # type: ignore[type-arg]
+        """Type が違う行は使わない。"""
+        config = _make_config(tmp_path, "sra", [_relation_row(spec, type_val="SUBMISSION")])
+        assert _run(config, "sra") == []
+
+    @pytest.mark.parametrize("spec", _RELATIONS, ids=_relation_id)
+    @pytest.mark.parametrize("b", [None, ""], ids=["null", "empty"])
+    def test_missing_column_excluded(self, tmp_path: Path, clean_ctx: None, spec: tuple, b: str | None) -> None:  # type: ignore[type-arg]
+        """片側の列が NULL / 空文字の行は使わない。"""
+        row = _make_row(spec[4], {spec[2]: _VALID_IDS[spec[0]], spec[3]: b})
+        config = _make_config(tmp_path, "sra", [row])
+        assert _run(config, "sra") == []
+
+    @pytest.mark.parametrize("spec", _RELATIONS, ids=_relation_id)
+    def test_duplicate_rows_dedup(self, tmp_path: Path, clean_ctx: None, spec: tuple) -> None:  # type: ignore[type-arg]
+        """同じ行が複数あっても edge は 1 本。"""
+        row = _relation_row(spec)
+        config = _make_config(tmp_path, "sra", [row, row])
+        assert _run(config, "sra") == [_expected_edge(spec)]
+
+    def test_empty_table(self, tmp_path: Path, clean_ctx: None) -> None:
+        config = _make_config(tmp_path, "sra", [])
+        assert _run(config, "sra") == []
+
+
 class TestBpStudyRelation:
     """BioProject <-> Study 関連テスト。"""
 
@@ -348,6 +459,37 @@ class TestStudySampleRelation:
         assert "SRS000001" in accessions
 
 
+class TestEdgeShape:
+    """raw_edges に入る edge の形のテスト。"""
+
+    def test_edges_are_canonical_and_distinct(self, tmp_path: Path, clean_ctx: None) -> None:
+        """edge は normalize_edge と同じ向きで、重複行は 1 つにまとまる。"""
+        row = (
+            "SRP000001",
+            "SRA000001",
+            None,
+            "PRJNA1",
+            "SRP000001",
+            None,
+            None,
+            "STUDY",
+            "live",
+            "public",
+            None,
+            None,
+            None,
+        )
+        config = _make_config(tmp_path, "sra", [row, row])
+        with run_logger(config=config):
+            process_sra_internal_relations(config, source="sra", **_default_kwargs())
+
+        relations = _get_relations(config)
+        assert sorted(relations) == [
+            ("bioproject", "PRJNA1", "sra-study", "SRP000001"),
+            ("sra-study", "SRP000001", "sra-submission", "SRA000001"),
+        ]
+
+
 class TestCrossHierarchyBlacklistFiltering:
     """階層横断関連の blacklist フィルタテスト。"""
 
@@ -46,6 +46,8 @@ _COMMON_MAPPING_EXPECTED_FIELDS: list[str] = [
     "title",
     "description",
     "dbXrefs",
+    "dbXrefsCount",
+    "dbXrefsLimit",
     "sameAs",
     "status",
     "accessibility",
@@ -67,6 +69,12 @@ class TestCommonMapping:
         assert mapping["dbXrefs"]["type"] == "object"
         assert mapping["dbXrefs"]["enabled"] is False
 
+    def test_dbxrefs_summary_fields(self) -> None:
+        """dbXrefsCount は検索対象外、dbXrefsLimit は切り詰めの有無で絞り込めるよう integer。"""
+        mapping = get_common_mapping()
+        assert mapping["dbXrefsCount"] == {"type": "object", "enabled": False}
+        assert mapping["dbXrefsLimit"] == {"type": "integer"}
+
     def test_same_as_is_nested(self) -> None:
         """sameAs should be nested with identifier/type/url properties."""
         mapping = get_common_mapping()
@@ -17,6 +17,7 @@ from ddbj_search_converter.es.status_sync import (
     sync_index_status,
     sync_status,
 )
+from ddbj_search_converter.sra_accessions_tab import create_resolved_table
 
 
 def _make_config(tmp_path: Path) -> Config:
@@ -59,6 +60,7 @@ def _setup_dra_db(config: Config, rows: list[tuple[str, str, str | None]]) -> No
             "INSERT INTO accessions VALUES (?, NULL, NULL, NULL, NULL, NULL, NULL, ?, ?, NULL, NULL, NULL, NULL)",
             rows,
         )
+        create_resolved_table(conn)
 
 
 class TestResolveIndexes:
@@ -1021,6 +1021,24 @@ class TestXmlEntryToBpInstanceProperties:
         bp = xml_entry_to_bp_instance({"Project": project}, is_ddbj=True)
         assert bp.name is None
 
+    def test_ncbi_dates_are_taken_from_same_parse(self) -> None:
+        """NCBI の日付は変換時に設定され、ファイルを読み直す必要がない。"""
+        project = _make_project()
+        project["Submission"] = {"submitted": "2020-01-01", "last_update": "2021-01-01"}
+        project["Project"]["ProjectDescr"]["ProjectReleaseDate"] = "2020-06-01T00:00:00Z"
+        bp = xml_entry_to_bp_instance({"Project": project}, is_ddbj=False)
+        assert (bp.dateCreated, bp.dateModified, bp.datePublished) == (
+            "2020-01-01",
+            "2021-01-01",
+            "2020-06-01T00:00:00Z",
+        )
+
+    def test_ddbj_dates_are_left_for_date_cache(self) -> None:
+        project = _make_project()
+        project["Submission"] = {"submitted": "2020-01-01", "last_update": "2021-01-01"}
+        bp = xml_entry_to_bp_instance({"Project": project}, is_ddbj=True)
+        assert (bp.dateCreated, bp.dateModified, bp.datePublished) == (None, None, None)
+
 
 class TestParseProjectType:
     """Tests for parse_project_type function."""
@@ -632,6 +632,25 @@ class TestXmlEntryToBsInstanceProperties:
         bs = xml_entry_to_bs_instance({"BioSample": sample}, is_ddbj=False)
         assert bs.organization == [Organization(name="NCBI", abbreviation="NCBI")]
 
+    def test_ncbi_dates_are_taken_from_same_parse(self) -> None:
+        """NCBI の日付は変換時に設定され、ファイルを読み直す必要がない。"""
+        sample = _make_sample()
+        sample["submission_date"] = "2020-01-01T00:00:00Z"
+        sample["last_update"] = "2021-01-01T00:00:00Z"
+        sample["publication_date"] = "2020-06-01T00:00:00Z"
+        bs = xml_entry_to_bs_instance({"BioSample": sample}, is_ddbj=False)
+        assert (bs.dateCreated, bs.dateModified, bs.datePublished) == (
+            "2020-01-01T00:00:00Z",
+            "2021-01-01T00:00:00Z",
+            "2020-06-01T00:00:00Z",
+        )
+
+    def test_ddbj_dates_are_left_for_date_cache(self) -> None:
+        sample = _make_sample()
+        sample["last_update"] = "2021-01-01T00:00:00Z"
+        bs = xml_entry_to_bs_instance({"BioSample": sample}, is_ddbj=True)
+        assert (bs.dateCreated, bs.dateModified, bs.datePublished) == (None, None, None)
+
 
 class TestFindAttr:
     """Tests for _find_attr helper (Attributes/Attribute lookup)."""
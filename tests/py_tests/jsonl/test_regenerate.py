@@ -1,19 +1,25 @@
 """Tests for ddbj_search_converter.jsonl.regenerate module."""
 
+import json
 import tempfile
 from collections.abc import Generator
+from functools import partial
 from pathlib import Path
 
 import pytest
 from hypothesis import given
 from hypothesis import strategies as st
 
+from ddbj_search_converter.cli.prepare_biosample_xml import BIOSAMPLE_XML_FOOTER, BIOSAMPLE_XML_HEADER
 from ddbj_search_converter.config import Config
 from ddbj_search_converter.jsonl.regenerate import (
     load_accessions_from_file,
+    regenerate_bs_jsonl,
     validate_accessions,
 )
 from ddbj_search_converter.logging.logger import _ctx, run_logger
+from ddbj_search_converter.xml_manifest import manifest_path, sniff_bs_accession
+from ddbj_search_converter.xml_utils import SplitCompression, split_xml
 from py_tests.strategies import (
     st_bioproject_id,
     st_biosample_id,
@@ -30,6 +36,8 @@ from py_tests.strategies import (
     st_sra_submission,
 )
 
+FIXTURES_DIR = Path(__file__).resolve().parents[2] / "fixtures"
+
 
 @pytest.fixture
 def clean_ctx() -> Generator[None, None, None]:
@@ -202,3 +210,41 @@ class TestValidateAccessionsPBT:
             with run_logger(config=config):
                 result = validate_accessions("jga", set(jga_ids))
                 assert result == set(jga_ids)
+
+
+class TestRegenerateBsJsonlManifest:
+    """manifest 経由でも全走査でも同じ JSONL になること。"""
+
+    def _split(self, tmp_xml_dir: Path, compression: SplitCompression | None = None) -> None:
+        split_xml(
+            FIXTURES_DIR / "usr/local/resources/biosample/biosample_set.xml.gz",
+            tmp_xml_dir,
+            batch_size=3,
+            tag="BioSample",
+            prefix="ncbi",
+            wrapper_start=BIOSAMPLE_XML_HEADER,
+            wrapper_end=BIOSAMPLE_XML_FOOTER,
+            sniffer=partial(sniff_bs_accession, is_ddbj=False),
+            compression=compression,
+        )
+
+    @pytest.mark.parametrize("compression", [None, "gzip"])
+    def test_manifest_and_full_scan_agree(
+        self, tmp_path: Path, clean_ctx: None, compression: SplitCompression | None
+    ) -> None:
+        config = Config(result_dir=tmp_path, const_dir=tmp_path)
+        tmp_xml_dir = tmp_path / "tmp_xml"
+        self._split(tmp_xml_dir, compression)
+        targets = {"SAMN00000002", "SAMN00000009", "SAMN99999999"}
+
+        with run_logger(config=config):
+            regenerate_bs_jsonl(config, tmp_xml_dir, tmp_path / "via_manifest", targets)
+            manifest_path(tmp_xml_dir, "ncbi").unlink()
+            regenerate_bs_jsonl(config, tmp_xml_dir, tmp_path / "full_scan", targets)
+
+        via_manifest = (tmp_path / "via_manifest" / "biosample.jsonl").read_text(encoding="utf-8")
+        full_scan = (tmp_path / "full_scan" / "biosample.jsonl").read_text(encoding="utf-8")
+        assert via_manifest == full_scan
+        docs = [json.loads(line) for line in via_manifest.splitlines()]
+        assert sorted(doc["identifier"] for doc in docs) == ["SAMN00000002", "SAMN00000009"]
+        assert all(doc["dateModified"] is not None for doc in docs)
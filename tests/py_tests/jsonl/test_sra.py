@@ -4,6 +4,8 @@ SRA モジュールは tar ファイル読み込みに強く依存するため
 ここではパース関数と正規化関数のユニットテストを中心に行う。
 """
 
+import io
+import tarfile
 from collections.abc import Generator
 from pathlib import Path
 from typing import Any
@@ -13,8 +15,10 @@ import pytest
 from ddbj_search_converter.config import Config
 from ddbj_search_converter.jsonl.sra import (
     XML_TYPES,
+    _extract_accessions_from_xml,
     _find_sample_attr,
     _get_text,
+    _iter_location_batches,
     _normalize_accessibility,
     _parse_analysis_type,
     _parse_library,
@@ -22,6 +26,8 @@ from ddbj_search_converter.jsonl.sra import (
     _parse_publications,
     _parse_sample_derived_from,
     _parse_submission_description,
+    _parse_submission_xmls,
+    _read_batch_xml,
     create_sra_entry,
     parse_analysis,
     parse_experiment,
@@ -33,8 +39,9 @@ from ddbj_search_converter.jsonl.sra import (
 )
 from ddbj_search_converter.logging.logger import _ctx, run_logger
 from ddbj_search_converter.schema import SRA, Organization, Xref
-from ddbj_search_converter.sra.tar_reader import SraXmlType
+from ddbj_search_converter.sra.tar_reader import SraXmlType, TarXMLReader
 from ddbj_search_converter.sra_accessions_tab import normalize_status
+from ddbj_search_converter.xml_utils import parse_xml
 
 
 @pytest.fixture
@@ -259,6 +266,40 @@ class TestProcessSubmissionXml:
         assert results["study"][0].dateCreated is None
 
 
+class TestParseOncePerXml:
+    """worker は XML 1 つにつき 1 回だけ parse し、accession 収集と変換で使い回す。"""
+
+    _XMLS: dict[SraXmlType, bytes | None] = {
+        "submission": TestProcessSubmissionXml._SUBMISSION_XML,
+        "study": TestProcessSubmissionXml._STUDY_XML,
+        "experiment": None,
+        "run": b'<RUN_SET><RUN accession="DRR000001"/><RUN accession="DRR000002"/></RUN_SET>',
+        "sample": None,
+        "analysis": b"<ANALYSIS_SET><broken",
+    }
+
+    def test_parsed_cache_matches_bytes(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, clean_ctx: None) -> None:
+        calls: list[bytes] = []
+
+        def counting(xml_bytes: bytes) -> dict[str, Any]:
+            calls.append(xml_bytes)
+            return parse_xml(xml_bytes)
+
+        with run_logger(config=Config(result_dir=tmp_path, const_dir=tmp_path)):
+            from_bytes = process_submission_xml("DRA000001", set(), {}, self._XMLS, is_ddbj_origin=True)
+
+            monkeypatch.setattr("ddbj_search_converter.jsonl.sra.parse_xml", counting)
+            parsed = _parse_submission_xmls("DRA000001", self._XMLS)
+            runs = _extract_accessions_from_xml(parsed["run"], "run", "DRA000001")
+            from_parsed = process_submission_xml("DRA000001", set(), {}, parsed, is_ddbj_origin=True)
+
+        assert sorted(calls) == sorted(xml for xml in self._XMLS.values() if xml)
+        assert parsed["analysis"] is None
+        assert runs == ["DRR000001", "DRR000002"]
+        for xml_type in XML_TYPES:
+            assert [e.model_dump() for e in from_parsed[xml_type]] == [e.model_dump() for e in from_bytes[xml_type]]
+
+
 class TestProcessSubmissionXmlAnalysisDirs:
     """analysis_dirs を渡したときに sra-analysis に DATA distribution が付くことを検証。"""
 
@@ -478,6 +519,38 @@ def _make_sra_entry(identifier: str, sra_type: SraXmlType = "study") -> SRA:
     )
 
 
+class TestReadBatchXml:
+    """worker 側で tar のデータ位置から読んだ XML が、TarXMLReader で読んだものと一致する。"""
+
+    def test_matches_tar_reader(self, tmp_path: Path, clean_ctx: None) -> None:
+        tar_path = tmp_path / "sample.tar"
+        contents = {
+            "DRA000001/DRA000001.submission.xml": b"<SUBMISSION_SET/>",
+            "DRA000001/DRA000001.run.xml": b"<RUN_SET><RUN accession='DRR000001'/></RUN_SET>",
+            "DRA000002/DRA000002.submission.xml": b"<SUBMISSION_SET>2</SUBMISSION_SET>",
+        }
+        with tarfile.open(tar_path, "w") as tar:
+            for name, content in contents.items():
+                info = tarfile.TarInfo(name=name)
+                info.size = len(content)
+                tar.addfile(info, fileobj=io.BytesIO(content))
+
+        config = Config(result_dir=tmp_path, const_dir=tmp_path)
+        with run_logger(config=config), TarXMLReader(tar_path) as reader:
+            batches = list(_iter_location_batches(reader, ["DRA000002", "DRA000009", "DRA000001"], batch_size=2))
+            expected = {
+                sub: {xml_type: reader.read_xml(sub, xml_type) for xml_type in XML_TYPES}
+                for sub in ["DRA000001", "DRA000002"]
+            }
+
+        # tar 内の位置順に並び、tar にない submission は最後に回る
+        assert [list(batch) for batch in batches] == [["DRA000001", "DRA000002"], ["DRA000009"]]
+        assert batches[0]["DRA000001"]["experiment"] is None
+        assert set(batches[1]["DRA000009"].values()) == {None}
+        assert _read_batch_xml(tar_path, batches[0]) == expected
+        assert expected["DRA000001"]["run"] == contents["DRA000001/DRA000001.run.xml"]
+
+
 class TestBatchDedup:
     """_process_batch_worker の重複排除ロジックを検証する。
 
@@ -0,0 +1,86 @@
+"""Tests for ddbj_search_converter.jsonl.sra_checkpoint module."""
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from ddbj_search_converter.config import Config
+from ddbj_search_converter.jsonl.sra import _batch_output_names, _skip_completed_batches
+from ddbj_search_converter.jsonl.sra_checkpoint import BatchCheckpoint
+from ddbj_search_converter.logging.logger import run_logger
+
+COUNTS = {"submission": 2, "study": 1, "experiment": 0, "run": 3, "sample": 0, "analysis": 0}
+
+
+def _complete(checkpoint: BatchCheckpoint, batch_num: int, batch_subs: list[str]) -> None:
+    names = _batch_output_names("ncbi", batch_num)
+    for name in names:
+        checkpoint.output_dir.joinpath(name).touch()
+    checkpoint.mark_completed("sra", batch_num, batch_subs, names, COUNTS)
+
+
+class TestBatchCheckpoint:
+    def test_completed_batch_survives_reload(self, tmp_path: Path, test_config: Config) -> None:
+        with run_logger(config=test_config):
+            checkpoint = BatchCheckpoint(tmp_path, False, "2026-01-01T00:00:00Z", 5000)
+            _complete(checkpoint, 1, ["SRA000001", "SRA000002"])
+
+            loaded = BatchCheckpoint.load(tmp_path, False, 5000)
+
+        assert loaded is not None
+        assert loaded.since == "2026-01-01T00:00:00Z"
+        assert loaded.completed_counts("sra", 1, ["SRA000001", "SRA000002"]) == COUNTS
+        assert loaded.completed_counts("dra", 1, ["SRA000001", "SRA000002"]) is None
+        assert loaded.completed_counts("sra", 2, ["SRA000001", "SRA000002"]) is None
+
+    def test_different_submissions_or_missing_output_is_not_completed(self, tmp_path: Path) -> None:
+        checkpoint = BatchCheckpoint(tmp_path, False, None, 5000)
+        _complete(checkpoint, 1, ["SRA000001", "SRA000002"])
+
+        assert checkpoint.completed_counts("sra", 1, ["SRA000001", "SRA000003"]) is None
+        tmp_path.joinpath("ncbi_run_0001.jsonl").unlink()
+        assert checkpoint.completed_counts("sra", 1, ["SRA000001", "SRA000002"]) is None
+
+    def test_failed_submissions_are_persisted_until_retried(self, tmp_path: Path) -> None:
+        checkpoint = BatchCheckpoint(tmp_path, False, None, 5000)
+        checkpoint.mark_failed("sra", 2, ["SRA000010", "SRA000011"], "OSError('disk full')")
+        checkpoint.mark_failed("dra", 1, ["DRA000001"], "OSError('disk full')")
+
+        assert checkpoint.failed_batches() == [("sra", 2), ("dra", 1)]
+        assert checkpoint.failed_submissions_path.read_text() == "DRA000001\nSRA000010\nSRA000011\n"
+
+        _complete(checkpoint, 2, ["SRA000010", "SRA000011"])
+        checkpoint.batches["dra"]["1"]["status"] = "completed"
+        checkpoint.save()
+
+        assert checkpoint.failed_batches() == []
+        assert not checkpoint.failed_submissions_path.exists()
+
+    def test_load_ignores_checkpoint_with_different_options(self, tmp_path: Path, test_config: Config) -> None:
+        BatchCheckpoint(tmp_path, False, None, 5000).save()
+
+        with run_logger(config=test_config):
+            assert BatchCheckpoint.load(tmp_path, True, 5000) is None
+            assert BatchCheckpoint.load(tmp_path, False, 1000) is None
+            tmp_path.joinpath("sra_batches.json").write_text("{broken")
+            assert BatchCheckpoint.load(tmp_path, False, 5000) is None
+
+    def test_load_without_checkpoint(self, tmp_path: Path) -> None:
+        assert BatchCheckpoint.load(tmp_path, False, 5000) is None
+
+
+class TestSkipCompletedBatches:
+    def test_skips_completed_and_adds_counts(self, tmp_path: Path, test_config: Config) -> None:
+        checkpoint = BatchCheckpoint(tmp_path, False, None, 5000)
+        _complete(checkpoint, 1, ["SRA000001"])
+        checkpoint.mark_failed("sra", 2, ["SRA000002"], "RuntimeError()")
+        batches: Iterator[tuple[int, dict[str, Any]]] = iter(
+            [(1, {"SRA000001": {}}), (2, {"SRA000002": {}}), (3, {"SRA000003": {}})]
+        )
+        total_counts = dict.fromkeys(COUNTS, 0)
+
+        with run_logger(config=test_config):
+            remaining = [n for n, _ in _skip_completed_batches(batches, checkpoint, "sra", total_counts)]
+
+        assert remaining == [2, 3]
+        assert total_counts == COUNTS
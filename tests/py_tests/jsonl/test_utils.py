@@ -1,6 +1,7 @@
 """Tests for ddbj_search_converter.jsonl.utils module."""
 
 import copy
+from types import SimpleNamespace
 from typing import Any
 
 import duckdb
@@ -12,6 +13,8 @@ from ddbj_search_converter.config import SEARCH_BASE_URL, Config
 from ddbj_search_converter.dblink.db import finalize_dblink_db, init_dblink_db
 from ddbj_search_converter.jsonl.utils import (
     URL_TEMPLATE,
+    EntryFilter,
+    attach_dbxrefs,
     build_doi_url,
     build_pubmed_url,
     deduplicate_organizations,
@@ -21,6 +24,7 @@ from ddbj_search_converter.jsonl.utils import (
     normalize_publication_dbtype,
     to_xref,
 )
+from ddbj_search_converter.logging.logger import run_logger
 from ddbj_search_converter.schema import Organization, XrefType
 from py_tests.strategies import (
     st_bioproject_id,
@@ -372,30 +376,121 @@ class TestEnsureAttributeListPBT:
         assert isinstance(props["Attributes"]["Attribute"], list)
 
 
+def _finalize_edges(config: Config, edges: list[tuple[str, str, str, str]]) -> None:
+    init_dblink_db(config)
+    tmp_db_path = config.const_dir / "dblink" / "dblink.tmp.duckdb"
+    with duckdb.connect(str(tmp_db_path)) as conn:
+        conn.executemany("INSERT INTO raw_edges VALUES (?, ?, ?, ?)", edges)
+    with run_logger(config=config):
+        finalize_dblink_db(config)
+
+
 class TestGetDbxrefMap:
     """Tests for get_dbxref_map function."""
 
     def test_returns_xrefs_for_accession(self, test_config: Config) -> None:
         """dblink DB からの関連を Xref リストとして返す。"""
-        init_dblink_db(test_config)
-        tmp_db_path = test_config.const_dir / "dblink" / "dblink.tmp.duckdb"
-        with duckdb.connect(str(tmp_db_path)) as conn:
-            conn.execute("INSERT INTO raw_edges VALUES ('bioproject', 'PRJDB100', 'biosample', 'SAMD1')")
-        finalize_dblink_db(test_config)
+        _finalize_edges(test_config, [("bioproject", "PRJDB100", "biosample", "SAMD1")])
 
         result = get_dbxref_map(test_config, "biosample", ["SAMD1"])
 
         assert "SAMD1" in result
-        xrefs = result["SAMD1"]
+        xrefs = result["SAMD1"].xrefs
         assert len(xrefs) == 1
         assert xrefs[0].type_ == "bioproject"
         assert xrefs[0].identifier == "PRJDB100"
+        assert result["SAMD1"].counts == {"bioproject": 1}
+        assert result["SAMD1"].limit is None
 
     def test_empty_accessions_returns_empty(self, test_config: Config) -> None:
         """空の accessions で空 dict を返す。"""
         result = get_dbxref_map(test_config, "biosample", [])
         assert result == {}
 
+    def test_caps_each_type_to_smallest_identifiers(self, test_config: Config) -> None:
+        """上限を超えた type だけ identifier 順の先頭から上限件に切り詰め、件数は全件分を返す。"""
+        edges = [("bioproject", "PRJDB1", "biosample", f"SAMD{i}") for i in (5, 3, 9, 1, 7)]
+        edges += [("bioproject", "PRJDB1", "sra-study", f"DRP{i}") for i in (2, 1)]
+        _finalize_edges(test_config, edges)
+        config = test_config.model_copy(update={"dbxref_max_per_type": 2})
+
+        with run_logger(config=config):
+            result = get_dbxref_map(config, "bioproject", ["PRJDB1"])
+
+        entry = result["PRJDB1"]
+        assert [(x.type_, x.identifier) for x in entry.xrefs] == [
+            ("sra-study", "DRP1"),
+            ("sra-study", "DRP2"),
+            ("biosample", "SAMD1"),
+            ("biosample", "SAMD3"),
+        ]
+        assert entry.counts == {"biosample": 5, "sra-study": 2}
+        assert entry.limit == 2
+
+    def test_zero_limit_keeps_all(self, test_config: Config) -> None:
+        """dbxref_max_per_type=0 では切り詰めない。"""
+        _finalize_edges(test_config, [("bioproject", "PRJDB1", "biosample", f"SAMD{i}") for i in range(5)])
+        config = test_config.model_copy(update={"dbxref_max_per_type": 0})
+
+        result = get_dbxref_map(config, "bioproject", ["PRJDB1"])
+
+        assert len(result["PRJDB1"].xrefs) == 5
+        assert result["PRJDB1"].limit is None
+
+
+class TestAttachDbxrefs:
+    """Tests for attach_dbxrefs function."""
+
+    def test_sets_xrefs_counts_and_limit(self, test_config: Config) -> None:
+        edges = [("bioproject", "PRJDB1", "biosample", f"SAMD{i}") for i in range(3)]
+        edges.append(("bioproject", "PRJDB2", "biosample", "SAMD0"))
+        _finalize_edges(test_config, edges)
+        config = test_config.model_copy(update={"dbxref_max_per_type": 2})
+        docs = {
+            acc: SimpleNamespace(dbXrefs=[], dbXrefsCount={}, dbXrefsLimit=None)
+            for acc in ("PRJDB1", "PRJDB2", "PRJDB3")
+        }
+
+        with run_logger(config=config):
+            attach_dbxrefs(config, "bioproject", docs)
+
+        assert [x.identifier for x in docs["PRJDB1"].dbXrefs] == ["SAMD0", "SAMD1"]
+        assert docs["PRJDB1"].dbXrefsCount == {"biosample": 3}
+        assert docs["PRJDB1"].dbXrefsLimit == 2
+        assert [x.identifier for x in docs["PRJDB2"].dbXrefs] == ["SAMD0"]
+        assert docs["PRJDB2"].dbXrefsCount == {"biosample": 1}
+        assert docs["PRJDB2"].dbXrefsLimit is None
+        assert docs["PRJDB3"].dbXrefs == []
+        assert docs["PRJDB3"].dbXrefsCount == {}
+
+
+class TestEntryFilter:
+    def test_counts_each_reason_once(self) -> None:
+        entry_filter = EntryFilter(
+            blacklist={"SAMD1"},
+            target_accessions={"SAMD1", "SAMD2", "SAMD3"},
+            unchanged={"SAMD3"},
+        )
+        assert [entry_filter(acc) for acc in ("SAMD1", "SAMD2", "SAMD3", "SAMD4")] == [False, True, False, False]
+        assert entry_filter.skipped_count == 1
+        assert entry_filter.filtered_count == 1
+        assert entry_filter.unchanged_count == 1
+
+    def test_accepted_accession_is_not_counted_twice(self) -> None:
+        """parse 前後の 2 回判定しても、通したものは数に入らない。"""
+        entry_filter = EntryFilter(blacklist=set(), target_accessions={"SAMD2"})
+        assert entry_filter("SAMD2") is True
+        assert entry_filter("SAMD2") is True
+        assert (entry_filter.skipped_count, entry_filter.filtered_count, entry_filter.unchanged_count) == (0, 0, 0)
+
+    @given(
+        accessions=st.lists(st_biosample_id(), max_size=20),
+        blacklist=st.sets(st_biosample_id(), max_size=5),
+    )
+    def test_no_target_accepts_all_but_blacklist(self, accessions: list[str], blacklist: set[str]) -> None:
+        entry_filter = EntryFilter(blacklist=blacklist)
+        assert [entry_filter(acc) for acc in accessions] == [acc not in blacklist for acc in accessions]
+
 
 class TestDeduplicateOrganizations:
     """Tests for deduplicate_organizations helper.
@@ -1,14 +1,18 @@
 """Tests for ddbj_search_converter.sra.dra_file_index module."""
 
+import os
 import tempfile
 from pathlib import Path
 
 import duckdb
+import pytest
 from hypothesis import given, settings
 from hypothesis import strategies as st
 
 from ddbj_search_converter.config import Config
+from ddbj_search_converter.sra import dra_file_index
 from ddbj_search_converter.sra.dra_file_index import (
+    build_dra_file_index,
     dra_file_index_exists,
     get_dra_file_index_db_path,
     query_analysis_dirs_bulk,
@@ -289,6 +293,127 @@ class TestQuerySraFilesBulk:
         assert result == set()
 
 
+def _prepare_dra_tree(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    layout: dict[str, list[str]],
+    runs: list[str],
+) -> tuple[Config, Path]:
+    """DRA_BASE_PATH と同じ配置の FS と submission 一覧を用意する。
+
+    layout は {submission: [サブディレクトリ名]}。layout に無い submission は一覧にだけ載る。
+    """
+    dra_base = tmp_path / "dra"
+    for sub, names in layout.items():
+        sub_dir = dra_base / "fastq" / sub[:6] / sub
+        sub_dir.mkdir(parents=True, exist_ok=True)
+        sub_dir.joinpath(f"{sub}.run.xml").write_text("<RUN/>", encoding="utf-8")
+        for name in names:
+            sub_dir.joinpath(name).mkdir()
+    for run in runs:
+        run_dir = dra_base / "sra" / "ByExp" / "sra" / "DRX" / "DRX000" / "DRX000001" / run
+        run_dir.mkdir(parents=True, exist_ok=True)
+        run_dir.joinpath(f"{run}.sra").write_bytes(b"")
+
+    submissions = sorted({*layout, "DRA999999"})
+    monkeypatch.setattr(dra_file_index, "DRA_BASE_PATH", dra_base)
+    monkeypatch.setattr(dra_file_index, "iter_all_dra_submissions", lambda _config: iter(submissions))
+
+    return Config(result_dir=tmp_path, const_dir=tmp_path / "const"), dra_base
+
+
+def _backdate(path: Path, seconds: int = 3600) -> None:
+    """mtime を過去にずらし、走査開始時刻に近い racy な mtime から外す。"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 10**9))
+
+
+@pytest.mark.usefixtures("with_logger_isolated")
+class TestBuildDraFileIndex:
+    """build_dra_file_index のテスト。"""
+
+    def test_full_build(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """DRX / DRZ サブディレクトリと .sra ファイルが索引に入る。"""
+        config, _ = _prepare_dra_tree(
+            tmp_path,
+            monkeypatch,
+            {"DRA000001": ["DRX000001", "DRZ000001", "other"], "DRA000002": ["DRX000002"]},
+            ["DRR000001", "DRR000002"],
+        )
+
+        build_dra_file_index(config, threads=4)
+
+        assert query_fastq_dirs_bulk(config, ["DRA000001", "DRA000002", "DRA999999"]) == {
+            "DRA000001": {"DRX000001"},
+            "DRA000002": {"DRX000002"},
+        }
+        assert query_analysis_dirs_bulk(config, ["DRA000001"]) == {"DRA000001": {"DRZ000001"}}
+        assert query_sra_files_bulk(config, ["DRR000001", "DRR000002", "DRR000003"]) == {"DRR000001", "DRR000002"}
+
+    def test_incremental_rescans_only_changed_submissions(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """mtime が変わらない submission は前回の行を引き継ぎ、変わったものだけ読み直す。"""
+        config, dra_base = _prepare_dra_tree(
+            tmp_path,
+            monkeypatch,
+            {"DRA000001": ["DRX000001"], "DRA000002": ["DRX000002"]},
+            [],
+        )
+        _backdate(dra_base / "fastq" / "DRA000" / "DRA000001")
+        _backdate(dra_base / "fastq" / "DRA000" / "DRA000002")
+        build_dra_file_index(config, threads=4)
+
+        # DRA000001 は中身を変えても mtime を戻す (= 読み直されないことの確認)
+        unchanged = dra_base / "fastq" / "DRA000" / "DRA000001"
+        stat = unchanged.stat()
+        unchanged.joinpath("DRX000009").mkdir()
+        os.utime(unchanged, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        # DRA000002 は DRX を追加して mtime を進める
+        changed = dra_base / "fastq" / "DRA000" / "DRA000002"
+        changed.joinpath("DRX000003").mkdir()
+        os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        build_dra_file_index(config, incremental=True, threads=4)
+
+        assert query_fastq_dirs_bulk(config, ["DRA000001", "DRA000002"]) == {
+            "DRA000001": {"DRX000001"},
+            "DRA000002": {"DRX000002", "DRX000003"},
+        }
+
+        build_dra_file_index(config, threads=4)
+
+        assert query_fastq_dirs_bulk(config, ["DRA000001"]) == {"DRA000001": {"DRX000001", "DRX000009"}}
+
+    def test_incremental_rescans_racy_mtime(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """前回の走査開始時刻に近い mtime は、一致していても読み直す。"""
+        config, dra_base = _prepare_dra_tree(tmp_path, monkeypatch, {"DRA000001": ["DRX000001"]}, [])
+        build_dra_file_index(config, threads=4)
+
+        # 走査直後に同じ mtime のまま中身が変わったケース (mtime の粒度が粗い FS で起きうる)
+        sub_dir = dra_base / "fastq" / "DRA000" / "DRA000001"
+        stat = sub_dir.stat()
+        sub_dir.joinpath("DRX000002").mkdir()
+        os.utime(sub_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        build_dra_file_index(config, incremental=True, threads=4)
+
+        assert query_fastq_dirs_bulk(config, ["DRA000001"]) == {"DRA000001": {"DRX000001", "DRX000002"}}
+
+    def test_incremental_without_previous_mtimes_scans_all(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """mtime を持たない旧スキーマの索引しか無ければ全 submission を走査する。"""
+        config, _ = _prepare_dra_tree(tmp_path, monkeypatch, {"DRA000001": ["DRX000001"]}, [])
+        db_path = get_dra_file_index_db_path(config)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        _create_test_db(db_path, fastq_rows=[("DRA000001", "DRX999999")])
+
+        build_dra_file_index(config, incremental=True, threads=4)
+
+        assert query_fastq_dirs_bulk(config, ["DRA000001"]) == {"DRA000001": {"DRX000001"}}
+
+
 # hypothesis 用の accession 戦略
 _dra_sub_st = st.from_regex(r"DRA[0-9]{6}", fullmatch=True)
 _drx_exp_st = st.from_regex(r"DRX[0-9]{6}", fullmatch=True)
@@ -0,0 +1,160 @@
+"""Tests for ddbj_search_converter.sra.tar_index_cache module."""
+
+import io
+import subprocess
+import tarfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import pytest
+
+from ddbj_search_converter.config import Config
+from ddbj_search_converter.logging.logger import run_logger
+from ddbj_search_converter.sra import tar_index_cache
+from ddbj_search_converter.sra.tar_index_cache import (
+    build_index_cache,
+    ensure_index_cache,
+    get_index_cache_path,
+    is_cache_valid,
+    iter_tar_members,
+    read_index_cache_meta,
+)
+from ddbj_search_converter.sra.tar_reader import TarXMLReader
+
+
+def _add(tar: tarfile.TarFile, name: str, content: bytes) -> None:
+    info = tarfile.TarInfo(name=name)
+    info.size = len(content)
+    tar.addfile(info, fileobj=io.BytesIO(content))
+
+
+def _read_index(cache_path: Path) -> list[tuple[Any, ...]]:
+    return duckdb.execute("SELECT * FROM read_parquet(?) ORDER BY name", (str(cache_path),)).fetchall()
+
+
+@pytest.fixture
+def sample_tar(tmp_path: Path) -> Path:
+    tar_path = tmp_path / "sample.tar"
+    with tarfile.open(tar_path, "w") as tar:
+        dir_info = tarfile.TarInfo(name="DRA000001")
+        dir_info.type = tarfile.DIRTYPE
+        tar.addfile(dir_info)
+        _add(tar, "DRA000001/DRA000001.submission.xml", b"<SUBMISSION>1</SUBMISSION>")
+        _add(tar, "DRA000001/DRA000001.run.xml", b"<RUN_SET/>")
+        _add(tar, "DRA000001/other.xml", b"<X/>")
+    return tar_path
+
+
+class TestBuildIndexCache:
+    def test_columns(self, sample_tar: Path, test_config: Config) -> None:
+        with run_logger(config=test_config):
+            cache_path = build_index_cache(sample_tar)
+
+        assert cache_path == get_index_cache_path(sample_tar)
+        assert cache_path.name == "sample.tar.index.parquet"
+        rows = duckdb.execute(
+            "SELECT name, submission, xml_type FROM read_parquet(?) ORDER BY name", (str(cache_path),)
+        ).fetchall()
+        assert rows == [
+            ("DRA000001", None, None),
+            ("DRA000001/DRA000001.run.xml", "DRA000001", "run"),
+            ("DRA000001/DRA000001.submission.xml", "DRA000001", "submission"),
+            ("DRA000001/other.xml", None, None),
+        ]
+
+    def test_later_duplicate_wins(self, sample_tar: Path, test_config: Config) -> None:
+        with tarfile.open(sample_tar, "a") as tar:
+            _add(tar, "DRA000001/DRA000001.run.xml", b"<RUN_SET>v2</RUN_SET>")
+
+        with run_logger(config=test_config), TarXMLReader(sample_tar) as reader:
+            assert reader.read_xml("DRA000001", "run") == b"<RUN_SET>v2</RUN_SET>"
+            assert reader.get_member_count() == 4
+
+    def test_iter_tar_members_flushes_without_losing_members(
+        self, sample_tar: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(tar_index_cache, "_MEMBER_FLUSH_INTERVAL", 1)
+        with tarfile.open(sample_tar, "r:") as tar:
+            expected = [(m.name, m.offset_data) for m in tar.getmembers()]
+
+        assert [(m.name, m.offset_data) for m in iter_tar_members(sample_tar)] == expected
+
+
+class TestEnsureIndexCache:
+    def test_reuses_valid_cache(self, sample_tar: Path, test_config: Config, monkeypatch: pytest.MonkeyPatch) -> None:
+        with run_logger(config=test_config):
+            ensure_index_cache(sample_tar)
+            assert is_cache_valid(sample_tar)
+
+            def fail(tar_path: Path) -> Path:
+                raise AssertionError("index should not be rebuilt")
+
+            monkeypatch.setattr(tar_index_cache, "build_index_cache", fail)
+            with TarXMLReader(sample_tar) as reader:
+                assert reader.exists("DRA000001", "submission")
+
+    def test_appended_members_are_merged_without_full_scan(
+        self, sample_tar: Path, test_config: Config, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """``tar -A`` で追記された分だけを走査し、同名は後の member が勝つ。"""
+        appended = sample_tar.with_name("daily.tar")
+        with tarfile.open(appended, "w") as tar:
+            _add(tar, "DRA000002/DRA000002.submission.xml", b"<SUBMISSION>2</SUBMISSION>")
+            _add(tar, "DRA000001/DRA000001.run.xml", b"<RUN_SET>v2</RUN_SET>")
+
+        with run_logger(config=test_config):
+            before = ensure_index_cache(sample_tar)
+            meta_before = read_index_cache_meta(sample_tar)
+            subprocess.run(["tar", "-Af", str(sample_tar), str(appended)], check=True)
+            assert is_cache_valid(sample_tar)
+
+            scanned_from: list[int] = []
+            original = tar_index_cache.iter_tar_members
+
+            def tracking(tar_path: Path, start: int = 0) -> Iterator[tarfile.TarInfo]:
+                scanned_from.append(start)
+                return original(tar_path, start)
+
+            monkeypatch.setattr(tar_index_cache, "iter_tar_members", tracking)
+            assert ensure_index_cache(sample_tar) == before
+
+            with TarXMLReader(sample_tar) as reader:
+                assert reader.read_xml("DRA000002", "submission") == b"<SUBMISSION>2</SUBMISSION>"
+                assert reader.read_xml("DRA000001", "run") == b"<RUN_SET>v2</RUN_SET>"
+                assert reader.read_xml("DRA000001", "submission") == b"<SUBMISSION>1</SUBMISSION>"
+                assert reader.get_member_count() == 5
+
+        assert meta_before is not None
+        # 先頭からの走査 (start=0) は起きない
+        assert scanned_from
+        assert min(scanned_from) == meta_before.covered_offset
+        with tarfile.open(sample_tar, "r:") as tar:
+            assert tar.getmembers()[4].offset == meta_before.covered_offset
+
+    def test_index_matches_full_scan_after_append(self, sample_tar: Path, test_config: Config) -> None:
+        appended = sample_tar.with_name("daily.tar")
+        with tarfile.open(appended, "w") as tar:
+            _add(tar, "DRA000003/DRA000003.study.xml", b"<STUDY_SET/>" * 100)
+
+        with run_logger(config=test_config):
+            ensure_index_cache(sample_tar)
+            subprocess.run(["tar", "-Af", str(sample_tar), str(appended)], check=True)
+            incremental = _read_index(ensure_index_cache(sample_tar))
+            full = _read_index(build_index_cache(sample_tar))
+
+        assert incremental == full
+
+    def test_rebuilds_when_tar_is_replaced(self, sample_tar: Path, test_config: Config) -> None:
+        with run_logger(config=test_config):
+            ensure_index_cache(sample_tar)
+            sample_tar.unlink()
+            with tarfile.open(sample_tar, "w") as tar:
+                _add(tar, "DRA000009/DRA000009.submission.xml", b"<SUBMISSION>9</SUBMISSION>" * 40)
+                _add(tar, "DRA000010/DRA000010.submission.xml", b"<SUBMISSION>10</SUBMISSION>")
+            assert not is_cache_valid(sample_tar)
+
+            with TarXMLReader(sample_tar) as reader:
+                assert reader.read_xml("DRA000010", "submission") == b"<SUBMISSION>10</SUBMISSION>"
+                assert reader.exists("DRA000001", "submission") is False
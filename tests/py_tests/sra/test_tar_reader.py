@@ -8,7 +8,7 @@ import pytest
 
 from ddbj_search_converter.config import Config
 from ddbj_search_converter.logging.logger import run_logger
-from ddbj_search_converter.sra.tar_reader import TarXMLReader
+from ddbj_search_converter.sra.tar_reader import SraXmlType, TarXMLReader, read_member_at
 
 
 @pytest.fixture
@@ -69,6 +69,24 @@ class TestTarXMLReader:
             content = reader.read_xml("DRA000001", "experiment")
             assert content is None
 
+    def test_locate_xml_matches_read_xml(self, sample_tar: Path, test_config: Config) -> None:
+        """Test pread from locate_xml() returns the same bytes as read_xml()."""
+        targets: list[tuple[str, SraXmlType]] = [
+            ("DRA000001", "submission"),
+            ("DRA000001", "run"),
+            ("ERA123456", "submission"),
+        ]
+        with run_logger(config=test_config), TarXMLReader(sample_tar) as reader, sample_tar.open("rb") as f:
+            for submission, xml_type in targets:
+                location = reader.locate_xml(submission, xml_type)
+                assert location is not None
+                assert location.name == f"{submission}/{submission}.{xml_type}.xml"
+                assert read_member_at(f.fileno(), location) == reader.read_xml(submission, xml_type)
+
+    def test_locate_xml_returns_none_for_missing_file(self, sample_tar: Path, test_config: Config) -> None:
+        with run_logger(config=test_config), TarXMLReader(sample_tar) as reader:
+            assert reader.locate_xml("DRA000001", "experiment") is None
+
     def test_get_member_count(self, sample_tar: Path, test_config: Config) -> None:
         """Test get_member_count() returns correct count."""
         with run_logger(config=test_config), TarXMLReader(sample_tar) as reader:
@@ -105,3 +123,14 @@ class TestTarXMLReaderWithDuplicates:
             content = reader.read_xml("DRA000001", "submission")
             # Should get the second (later) version
             assert content == b"<SUBMISSION>version2</SUBMISSION>"
+
+    def test_later_entry_location_wins(self, tar_with_duplicates: Path, test_config: Config) -> None:
+        """Test that locate_xml() points at the later (appended) entry."""
+        with (
+            run_logger(config=test_config),
+            TarXMLReader(tar_with_duplicates) as reader,
+            tar_with_duplicates.open("rb") as f,
+        ):
+            location = reader.locate_xml("DRA000001", "submission")
+            assert location is not None
+            assert read_member_at(f.fileno(), location) == b"<SUBMISSION>version2</SUBMISSION>"
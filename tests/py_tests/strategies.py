@@ -289,3 +289,41 @@ def st_xml_dict() -> st.SearchStrategy[dict]:  # type: ignore[type-arg]
             "attr": st.text(min_size=0, max_size=20),
         }
     )
+
+
+# 名前の衝突 (同名の子要素が複数、属性と子要素が同名、"content" という子要素) を
+# 起こしやすいよう、タグ名・属性名は小さい集合から選ぶ。
+_XML_NAMES = ["a", "b", "content", "id"]
+_XML_ATTR_NAMES = [*_XML_NAMES, "{http://www.w3.org/XML/1998/namespace}lang"]
+
+
+def st_xml_element_bytes() -> st.SearchStrategy[bytes]:
+    """名前空間宣言を含まない、ランダムな入れ子構造の XML 要素 (bytes)。"""
+    from lxml import etree
+
+    text = st.one_of(st.none(), st.sampled_from(["", " ", "\n  ", "x", " y ", "&<>"]))
+    attrs = st.dictionaries(st.sampled_from(_XML_ATTR_NAMES), st.sampled_from(["", "v", "1"]), max_size=3)
+
+    def build(
+        tag: str, attrib: dict[str, str], head: str | None, children: list[tuple[etree._Element, str | None]]
+    ) -> etree._Element:
+        element = etree.Element(tag, attrib)
+        element.text = head
+        for child, tail in children:
+            child.tail = tail
+            element.append(child)
+        return element
+
+    leaf = st.builds(build, st.sampled_from(_XML_NAMES), attrs, text, st.just([]))
+    tree = st.recursive(
+        leaf,
+        lambda inner: st.builds(
+            build,
+            st.sampled_from(_XML_NAMES),
+            attrs,
+            text,
+            st.lists(st.tuples(st.one_of(inner, st.builds(etree.Comment, st.just("c"))), text), max_size=4),
+        ),
+        max_leaves=12,
+    )
+    return tree.map(etree.tostring)
@@ -1002,6 +1002,14 @@ class TestRequiredListFieldsKeyContract:
             assert field in dumped, f"{model_cls.__name__}.{field} key が JSON 出力から消えている"
             assert dumped[field] == [], f"{model_cls.__name__}.{field} は空 list として出力されるべき"
 
+    @pytest.mark.parametrize("model_cls", list(_REQUIRED_LIST_FIELDS.keys()))
+    def test_dbxrefs_summary_keys_persist_in_json(self, model_cls: type) -> None:
+        """dbXrefsCount / dbXrefsLimit は kwarg を省略しても ``{}`` / ``null`` として出力される。"""
+        instance = model_cls(**_MAKE_KWARGS[model_cls]())
+        dumped = json.loads(instance.model_dump_json(by_alias=True))
+        assert dumped["dbXrefsCount"] == {}
+        assert dumped["dbXrefsLimit"] is None
+
 
 class TestRequiredListFieldsValidation:
     """各リスト系フィールドを kwarg から省略すると ValidationError。
@@ -16,32 +16,14 @@ from hypothesis import strategies as st
 from ddbj_search_converter import sra_accessions_tab
 from ddbj_search_converter.config import Config
 from ddbj_search_converter.sra_accessions_tab import (
+    SourceKind,
+    create_resolved_table,
     finalize_db,
     get_accession_info_bulk,
     get_submission_accessions,
     init_accession_db,
     iter_all_submissions,
-    iter_bp_analysis_relations,
     iter_bp_bs_relations,
-    iter_bp_experiment_relations,
-    iter_bp_run_relations,
-    iter_bp_study_relations,
-    iter_bs_analysis_relations,
-    iter_bs_experiment_relations,
-    iter_bs_run_relations,
-    iter_bs_sample_relations,
-    iter_experiment_run_relations,
-    iter_experiment_sample_relations,
-    iter_run_sample_relations,
-    iter_study_analysis_relations,
-    iter_study_experiment_relations,
-    iter_study_run_relations,
-    iter_study_sample_relations,
-    iter_submission_analysis_relations,
-    iter_submission_experiment_relations,
-    iter_submission_run_relations,
-    iter_submission_sample_relations,
-    iter_submission_study_relations,
     iter_updated_submissions,
     load_tsv_to_tmp_db,
     lookup_submissions_for_accessions,
@@ -105,6 +87,7 @@ def _setup_accessions_db(db_path: Path, rows: list) -> None:  # type: ignore[typ
                 "INSERT INTO accessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
                 row,
             )
+        create_resolved_table(conn)
 
 
 def _make_config(tmp_path: Path) -> Config:
@@ -465,44 +448,58 @@ class TestFinalizeDb:
 
         assert count == 2
 
+    def test_creates_resolved_table(self, tmp_path: Path) -> None:
+        """accession_resolved は 1 accession 1 行で、最も強い status の行が残り Accession 順に並ぶ。"""
+        tmp_db = tmp_path / "tmp.duckdb"
+        final_db = tmp_path / "final.duckdb"
+        init_accession_db(tmp_db)
+
+        with duckdb.connect(tmp_db) as conn:
+            conn.execute(
+                "INSERT INTO accessions VALUES "
+                "('SRR2', 'SRA1', NULL, NULL, NULL, NULL, NULL, 'RUN', 'unpublished', NULL, NULL, NULL, NULL), "
+                "('SRR1', 'SRA1', NULL, NULL, NULL, NULL, NULL, 'RUN', 'withdrawn', 'public', NULL, NULL, NULL), "
+                "('SRR1', 'SRA1', NULL, NULL, NULL, NULL, NULL, 'RUN', 'live', 'public', "
+                "'2023-01-01 00:00:00+00', NULL, NULL), "
+                "(NULL, 'SRA1', NULL, NULL, NULL, NULL, NULL, 'RUN', 'live', 'public', NULL, NULL, NULL)"
+            )
+
+        finalize_db(tmp_db, final_db)
+
+        with duckdb.connect(final_db) as conn:
+            rows = conn.execute(
+                "SELECT Accession, Status, NormalizedStatus, Visibility, Updated FROM accession_resolved"
+            ).fetchall()
+
+        assert rows == [
+            ("SRR1", "live", "public", "public", "2023-01-01T00:00:00Z"),
+            ("SRR2", "unpublished", "private", "public", None),
+        ]
+
+    @pytest.mark.parametrize(
+        "status",
+        [None, "live", "public", "unpublished", "suppressed", "replaced", "withdrawn", "killed", "LIVE", "unknown"],
+    )
+    def test_resolved_normalized_status_matches_normalize_status(self, tmp_path: Path, status: str | None) -> None:
+        """SQL 側の正規化は normalize_status と同じ結果になる。"""
+        db_path = tmp_path / "tmp.duckdb"
+        init_accession_db(db_path)
+
+        with duckdb.connect(db_path) as conn:
+            conn.execute(
+                "INSERT INTO accessions (Accession, Status) VALUES ('SRR1', ?)",
+                (status,),
+            )
+            create_resolved_table(conn)
+            row = conn.execute("SELECT NormalizedStatus FROM accession_resolved").fetchone()
+
+        assert row == (sra_accessions_tab.normalize_status(status),)
+
 
 # ============================================================
 # Group 2: Relation イテレータ
 # ============================================================
 
-# 各 relation イテレータの仕様を定義
-# (関数, Type フィルタ (None=フィルタなし), 出力の (col1, col2) カラム名)
-_RELATION_SPECS: list[tuple] = [  # type: ignore[type-arg]
-    (iter_bp_bs_relations, None, "BioProject", "BioSample"),
-    (iter_study_experiment_relations, "EXPERIMENT", "Study", "Accession"),
-    (iter_experiment_run_relations, "RUN", "Experiment", "Accession"),
-    (iter_experiment_sample_relations, "EXPERIMENT", "Accession", "Sample"),
-    (iter_run_sample_relations, "RUN", "Accession", "Sample"),
-    (iter_submission_study_relations, "STUDY", "Submission", "Accession"),
-    (iter_study_analysis_relations, "ANALYSIS", "Study", "Accession"),
-    (iter_submission_analysis_relations, "ANALYSIS", "Submission", "Accession"),
-    # SRA 階層横断関連
-    (iter_submission_experiment_relations, "EXPERIMENT", "Submission", "Accession"),
-    (iter_submission_run_relations, "RUN", "Submission", "Accession"),
-    (iter_submission_sample_relations, "SAMPLE", "Submission", "Accession"),
-    (iter_study_run_relations, "RUN", "Study", "Accession"),
-    (iter_study_sample_relations, "EXPERIMENT", "Study", "Sample"),
-    # BioProject <-> SRA
-    (iter_bp_study_relations, "STUDY", "BioProject", "Accession"),
-    (iter_bp_experiment_relations, "EXPERIMENT", "BioProject", "Accession"),
-    (iter_bp_run_relations, "RUN", "BioProject", "Accession"),
-    (iter_bp_analysis_relations, "ANALYSIS", "BioProject", "Accession"),
-    # BioSample <-> SRA
-    (iter_bs_sample_relations, "SAMPLE", "BioSample", "Accession"),
-    (iter_bs_experiment_relations, "EXPERIMENT", "BioSample", "Accession"),
-    (iter_bs_run_relations, "RUN", "BioSample", "Accession"),
-    (iter_bs_analysis_relations, "ANALYSIS", "BioSample", "Accession"),
-]
-
-
-def _relation_id(spec: tuple) -> str:  # type: ignore[type-arg]
-    return spec[0].__name__  # type: ignore[no-any-return]
-
 
 def _make_row_for_relation(
     type_val: str | None,
@@ -540,93 +537,47 @@ def _make_row_for_relation(
     )
 
 
-class TestRelationIterators:
-    """全 8 relation イテレータの共通テスト。"""
+class TestIterBpBsRelations:
+    """iter_bp_bs_relations のテスト (Type フィルタなし)。
 
-    @pytest.mark.parametrize("spec", _RELATION_SPECS, ids=_relation_id)
-    def test_matching_row_returned(self, tmp_path: Path, spec: tuple) -> None:  # type: ignore[type-arg]
+    SRA 内部関連などは dblink/test_sra_internal.py で SQL 経路を検証する。
+    """
+
+    def test_matching_row_returned(self, tmp_path: Path) -> None:
         """マッチする行が返される。"""
-        func, type_filter, col1, col2 = spec
-        row = _make_row_for_relation(type_filter, col1, "VAL1", col2, "VAL2")
+        row = _make_row_for_relation("SAMPLE", "BioProject", "VAL1", "BioSample", "VAL2")
         config = _make_config_with_db(tmp_path, "sra", [row])
-        result = list(func(config, source="sra"))
-        assert ("VAL1", "VAL2") in result
+        assert ("VAL1", "VAL2") in list(iter_bp_bs_relations(config, source="sra"))
 
-    @pytest.mark.parametrize(
-        "spec",
-        [s for s in _RELATION_SPECS if s[1] is not None],
-        ids=lambda s: s[0].__name__,
-    )
-    def test_wrong_type_excluded(self, tmp_path: Path, spec: tuple) -> None:  # type: ignore[type-arg]
-        """異なる Type の行は除外される。"""
-        func, type_filter, col1, col2 = spec
-        wrong_type = "SUBMISSION" if type_filter != "SUBMISSION" else "RUN"
-        row = _make_row_for_relation(wrong_type, col1, "VAL1", col2, "VAL2")
+    def test_any_type_returned(self, tmp_path: Path) -> None:
+        """Type に関係なく返される。"""
+        row = _make_row_for_relation(None, "BioProject", "VAL1", "BioSample", "VAL2")
         config = _make_config_with_db(tmp_path, "sra", [row])
-        result = list(func(config, source="sra"))
-        assert result == []
+        assert list(iter_bp_bs_relations(config, source="sra")) == [("VAL1", "VAL2")]
 
-    @pytest.mark.parametrize("spec", _RELATION_SPECS, ids=_relation_id)
-    def test_null_col_excluded(self, tmp_path: Path, spec: tuple) -> None:  # type: ignore[type-arg]
+    def test_null_col_excluded(self, tmp_path: Path) -> None:
         """NULL カラムの行は除外される。"""
-        func, type_filter, col1, _col2 = spec
-        # col2 が NULL の行
-        mapping = {
-            "Accession": None,
-            "Submission": None,
-            "BioSample": None,
-            "BioProject": None,
-            "Study": None,
-            "Experiment": None,
-            "Sample": None,
-        }
-        mapping[col1] = "VAL1"  # type: ignore[assignment]
-        # col2 は None のまま
-        row = (
-            mapping["Accession"],
-            mapping["Submission"],
-            mapping["BioSample"],
-            mapping["BioProject"],
-            mapping["Study"],
-            mapping["Experiment"],
-            mapping["Sample"],
-            type_filter,
-            "live",
-            "public",
-            None,
-            None,
-            None,
-        )
+        row = _make_row_for_relation("SAMPLE", "BioProject", "VAL1", "Accession", "DRS000001")
         config = _make_config_with_db(tmp_path, "sra", [row])
-        result = list(func(config, source="sra"))
-        assert result == []
+        assert list(iter_bp_bs_relations(config, source="sra")) == []
 
-    @pytest.mark.parametrize("spec", _RELATION_SPECS, ids=_relation_id)
-    def test_distinct_dedup(self, tmp_path: Path, spec: tuple) -> None:  # type: ignore[type-arg]
+    def test_distinct_dedup(self, tmp_path: Path) -> None:
         """DISTINCT で重複が排除される。"""
-        func, type_filter, col1, col2 = spec
-        row = _make_row_for_relation(type_filter, col1, "VAL1", col2, "VAL2")
+        row = _make_row_for_relation("SAMPLE", "BioProject", "VAL1", "BioSample", "VAL2")
         config = _make_config_with_db(tmp_path, "sra", [row, row])
-        result = list(func(config, source="sra"))
-        assert len(result) == 1
+        assert len(list(iter_bp_bs_relations(config, source="sra"))) == 1
 
-    @pytest.mark.parametrize("spec", _RELATION_SPECS, ids=_relation_id)
-    def test_empty_table(self, tmp_path: Path, spec: tuple) -> None:  # type: ignore[type-arg]
+    def test_empty_table(self, tmp_path: Path) -> None:
         """空テーブル → 空リスト。"""
-        func, _, _, _ = spec
         config = _make_config_with_db(tmp_path, "sra", [])
-        result = list(func(config, source="sra"))
-        assert result == []
+        assert list(iter_bp_bs_relations(config, source="sra")) == []
 
-    @pytest.mark.parametrize("spec", _RELATION_SPECS, ids=_relation_id)
     @pytest.mark.parametrize("source", ["sra", "dra"])
-    def test_both_sources(self, tmp_path: Path, spec: tuple, source: str) -> None:  # type: ignore[type-arg]
+    def test_both_sources(self, tmp_path: Path, source: SourceKind) -> None:
         """sra/dra 両 source で動作する。"""
-        func, type_filter, col1, col2 = spec
-        row = _make_row_for_relation(type_filter, col1, "VAL1", col2, "VAL2")
+        row = _make_row_for_relation("SAMPLE", "BioProject", "VAL1", "BioSample", "VAL2")
         config = _make_config_with_db(tmp_path, source, [row])
-        result = list(func(config, source=source))
-        assert ("VAL1", "VAL2") in result
+        assert ("VAL1", "VAL2") in list(iter_bp_bs_relations(config, source=source))
 
 
 # ============================================================
@@ -1741,6 +1692,18 @@ class TestLookupSubmissionsForAccessions:
         result = lookup_submissions_for_accessions(config, "sra", ["SRR999999"])
         assert result == {}
 
+    def test_duplicate_input(self, tmp_path: Path) -> None:
+        """入力に同じ accession が重複しても 1 件として引ける。"""
+        config = _make_config_with_db(
+            tmp_path,
+            "sra",
+            [
+                ("SRR000001", "SRA000001", None, None, None, None, None, "RUN", "live", "public", None, None, None),
+            ],
+        )
+        result = lookup_submissions_for_accessions(config, "sra", ["SRR000001", "SRR000001"])
+        assert result == {"SRR000001": "SRA000001"}
+
 
 class TestGetSubmissionAccessions:
     """get_submission_accessions のテスト。"""
@@ -0,0 +1,228 @@
+"""xml_manifest のテスト。
+
+sniffer は parse せずに正規表現で accession を取るので、jsonl 側の parse 結果と
+ずれると regenerate で黙って not found になる。fixture の実データで一致を確かめる。
+"""
+
+from pathlib import Path
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from ddbj_search_converter.jsonl.bp import xml_entry_to_bp_instance
+from ddbj_search_converter.jsonl.bs import parse_accession
+from ddbj_search_converter.xml_manifest import (
+    ManifestEntry,
+    build_manifest,
+    build_unchanged_index,
+    commit_content_hashes,
+    content_hash,
+    content_hash_store_path,
+    load_unchanged_accessions,
+    lookup_manifest,
+    manifest_available,
+    manifest_part_path,
+    manifest_path,
+    read_manifest_elements,
+    sniff_bp_accession,
+    sniff_bs_accession,
+    write_manifest_rows,
+)
+from ddbj_search_converter.xml_utils import iterate_xml_element, parse_xml
+from py_tests.strategies import st_biosample_id
+
+FIXTURES_DIR = Path(__file__).resolve().parents[1] / "fixtures"
+BP_FIXTURE_DIR = FIXTURES_DIR / "usr/local/resources/bioproject"
+BS_FIXTURE_DIR = FIXTURES_DIR / "usr/local/resources/biosample"
+
+
+class TestSniffBpAccession:
+    @pytest.mark.parametrize(
+        ("file_name", "is_ddbj"),
+        [("bioproject.xml", False), ("ddbj_core_bioproject.xml", True)],
+    )
+    def test_matches_parsed_accession(self, file_name: str, is_ddbj: bool) -> None:
+        elements = list(iterate_xml_element(BP_FIXTURE_DIR / file_name, "Package"))
+        assert elements
+        for element in elements:
+            expected = xml_entry_to_bp_instance(parse_xml(element)["Package"], is_ddbj).identifier
+            assert sniff_bp_accession(element) == expected
+
+    def test_attribute_order_does_not_matter(self) -> None:
+        element = b'<Package><ArchiveID id="1" archive="NCBI" accession="PRJNA1"/></Package>'
+        assert sniff_bp_accession(element) == "PRJNA1"
+
+    def test_missing_archive_id_returns_none(self) -> None:
+        assert sniff_bp_accession(b"<Package><Project/></Package>") is None
+
+
+class TestSniffBsAccession:
+    @pytest.mark.parametrize(
+        ("file_name", "is_ddbj"),
+        [("biosample_set.xml.gz", False), ("ddbj_biosample_set.xml.gz", True)],
+    )
+    def test_matches_parsed_accession(self, file_name: str, is_ddbj: bool) -> None:
+        elements = list(iterate_xml_element(BS_FIXTURE_DIR / file_name, "BioSample"))
+        assert elements
+        for element in elements:
+            expected = parse_accession(parse_xml(element)["BioSample"], is_ddbj)
+            assert sniff_bs_accession(element, is_ddbj) == expected
+
+    def test_ncbi_ignores_accession_attribute_outside_start_tag(self) -> None:
+        """開始タグ以外の ``accession=`` (子要素の属性) を拾わない。"""
+        element = b'<BioSample id="1"><Link accession="SAMN9"/></BioSample>'
+        assert sniff_bs_accession(element, is_ddbj=False) is None
+
+    def test_ddbj_picks_biosample_namespace(self) -> None:
+        element = (
+            b"<BioSample><Ids>"
+            b'<Id namespace="SRA">DRS000001</Id>'
+            b'<Id namespace="BioSample" is_primary="1">SAMD00000001</Id>'
+            b"</Ids></BioSample>"
+        )
+        assert sniff_bs_accession(element, is_ddbj=True) == "SAMD00000001"
+
+    @given(accession=st_biosample_id())
+    def test_ncbi_roundtrip(self, accession: str) -> None:
+        element = f'<BioSample submission_date="2020" accession="{accession}" id="1">\n</BioSample>\n'.encode()
+        assert sniff_bs_accession(element, is_ddbj=False) == accession
+
+
+class TestManifestRoundTrip:
+    def _build(self, tmp_path: Path, rows_by_part: list[list[tuple[str, str, int, int]]]) -> Path:
+        parts = []
+        for i, rows in enumerate(rows_by_part):
+            part = manifest_part_path(tmp_path, "ncbi", i)
+            part.write_text("".join(f"{a}\t{f}\t{o}\t{n}\t0\n" for a, f, o, n in rows), encoding="utf-8")
+            parts.append(part)
+        return build_manifest(tmp_path, "ncbi", parts)
+
+    def test_build_merges_parts_and_removes_them(self, tmp_path: Path) -> None:
+        path = self._build(
+            tmp_path,
+            [[("SAMN2", "ncbi_1.xml", 10, 5)], [], [("SAMN1", "ncbi_2.xml", 3, 7)]],
+        )
+        assert path == manifest_path(tmp_path, "ncbi")
+        assert not list(tmp_path.glob("*.tsv"))
+        assert lookup_manifest(tmp_path, ["ncbi"], ["SAMN1", "SAMN2", "SAMN3"]) == [
+            ManifestEntry("SAMN2", "ncbi_1.xml", 10, 5),
+            ManifestEntry("SAMN1", "ncbi_2.xml", 3, 7),
+        ]
+
+    def test_lookup_without_manifest_returns_empty(self, tmp_path: Path) -> None:
+        assert lookup_manifest(tmp_path, ["ncbi"], ["SAMN1"]) == []
+
+    def test_read_manifest_elements(self, tmp_path: Path) -> None:
+        (tmp_path / "ncbi_1.xml").write_bytes(b"<Set>\n<A>1</A>\n<A>22</A>\n</Set>")
+        entries = [ManifestEntry("x", "ncbi_1.xml", 15, 10)]
+        assert list(read_manifest_elements(tmp_path, entries)) == [(tmp_path / "ncbi_1.xml", b"<A>22</A>\n")]
+
+    @settings(max_examples=20, deadline=None)
+    @given(accessions=st.lists(st_biosample_id(), min_size=1, max_size=30, unique=True))
+    def test_lookup_returns_exactly_requested(
+        self, tmp_path_factory: pytest.TempPathFactory, accessions: list[str]
+    ) -> None:
+        tmp_path = tmp_path_factory.mktemp("manifest")
+        rows = [(acc, f"ncbi_{i // 7 + 1}.xml", i * 100, 100) for i, acc in enumerate(accessions)]
+        self._build(tmp_path, [rows])
+        wanted = set(accessions[::2])
+        result = lookup_manifest(tmp_path, ["ncbi"], wanted | {"SAMN_NOT_THERE"})
+        assert {entry.accession for entry in result} == wanted
+        assert all(ManifestEntry(*row) in result for row in rows if row[0] in wanted)
+
+
+class TestManifestAvailable:
+    def test_no_split_files(self, tmp_path: Path) -> None:
+        assert manifest_available(tmp_path, ["ddbj", "ncbi"]) is False
+
+    def test_all_prefixes_have_manifest(self, tmp_path: Path) -> None:
+        for prefix in ("ddbj", "ncbi"):
+            (tmp_path / f"{prefix}_1.xml").touch()
+            manifest_path(tmp_path, prefix).touch()
+        assert manifest_available(tmp_path, ["ddbj", "ncbi"]) is True
+
+    def test_prefix_without_split_files_is_ignored(self, tmp_path: Path) -> None:
+        (tmp_path / "ncbi_1.xml").touch()
+        manifest_path(tmp_path, "ncbi").touch()
+        assert manifest_available(tmp_path, ["ddbj", "ncbi"]) is True
+
+    def test_missing_manifest_for_one_prefix(self, tmp_path: Path) -> None:
+        """片方だけ manifest がないと、そちらの accession を取りこぼすので使わない。"""
+        for prefix in ("ddbj", "ncbi"):
+            (tmp_path / f"{prefix}_1.xml").touch()
+        manifest_path(tmp_path, "ncbi").touch()
+        assert manifest_available(tmp_path, ["ddbj", "ncbi"]) is False
+
+
+class TestContentHash:
+    def _build(self, tmp_path: Path, files: dict[str, list[bytes]]) -> None:
+        """要素のバイト列から manifest を作る (offset は使わないので 0 始まり)。"""
+        part = manifest_part_path(tmp_path, "ncbi", 0)
+        with part.open("w", encoding="utf-8") as f:
+            for file_name, elements in files.items():
+                write_manifest_rows(f, file_name, elements, 0, lambda e: sniff_bs_accession(e, is_ddbj=False))
+        build_manifest(tmp_path, "ncbi", [part])
+
+    @staticmethod
+    def _element(accession: str, body: str) -> bytes:
+        return f'<BioSample accession="{accession}">{body}</BioSample>\n'.encode()
+
+    def test_hash_depends_only_on_bytes(self) -> None:
+        assert content_hash(b"<A>1</A>") == content_hash(b"<A>1</A>")
+        assert content_hash(b"<A>1</A>") != content_hash(b"<A>2</A>")
+
+    def test_unchanged_index_without_store_is_none(self, tmp_path: Path) -> None:
+        self._build(tmp_path, {"ncbi_1.xml": [self._element("SAMN1", "a")]})
+        assert build_unchanged_index(tmp_path, "ncbi", content_hash_store_path(tmp_path, "ncbi")) is None
+
+    def test_only_identical_entries_are_unchanged(self, tmp_path: Path) -> None:
+        prev_dir = tmp_path / "prev"
+        curr_dir = tmp_path / "curr"
+        prev_dir.mkdir()
+        curr_dir.mkdir()
+        store = content_hash_store_path(tmp_path, "ncbi")
+
+        self._build(
+            prev_dir,
+            {
+                "ncbi_1.xml": [self._element("SAMN1", "a"), self._element("SAMN2", "b")],
+                "ncbi_2.xml": [self._element("SAMN3", "c")],
+            },
+        )
+        assert commit_content_hashes(prev_dir, "ncbi", store, ["ncbi_1.xml", "ncbi_2.xml"]) == 3
+
+        # SAMN2 は内容が変わり、SAMN3 は別の分割ファイルに移動し、SAMN4 は新規
+        self._build(
+            curr_dir,
+            {
+                "ncbi_1.xml": [self._element("SAMN1", "a"), self._element("SAMN2", "B")],
+                "ncbi_2.xml": [self._element("SAMN4", "d")],
+                "ncbi_3.xml": [self._element("SAMN3", "c")],
+            },
+        )
+        index = build_unchanged_index(curr_dir, "ncbi", store)
+        assert index is not None
+        assert load_unchanged_accessions(index, "ncbi_1.xml") == {"SAMN1"}
+        assert load_unchanged_accessions(index, "ncbi_2.xml") == set()
+        assert load_unchanged_accessions(index, "ncbi_3.xml") == {"SAMN3"}
+
+    def test_commit_excludes_unfinished_files(self, tmp_path: Path) -> None:
+        """JSONL 生成に失敗した分割ファイルの hash を残すと、次回に読み飛ばされてしまう。"""
+        store = content_hash_store_path(tmp_path / "base", "ncbi")
+        self._build(
+            tmp_path,
+            {"ncbi_1.xml": [self._element("SAMN1", "a")], "ncbi_2.xml": [self._element("SAMN2", "b")]},
+        )
+        assert commit_content_hashes(tmp_path, "ncbi", store, ["ncbi_1.xml"]) == 1
+
+        index = build_unchanged_index(tmp_path, "ncbi", store)
+        assert index is not None
+        assert load_unchanged_accessions(index, "ncbi_1.xml") == {"SAMN1"}
+        assert load_unchanged_accessions(index, "ncbi_2.xml") == set()
+
+    def test_commit_without_manifest_keeps_store(self, tmp_path: Path) -> None:
+        store = content_hash_store_path(tmp_path, "ncbi")
+        store.write_bytes(b"previous")
+        assert commit_content_hashes(tmp_path / "missing", "ncbi", store, ["ncbi_1.xml"]) == 0
+        assert store.read_bytes() == b"previous"
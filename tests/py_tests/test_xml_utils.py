@@ -1,12 +1,40 @@
 """Tests for ddbj_search_converter.xml_utils module."""
 
 import gzip
+import shutil
+from functools import partial
 from pathlib import Path
 
 import pytest
+from hypothesis import HealthCheck, given, settings
+from hypothesis import strategies as st
+from lxml import etree
 
 from ddbj_search_converter.config import Config
-from ddbj_search_converter.xml_utils import extract_gzip, get_tmp_xml_dir, iterate_xml_element, parse_xml, split_xml
+from ddbj_search_converter.xml_manifest import (
+    lookup_manifest,
+    manifest_path,
+    read_manifest_elements,
+    sniff_bs_accession,
+)
+from ddbj_search_converter.xml_utils import (
+    _chunk_bounds,
+    _element_to_dict,
+    _plain_element_to_dict,
+    extract_gzip,
+    get_tmp_xml_dir,
+    iterate_xml_element,
+    iterate_xml_element_spans,
+    list_split_files,
+    open_xml_stream,
+    parse_xml,
+    sort_largest_first,
+    split_file_stem,
+    split_xml,
+)
+from tests.py_tests.strategies import st_biosample_id, st_xml_element_bytes
+
+RESOURCES_DIR = Path(__file__).resolve().parent.parent / "fixtures/usr/local/resources"
 
 
 class TestParseXml:
@@ -102,6 +130,34 @@ class TestParseXml:
         assert "root:x:0:0" not in str(result)
 
 
+class TestPlainElementToDict:
+    """名前空間なし用の高速版が ``_element_to_dict`` と同じ dict を返すこと。"""
+
+    @given(xml_bytes=st_xml_element_bytes())
+    def test_matches_generic(self, xml_bytes: bytes) -> None:
+        root = etree.fromstring(xml_bytes)
+        assert _plain_element_to_dict(root) == _element_to_dict(root)
+
+    @pytest.mark.parametrize(
+        ("path", "tag"),
+        [
+            ("bioproject/bioproject.xml", "Package"),
+            ("bioproject/ddbj_core_bioproject.xml", "Package"),
+            ("biosample/biosample_set.xml.gz", "BioSample"),
+            ("biosample/ddbj_biosample_set.xml.gz", "BioSample"),
+        ],
+    )
+    def test_matches_generic_on_fixtures(self, path: str, tag: str) -> None:
+        for element in iterate_xml_element(RESOURCES_DIR / path, tag):
+            root = etree.fromstring(element)
+            assert _plain_element_to_dict(root) == _element_to_dict(root)
+
+    def test_parse_xml_keeps_namespace_declarations(self) -> None:
+        """``xmlns`` を含む入力は従来の経路で処理し、宣言を属性として残す。"""
+        result = parse_xml(b'<a xmlns:x="urn:x"><x:b>1</x:b></a>')
+        assert result == {"a": {"xmlns:x": "urn:x", "b": "1"}}
+
+
 class TestGetTmpXmlDir:
     """Tests for get_tmp_xml_dir function."""
 
@@ -233,11 +289,10 @@ class TestBug3SameLineElement:
 
 
 class TestClosingTagBehavior:
-    """Bug #16 (by design): iterate_xml_element の終了タグ行頭検出。
+    """Bug #16 (fixed): 終了タグが行頭に無い要素も検出する。
 
-    iterate_xml_element は行ベースパーサのため、終了タグ `</Tag>` が
-    行頭に現れることを前提にしている。これは性能のための設計判断であり、
-    DDBJ Search の XML データではこの仮定が成り立つ。
+    以前の行ベースの実装は終了タグ `</Tag>` が行頭に現れることを前提にしており、
+    インデントされた終了タグや、子要素と同じ行に続く終了タグを取りこぼしていた。
     """
 
     def test_closing_tag_at_line_start(self, tmp_path: Path) -> None:
@@ -259,11 +314,7 @@ class TestClosingTagBehavior:
         assert len(elements) == 2
 
     def test_closing_tag_indented(self, tmp_path: Path) -> None:
-        """終了タグがインデントされている場合の動作。
-
-        行ベースパーサなので、終了タグが行頭にない場合は
-        同一行の開始+終了パターンでのみ検出される。
-        """
+        """インデントされた終了タグでも要素全体を返す。"""
         xml_content = b"""<?xml version="1.0" encoding="UTF-8"?>
 <Root>
 <Item id="1">
@@ -275,9 +326,90 @@ class TestClosingTagBehavior:
         xml_file.write_bytes(xml_content)
 
         elements = list(iterate_xml_element(xml_file, "Item"))
-        # インデントされた終了タグは行頭検出に引っかからないが、
-        # 次の要素の開始タグや EOF で暗黙的に終了する
-        assert len(elements) >= 0  # 実装依存の動作をドキュメント
+        assert len(elements) == 1
+        assert parse_xml(elements[0]) == {"Item": {"id": "1", "Name": "First"}}
+
+    def test_closing_tag_after_child_on_same_line(self, tmp_path: Path) -> None:
+        """子要素と同じ行に続く終了タグ、1 行に複数要素が並ぶ XML も扱える。"""
+        xml_content = b'<Root><Item id="1">\n  <Name>First</Name></Item><Item id="2"><Name>Second</Name></Item></Root>'
+        xml_file = tmp_path / "test.xml"
+        xml_file.write_bytes(xml_content)
+
+        elements = list(iterate_xml_element(xml_file, "Item"))
+        assert [parse_xml(e)["Item"]["Name"] for e in elements] == ["First", "Second"]
+
+
+class TestIterateXmlElementSpans:
+    """Tests for iterate_xml_element_spans function."""
+
+    def test_spans_point_at_elements(self, tmp_path: Path) -> None:
+        xml_content = b"""<BioSampleSet>
+<BioSample accession="SAMN00000001"><Title>1</Title></BioSample>
+<BioSampleExtra/>
+<BioSample accession="SAMN00000002">
+  <Title>2</Title>
+</BioSample>
+</BioSampleSet>
+"""
+        xml_file = tmp_path / "test.xml"
+        xml_file.write_bytes(xml_content)
+
+        spans = list(iterate_xml_element_spans(xml_file, "BioSample"))
+        assert [xml_content[s:e] for s, e in spans] == list(iterate_xml_element(xml_file, "BioSample"))
+        assert xml_content[spans[0][0] : spans[0][1]].startswith(b'<BioSample accession="SAMN00000001">')
+        assert xml_content[spans[1][0] : spans[1][1]].endswith(b"</BioSample>\n")
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        xml_file = tmp_path / "empty.xml"
+        xml_file.write_bytes(b"")
+        assert list(iterate_xml_element_spans(xml_file, "BioSample")) == []
+
+
+def _st_biosample_xml() -> st.SearchStrategy[tuple[bytes, list[str]]]:
+    """``<BioSample>`` 要素を改行・インデントの揺れ付きで並べた XML と、その accession 列。"""
+    element = st.tuples(
+        st_biosample_id(),
+        st.sampled_from(["", "  ", "\n"]),
+        st.sampled_from(["\n", "", "\r\n"]),
+    )
+    return st.lists(element, max_size=8).map(
+        lambda items: (
+            b"<BioSampleSet>\n"
+            + b"".join(
+                f'<BioSampleX/><BioSample accession="{acc}">{sep}<Title>t</Title>{sep}</BioSample>{nl}'.encode()
+                for acc, sep, nl in items
+            )
+            + b"</BioSampleSet>\n",
+            [acc for acc, _, _ in items],
+        )
+    )
+
+
+class TestIterateXmlElementProperties:
+    """mmap 走査と stream 走査 (chunk 境界を細かく切る) が同じ要素列を返すこと。"""
+
+    @given(data=_st_biosample_xml(), chunk_size=st.integers(min_value=1, max_value=64))
+    @settings(max_examples=50, suppress_health_check=[HealthCheck.function_scoped_fixture])
+    def test_mmap_and_gzip_stream_agree(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        data: tuple[bytes, list[str]],
+        chunk_size: int,
+    ) -> None:
+        xml_content, accessions = data
+        monkeypatch.setattr(shutil, "which", lambda _name: None)
+        monkeypatch.setattr("ddbj_search_converter.xml_utils.STREAM_CHUNK_SIZE", chunk_size)
+        plain_file = tmp_path / "input.xml"
+        plain_file.write_bytes(xml_content)
+        gz_file = tmp_path / "input.xml.gz"
+        gz_file.write_bytes(gzip.compress(xml_content))
+
+        from_mmap = list(iterate_xml_element(plain_file, "BioSample"))
+        from_stream = list(iterate_xml_element(gz_file, "BioSample"))
+
+        assert from_mmap == from_stream
+        assert [parse_xml(e)["BioSample"]["accession"] for e in from_mmap] == accessions
 
 
 class TestSplitXml:
@@ -337,6 +469,280 @@ class TestSplitXml:
         assert output_files == []
 
 
+def _write_biosample_set(xml_file: Path, n: int) -> None:
+    """サイズがばらつく ``<BioSample>`` を n 件並べた XML を書く。"""
+    xml_file.write_bytes(
+        b'<?xml version="1.0" encoding="UTF-8"?>\n<BioSampleSet>\n'
+        + b"".join(
+            f'<BioSample accession="SAMN{i:08d}">\n  <Title>{"x" * (i * 37 % 500)}</Title>\n</BioSample>\n'.encode()
+            for i in range(n)
+        )
+        + b"</BioSampleSet>\n"
+    )
+
+
+class TestSplitXmlParallel:
+    """バイト範囲の並列分割が逐次分割と同じ番号・内容のファイルを出すこと。"""
+
+    @pytest.mark.parametrize(
+        ("n", "batch_size", "parallel_num", "max_bytes"),
+        [
+            (0, 3, 4, None),
+            (1, 3, 4, None),
+            (10, 3, 4, None),
+            (10, 5, 2, None),
+            (10, 100, 4, None),
+            (25, 1, 3, None),
+            (30, 7, 16, None),
+            (30, 100, 4, 1000),
+            (30, 4, 3, 1500),
+            (40, 100, 16, 1),
+        ],
+    )
+    def test_parallel_matches_sequential(
+        self, tmp_path: Path, n: int, batch_size: int, parallel_num: int, max_bytes: int | None
+    ) -> None:
+        xml_file = tmp_path / "input.xml"
+        _write_biosample_set(xml_file, n)
+        kwargs = {
+            "batch_size": batch_size,
+            "tag": "BioSample",
+            "prefix": "ncbi",
+            "wrapper_start": b"<BioSampleSet>\n",
+            "wrapper_end": b"</BioSampleSet>",
+            "max_bytes": max_bytes,
+        }
+
+        sequential = split_xml(xml_file, tmp_path / "seq", **kwargs)  # type: ignore[arg-type]
+        parallel = split_xml(xml_file, tmp_path / "par", parallel_num=parallel_num, **kwargs)  # type: ignore[arg-type]
+
+        assert [p.name for p in parallel] == [p.name for p in sequential]
+        assert [p.read_bytes() for p in parallel] == [p.read_bytes() for p in sequential]
+        assert sorted(p.name for p in (tmp_path / "par").iterdir()) == sorted(p.name for p in sequential)
+
+    def test_range_boundary_inside_element_is_resynced(self, tmp_path: Path) -> None:
+        """等分オフセットが要素の途中やプレフィクスタグに落ちても要素を割らない。"""
+        xml_file = tmp_path / "input.xml"
+        long_element = b'<BioSample accession="SAMN1"><Title>' + b"a" * 200 + b"</Title></BioSample>\n"
+        xml_file.write_bytes(
+            b"<BioSampleSet>\n"
+            + long_element
+            + b'<BioSampleX id="x"/>' * 20
+            + b'<BioSample accession="SAMN2"><Title>b</Title></BioSample>\n'
+            + b"</BioSampleSet>\n"
+        )
+        output_files = split_xml(
+            xml_file,
+            tmp_path / "out",
+            batch_size=1,
+            tag="BioSample",
+            prefix="ncbi",
+            wrapper_start=b"<BioSampleSet>\n",
+            wrapper_end=b"</BioSampleSet>",
+            parallel_num=8,
+        )
+        assert [parse_xml(p.read_bytes())["BioSampleSet"]["BioSample"]["accession"] for p in output_files] == [
+            "SAMN1",
+            "SAMN2",
+        ]
+
+    def test_gzip_input_falls_back_to_sequential(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(shutil, "which", lambda _name: None)
+        plain_file = tmp_path / "input.xml"
+        _write_biosample_set(plain_file, 7)
+        gz_file = tmp_path / "input.xml.gz"
+        gz_file.write_bytes(gzip.compress(plain_file.read_bytes()))
+
+        output_files = split_xml(
+            gz_file,
+            tmp_path / "out",
+            batch_size=3,
+            tag="BioSample",
+            prefix="ncbi",
+            wrapper_start=b"<BioSampleSet>\n",
+            wrapper_end=b"</BioSampleSet>",
+            parallel_num=4,
+        )
+        assert [p.name for p in output_files] == ["ncbi_1.xml", "ncbi_2.xml", "ncbi_3.xml"]
+
+
+class TestSplitXmlMaxBytes:
+    """``max_bytes`` で要素のバイト数の合計が予算に達した時点で分割ファイルを閉じること。"""
+
+    def test_files_close_at_byte_budget(self, tmp_path: Path) -> None:
+        xml_file = tmp_path / "input.xml"
+        _write_biosample_set(xml_file, 50)
+        max_bytes = 2000
+        output_files = split_xml(
+            xml_file,
+            tmp_path / "out",
+            batch_size=1000,
+            tag="BioSample",
+            prefix="ncbi",
+            wrapper_start=b"<BioSampleSet>",
+            wrapper_end=b"</BioSampleSet>",
+            max_bytes=max_bytes,
+        )
+
+        all_elements = list(iterate_xml_element(xml_file, "BioSample"))
+        per_file = [list(iterate_xml_element(p, "BioSample")) for p in output_files]
+        assert [e for elements in per_file for e in elements] == all_elements
+        for elements in per_file[:-1]:
+            # 予算に達した要素で閉じるので、最後の要素を除けば予算未満
+            assert sum(map(len, elements[:-1])) < max_bytes <= sum(map(len, elements))
+        assert sum(map(len, per_file[-1])) > 0
+
+    @given(
+        sizes=st.lists(st.integers(min_value=1, max_value=1000), max_size=200),
+        batch_size=st.integers(min_value=1, max_value=50),
+        max_bytes=st.one_of(st.none(), st.integers(min_value=1, max_value=5000)),
+    )
+    def test_chunk_bounds_cover_all_elements(self, sizes: list[int], batch_size: int, max_bytes: int | None) -> None:
+        bounds = _chunk_bounds(sizes, batch_size, max_bytes)
+
+        assert [index for start, end in bounds for index in range(start, end)] == list(range(len(sizes)))
+        for start, end in bounds:
+            assert end - start <= batch_size
+            if max_bytes is not None and end - start > 1:
+                assert sum(sizes[start : end - 1]) < max_bytes
+
+
+class TestSortLargestFirst:
+    def test_orders_by_size_descending(self, tmp_path: Path) -> None:
+        for name, size in [("ncbi_1.xml", 10), ("ncbi_2.xml", 300), ("ncbi_3.xml", 20)]:
+            (tmp_path / name).write_bytes(b"x" * size)
+        files = list_split_files(tmp_path, "ncbi")
+        assert [p.name for p in sort_largest_first(files)] == ["ncbi_2.xml", "ncbi_3.xml", "ncbi_1.xml"]
+
+
+class TestSplitXmlManifest:
+    """``sniffer`` を渡すと、分割ファイル内の位置を指す manifest が書かれること。"""
+
+    @pytest.mark.parametrize("parallel_num", [1, 3])
+    def test_manifest_points_to_each_element(self, tmp_path: Path, parallel_num: int) -> None:
+        xml_file = tmp_path / "input.xml"
+        _write_biosample_set(xml_file, 20)
+        out_dir = tmp_path / "out"
+        split_xml(
+            xml_file,
+            out_dir,
+            batch_size=6,
+            tag="BioSample",
+            prefix="ncbi",
+            wrapper_start=b"<BioSampleSet>",
+            wrapper_end=b"</BioSampleSet>",
+            parallel_num=parallel_num,
+            sniffer=partial(sniff_bs_accession, is_ddbj=False),
+        )
+
+        accessions = [f"SAMN{i:08d}" for i in range(20)]
+        entries = lookup_manifest(out_dir, ["ncbi"], accessions)
+        assert sorted(entry.accession for entry in entries) == accessions
+        assert not list(out_dir.glob("*.tsv"))
+        for entry, (_path, element) in zip(entries, read_manifest_elements(out_dir, entries), strict=True):
+            assert parse_xml(element)["BioSample"]["accession"] == entry.accession
+        assert {entry.file for entry in entries} == {"ncbi_1.xml", "ncbi_2.xml", "ncbi_3.xml", "ncbi_4.xml"}
+
+    def test_resplit_without_sniffer_removes_stale_manifest(self, tmp_path: Path) -> None:
+        xml_file = tmp_path / "input.xml"
+        _write_biosample_set(xml_file, 3)
+        kwargs = {
+            "batch_size": 2,
+            "tag": "BioSample",
+            "prefix": "ncbi",
+            "wrapper_start": b"<BioSampleSet>",
+            "wrapper_end": b"</BioSampleSet>",
+        }
+        split_xml(xml_file, tmp_path, sniffer=partial(sniff_bs_accession, is_ddbj=False), **kwargs)  # type: ignore[arg-type]
+        assert manifest_path(tmp_path, "ncbi").exists()
+
+        split_xml(xml_file, tmp_path, **kwargs)  # type: ignore[arg-type]
+        assert not manifest_path(tmp_path, "ncbi").exists()
+
+
+_COMPRESSIONS = [
+    "gzip",
+    pytest.param("zstd", marks=pytest.mark.skipif(shutil.which("zstd") is None, reason="zstd is not installed")),
+]
+
+
+class TestSplitXmlCompressed:
+    """``compression`` を渡すと圧縮した分割ファイルを書き、読む側は透過的に展開すること。"""
+
+    _KWARGS = {
+        "batch_size": 6,
+        "tag": "BioSample",
+        "prefix": "ncbi",
+        "wrapper_start": b"<BioSampleSet>",
+        "wrapper_end": b"</BioSampleSet>",
+    }
+
+    @pytest.mark.parametrize("compression", _COMPRESSIONS)
+    @pytest.mark.parametrize("parallel_num", [1, 3])
+    def test_elements_match_uncompressed(self, tmp_path: Path, compression: str, parallel_num: int) -> None:
+        xml_file = tmp_path / "input.xml"
+        _write_biosample_set(xml_file, 20)
+
+        plain = split_xml(xml_file, tmp_path / "plain", **self._KWARGS)  # type: ignore[arg-type]
+        compressed = split_xml(
+            xml_file,
+            tmp_path / "compressed",
+            parallel_num=parallel_num,
+            compression=compression,  # type: ignore[arg-type]
+            **self._KWARGS,  # type: ignore[arg-type]
+        )
+
+        suffix = ".xml.gz" if compression == "gzip" else ".xml.zst"
+        assert [p.name for p in compressed] == [f"ncbi_{n}{suffix}" for n in range(1, 5)]
+        assert list_split_files(tmp_path / "compressed", "ncbi") == compressed
+        assert [split_file_stem(p) for p in compressed] == [split_file_stem(p) for p in plain]
+        for plain_file, compressed_file in zip(plain, compressed, strict=True):
+            with open_xml_stream(compressed_file) as f:
+                assert f.read() == plain_file.read_bytes()
+            assert list(iterate_xml_element(compressed_file, "BioSample")) == list(
+                iterate_xml_element(plain_file, "BioSample")
+            )
+
+    @pytest.mark.parametrize("compression", _COMPRESSIONS)
+    def test_manifest_reads_compressed_files(self, tmp_path: Path, compression: str) -> None:
+        """manifest の offset は展開後の位置で、圧縮ファイルからも要素を取り出せる。"""
+        xml_file = tmp_path / "input.xml"
+        _write_biosample_set(xml_file, 20)
+        out_dir = tmp_path / "out"
+        split_xml(
+            xml_file,
+            out_dir,
+            sniffer=partial(sniff_bs_accession, is_ddbj=False),
+            compression=compression,  # type: ignore[arg-type]
+            **self._KWARGS,  # type: ignore[arg-type]
+        )
+
+        targets = ["SAMN00000001", "SAMN00000007", "SAMN00000008", "SAMN00000019"]
+        entries = lookup_manifest(out_dir, ["ncbi"], targets)
+        elements = list(read_manifest_elements(out_dir, entries))
+        assert sorted(parse_xml(element)["BioSample"]["accession"] for _path, element in elements) == targets
+
+    def test_resplit_with_other_compression_removes_old_files(self, tmp_path: Path) -> None:
+        """圧縮形式を変えて分割し直しても、前回の分割ファイルが残って二重に読まれない。"""
+        xml_file = tmp_path / "input.xml"
+        _write_biosample_set(xml_file, 20)
+        split_xml(xml_file, tmp_path / "out", **self._KWARGS)  # type: ignore[arg-type]
+        compressed = split_xml(xml_file, tmp_path / "out", compression="gzip", **self._KWARGS)  # type: ignore[arg-type]
+
+        assert list_split_files(tmp_path / "out", "ncbi") == compressed
+
+
+class TestSplitFileHelpers:
+    def test_list_split_files_ignores_other_files(self, tmp_path: Path) -> None:
+        for name in ["ncbi_1.xml", "ncbi_2.xml.gz", "ncbi_3.xml.zst", "ncbi_manifest.parquet", "ddbj_1.xml"]:
+            (tmp_path / name).touch()
+        assert [p.name for p in list_split_files(tmp_path, "ncbi")] == ["ncbi_1.xml", "ncbi_2.xml.gz", "ncbi_3.xml.zst"]
+
+    @pytest.mark.parametrize("name", ["ncbi_12.xml", "ncbi_12.xml.gz", "ncbi_12.xml.zst"])
+    def test_split_file_stem(self, name: str) -> None:
+        assert split_file_stem(Path(name)) == "ncbi_12"
+
+
 class TestExtractGzip:
     """Tests for extract_gzip function."""
 
@@ -365,6 +771,75 @@ class TestExtractGzip:
         assert result.exists()
 
 
+class TestOpenXmlStream:
+    """Tests for open_xml_stream function."""
+
+    def test_plain_file_is_read_as_is(self, tmp_path: Path) -> None:
+        xml_file = tmp_path / "test.xml"
+        xml_file.write_bytes(b"<Root>plain</Root>\n")
+        with open_xml_stream(xml_file) as f:
+            assert f.read() == b"<Root>plain</Root>\n"
+
+    def test_gzip_without_pigz_falls_back_to_gzip_module(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(shutil, "which", lambda _name: None)
+        gz_file = tmp_path / "test.xml.gz"
+        with gzip.open(gz_file, "wb") as f:
+            f.write(b"<Root>gz</Root>\n")
+        with open_xml_stream(gz_file) as f:
+            assert f.read() == b"<Root>gz</Root>\n"
+
+    @pytest.mark.skipif(shutil.which("pigz") is None, reason="pigz is not installed")
+    def test_gzip_with_pigz(self, tmp_path: Path) -> None:
+        gz_file = tmp_path / "test.xml.gz"
+        with gzip.open(gz_file, "wb") as f:
+            f.write(b"<Root>pigz</Root>\n")
+        with open_xml_stream(gz_file) as f:
+            assert f.read() == b"<Root>pigz</Root>\n"
+
+    @pytest.mark.skipif(shutil.which("pigz") is None, reason="pigz is not installed")
+    def test_corrupt_gzip_with_pigz_raises(self, tmp_path: Path) -> None:
+        """pigz の異常終了を握り潰さない (途中までの分割結果で成功扱いにしない)。"""
+        gz_file = tmp_path / "broken.xml.gz"
+        gz_file.write_bytes(gzip.compress(b"<Root>" + b"x" * 10000 + b"</Root>")[:-20])
+        with pytest.raises(Exception), open_xml_stream(gz_file) as f:
+            f.read()
+
+
+class TestSplitGzipStreaming:
+    """``.gz`` を展開済みファイルなしで分割できること (prepare_biosample_xml 用)。"""
+
+    def test_gzip_split_matches_plain_split(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(shutil, "which", lambda _name: None)
+        xml_content = (
+            b'<?xml version="1.0" encoding="UTF-8"?>\n<BioSampleSet>\n'
+            + b"".join(
+                f'<BioSample accession="SAMN{i:08d}">\n  <Title>Sample {i}</Title>\n</BioSample>\n'.encode()
+                for i in range(5)
+            )
+            + b"</BioSampleSet>\n"
+        )
+        plain_file = tmp_path / "input.xml"
+        plain_file.write_bytes(xml_content)
+        gz_file = tmp_path / "input.xml.gz"
+        with gzip.open(gz_file, "wb") as f:
+            f.write(xml_content)
+
+        kwargs = {
+            "batch_size": 2,
+            "tag": "BioSample",
+            "prefix": "ncbi",
+            "wrapper_start": b"<BioSampleSet>\n",
+            "wrapper_end": b"</BioSampleSet>",
+        }
+        plain_files = split_xml(plain_file, tmp_path / "plain", **kwargs)  # type: ignore[arg-type]
+        gz_files = split_xml(gz_file, tmp_path / "gz", **kwargs)  # type: ignore[arg-type]
+
+        assert [p.name for p in gz_files] == ["ncbi_1.xml", "ncbi_2.xml", "ncbi_3.xml"]
+        assert [p.read_bytes() for p in gz_files] == [p.read_bytes() for p in plain_files]
+        # 展開済みの中間ファイルを作らない
+        assert not (tmp_path / "gz" / "input.xml").exists()
+
+
 class TestIntegration:
     """Integration tests: iterate_xml_element + split."""
 